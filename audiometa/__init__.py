@@ -1,25 +1,46 @@
 """Audio metadata handling module.
 
 A comprehensive Python library for reading and writing audio metadata across multiple formats
-including MP3, FLAC, WAV, and more. Supports ID3v1, ID3v2, Vorbis (OGG/FLAC), and RIFF (WAV) formats
+including MP3, FLAC, WAV, and more. Supports ID3v1, ID3v2, Vorbis (OGG/FLAC), RIFF (WAV) and MP4 (M4A) formats
 with 50+ metadata fields including title, artist, album, rating, BPM, and more.
 
 For detailed metadata support information, see the README.md file.
 """
 
-from mutagen.id3 import ID3
-
-from .audio_file import AudioFile
+from .audio_file import (FLAC_BEST_COMPRESSION_LEVEL, FLAC_FAST_COMPRESSION_LEVEL, AudioFile, DiskBasedFile,
+                         OutputFile)
 from .exceptions import FileTypeNotSupportedError
 from .utils.types import AppMetadata, AppMetadataValue
+from .utils.AudioTechnicalInfo import AudioTechnicalInfo
+from .utils.ByteBudgetPolicy import ByteBudgetPolicy
+from .utils.IoStats import IoStats
+from .utils.LayoutRegion import LayoutRegion
+from .utils.LayoutRegionType import LayoutRegionType
+from .utils.MetadataDeletionReport import MetadataDeletionReport
+from .utils.MetadataUpdateResult import MetadataUpdateResult
+from .utils.Mp3DurationMode import Mp3DurationMode
+from .utils.mp3_seek_table import DEFAULT_SEEK_TABLE_INTERVAL_MS, Mp3SeekTable
+from .utils.payload_hash import DEFAULT_PAYLOAD_HASH_ALGORITHM
+from .utils.instrumentation import (HistogramInstrumentation, Instrumentation, StageTimingHistogram,
+                                    get_instrumentation, set_instrumentation)
 from .utils.TagFormat import MetadataFormat
 from .utils.AppMetadataKey import AppMetadataKey
+from .utils.TrackMetadata import TrackMetadata
 from .manager.id3v1.Id3v1Manager import Id3v1Manager
 from .manager.MetadataManager import MetadataManager
 from .manager.rating_supporting.RatingSupportingMetadataManager import RatingSupportingMetadataManager
 from .manager.rating_supporting.Id3v2Manager import Id3v2Manager
 from .manager.rating_supporting.RiffManager import RiffManager
 from .manager.rating_supporting.VorbisManager import VorbisManager
+from .manager.rating_supporting.Mp4Manager import Mp4Manager
+from .flac_md5_repair import FlacMd5RepairResult, repair_flac_md5_many
+from .library_index import LibraryIndex, LibrarySyncReport
+from .tag_stripping import TagStripResult, strip_many
+from .payload_hashing import PayloadHashResult, get_payload_hash_many
+from .columnar_export import (DictionaryColumn, MetadataColumns, export_columns, export_columns_to_csv,
+                              export_columns_to_jsonl, iter_exported_column_chunks)
+from .library_watcher import LibraryChangeEvent, LibraryWatcher, watch_library
+from .utils.LibraryChangeType import LibraryChangeType
 
 
 FILE_EXTENSION_NOT_HANDLED_MESSAGE = "The file's format is not handled by the service."
@@ -28,10 +49,11 @@ TAG_FORMAT_MANAGER_CLASS_MAP = {
     MetadataFormat.ID3V1: Id3v1Manager,
     MetadataFormat.ID3V2: Id3v2Manager,
     MetadataFormat.VORBIS: VorbisManager,
-    MetadataFormat.RIFF: RiffManager
+    MetadataFormat.RIFF: RiffManager,
+    MetadataFormat.MP4: Mp4Manager
 }
 
-FILE_TYPE = AudioFile | str
+FILE_TYPE = AudioFile | DiskBasedFile
 
 
 def _get_metadata_manager(
@@ -117,12 +139,30 @@ def get_specific_metadata(file: FILE_TYPE, app_metadata_key: AppMetadataKey) ->
 
 
 def update_file_metadata(
-        file: FILE_TYPE, app_metadata: AppMetadata, normalized_rating_max_value: int | None = None) -> None:
+        file: FILE_TYPE, app_metadata: AppMetadata, normalized_rating_max_value: int | None = None,
+        output: OutputFile | None = None) -> MetadataUpdateResult:
+    """
+    Updates the metadata of the file in place or, if output is given, writes the updated file to output, leaving the
+    file untouched.
+
+    Only the values differing from the current ones, once normalized, are written (see MetadataUpdateResult): if
+    none does, the file is read but not written.
+
+    Args:
+        output: Path of the file to create or replace, or writable binary stream. Only the tag regions are rewritten:
+            the audio payload is copied unchanged, by the kernel (os.copy_file_range, os.sendfile) when both ends are
+            files. WAV and Ogg files, whose tags may be interleaved with the audio, are copied then updated.
+    """
     if not isinstance(file, AudioFile):
         file = AudioFile(file)
+    if output is not None:
+        results: list[MetadataUpdateResult] = []
+        file.write_to(output, lambda scratch_file: results.append(update_file_metadata(
+            scratch_file, app_metadata, normalized_rating_max_value=normalized_rating_max_value)))
+        return results[0]
     prioritary_metadata_manager = _get_metadata_manager(
         file=file, normalized_rating_max_value=normalized_rating_max_value)
-    prioritary_metadata_manager.update_file_metadata(app_metadata=app_metadata)
+    return prioritary_metadata_manager.update_file_metadata(app_metadata=app_metadata)
 
 
 def delete_metadata(file, tag_format: MetadataFormat | None = None) -> bool:
@@ -131,16 +171,68 @@ def delete_metadata(file, tag_format: MetadataFormat | None = None) -> bool:
     return _get_metadata_manager(file, tag_format=tag_format).delete_metadata()
 
 
-def get_bitrate(file: FILE_TYPE) -> int:
+def delete_metadata_with_report(file: FILE_TYPE, tag_format: MetadataFormat | None = None,
+                                in_place: bool = False) -> MetadataDeletionReport:
+    """
+    Deletes the metadata like delete_metadata, reporting the bytes reclaimed.
+
+    RIFF INFO chunks and leading ID3v2 tags are removed without rewriting the file: the following bytes are shifted
+    backward in place, by the kernel (os.copy_file_range) for large shifts, then the file is truncated. Trailing ID3v1
+    tags are truncated.
+
+    Args:
+        file: The file to delete the metadata from. Can be AudioFile or str path.
+        tag_format: The metadata format to delete, the prioritary one of the file format by default
+        in_place: Blank the metadata where it is instead of removing it, so that no audio byte is moved: a RIFF INFO
+            chunk is turned into a JUNK chunk, ID3v2 tags into an empty tag of the same size
+    """
+    if not isinstance(file, AudioFile):
+        file = AudioFile(file)
+    return _get_metadata_manager(file, tag_format=tag_format).delete_metadata_with_report(in_place=in_place)
+
+
+def get_technical_info(
+        file: FILE_TYPE, mp3_duration_mode: Mp3DurationMode = Mp3DurationMode.MUTAGEN) -> AudioTechnicalInfo:
+    if not isinstance(file, AudioFile):
+        file = AudioFile(file)
+    return file.get_technical_info(mp3_duration_mode)
+
+
+def get_bitrate(file: FILE_TYPE, mp3_duration_mode: Mp3DurationMode = Mp3DurationMode.MUTAGEN) -> int:
     if not isinstance(file, AudioFile):
         file = AudioFile(file)
-    return file.get_bitrate()
+    return file.get_bitrate(mp3_duration_mode)
 
 
-def get_duration_in_sec(file: FILE_TYPE) -> float:
+def get_duration_in_sec(file: FILE_TYPE, mp3_duration_mode: Mp3DurationMode = Mp3DurationMode.MUTAGEN) -> float:
     if not isinstance(file, AudioFile):
         file = AudioFile(file)
-    return file.get_duration_in_sec()
+    return file.get_duration_in_sec(mp3_duration_mode)
+
+
+def get_mp3_seek_table(file: FILE_TYPE, interval_ms: int = DEFAULT_SEEK_TABLE_INTERVAL_MS,
+                       cache_dir: str | None = None) -> Mp3SeekTable:
+    if not isinstance(file, AudioFile):
+        file = AudioFile(file)
+    return file.get_mp3_seek_table(interval_ms=interval_ms, cache_dir=cache_dir)
+
+
+def get_payload_hash(file: FILE_TYPE, algorithm: str = DEFAULT_PAYLOAD_HASH_ALGORITHM) -> str:
+    """
+    Returns the hexadecimal hash of the audio bytes of the file, excluding its tags (ID3v2 tags, FLAC metadata blocks,
+    RIFF chunks other than 'data', APEv2 and ID3v1 tags), so that copies tagged differently have the same hash.
+    For many files, use get_payload_hash_many.
+
+    Args:
+        file: The file to hash. Can be AudioFile or str path.
+        algorithm: Name of a hashlib algorithm, e.g. 'sha256', 'blake2b' or 'md5'
+
+    Raises:
+        FileTypeNotSupportedError: If the format is not MP3, FLAC or WAV
+    """
+    if not isinstance(file, AudioFile):
+        file = AudioFile(file)
+    return file.get_payload_hash(algorithm)
 
 
 def is_flac_md5_valid(file: FILE_TYPE) -> bool:
@@ -149,12 +241,14 @@ def is_flac_md5_valid(file: FILE_TYPE) -> bool:
     return file.is_flac_file_md5_valid()
 
 
-def fix_md5_checking(file: FILE_TYPE) -> str:
+def fix_md5_checking(file: FILE_TYPE, compression_level: int = FLAC_BEST_COMPRESSION_LEVEL) -> str:
     """
     Returns a temporary file with corrected MD5 signature.
 
     Args:
         file: The file to fix MD5 for. Can be AudioFile or str path.
+        compression_level: FLAC compression level of the reencoded file (0-8). For many files, use
+            repair_flac_md5_many instead.
 
     Returns:
         str: Path to a temporary file containing the corrected audio data.
@@ -166,14 +260,12 @@ def fix_md5_checking(file: FILE_TYPE) -> str:
     """
     if not isinstance(file, AudioFile):
         file = AudioFile(file)
-    return file.get_file_with_corrected_md5(delete_original=True)
+    return file.get_file_with_corrected_md5(delete_original=True, compression_level=compression_level)
 
 
-def delete_potential_id3_metadata_with_header(file: FILE_TYPE) -> None:
+def delete_potential_id3_metadata_with_header(file: FILE_TYPE) -> MetadataDeletionReport:
+    """Deletes the ID3 tags of a file of any format, e.g. ID3v2 tags in front of FLAC content, reporting the bytes
+    reclaimed."""
     if not isinstance(file, AudioFile):
-        audio_file = AudioFile(file)
-    try:
-        id_metadata = ID3(audio_file.get_file_path_or_object())
-        id_metadata.delete()
-    except Exception:
-        pass
+        file = AudioFile(file)
+    return Id3v2Manager(file).delete_metadata_with_report()
@@ -1,170 +1,688 @@
+import hashlib
+import io
 import json
+import mmap
 import os
+import shutil
+import stat
 import subprocess
 import tempfile
-from typing import cast, TypeAlias, Union
+import uuid
+from typing import Any, BinaryIO, Callable, cast, TypeAlias, Union
 
 from mutagen.flac import FLAC
 from mutagen.flac import StreamInfo
-from mutagen.mp3 import MP3
+from mutagen.mp3 import MP3, BitrateMode, MPEGInfo
+from mutagen.mp4 import MP4, MP4Info
 from mutagen.wave import WAVE
 
 from .exceptions import FileByteMismatchError, FileCorruptedError, FileTypeNotSupportedError
-
-# Type alias for files that can be handled (must be disk-based)
-DiskBasedFile: TypeAlias = Union[str, bytes, object]
+from .utils.AudioTechnicalInfo import AudioTechnicalInfo
+from .utils.ByteBudgetPolicy import ByteBudgetPolicy
+from .utils.file_copy import COPY_CHUNK_SIZE, copy_file_range
+from .utils.instrumentation import call_timed
+from .utils.io_accounting import AccountingFile, IoAccountant
+from .utils.IoStats import IoStats
+from .utils.LayoutRegion import LayoutRegion
+from .utils.LayoutRegionType import LayoutRegionType
+from .utils.file_layout import LAYOUT_FILE_EXTENSIONS, read_file_layout
+from .utils.format_sniffing import guess_file_extension
+from .utils.positional_file import (PositionalBuffer, PositionalFile, PositionalFileView, PositionalSource,
+                                    PositionalStream)
+from .utils.Mp3DurationMode import Mp3DurationMode
+from .utils.mp3_seek_table import (DEFAULT_SEEK_TABLE_INTERVAL_MS, Mp3SeekTable, get_mp3_seek_table,
+                                   scan_mp3_seek_table)
+from .utils.mp4_atoms import MP4_FILE_EXTENSIONS
+from .utils.mpeg_audio import read_mp3_technical_info
+from .utils.ogg_pages import OGG_FILE_EXTENSIONS, read_ogg_technical_info
+from .utils.payload_hash import (DEFAULT_PAYLOAD_HASH_ALGORITHM, PAYLOAD_HASH_BLOCK_SIZE, get_payload_hash,
+                                 update_hash)
+from .utils.riff_chunks import RIFF_FILE_EXTENSIONS, RIFF_FORM_RIFF, read_riff_form, read_riff_technical_info
+from .utils.tag_regions import get_leading_id3v2_tags_size
+
+# Compression levels accepted by the flac encoder (-0 to -8, --best being -8)
+FLAC_FAST_COMPRESSION_LEVEL = 0
+FLAC_BEST_COMPRESSION_LEVEL = 8
+
+# Type alias for files that can be handled: paths, file-like objects with a name or temporary_file_path, bytes-like
+# objects and seekable binary streams
+DiskBasedFile: TypeAlias = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO, object]
+
+# Name of in-memory inputs in messages and in io_stats
+IN_MEMORY_FILE_NAME = '<memory>'
+
+# Type alias for the outputs of write_to: path of the file to create or replace, or writable binary stream
+OutputFile: TypeAlias = Union[str, os.PathLike, BinaryIO]
+
+# Stands for the audio payload in the scratch copies of the tag regions (write_to, get_tag_regions_copy). At least
+# 128 zero bytes, so that the end of the scratch copy is never taken for an ID3v1 or APEv2 tag, then random bytes to
+# locate it
+PAYLOAD_PLACEHOLDER_PADDING_SIZE = 128
 
 
 class AudioFile:
     file: DiskBasedFile
-    file_path: str
-
-    def __init__(self, file: DiskBasedFile):
-        if isinstance(file, str):
-            self.file = file
-            self.file_path = file
-        elif hasattr(file, 'name'):
-            # Handle file-like objects with a name attribute
-            self.file = file
-            self.file_path = file.name
+    file_path: str | None
+    file_extension: str
+    _technical_infos: dict[Mp3DurationMode | None, AudioTechnicalInfo]
+    _layout: list[LayoutRegion] | None
+    _read_only: bool
+    _io_accountant: IoAccountant
+    _positional_file: PositionalSource
+    _position: int
+
+    def __init__(self, file: DiskBasedFile, max_bytes_read: int | None = None,
+                 byte_budget_policy: ByteBudgetPolicy = ByteBudgetPolicy.RAISE, file_extension: str | None = None,
+                 read_only: bool = False):
+        """
+        Args:
+            file: Path of the file, file-like object with a name or temporary_file_path, bytes-like object (bytes,
+                bytearray, memoryview) or seekable binary stream (e.g. BytesIO). Bytes-like objects are read in place
+                without being copied, and are read-only. Streams are written in place.
+            max_bytes_read: Maximum number of bytes that operations on this instance may read from the file, None for
+                no limit. Reads of external tools (flac, ffmpeg) are checked before the tool is run.
+            byte_budget_policy: Whether exceeding max_bytes_read raises ByteBudgetExceededError or warns
+            file_extension: Extension of the format (e.g. '.mp3'), overriding the one of the file name. Guessed from the
+                first bytes of in-memory inputs if not given.
+            read_only: Never write the file, e.g. when indexing a library. Files are then only opened for reading,
+                and writes raise io.UnsupportedOperation.
+        """
+        self.file = file
+        self.file_path = None
+        if isinstance(file, (str, os.PathLike)):
+            self.file_path = os.fspath(file)
+        elif isinstance(file, (bytes, bytearray, memoryview)):
+            pass
+        elif isinstance(getattr(file, 'name', None), str) and os.path.exists(file.name):  # type: ignore[union-attr]
+            # Handle file-like objects opened from a path
+            self.file_path = file.name  # type: ignore[union-attr]
         elif hasattr(file, 'temporary_file_path'):
             # Handle temporary uploaded files
-            self.file = file
-            self.file_path = file.temporary_file_path()
-        else:
+            self.file_path = file.temporary_file_path()  # type: ignore[union-attr]
+        elif not (hasattr(file, 'read') and hasattr(file, 'seek')):
             raise FileTypeNotSupportedError(f"Unsupported file type: {type(file)}")
 
-        if not os.path.exists(self.file_path):
+        if self.file_path is not None and not os.path.exists(self.file_path):
             raise FileNotFoundError(f"File {self.file_path} does not exist")
 
-        file_extension = os.path.splitext(self.file_path)[1].lower()
-        self.file_extension = file_extension
+        self._technical_infos = {}
+        self._layout = None
+        self._read_only = read_only
+        self._io_accountant = IoAccountant(self.file_path or IN_MEMORY_FILE_NAME, max_bytes_read, byte_budget_policy)
+        # Opened on first use and kept until close(), shared by every read and write of this instance
+        if self.file_path is not None:
+            self._positional_file = PositionalFile(self.file_path, self._io_accountant, read_only=read_only)
+        elif isinstance(file, (bytes, bytearray, memoryview)):
+            self._positional_file = PositionalBuffer(file, self._io_accountant, IN_MEMORY_FILE_NAME)
+        else:
+            self._positional_file = PositionalStream(cast(BinaryIO, file), self._io_accountant, IN_MEMORY_FILE_NAME)
+        self._position = 0
 
-    def get_duration_in_sec(self) -> float:
-        path = self.file_path
+        if file_extension is not None:
+            self.file_extension = ('' if file_extension.startswith('.') else '.') + file_extension.lower()
+        elif self.file_path is not None:
+            self.file_extension = os.path.splitext(self.file_path)[1].lower()
+        else:
+            self.file_extension = guess_file_extension(self._positional_file.read_at) or ''
 
-        if self.file_extension == '.mp3':
-            try:
-                audio = MP3(path)
-                return audio.info.length
-            except Exception as exc:
-                # If MP3 fails, try other formats as fallback
+    def _clear_content_caches(self) -> None:
+        # Called before any write through this instance
+        self._technical_infos.clear()
+        self._layout = None
+
+    def is_read_only(self) -> bool:
+        """Whether the content is never written: given as a bytes-like object, or opened with read_only."""
+        return self._read_only or isinstance(self._positional_file, PositionalBuffer)
+
+    @property
+    def io_stats(self) -> IoStats:
+        """I/O performed on the file by this instance and the managers using it, since creation or the last reset."""
+        return self._io_accountant.stats
+
+    def reset_io_stats(self) -> None:
+        """Resets io_stats, which also restarts the max_bytes_read budget."""
+        self._io_accountant.reset()
+
+    def open_file(self, mode: str = 'rb') -> AccountingFile:
+        """
+        Opens the file separately, with its I/O counted in io_stats, e.g. to stream it to an external tool.
+        Prefer get_file_object, which does not open the file again.
+
+        Raises:
+            io.UnsupportedOperation: If the content is in memory
+        """
+        if self.file_path is None:
+            raise io.UnsupportedOperation("In-memory content cannot be opened as a file, use get_file_object")
+        return self._io_accountant.open(mode)
+
+    def get_file_object(self, writable: bool = False) -> PositionalFileView:
+        """
+        Returns a file-like object with its own position over the persistent handle of this instance, reading through
+        the head/tail block cache. Managers and parsers pass it to mutagen instead of the path, so that an operation
+        opens the file once, and its I/O is counted in io_stats and subject to the byte budget.
+        Closing the returned object does not close the handle.
+        """
+        if writable:
+            self._clear_content_caches()
+        return self._positional_file.open_view(writable)
+
+    def read_at(self, offset: int, size: int = -1) -> bytes:
+        """Returns up to size bytes at offset (all the remaining bytes if size is negative) with a positional read."""
+        return self._positional_file.read_at(offset, size)
+
+    def get_file_size(self) -> int:
+        return self._positional_file.get_size()
+
+    def get_buffer(self) -> memoryview | None:
+        """Returns the content without copying it if it was given as a bytes-like object, None otherwise."""
+        return self._positional_file.get_buffer()
+
+    def get_layout(self) -> list[LayoutRegion]:
+        """
+        Returns the regions of the file in file order, covering it whole: ID3v2 tags and their padding, RIFF header
+        and chunks, FLAC marker and metadata blocks, audio payload, APEv2 and ID3v1 tags. Only the headers are read,
+        and the layout is cached until the file is written through this instance.
+
+        Raises:
+            FileTypeNotSupportedError: If the format is not MP3, FLAC or WAV
+            FileCorruptedError: If the FLAC metadata blocks or RIFF chunks cannot be read
+        """
+        if self._layout is None:
+            if self.file_extension not in LAYOUT_FILE_EXTENSIONS:
+                raise FileTypeNotSupportedError(f"The layout of {self.file_extension} files is not supported")
+            with self.get_file_object() as f:
                 try:
-                    return WAVE(path).info.length
-                except:
-                    try:
-                        return FLAC(path).info.length
-                    except:
-                        raise exc  # If all attempts fail, raise original MP3 error
+                    self._layout = read_file_layout(f, self.get_file_size(), self.file_extension)
+                except ValueError as exc:
+                    raise FileCorruptedError(f"Failed to read the layout of the file: {exc}")
+        return self._layout
 
-        elif self.file_extension == '.wav':
-            try:
-                # Use ffprobe to get duration, more tolerant of file format issues
-                result = subprocess.run([
-                    'ffprobe',
-                    '-v', 'quiet',
-                    '-print_format', 'json',
-                    '-show_format',
-                    '-show_streams',
-                    path
-                ], capture_output=True, text=True)
-
-                if result.returncode != 0:
-                    raise RuntimeError("Failed to probe audio file")
-
-                data = json.loads(result.stdout)
-                # Try format duration first, then stream duration if available
-                duration = float(data.get('format', {}).get('duration') or
-                                 next((s.get('duration') for s in data.get('streams', [])
-                                       if s.get('duration')), 0))
-
-                if duration <= 0:
-                    raise RuntimeError("Could not determine audio duration")
-                return duration
-
-            except json.JSONDecodeError:
-                raise RuntimeError("Failed to parse audio file metadata")
-            except Exception as exc:
-                if str(exc) == "Failed to probe audio file":
-                    raise FileCorruptedError("ffprobe could not parse the audio file.")
-                raise RuntimeError(f"Failed to read WAV file duration: {str(exc)}")
+    def get_audio_payload_region(self) -> tuple[int, int] | None:
+        """
+        Returns the (start, end) offsets of the audio payload between the tags at the start of the file (ID3v2, FLAC
+        metadata blocks) and those at its end (ID3v1, APEv2), or None for formats whose tags may be interleaved with
+        the audio (RIFF chunks, Ogg pages) or if the tags cannot be located.
+        """
+        if self.file_extension not in ('.mp3', '.flac'):
+            return None
+        try:
+            layout = self.get_layout()
+        except FileCorruptedError:
+            return None
+        payload_region = next(region for region in layout if region.type == LayoutRegionType.AUDIO_PAYLOAD)
+        return payload_region.offset, payload_region.end
 
-        elif self.file_extension == '.flac':
-            try:
-                return FLAC(path).info.length
-            except Exception as exc:
-                error_str = str(exc)
-                if "file said" in error_str and "bytes, read" in error_str:
-                    raise FileByteMismatchError(error_str.capitalize())
-                raise
+    def get_audio_payload_ranges(self) -> list[tuple[int, int]]:
+        """
+        Returns the (start, end) offsets of the audio bytes of the file (see get_layout): the audio payload region of
+        MP3 and FLAC files, or the data of the 'data' chunks of WAV files.
+
+        Raises:
+            FileTypeNotSupportedError: If the format is not MP3, FLAC or WAV
+            FileCorruptedError: If the tags or chunks cannot be located, or a WAV file has no 'data' chunk
+        """
+        payload_ranges = [(region.offset, region.end) for region in self.get_layout()
+                          if region.type == LayoutRegionType.AUDIO_PAYLOAD]
+        if not payload_ranges:
+            missing_region = "data chunk" if self.file_extension in RIFF_FILE_EXTENSIONS else "audio payload"
+            raise FileCorruptedError(f"The {self.file_extension} file has no {missing_region}")
+        return payload_ranges
+
+    def get_payload_hash(self, algorithm: str = DEFAULT_PAYLOAD_HASH_ALGORITHM) -> str:
+        """
+        Returns the hexadecimal hash of the audio bytes of the file (see get_audio_payload_ranges), which ignores the
+        tags: copies of a file tagged differently have the same payload hash.
+
+        The payload is hashed in large blocks from a memory map of the file, without going through the block cache.
+        Hashes of files on disk are cached by file identity in memory.
+
+        Args:
+            algorithm: Name of a hashlib algorithm, e.g. 'sha256', 'blake2b' or 'md5'
+        """
+        if self.file_path is None:
+            # In-memory content has no identity to cache the hash by
+            return self._compute_payload_hash(algorithm)
+        return get_payload_hash(self.file_path, algorithm, lambda: self._compute_payload_hash(algorithm))
+
+    def _compute_payload_hash(self, algorithm: str) -> str:
+        payload_ranges = self.get_audio_payload_ranges()
+        hash_object = hashlib.new(algorithm)
+        buffer = self.get_buffer()
+        if buffer is not None:
+            self._io_accountant.record_read(sum(end - start for start, end in payload_ranges))
+            for start, end in payload_ranges:
+                update_hash(hash_object, buffer, start, end)
+        elif isinstance(self._positional_file, PositionalFile):
+            # The mapped pages do not go through the read accounting: they are charged before the hashing
+            self._io_accountant.record_external_read(sum(end - start for start, end in payload_ranges))
+            if self.get_file_size():
+                with mmap.mmap(self._positional_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                    if hasattr(mapped_file, 'madvise'):
+                        mapped_file.madvise(mmap.MADV_SEQUENTIAL)
+                    with memoryview(mapped_file) as mapped_view:
+                        for start, end in payload_ranges:
+                            update_hash(hash_object, mapped_view, start, end)
         else:
-            raise FileTypeNotSupportedError(f"Reading is not supported for file type: {self.file_extension}")
+            for start, end in payload_ranges:
+                for block_start in range(start, end, PAYLOAD_HASH_BLOCK_SIZE):
+                    hash_object.update(self.read_at(block_start, min(PAYLOAD_HASH_BLOCK_SIZE, end - block_start)))
+        return hash_object.hexdigest()
+
+    def get_technical_info(
+            self, mp3_duration_mode: Mp3DurationMode = Mp3DurationMode.MUTAGEN) -> AudioTechnicalInfo:
+        """
+        Returns the technical properties of the audio stream.
+
+        The file headers are parsed once and the result is memoized on the instance, so repeated calls (and
+        get_duration_in_sec/get_bitrate, which are views over this method) do not touch the file again.
 
-    def get_bitrate(self) -> int:
-        path = self.file_path
+        Args:
+            mp3_duration_mode: Accuracy/latency trade-off used for MP3 files, ignored for other formats.
+                The mode that produced the result is reported in AudioTechnicalInfo.duration_mode.
+        """
+        cache_key = mp3_duration_mode if self.file_extension == '.mp3' else None
+        technical_info = self._technical_infos.get(cache_key)
+        if technical_info is None:
+            technical_info = self._read_technical_info(mp3_duration_mode)
+            self._technical_infos[cache_key] = technical_info
+        return technical_info
+
+    def _read_technical_info(self, mp3_duration_mode: Mp3DurationMode) -> AudioTechnicalInfo:
         if self.file_extension == '.mp3':
-            audio = MP3(path)
-            # Calculate MP3 bitrate from file size and duration
-            if audio.info.length > 0 and isinstance(path, str) and os.path.exists(path):
-                file_size = os.path.getsize(path)
-                return int((file_size * 8) / self.get_duration_in_sec() / 1000)
-            return 0
-        elif self.file_extension == '.wav':
-            try:
-                # Use ffprobe to get audio stream information
-                result = subprocess.run([
-                    'ffprobe',
-                    '-v', 'quiet',
-                    '-print_format', 'json',
-                    '-show_streams',
-                    '-select_streams', 'a:0',  # Select first audio stream
-                    path
-                ], capture_output=True, text=True)
-
-                if result.returncode != 0:
-                    raise RuntimeError("Failed to probe audio file")
-
-                data = json.loads(result.stdout)
-                if not data.get('streams'):
-                    raise RuntimeError("No audio streams found")
-
-                stream = data['streams'][0]
-                # Get bitrate directly if available
-                if 'bit_rate' in stream:
-                    return int(stream['bit_rate']) // 1000
-
-                # Calculate from sample_rate * channels * bits_per_sample if no direct bitrate
-                sample_rate = int(stream.get('sample_rate', 0))
-                channels = int(stream.get('channels', 0))
-                bits_per_sample = int(stream.get('bits_per_raw_sample', 0) or stream.get('bits_per_sample', 0))
-
-                if not all([sample_rate, channels, bits_per_sample]):
-                    raise RuntimeError("Missing audio stream information")
-
-                return (sample_rate * channels * bits_per_sample) // 1000
-            except json.JSONDecodeError:
-                raise RuntimeError("Failed to parse audio file metadata")
-            except Exception as exc:
-                raise RuntimeError(f"Failed to read WAV file bitrate: {str(exc)}")
+            if mp3_duration_mode == Mp3DurationMode.MUTAGEN:
+                return self._read_mp3_technical_info()
+            with self.get_file_object() as f:
+                try:
+                    return read_mp3_technical_info(f, self.get_file_size(), mp3_duration_mode)
+                except ValueError as exc:
+                    raise FileCorruptedError(f"Failed to read MP3 frames: {exc}")
+        elif self.file_extension in RIFF_FILE_EXTENSIONS:
+            with self.get_file_object() as f:
+                riff_start = get_leading_id3v2_tags_size(f)
+                if read_riff_form(f, riff_start) not in (RIFF_FORM_RIFF, None):
+                    # RF64 and Wave64 files are read from their fmt and data chunk headers, at any size
+                    try:
+                        return read_riff_technical_info(f, riff_start, self.get_file_size())
+                    except ValueError as exc:
+                        raise FileCorruptedError(f"Failed to read RIFF chunks: {exc}")
+            return self._read_wav_technical_info()
         elif self.file_extension == '.flac':
-            audio_info = cast(StreamInfo, FLAC(path).info)
-            return int(audio_info.bitrate / 1000)
+            return self._read_flac_technical_info()
+        elif self.file_extension in OGG_FILE_EXTENSIONS:
+            # The duration comes from the last page, found by reading the end of the file only
+            with self.get_file_object() as f:
+                try:
+                    return read_ogg_technical_info(f, self.get_file_size())
+                except ValueError as exc:
+                    raise FileCorruptedError(f"Failed to read Ogg pages: {exc}")
+        elif self.file_extension in MP4_FILE_EXTENSIONS:
+            return self._read_mp4_technical_info()
         else:
             raise FileTypeNotSupportedError(f"Reading is not supported for file type: {self.file_extension}")
 
+    def _read_mp3_technical_info(self) -> AudioTechnicalInfo:
+        try:
+            with self.get_file_object() as f:
+                audio = MP3(f)
+        except Exception as exc:
+            # If MP3 fails, try other formats as fallback
+            try:
+                with self.get_file_object() as f:
+                    wave_info = WAVE(f).info
+                return AudioTechnicalInfo(
+                    duration_in_sec=wave_info.length,
+                    bitrate=int(wave_info.bitrate / 1000),
+                    sample_rate=wave_info.sample_rate,
+                    channels=wave_info.channels,
+                    bit_depth=wave_info.bits_per_sample,
+                    codec='pcm')
+            except:
+                try:
+                    return self._read_flac_technical_info()
+                except:
+                    raise exc  # If all attempts fail, raise original MP3 error
+
+        audio_info = cast(MPEGInfo, audio.info)
+        bitrate = 0
+        # Calculate MP3 bitrate from file size and duration
+        if audio_info.length > 0:
+            bitrate = int((self.get_file_size() * 8) / audio_info.length / 1000)
+
+        return AudioTechnicalInfo(
+            duration_in_sec=audio_info.length,
+            bitrate=bitrate,
+            sample_rate=audio_info.sample_rate,
+            channels=audio_info.channels,
+            codec='mp3',
+            is_vbr=audio_info.bitrate_mode in (BitrateMode.VBR, BitrateMode.ABR),
+            duration_mode=Mp3DurationMode.MUTAGEN)
+
+    def _read_wav_technical_info(self) -> AudioTechnicalInfo:
+        try:
+            # Use ffprobe to get duration and stream information in a single call, more tolerant of file format
+            # issues than mutagen
+            tool_input_path, tool_input = self._get_tool_input('pipe:0')
+            result = self._run_subprocess([
+                'ffprobe',
+                '-v', 'quiet',
+                '-print_format', 'json',
+                '-show_format',
+                '-show_streams',
+                '-select_streams', 'a:0',  # Select first audio stream
+                tool_input_path
+            ], reads_whole_file=tool_input is not None, input=tool_input, capture_output=True)
+
+            if result.returncode != 0:
+                raise RuntimeError("Failed to probe audio file")
+
+            data = json.loads(result.stdout.decode())
+            streams = data.get('streams', [])
+            # Try format duration first, then stream duration if available
+            duration = float(data.get('format', {}).get('duration') or
+                             next((s.get('duration') for s in streams if s.get('duration')), 0))
+
+            if duration <= 0:
+                raise RuntimeError("Could not determine audio duration")
+            if not streams:
+                raise RuntimeError("No audio streams found")
+
+            stream = streams[0]
+            sample_rate = int(stream.get('sample_rate', 0))
+            channels = int(stream.get('channels', 0))
+            bits_per_sample = int(stream.get('bits_per_raw_sample', 0) or stream.get('bits_per_sample', 0))
+
+            # Get bitrate directly if available, calculate from sample_rate * channels * bits_per_sample otherwise
+            if 'bit_rate' in stream:
+                bitrate = int(stream['bit_rate']) // 1000
+            elif all([sample_rate, channels, bits_per_sample]):
+                bitrate = (sample_rate * channels * bits_per_sample) // 1000
+            else:
+                raise RuntimeError("Missing audio stream information")
+
+            return AudioTechnicalInfo(
+                duration_in_sec=duration,
+                bitrate=bitrate,
+                sample_rate=sample_rate or None,
+                channels=channels or None,
+                bit_depth=bits_per_sample or None,
+                codec=stream.get('codec_name'))
+
+        except json.JSONDecodeError:
+            raise RuntimeError("Failed to parse audio file metadata")
+        except Exception as exc:
+            if str(exc) == "Failed to probe audio file":
+                raise FileCorruptedError("ffprobe could not parse the audio file.")
+            raise RuntimeError(f"Failed to read WAV file technical info: {str(exc)}")
+
+    def _read_flac_technical_info(self) -> AudioTechnicalInfo:
+        try:
+            with self.get_file_object() as f:
+                audio_info = cast(StreamInfo, FLAC(f).info)
+        except Exception as exc:
+            error_str = str(exc)
+            if "file said" in error_str and "bytes, read" in error_str:
+                raise FileByteMismatchError(error_str.capitalize())
+            raise
+
+        return AudioTechnicalInfo(
+            duration_in_sec=audio_info.length,
+            bitrate=int(audio_info.bitrate / 1000),
+            sample_rate=audio_info.sample_rate,
+            channels=audio_info.channels,
+            bit_depth=audio_info.bits_per_sample,
+            codec='flac',
+            is_vbr=True)
+
+    def _read_mp4_technical_info(self) -> AudioTechnicalInfo:
+        try:
+            # Mutagen reads the moov atom only, seeking over the audio
+            with self.get_file_object() as f:
+                audio_info = cast(MP4Info, MP4(f).info)
+        except Exception as exc:
+            raise FileCorruptedError(f"Failed to read MP4 atoms: {exc}")
+
+        return AudioTechnicalInfo(
+            duration_in_sec=audio_info.length,
+            bitrate=int(audio_info.bitrate / 1000),
+            sample_rate=audio_info.sample_rate,
+            channels=audio_info.channels,
+            bit_depth=audio_info.bits_per_sample or None,
+            codec=audio_info.codec,
+            is_vbr=True)
+
+    def get_duration_in_sec(self, mp3_duration_mode: Mp3DurationMode = Mp3DurationMode.MUTAGEN) -> float:
+        return self.get_technical_info(mp3_duration_mode).duration_in_sec
+
+    def get_bitrate(self, mp3_duration_mode: Mp3DurationMode = Mp3DurationMode.MUTAGEN) -> int:
+        return self.get_technical_info(mp3_duration_mode).bitrate
+
+    def get_mp3_seek_table(self, interval_ms: int = DEFAULT_SEEK_TABLE_INTERVAL_MS,
+                           cache_dir: str | None = None) -> Mp3SeekTable:
+        """
+        Returns a frame-accurate seek table with an entry every interval_ms milliseconds.
+
+        The frame headers are scanned once with bounded memory; tables are cached by file identity in memory and,
+        if cache_dir is given, persisted on disk so that they survive process restarts.
+        """
+        if not self.file_extension == '.mp3':
+            raise FileTypeNotSupportedError("The file is not an MP3 file")
+        try:
+            if self.file_path is None:
+                # In-memory content has no identity to cache the table by
+                return scan_mp3_seek_table(None, interval_ms=interval_ms, opener=self.get_file_object)
+            return get_mp3_seek_table(self.file_path, interval_ms=interval_ms, cache_dir=cache_dir,
+                                      opener=self.get_file_object)
+        except ValueError as exc:
+            raise FileCorruptedError(f"Failed to read MP3 frames: {exc}")
+
+    def write_to(self, output: OutputFile, update_tags: Callable[['AudioFile'], Any] | None = None) -> None:
+        """
+        Writes the content of the file to output, with its tags modified by update_tags, leaving the file untouched.
+
+        update_tags is called with an AudioFile over an in-memory copy of the tag regions (see get_audio_payload_region)
+        in which a placeholder stands for the audio payload; the new tag bytes are then written to output, followed by
+        the unchanged audio payload. When both the file and output are files, the payload is copied by the kernel
+        (os.copy_file_range, os.sendfile). For formats whose tags may be interleaved with the audio, the whole file is
+        copied and then updated in place.
+
+        Args:
+            output: Path of the file to create or replace, which is written to a temporary file next to it then
+                atomically renamed, or writable binary stream, written from its current position
+            update_tags: Function modifying the tags of the AudioFile it is given, e.g. with update_file_metadata
+        """
+        if isinstance(output, (str, os.PathLike)):
+            _write_file_atomically(os.fspath(output),
+                                   lambda partial_file: self._write_to_stream(partial_file, update_tags))
+        else:
+            self._write_to_stream(output, update_tags)
+
+    def replace_content(self, write_content: Callable[[BinaryIO], Any]) -> None:
+        """
+        Replaces the content of the file with what write_content writes to the empty temporary file it is given.
+        write_content may read this instance meanwhile, e.g. copying its unchanged ranges with copy_range_to, so that a
+        rewrite needs memory only for the bytes that change.
+
+        Files on disk are replaced atomically by renaming the temporary file, created next to them with the same
+        permissions; streams are overwritten once the new content is complete. Timed as the 'write' stage, like write.
+
+        Raises:
+            io.UnsupportedOperation: If the content is read-only (see is_read_only)
+        """
+        if self.is_read_only():
+            raise io.UnsupportedOperation(f"{self.file_path or IN_MEMORY_FILE_NAME} is read-only")
+        self._clear_content_caches()
+        call_timed(self.file_extension, 'AudioFile', 'write', self._replace_content, write_content)
+
+    def remove_range(self, offset: int, size: int) -> None:
+        """
+        Removes size bytes at offset in place: the bytes after them are shifted backward, with os.copy_file_range when
+        the shift is large enough, then the file is truncated. Removing bytes at the end of the file only truncates it.
+        Unlike replace_content, this needs no free space, but leaves the file corrupted if interrupted midway.
+
+        Raises:
+            io.UnsupportedOperation: If the content is read-only (see is_read_only)
+        """
+        if self.is_read_only():
+            raise io.UnsupportedOperation(f"{self.file_path or IN_MEMORY_FILE_NAME} is read-only")
+        self._clear_content_caches()
+        call_timed(self.file_extension, 'AudioFile', 'write', self._positional_file.remove_range, offset, size)
+
+    def _replace_content(self, write_content: Callable[[BinaryIO], Any]) -> None:
+        if self.file_path is None:
+            with tempfile.TemporaryFile() as new_content_file:
+                write_content(cast(BinaryIO, new_content_file))
+                new_content_file.seek(0)
+                with self.get_file_object(writable=True) as f:
+                    shutil.copyfileobj(new_content_file, f, COPY_CHUNK_SIZE)
+                    f.truncate()
+            return
+
+        file_path = self.file_path
+
+        def before_replace(new_content_path: str) -> None:
+            shutil.copymode(file_path, new_content_path)
+            self._io_accountant.record_write(os.path.getsize(new_content_path))
+            # The handle on the replaced file is dropped, the next operation opening the new file
+            self._positional_file.close()
+
+        _write_file_atomically(file_path, write_content, before_replace)
+
+    def _write_to_stream(self, output: BinaryIO, update_tags: Callable[['AudioFile'], Any] | None) -> None:
+        payload_region = self.get_audio_payload_region()
+        if payload_region is None:
+            self._write_to_stream_updating_whole_copy(output, update_tags)
+            return
+
+        payload_start, payload_end = payload_region
+        if update_tags is None:
+            head = self.read_at(0, payload_start)
+            tail = self.read_at(payload_end)
+        else:
+            placeholder = b'\x00' * PAYLOAD_PLACEHOLDER_PADDING_SIZE + uuid.uuid4().bytes
+            scratch = self._get_tag_regions_copy(payload_start, payload_end, placeholder)
+            update_tags(AudioFile(scratch, file_extension=self.file_extension))
+            scratch_data = scratch.getvalue()
+            placeholder_offset = scratch_data.rfind(placeholder)
+            if placeholder_offset == -1:
+                raise RuntimeError("Updating the tags modified the audio payload")
+            head = scratch_data[:placeholder_offset]
+            tail = scratch_data[placeholder_offset + len(placeholder):]
+
+        output.write(head)
+        self.copy_range_to(output, payload_start, payload_end - payload_start)
+        output.write(tail)
+
+    def get_tag_regions_copy(self) -> 'AudioFile | None':
+        """
+        Returns an AudioFile over a writable in-memory copy of the tag regions (see get_audio_payload_region), a
+        placeholder standing for the audio payload, or None for formats whose tags may be interleaved with the audio.
+        Tag operations can be tried on the copy, e.g. to know the size of their result, reading only the tag regions.
+        """
+        payload_region = self.get_audio_payload_region()
+        if payload_region is None:
+            return None
+        placeholder = b'\x00' * PAYLOAD_PLACEHOLDER_PADDING_SIZE + uuid.uuid4().bytes
+        return AudioFile(self._get_tag_regions_copy(*payload_region, placeholder), file_extension=self.file_extension)
+
+    def _get_tag_regions_copy(self, payload_start: int, payload_end: int, placeholder: bytes) -> io.BytesIO:
+        return io.BytesIO(self.read_at(0, payload_start) + placeholder + self.read_at(payload_end))
+
+    def _write_to_stream_updating_whole_copy(self, output: BinaryIO,
+                                             update_tags: Callable[['AudioFile'], Any] | None) -> None:
+        if update_tags is None:
+            self.copy_range_to(output, 0, self.get_file_size())
+            return
+        with tempfile.TemporaryFile() as copy_file:
+            self.copy_range_to(cast(BinaryIO, copy_file), 0, self.get_file_size())
+            update_tags(AudioFile(copy_file, file_extension=self.file_extension))
+            copy_size = copy_file.seek(0, os.SEEK_END)
+            output_fileno = _get_regular_file_fileno(output)
+            if output_fileno is not None:
+                _copy_file_range_to_stream(copy_file.fileno(), 0, output, output_fileno, copy_size)
+            else:
+                copy_file.seek(0)
+                shutil.copyfileobj(copy_file, output, COPY_CHUNK_SIZE)
+
+    def copy_range_to(self, output: BinaryIO, offset: int, size: int) -> None:
+        """
+        Writes size bytes at offset to output, from its current position. The bytes are copied by the kernel when both
+        the file and output are files on disk, and do not go through the block cache.
+        """
+        buffer = self.get_buffer()
+        if buffer is not None:
+            self._io_accountant.record_read(size)
+            output.write(buffer[offset:offset + size])
+            return
+        output_fileno = _get_regular_file_fileno(output)
+        if isinstance(self._positional_file, PositionalFile) and output_fileno is not None:
+            # The bytes do not go through this process: they are charged before the copy, as for external tools
+            self._io_accountant.record_external_read(size)
+            _copy_file_range_to_stream(self._positional_file.fileno(), offset, output, output_fileno, size)
+            return
+        for chunk_offset in range(offset, offset + size, COPY_CHUNK_SIZE):
+            output.write(self.read_at(chunk_offset, min(COPY_CHUNK_SIZE, offset + size - chunk_offset)))
+
     def read(self, size: int = -1) -> bytes:
-        with open(self.file_path, 'rb') as f:
-            return f.read(size)
+        """Reads from the current position (see seek), with a positional read on the persistent handle."""
+        data = self._positional_file.read_at(self._position, size)
+        self._position += len(data)
+        return data
 
     def write(self, data: bytes) -> int:
-        with open(self.file_path, 'wb') as f:
-            return f.write(data)
+        """
+        Replaces the whole content of the file with data, and rewinds the read position.
+
+        Raises:
+            io.UnsupportedOperation: If the content was given as a bytes-like object, which is read-only
+        """
+        self._clear_content_caches()
+        return call_timed(self.file_extension, 'AudioFile', 'write', self._write_data, data)
+
+    def _write_data(self, data: bytes) -> int:
+        written_size = self._positional_file.write_at(0, data)
+        self._positional_file.truncate(written_size)
+        self._position = 0
+        return written_size
+
+    def _run_subprocess(self, args: list[str], reads_whole_file: bool = False, **kwargs) -> subprocess.CompletedProcess:
+        """
+        Runs an external tool, timed under the stage 'subprocess.<tool>' if instrumentation is enabled.
+        If reads_whole_file is set, the file size is charged to io_stats, and to the byte budget, before running it.
+        """
+        if reads_whole_file:
+            # The file is not opened just to size it, the tool opening it by itself
+            file_size = os.path.getsize(self.file_path) if self.file_path is not None else self.get_file_size()
+            self._io_accountant.record_external_read(file_size)
+        return call_timed(self.file_extension, 'AudioFile', f'subprocess.{args[0]}', subprocess.run, args, **kwargs)
+
+    def _get_tool_input(self, stdin_path: str) -> tuple[str, bytes | memoryview | None]:
+        """
+        Returns the path to pass to an external tool, and the input to pass to subprocess.run. In-memory content is
+        piped to the standard input of the tool, which stdin_path designates (e.g. '-' or 'pipe:0').
+        """
+        if self.file_path is not None:
+            return self.file_path, None
+        buffer = self.get_buffer()
+        return stdin_path, buffer if buffer is not None else self.read_at(0)
 
     def seek(self, offset: int, whence: int = 0) -> int:
-        with open(self.file_path, 'rb') as f:
-            return f.seek(offset, whence)
+        """Sets the position of the next read, without any I/O."""
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self.get_file_size() + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self._position = position
+        return position
 
     def close(self) -> None:
+        """Closes the persistent handle, reopened on next use, and the wrapped file object if any."""
+        self._positional_file.close()
         if hasattr(self.file, 'close'):
             self.file.close()
 
@@ -174,8 +692,10 @@ class AudioFile:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def get_file_path_or_object(self) -> str:
-        """Returns the path to the file on the filesystem."""
+    def get_file_path_or_object(self) -> str | PositionalFileView:
+        """Returns the path to the file on the filesystem, or a file-like object over in-memory content."""
+        if self.file_path is None:
+            return self.get_file_object(writable=not self.is_read_only())
         return self.file_path
 
     def get_file_name_original(self) -> str:
@@ -195,14 +715,17 @@ class AudioFile:
         Returns the actual filename in the system, which may be different from the original name
         if the file was renamed during upload or processing.
         """
-        path = self.file_path
-        return os.path.basename(path)
+        if self.file_path is None:
+            raise FileTypeNotSupportedError("In-memory content has no file name")
+        return os.path.basename(self.file_path)
 
     def is_flac_file_md5_valid(self) -> bool:
         if not self.file_extension == '.flac':
             raise FileTypeNotSupportedError("The file is not a FLAC file")
 
-        result = subprocess.run(['flac', '-t', self.file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        tool_input_path, tool_input = self._get_tool_input('-')
+        result = self._run_subprocess(['flac', '-t', tool_input_path], reads_whole_file=True, input=tool_input,
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
         output = result.stderr.decode()
         if 'ok' in output:
@@ -214,7 +737,8 @@ class AudioFile:
         else:
             raise FileCorruptedError("The Flac file md5 check failed")
 
-    def get_file_with_corrected_md5(self, delete_original: bool = False) -> str:
+    def get_file_with_corrected_md5(self, delete_original: bool = False,
+                                    compression_level: int = FLAC_BEST_COMPRESSION_LEVEL) -> str:
         """
         Returns a new temporary file with corrected MD5 signature.
         Returns the path to the corrected file.
@@ -222,37 +746,99 @@ class AudioFile:
         Args:
             delete_original: If True, deletes the original file after creating the corrected version.
                            Defaults to False to maintain backward compatibility.
+            compression_level: FLAC compression level of the reencoded file, from FLAC_FAST_COMPRESSION_LEVEL (0)
+                           to FLAC_BEST_COMPRESSION_LEVEL (8).
 
         Raises:
             FileCorruptedError: If the FLAC file is corrupted or cannot be corrected
             RuntimeError: If the FLAC command fails to execute
             OSError: If deletion of the original file fails when delete_original is True
+            ValueError: If delete_original is True and the content is in memory
         """
         if not self.file_extension == '.flac':
             raise FileTypeNotSupportedError("The file is not a FLAC file")
+        if delete_original and self.file_path is None:
+            raise ValueError("In-memory content has no original file to delete")
 
-        # Create a temporary file to store the corrected FLAC content
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.flac')
-        temp_path = temp_file.name
-        temp_file.close()  # Close but don't delete yet
+        # Reserve a temporary path to store the corrected FLAC content
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.flac')
+        os.close(temp_fd)
+
+        success = False
+        try:
+            self.write_file_with_corrected_md5(temp_path, compression_level=compression_level)
+            success = True
+        finally:
+            # Clean up the temp file only if we failed
+            if not success and os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass  # Ignore cleanup errors
+
+        # If requested, try to delete the original file
+        if delete_original:
+            try:
+                os.unlink(self.file_path)
+            except OSError as e:
+                raise OSError(f"Failed to delete original file: {str(e)}")
+
+        return temp_path
+
+    def write_file_with_corrected_md5(self, destination_path: str,
+                                      compression_level: int = FLAC_BEST_COMPRESSION_LEVEL) -> str:
+        """
+        Reencodes the FLAC file with a corrected MD5 signature directly to destination_path.
+
+        The encoder writes to a hidden temporary file next to the destination, which is then atomically renamed, so
+        that destination_path never holds a partially written file, even if the process is interrupted.
+
+        Args:
+            destination_path: Path of the corrected file. An existing file at this path is replaced.
+            compression_level: FLAC compression level, from FLAC_FAST_COMPRESSION_LEVEL (0) to
+                           FLAC_BEST_COMPRESSION_LEVEL (8).
+
+        Raises:
+            FileCorruptedError: If the FLAC file is corrupted or cannot be corrected
+            RuntimeError: If the FLAC command fails to execute
+        """
+        if not self.file_extension == '.flac':
+            raise FileTypeNotSupportedError("The file is not a FLAC file")
+        if compression_level not in range(FLAC_FAST_COMPRESSION_LEVEL, FLAC_BEST_COMPRESSION_LEVEL + 1):
+            raise ValueError(f"Invalid FLAC compression level: {compression_level}")
+
+        destination_dir = os.path.dirname(os.path.abspath(destination_path))
+        partial_fd, partial_path = tempfile.mkstemp(
+            dir=destination_dir, prefix=f'.{os.path.basename(destination_path)}.', suffix='.partial')
+        os.close(partial_fd)
 
         success = False
         try:
             # Read the input file and run FLAC command
-            with open(self.file_path, 'rb') as f:
-                result = subprocess.run(['flac', '-f', '--best', '-o', temp_path, '-'],
-                                        stdin=f,
-                                        stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE)
+            encode_args = ['flac', '-f', f'-{compression_level}', '-o', partial_path, '-']
+            if self.file_path is None:
+                result = self._run_subprocess(encode_args, reads_whole_file=True, input=self._get_tool_input('-')[1],
+                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            else:
+                with self.open_file() as f:
+                    result = self._run_subprocess(encode_args,
+                                                  reads_whole_file=True,
+                                                  stdin=f,
+                                                  stdout=subprocess.PIPE,
+                                                  stderr=subprocess.PIPE)
 
             if result.returncode != 0:
                 stderr = result.stderr.decode()
                 if 'wrote' not in stderr:
-                    # Try reencoding with ffmpeg as a fallback
-                    ffmpeg_cmd = ['ffmpeg', '-i', self.file_path, '-c:a', 'flac', temp_path]
+                    # Try reencoding with ffmpeg as a fallback, overwriting what flac may have partially written
+                    tool_input_path, tool_input = self._get_tool_input('pipe:0')
+                    ffmpeg_cmd = ['ffmpeg', '-y', '-i', tool_input_path, '-c:a', 'flac',
+                                  '-compression_level', str(compression_level), '-f', 'flac', partial_path]
 
-                    ffmpeg_result = subprocess.run(
+                    ffmpeg_result = self._run_subprocess(
                         ffmpeg_cmd,
+                        reads_whole_file=True,
+                        input=tool_input,
                         stdout=subprocess.PIPE,
                         stderr=subprocess.PIPE
                     )
@@ -263,28 +849,62 @@ class AudioFile:
                         )
 
             # Verify the output file exists and is valid
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+            if not os.path.exists(partial_path) or os.path.getsize(partial_path) == 0:
                 raise FileCorruptedError("Failed to create corrected FLAC file")
 
+            os.replace(partial_path, destination_path)
             success = True
-
-            # If requested, try to delete the original file
-            if delete_original and success:
-                try:
-                    os.unlink(self.file_path)
-                except OSError as e:
-                    raise OSError(f"Failed to delete original file: {str(e)}")
-
-            return temp_path
+            return destination_path
 
         except (subprocess.SubprocessError, OSError) as e:
             raise RuntimeError(f"Failed to execute FLAC command: {str(e)}")
-        except Exception as e:
-            raise e
         finally:
-            # Clean up the temp file only if we failed
-            if not success and os.path.exists(temp_path):
+            # Clean up the partial file only if we failed
+            if not success and os.path.exists(partial_path):
                 try:
-                    os.unlink(temp_path)
+                    os.unlink(partial_path)
                 except OSError:
                     pass  # Ignore cleanup errors
+
+
+def _get_regular_file_fileno(stream: BinaryIO) -> int | None:
+    """Returns the file descriptor of stream if it is a regular file, None otherwise (BytesIO, pipe, socket...)."""
+    try:
+        fileno = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+    return fileno if stat.S_ISREG(os.fstat(fileno).st_mode) else None
+
+
+def _copy_file_range_to_stream(source_fileno: int, source_offset: int, output: BinaryIO, output_fileno: int,
+                               size: int) -> None:
+    """Copies size bytes of source_fileno to the current position of output, the regular file of output_fileno."""
+    output.flush()
+    output_offset = output.tell()
+    copy_file_range(source_fileno, source_offset, output_fileno, output_offset, size)
+    output.seek(output_offset + size)
+
+
+def _write_file_atomically(file_path: str, write_content: Callable[[BinaryIO], Any],
+                           before_replace: Callable[[str], Any] | None = None) -> None:
+    """
+    Writes file_path with write_content through a hidden temporary file next to it, then atomically renamed, so that
+    file_path never holds a partially written file. before_replace is called with the path of the temporary file once
+    it is complete.
+    """
+    partial_fd, partial_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_path)), prefix=f'.{os.path.basename(file_path)}.', suffix='.partial')
+    success = False
+    try:
+        with open(partial_fd, 'w+b') as partial_file:
+            write_content(cast(BinaryIO, partial_file))
+        if before_replace is not None:
+            before_replace(partial_path)
+        os.replace(partial_path, file_path)
+        success = True
+    finally:
+        if not success:
+            try:
+                os.unlink(partial_path)
+            except OSError:
+                pass  # Ignore cleanup errors
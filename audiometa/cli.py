@@ -0,0 +1,327 @@
+"""Command-line interface: `audiometa <command>`, or `python -m audiometa <command>`.
+
+Every command processes its files in one process with a bounded pool of threads, results being written as JSON Lines
+(one object per file, in completion order) to the standard output or to --output as soon as each file is done.
+Progress with throughput goes to the standard error with --progress. The exit status is 1 if any file failed.
+
+Commands:
+    read        Merged metadata (and technical info with --technical) of files
+    scan        Same as read, for the supported files under directories
+    write       Metadata given with --set, or per file from a JSONL manifest, resumable with --resume
+    strip       Metadata deletion (see strip_many)
+    verify-md5  FLAC MD5 signature checks
+    bench       Timings of metadata reads by stage (see HistogramInstrumentation)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+from enum import Enum
+from typing import IO, Any, Iterable, Iterator, Sequence
+
+from . import (HistogramInstrumentation, get_instrumentation, get_merged_app_metadata, is_flac_md5_valid,
+               set_instrumentation, strip_many, update_file_metadata)
+from .audio_file import AudioFile
+from .utils.AppMetadataKey import AppMetadataKey
+from .utils.parallel_map import map_parallel
+from .utils.TagFormat import MetadataFormat
+from .utils.types import AppMetadata
+
+
+# Minimum interval between two progress lines
+PROGRESS_INTERVAL_SEC = 0.5
+
+# Suffix of the journal of the files written from a manifest, next to the manifest
+MANIFEST_JOURNAL_SUFFIX = '.done'
+
+
+class _Progress:
+    """Reports the files done, files per second and megabytes per second to a stream."""
+
+    def __init__(self, stream: IO[str] | None):
+        self._stream = stream
+        self._start_time = time.perf_counter()
+        self._last_report_time = 0.0
+        self.count = 0
+        self.failed_count = 0
+        self.bytes_count = 0
+
+    def add(self, path: str, failed: bool) -> None:
+        self.count += 1
+        self.failed_count += failed
+        try:
+            self.bytes_count += os.path.getsize(path)
+        except OSError:
+            pass
+        if self._stream is not None and time.perf_counter() - self._last_report_time >= PROGRESS_INTERVAL_SEC:
+            self.report()
+
+    def report(self, end: str = '\r') -> None:
+        if self._stream is None:
+            return
+        self._last_report_time = time.perf_counter()
+        elapsed_sec = self._last_report_time - self._start_time or 1e-9
+        self._stream.write(f'{self.count} files ({self.failed_count} failed), {self.count / elapsed_sec:.1f} files/s, '
+                           f'{self.bytes_count / elapsed_sec / 1e6:.1f} MB/s{end}')
+        self._stream.flush()
+
+
+def _iter_audio_files(roots: Iterable[str]) -> Iterator[str]:
+    """Yields the files with a supported extension under roots, recursively, without materializing the list."""
+    supported_extensions = tuple(MetadataFormat.get_priorities().keys())
+    directories = list(roots)
+    while directories:
+        directory = directories.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file() and entry.name.lower().endswith(supported_extensions):
+                    yield entry.path
+            except OSError:
+                continue
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(_to_json_value(key)): _to_json_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json_value(item) for item in value]
+    return value
+
+
+def _get_error_message(exc: Exception) -> str:
+    return f'{type(exc).__name__}: {exc}'
+
+
+def _parse_app_metadata(values: dict[str, Any]) -> AppMetadata:
+    """
+    Converts {key value: value} (e.g. from a manifest) to app metadata, values being converted to the type of their
+    key: a string is a one-item list for list keys, and numeric strings are accepted for numeric keys.
+
+    Raises:
+        ValueError: If a key is unknown or a value cannot be converted
+    """
+    app_metadata: AppMetadata = {}
+    for key, value in values.items():
+        try:
+            app_metadata_key = AppMetadataKey(key)
+        except ValueError:
+            raise ValueError(f'Unknown metadata key: {key}') from None
+        key_type = app_metadata_key.get_optional_type()
+        if value is not None:
+            if key_type == list[str]:
+                value = [value] if isinstance(value, str) else [str(item) for item in value]
+            elif key_type in (int, float, str):
+                value = key_type(value)
+        app_metadata[app_metadata_key] = value
+    return app_metadata
+
+
+def _read_file(path: str, technical: bool, normalized_rating_max_value: int | None) -> dict[str, Any]:
+    result: dict[str, Any] = {'path': path}
+    try:
+        with AudioFile(path, read_only=True) as audio_file:
+            result['metadata'] = get_merged_app_metadata(
+                audio_file, normalized_rating_max_value=normalized_rating_max_value)
+            if technical:
+                result['technical_info'] = asdict(audio_file.get_technical_info())
+    except Exception as exc:
+        result['error'] = _get_error_message(exc)
+    return result
+
+
+def _write_file(path_and_values: tuple[str, dict[str, Any]], normalized_rating_max_value: int | None) -> dict[str, Any]:
+    path, values = path_and_values
+    try:
+        update_result = update_file_metadata(path, _parse_app_metadata(values),
+                                             normalized_rating_max_value=normalized_rating_max_value)
+    except Exception as exc:
+        return {'path': path, 'error': _get_error_message(exc)}
+    return {'path': path, 'modified_keys': [key.value for key in update_result.modified_keys]}
+
+
+def _verify_md5(path: str) -> dict[str, Any]:
+    try:
+        return {'path': path, 'md5_valid': is_flac_md5_valid(path)}
+    except Exception as exc:
+        return {'path': path, 'error': _get_error_message(exc)}
+
+
+def _iter_manifest(manifest_path: str, done_paths: set[str]) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yields the (path, metadata) of the lines of a JSONL manifest, skipping done_paths."""
+    with open(manifest_path, encoding='utf-8') as manifest:
+        for line_number, line in enumerate(manifest, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                path, values = entry['path'], entry['metadata']
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(f'{manifest_path}:{line_number}: expected {{"path": ..., "metadata": {{...}}}}')
+            if path not in done_paths:
+                yield path, values
+
+
+def _parse_set_options(set_options: Sequence[str]) -> dict[str, Any]:
+    values: dict[str, Any] = {}
+    for set_option in set_options:
+        key, separator, value = set_option.partition('=')
+        if not separator:
+            raise ValueError(f'Expected KEY=VALUE: {set_option}')
+        try:
+            # JSON values for lists and numbers, e.g. artists_names=["A", "B"]
+            values[key] = json.loads(value)
+        except ValueError:
+            values[key] = value
+    return values
+
+
+def _run_write(args: argparse.Namespace) -> Iterator[dict[str, Any]]:
+    if args.manifest is None:
+        if not args.paths or not args.set:
+            raise ValueError('write requires files and --set options, or --manifest')
+        values = _parse_set_options(args.set)
+        _parse_app_metadata(values)  # Fail before writing any file
+        yield from (result for _, result in map_parallel(
+            lambda path: _write_file((path, values), args.rating_max), args.paths, args.workers))
+        return
+
+    # The journal lists the files written, so that an interrupted run is resumed where it stopped
+    journal_path = args.manifest + MANIFEST_JOURNAL_SUFFIX
+    done_paths: set[str] = set()
+    if args.resume and os.path.exists(journal_path):
+        with open(journal_path, encoding='utf-8') as journal:
+            done_paths = {line.rstrip('\n') for line in journal if line.strip()}
+    with open(journal_path, 'a' if args.resume else 'w', encoding='utf-8') as journal:
+        for _, result in map_parallel(lambda entry: _write_file(entry, args.rating_max),
+                                       _iter_manifest(args.manifest, done_paths), args.workers):
+            if 'error' not in result:
+                journal.write(result['path'] + '\n')
+                journal.flush()
+            yield result
+
+
+def _run_strip(args: argparse.Namespace) -> Iterator[dict[str, Any]]:
+    formats = [MetadataFormat(tag_format) for tag_format in args.format] if args.format else None
+    for strip_result in strip_many(args.paths, formats=formats, workers=args.workers, dry_run=args.dry_run):
+        result: dict[str, Any] = {'path': strip_result.path, 'bytes_removed': strip_result.bytes_removed,
+                                  'in_place': strip_result.in_place}
+        if strip_result.error:
+            result['error'] = strip_result.error
+        yield result
+
+
+def _run_bench(args: argparse.Namespace, output: IO[str]) -> bool:
+    instrumentation = HistogramInstrumentation()
+    previous_instrumentation = get_instrumentation()
+    set_instrumentation(instrumentation)
+    failed = False
+    start_time = time.perf_counter()
+    try:
+        paths = [path for _ in range(args.iterations) for path in args.paths]
+        for _, result in map_parallel(lambda path: _read_file(path, args.technical, None), paths, args.workers):
+            failed = failed or 'error' in result
+    finally:
+        set_instrumentation(previous_instrumentation)
+    elapsed_sec = time.perf_counter() - start_time
+
+    for (file_format, component, stage), histogram in sorted(instrumentation.get_histograms().items()):
+        output.write(json.dumps({
+            'format': file_format, 'component': component, 'stage': stage, 'count': histogram.count,
+            'mean_sec': histogram.get_mean_sec(), 'p50_sec': histogram.get_percentile(0.5),
+            'p99_sec': histogram.get_percentile(0.99), 'max_sec': histogram.max_sec}) + '\n')
+    output.write(json.dumps({'files': len(paths), 'elapsed_sec': elapsed_sec,
+                             'files_per_sec': len(paths) / elapsed_sec if elapsed_sec else 0.0}) + '\n')
+    return not failed
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='audiometa', description='Read and write audio metadata in bulk.')
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                               help='files processed in parallel (default: number of CPUs)')
+    common_parser.add_argument('-o', '--output', help='JSONL output file (default: standard output)')
+    common_parser.add_argument('--progress', action='store_true', help='report progress to the standard error')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for command, help_text, paths_help in (('read', 'read the metadata of files', 'audio files'),
+                                           ('scan', 'read the metadata of the files under directories', 'directories')):
+        command_parser = subparsers.add_parser(command, parents=[common_parser], help=help_text)
+        command_parser.add_argument('paths', nargs='+', help=paths_help)
+        command_parser.add_argument('--technical', action='store_true', help='include the technical info')
+        command_parser.add_argument('--rating-max', type=int, help='maximum of the normalized ratings')
+
+    write_parser = subparsers.add_parser('write', parents=[common_parser], help='write metadata')
+    write_parser.add_argument('paths', nargs='*', help='audio files, written with the --set values')
+    write_parser.add_argument('--set', action='append', metavar='KEY=VALUE',
+                              help='metadata key and value, JSON for lists and numbers (e.g. artists_names=["A"])')
+    write_parser.add_argument('--manifest', help='JSONL file of {"path": ..., "metadata": {key: value}} lines')
+    write_parser.add_argument('--resume', action='store_true',
+                              help=f'skip the files listed in the {MANIFEST_JOURNAL_SUFFIX} journal of the manifest')
+    write_parser.add_argument('--rating-max', type=int, help='maximum of the normalized ratings')
+
+    strip_parser = subparsers.add_parser('strip', parents=[common_parser], help='delete the metadata of files')
+    strip_parser.add_argument('paths', nargs='+', help='audio files')
+    strip_parser.add_argument('--format', action='append', choices=[tag_format.value for tag_format in MetadataFormat],
+                              help='metadata format to delete, repeatable (default: those of each file)')
+    strip_parser.add_argument('--dry-run', action='store_true', help='report the bytes that would be removed')
+
+    verify_parser = subparsers.add_parser('verify-md5', parents=[common_parser], help='check FLAC MD5 signatures')
+    verify_parser.add_argument('paths', nargs='+', help='FLAC files')
+
+    bench_parser = subparsers.add_parser('bench', parents=[common_parser], help='time metadata reads by stage')
+    bench_parser.add_argument('paths', nargs='+', help='audio files')
+    bench_parser.add_argument('--iterations', type=int, default=1, help='reads of each file')
+    bench_parser.add_argument('--technical', action='store_true', help='also read the technical info')
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _create_parser().parse_args(argv)
+    if args.workers < 1:
+        print('audiometa: error: --workers must be at least 1', file=sys.stderr)
+        return 2
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    progress = _Progress(sys.stderr if args.progress else None)
+    try:
+        if args.command == 'bench':
+            return 0 if _run_bench(args, output) else 1
+
+        results: Iterable[dict[str, Any]]
+        if args.command in ('read', 'scan'):
+            paths = _iter_audio_files(args.paths) if args.command == 'scan' else args.paths
+            results = (result for _, result in map_parallel(
+                lambda path: _read_file(path, args.technical, args.rating_max), paths, args.workers))
+        elif args.command == 'write':
+            results = _run_write(args)
+        elif args.command == 'strip':
+            results = _run_strip(args)
+        else:
+            results = (result for _, result in map_parallel(_verify_md5, args.paths, args.workers))
+
+        success = True
+        for result in results:
+            failed = 'error' in result or result.get('md5_valid') is False
+            success = success and not failed
+            progress.add(result['path'], failed)
+            output.write(json.dumps(_to_json_value(result), ensure_ascii=False) + '\n')
+            output.flush()
+        progress.report(end='\n')
+        return 0 if success else 1
+    except (ValueError, OSError) as exc:
+        print(f'audiometa: error: {exc}', file=sys.stderr)
+        return 2
+    finally:
+        if output is not sys.stdout:
+            output.close()
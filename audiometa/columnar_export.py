@@ -0,0 +1,310 @@
+"""Columnar batch export of the metadata and technical info of many files, e.g. a whole library for analytics.
+
+Files are read by a bounded pool of threads (see get_merged_app_metadata and AudioFile.get_technical_info), and each
+one is reduced to a row of its exported keys as soon as it is read, so that no metadata dict outlives its file. Rows
+are appended to columns: numeric keys to arrays of 64-bit floats, string keys to dictionary-encoded columns storing
+each distinct value once. The columns can be viewed as NumPy arrays without copying them, with the optional numpy
+dependency (pip install audiometa-python[numpy]), or streamed to CSV or JSONL files chunk by chunk.
+"""
+
+import array
+import csv
+import json
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import IO, Any, Iterable, Iterator, Sequence
+
+from .audio_file import AudioFile
+from .utils.AppMetadataKey import AppMetadataKey
+from .utils.AudioTechnicalInfo import AudioTechnicalInfo
+from .utils.parallel_map import map_parallel
+from .utils.types import AppMetadataValue
+
+
+# Technical info fields that can be exported, with whether they are numeric
+TECHNICAL_INFO_EXPORT_KEYS: dict[str, bool] = {
+    'duration_in_sec': True,
+    'bitrate': True,
+    'sample_rate': True,
+    'channels': True,
+    'bit_depth': True,
+    'codec': False,
+}
+
+DEFAULT_EXPORT_KEYS: tuple[AppMetadataKey | str, ...] = (
+    AppMetadataKey.TITLE, AppMetadataKey.ARTISTS_NAMES, AppMetadataKey.ALBUM_NAME, AppMetadataKey.GENRE_NAME,
+    AppMetadataKey.RATING, AppMetadataKey.BPM, 'duration_in_sec', 'bitrate',
+)
+
+# Rows per chunk written by the CSV and JSONL exports
+DEFAULT_EXPORT_CHUNK_SIZE = 10000
+
+# Separator of the values of list keys (e.g. the artists), exported as one string
+EXPORTED_LIST_SEPARATOR = '; '
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("NumPy columns require numpy: pip install audiometa-python[numpy]") from None
+    return numpy
+
+
+@dataclass
+class DictionaryColumn:
+    """
+    String column storing each distinct value once.
+
+    - values: Distinct values, in order of first appearance
+    - codes: Index in values of the value of each row, -1 for missing values
+    """
+    values: list[str] = field(default_factory=list)
+    codes: array.array = field(default_factory=lambda: array.array('i'))
+    _value_codes: dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> str | None:
+        code = self.codes[index]
+        return self.values[code] if code >= 0 else None
+
+    def append(self, value: str | None) -> None:
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self._value_codes.get(value)
+        if code is None:
+            code = self._value_codes[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+@dataclass
+class MetadataColumns:
+    """
+    Exported keys of a batch of files, one row per file.
+
+    - keys: Names of the exported keys, in export order (AppMetadataKey values and technical info fields)
+    - paths: Path of the file of each row
+    - numeric_columns: Values of the numeric keys (e.g. 'rating', 'duration_in_sec') by key, NaN if missing
+    - string_columns: Values of the string keys (e.g. 'title', 'artists_names') by key, the values of list keys being
+      joined with EXPORTED_LIST_SEPARATOR
+    - errors: (path, error) of the files whose metadata or technical info could not be read, their missing values
+      being exported as such
+    """
+    keys: list[str] = field(default_factory=list)
+    paths: list[str] = field(default_factory=list)
+    numeric_columns: dict[str, array.array] = field(default_factory=dict)
+    string_columns: dict[str, DictionaryColumn] = field(default_factory=dict)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def get_value(self, key: str, index: int) -> float | str | None:
+        """Returns the value of key for the file of row index, None if missing."""
+        if key in self.numeric_columns:
+            value = self.numeric_columns[key][index]
+            return None if math.isnan(value) else value
+        return self.string_columns[key][index]
+
+    def to_numpy(self, key: str) -> Any:
+        """
+        Returns the column of key as a NumPy array sharing its memory: float64 values for numeric keys, int32 codes
+        into DictionaryColumn.values for string keys.
+
+        Raises:
+            ImportError: If numpy is not installed
+        """
+        numpy = _import_numpy()
+        if key in self.numeric_columns:
+            return numpy.frombuffer(self.numeric_columns[key], dtype=numpy.float64)
+        return numpy.frombuffer(self.string_columns[key].codes, dtype=numpy.int32)
+
+    def write_csv(self, output: IO[str], header: bool = True) -> None:
+        """Writes a 'path' column and the columns of the keys, missing values being empty."""
+        writer = csv.writer(output)
+        keys = self.keys
+        if header:
+            writer.writerow(['path', *keys])
+        for index, path in enumerate(self.paths):
+            writer.writerow([path, *('' if (value := self.get_value(key, index)) is None else value for key in keys)])
+
+    def write_jsonl(self, output: IO[str]) -> None:
+        """Writes a JSON object per row, with the path and the keys, missing values being null."""
+        keys = self.keys
+        for index, path in enumerate(self.paths):
+            row = {'path': path, **{key: self.get_value(key, index) for key in keys}}
+            output.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def _get_export_key_names(keys: Sequence[AppMetadataKey | str]) -> list[tuple[str, AppMetadataKey | None, bool]]:
+    """Returns the (column name, app metadata key or None for technical info fields, is numeric) of keys."""
+    key_names = []
+    for key in keys:
+        if isinstance(key, str) and key in TECHNICAL_INFO_EXPORT_KEYS:
+            key_names.append((key, None, TECHNICAL_INFO_EXPORT_KEYS[key]))
+            continue
+        try:
+            app_metadata_key = AppMetadataKey(key)
+        except ValueError:
+            raise ValueError(f"Unknown export key: {key}") from None
+        key_names.append((app_metadata_key.value, app_metadata_key,
+                          app_metadata_key.get_optional_type() in (int, float)))
+    return key_names
+
+
+def _create_columns(key_names: list[tuple[str, AppMetadataKey | None, bool]]) -> MetadataColumns:
+    return MetadataColumns(
+        keys=[name for name, _, _ in key_names],
+        numeric_columns={name: array.array('d') for name, _, is_numeric in key_names if is_numeric},
+        string_columns={name: DictionaryColumn() for name, _, is_numeric in key_names if not is_numeric})
+
+
+def _to_column_value(value: AppMetadataValue | str | None, is_numeric: bool) -> float | str | None:
+    if value is None:
+        return None
+    if is_numeric:
+        try:
+            return float(value)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, list):
+        return EXPORTED_LIST_SEPARATOR.join(str(item) for item in value) or None
+    return str(value)
+
+
+def _read_row(path: str, key_names: list[tuple[str, AppMetadataKey | None, bool]],
+              normalized_rating_max_value: int | None) -> tuple[list[float | str | None], str | None]:
+    # Imported here as the package entry point imports this module
+    from . import get_merged_app_metadata
+
+    errors = []
+    app_metadata = {}
+    technical_info: AudioTechnicalInfo | None = None
+    try:
+        with AudioFile(path, read_only=True) as audio_file:
+            if any(app_metadata_key is not None for _, app_metadata_key, _ in key_names):
+                try:
+                    app_metadata = get_merged_app_metadata(
+                        audio_file, normalized_rating_max_value=normalized_rating_max_value)
+                except Exception as exc:
+                    errors.append(f'{type(exc).__name__}: {exc}')
+            if any(app_metadata_key is None for _, app_metadata_key, _ in key_names):
+                try:
+                    technical_info = audio_file.get_technical_info()
+                except Exception as exc:
+                    errors.append(f'{type(exc).__name__}: {exc}')
+    except Exception as exc:
+        errors.append(f'{type(exc).__name__}: {exc}')
+
+    row = []
+    for name, app_metadata_key, is_numeric in key_names:
+        if app_metadata_key is not None:
+            value = app_metadata.get(app_metadata_key)
+        else:
+            value = getattr(technical_info, name) if technical_info else None
+        row.append(_to_column_value(value, is_numeric))
+    return row, '; '.join(errors) or None
+
+
+def iter_exported_column_chunks(paths: Iterable[str], keys: Sequence[AppMetadataKey | str] = DEFAULT_EXPORT_KEYS,
+                                workers: int | None = None, chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+                                normalized_rating_max_value: int | None = None) -> Iterator[MetadataColumns]:
+    """
+    Reads the keys of files into columns, yielding them every chunk_size files, e.g. to write them out while the
+    remaining files are read. Only the current chunk is held in memory.
+
+    Rows are appended as files are read (see map_parallel), the paths column telling the file of each. The values of
+    a file that cannot be read are missing, its error being in MetadataColumns.errors.
+
+    Args:
+        paths: Files to export
+        keys: App metadata keys (e.g. AppMetadataKey.RATING) or technical info fields (see TECHNICAL_INFO_EXPORT_KEYS)
+        workers: Maximum number of files read in parallel, defaults to the number of CPUs
+        chunk_size: Maximum number of rows of each yielded chunk
+        normalized_rating_max_value: Maximum of the exported ratings, raw file values if None
+
+    Raises:
+        ValueError: If a key is unknown, or workers or chunk_size is below 1
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    key_names = _get_export_key_names(keys)
+    chunk = _create_columns(key_names)
+    rows = map_parallel(lambda path: _read_row(path, key_names, normalized_rating_max_value), map(str, paths), workers)
+    for path, (row, error) in rows:
+        chunk.paths.append(path)
+        for (name, _, is_numeric), value in zip(key_names, row):
+            if is_numeric:
+                chunk.numeric_columns[name].append(math.nan if value is None else value)  # type: ignore
+            else:
+                chunk.string_columns[name].append(value)  # type: ignore[arg-type]
+        if error:
+            chunk.errors.append((path, error))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = _create_columns(key_names)
+
+    if len(chunk):
+        yield chunk
+
+
+def export_columns(paths: Iterable[str], keys: Sequence[AppMetadataKey | str] = DEFAULT_EXPORT_KEYS,
+                   workers: int | None = None, normalized_rating_max_value: int | None = None) -> MetadataColumns:
+    """
+    Reads the keys of files into columns (see iter_exported_column_chunks), all the files being in the returned
+    columns.
+
+    Example:
+        columns = export_columns(paths, keys=[AppMetadataKey.ARTISTS_NAMES, AppMetadataKey.RATING], workers=8)
+        ratings = columns.to_numpy('rating')  # With numpy installed
+    """
+    chunks = iter_exported_column_chunks(paths, keys=keys, workers=workers, chunk_size=sys.maxsize,
+                                         normalized_rating_max_value=normalized_rating_max_value)
+    return next(chunks, None) or _create_columns(_get_export_key_names(keys))
+
+
+def export_columns_to_csv(paths: Iterable[str], output_path: str,
+                          keys: Sequence[AppMetadataKey | str] = DEFAULT_EXPORT_KEYS, workers: int | None = None,
+                          chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+                          normalized_rating_max_value: int | None = None) -> list[tuple[str, str]]:
+    """
+    Writes the keys of files to a CSV file with a header row (see MetadataColumns.write_csv), chunk by chunk as they
+    are read (see iter_exported_column_chunks). Returns the (path, error) of the files that could not be read.
+    """
+    errors: list[tuple[str, str]] = []
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        header = True
+        for chunk in iter_exported_column_chunks(paths, keys=keys, workers=workers, chunk_size=chunk_size,
+                                                 normalized_rating_max_value=normalized_rating_max_value):
+            chunk.write_csv(output, header=header)
+            header = False
+            errors.extend(chunk.errors)
+        if header:
+            _create_columns(_get_export_key_names(keys)).write_csv(output)
+    return errors
+
+
+def export_columns_to_jsonl(paths: Iterable[str], output_path: str,
+                            keys: Sequence[AppMetadataKey | str] = DEFAULT_EXPORT_KEYS, workers: int | None = None,
+                            chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+                            normalized_rating_max_value: int | None = None) -> list[tuple[str, str]]:
+    """
+    Writes the keys of files to a JSON Lines file (see MetadataColumns.write_jsonl), chunk by chunk as they are read
+    (see iter_exported_column_chunks). Returns the (path, error) of the files that could not be read.
+    """
+    errors: list[tuple[str, str]] = []
+    with open(output_path, 'w', encoding='utf-8') as output:
+        for chunk in iter_exported_column_chunks(paths, keys=keys, workers=workers, chunk_size=chunk_size,
+                                                 normalized_rating_max_value=normalized_rating_max_value):
+            chunk.write_jsonl(output)
+            errors.extend(chunk.errors)
+    return errors
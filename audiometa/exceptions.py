@@ -33,3 +33,11 @@ class MetadataNotSupportedError(Exception):
         - Trying to write BPM to ID3v1 tags
         - Trying to write album artist to ID3v1 tags
     """
+
+
+class ByteBudgetExceededError(Exception):
+    """Raised when more bytes are read from an audio file than its max_bytes_read budget allows."""
+
+
+class ByteBudgetExceededWarning(UserWarning):
+    """Emitted instead of ByteBudgetExceededError when the byte budget policy is to warn."""
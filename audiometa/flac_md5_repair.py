@@ -0,0 +1,96 @@
+"""Batch correction of FLAC MD5 signatures.
+
+Files are reencoded by a bounded pool of workers, each one writing straight to the destination directory (see
+AudioFile.write_file_with_corrected_md5), and results are streamed back as soon as each file is done.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from .audio_file import FLAC_FAST_COMPRESSION_LEVEL, AudioFile
+from .utils.parallel_map import map_parallel
+
+
+@dataclass(frozen=True)
+class FlacMd5RepairResult:
+    """
+    Outcome of the repair of one file.
+
+    - source_path: Path of the file to repair
+    - destination_path: Path of the corrected file, None if the file was skipped or could not be repaired
+    - was_md5_valid: Result of the MD5 check when only_invalid is set, None otherwise
+    - error: Error message if the repair failed, None otherwise
+    - elapsed_sec: Wall-clock time spent on this file (check and reencoding)
+    - completed_count: Number of files done so far, this one included, for progress reporting
+    """
+    source_path: str
+    destination_path: str | None
+    was_md5_valid: bool | None
+    error: str | None
+    elapsed_sec: float
+    completed_count: int
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def _repair_one(source_path: str, destination_path: str, is_destination_taken: bool, compression_level: int,
+                only_invalid: bool) -> tuple[str | None, bool | None, str | None, float]:
+    start_time = time.perf_counter()
+    was_md5_valid = None
+    if is_destination_taken:
+        destination_dir, destination_name = os.path.split(destination_path)
+        error = f'Another file named {destination_name} is already written to {destination_dir}'
+        return None, was_md5_valid, error, 0.0
+    try:
+        audio_file = AudioFile(source_path)
+        if only_invalid:
+            was_md5_valid = audio_file.is_flac_file_md5_valid()
+            if was_md5_valid:
+                return None, was_md5_valid, None, time.perf_counter() - start_time
+        audio_file.write_file_with_corrected_md5(destination_path, compression_level=compression_level)
+        return destination_path, was_md5_valid, None, time.perf_counter() - start_time
+    except Exception as exc:
+        return None, was_md5_valid, f'{type(exc).__name__}: {exc}', time.perf_counter() - start_time
+
+
+def repair_flac_md5_many(paths: Iterable[str], destination_dir: str,
+                         compression_level: int = FLAC_FAST_COMPRESSION_LEVEL, workers: int | None = None,
+                         only_invalid: bool = False) -> Iterator[FlacMd5RepairResult]:
+    """
+    Reencodes FLAC files with corrected MD5 signatures into destination_dir, keeping their file names.
+
+    Each file is reencoded once: a file whose name was already written to destination_dir by this batch is not
+    reencoded, its result carrying an error, and so is a file whose check or reencoding fails. Results are yielded as
+    files are done (see map_parallel), so paths may be a lazy iterable over a very large library.
+
+    Args:
+        paths: FLAC files to repair
+        destination_dir: Directory receiving the corrected files, created if missing
+        compression_level: FLAC compression level, the fastest by default as bulk repair is I/O and CPU bound
+        workers: Maximum number of files processed in parallel, defaults to the number of CPUs
+        only_invalid: If True, files whose MD5 signature is valid are checked but not reencoded
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    os.makedirs(destination_dir, exist_ok=True)
+
+    def iter_destinations() -> Iterator[tuple[str, str, bool]]:
+        # Checked as files are submitted, so that the first file of each name is the one written
+        destination_names: set[str] = set()
+        for source_path in map(str, paths):
+            destination_name = os.path.basename(source_path)
+            yield source_path, os.path.join(destination_dir, destination_name), destination_name in destination_names
+            destination_names.add(destination_name)
+
+    repairs = map_parallel(lambda destination: _repair_one(*destination, compression_level, only_invalid),
+                           iter_destinations(), workers)
+    for completed_count, ((source_path, _, _), repair) in enumerate(repairs, start=1):
+        destination_path, was_md5_valid, error, elapsed_sec = repair
+        yield FlacMd5RepairResult(
+            source_path=source_path, destination_path=destination_path, was_md5_valid=was_md5_valid,
+            error=error, elapsed_sec=elapsed_sec, completed_count=completed_count)
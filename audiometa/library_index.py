@@ -0,0 +1,353 @@
+"""Persistent SQLite index of the metadata of a music library.
+
+The index stores, for every supported audio file under a root directory, its merged app metadata and technical info,
+along with the (size, mtime_ns, inode) signature of the file when it was read. Syncing only re-reads the files whose
+signature changed and drops the files that disappeared, and queries are answered from indexed columns without
+opening any audio file.
+"""
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from .audio_file import AudioFile
+from .utils.AppMetadataKey import AppMetadataKey
+from .utils.AudioTechnicalInfo import AudioTechnicalInfo
+from .utils.parallel_map import map_parallel
+from .utils.TagFormat import MetadataFormat
+from .utils.types import AppMetadata
+
+
+# Number of re-read files written per transaction during a sync
+SYNC_COMMIT_BATCH_SIZE = 500
+
+LIBRARY_INDEX_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS index_settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    title TEXT,
+    album TEXT COLLATE NOCASE,
+    genre TEXT COLLATE NOCASE,
+    rating INTEGER,
+    duration REAL,
+    bitrate INTEGER,
+    sample_rate INTEGER,
+    channels INTEGER,
+    bit_depth INTEGER,
+    codec TEXT,
+    is_vbr INTEGER,
+    metadata_json TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS track_artists (
+    path TEXT NOT NULL REFERENCES tracks(path) ON DELETE CASCADE,
+    artist TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS tracks_album ON tracks(album);
+CREATE INDEX IF NOT EXISTS tracks_genre ON tracks(genre);
+CREATE INDEX IF NOT EXISTS tracks_rating ON tracks(rating);
+CREATE INDEX IF NOT EXISTS tracks_duration ON tracks(duration);
+CREATE INDEX IF NOT EXISTS track_artists_artist ON track_artists(artist);
+CREATE INDEX IF NOT EXISTS track_artists_path ON track_artists(path);
+'''
+
+FileSignature = tuple[int, int, int]
+
+
+@dataclass
+class LibrarySyncReport:
+    """
+    Outcome of a LibraryIndex.sync call.
+
+    - added/updated/removed/unchanged: Number of files in each state
+    - failed: (path, error) of the files whose metadata or technical info could not be read. They are still indexed
+      with their signature, so they are not retried until they change.
+    """
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class _TrackReading:
+    path: str
+    signature: FileSignature
+    app_metadata: AppMetadata
+    technical_info: AudioTechnicalInfo | None
+    error: str | None
+
+
+def get_file_signature(stat_result: os.stat_result) -> FileSignature:
+    return stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+
+
+class LibraryIndex:
+    """
+    SQLite-backed index of the metadata of every supported audio file under root.
+
+    Ratings are stored normalized with normalized_rating_max_value (raw file values if None), so that rating range
+    queries are comparable across formats. Changing normalized_rating_max_value for an existing database makes the
+    next sync re-read every file.
+
+    Example:
+        with LibraryIndex('/music', '/var/lib/audiometa/library.db', normalized_rating_max_value=5) as index:
+            index.sync()
+            five_star_tracks = index.find(min_rating=5)
+    """
+
+    root: str
+    db_path: str
+    normalized_rating_max_value: int | None
+
+    def __init__(self, root: str, db_path: str, normalized_rating_max_value: int | None = None):
+        self.root = os.path.abspath(root)
+        self.db_path = db_path
+        self.normalized_rating_max_value = normalized_rating_max_value
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.executescript(LIBRARY_INDEX_SCHEMA)
+        self._reset_if_rating_normalization_changed()
+
+    def _reset_if_rating_normalization_changed(self) -> None:
+        row = self._connection.execute(
+            "SELECT value FROM index_settings WHERE key = 'normalized_rating_max_value'").fetchone()
+        current_value = json.dumps(self.normalized_rating_max_value)
+        if row is not None and row[0] == current_value:
+            return
+        with self._connection:
+            if row is not None:
+                # Stored ratings use another scale: forget the signatures so that every file is read again
+                self._connection.execute('UPDATE tracks SET size = -1')
+            self._connection.execute(
+                "INSERT OR REPLACE INTO index_settings (key, value) VALUES ('normalized_rating_max_value', ?)",
+                (current_value,))
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM tracks').fetchone()[0]
+
+    def _iter_library_files(self) -> Iterator[tuple[str, os.stat_result]]:
+        supported_extensions = tuple(MetadataFormat.get_priorities().keys())
+        directories = [self.root]
+        while directories:
+            directory = directories.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file() and entry.name.lower().endswith(supported_extensions):
+                        yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+    def _read_track(self, path: str, signature: FileSignature) -> _TrackReading:
+        # Imported here as the package entry point imports this module
+        from . import get_merged_app_metadata
+
+        app_metadata: AppMetadata = {}
+        technical_info = None
+        errors = []
+        try:
+            # Read-only, so that reading never modifies the library (e.g. by adding empty tags)
+            audio_file = AudioFile(path, read_only=True)
+        except Exception as exc:
+            return _TrackReading(path, signature, app_metadata, technical_info, f'{type(exc).__name__}: {exc}')
+        with audio_file:
+            try:
+                app_metadata = get_merged_app_metadata(
+                    audio_file, normalized_rating_max_value=self.normalized_rating_max_value)
+            except Exception as exc:
+                errors.append(f'{type(exc).__name__}: {exc}')
+            try:
+                technical_info = audio_file.get_technical_info()
+            except Exception as exc:
+                errors.append(f'{type(exc).__name__}: {exc}')
+        # The signature of the content read, in case the file changed since it was listed
+        try:
+            signature = get_file_signature(os.stat(path))
+        except OSError:
+            pass
+        return _TrackReading(path, signature, app_metadata, technical_info, '; '.join(errors) or None)
+
+    def _store_track(self, track: _TrackReading) -> None:
+        app_metadata = track.app_metadata
+        technical_info = track.technical_info
+        rating = app_metadata.get(AppMetadataKey.RATING)
+        self._connection.execute('DELETE FROM track_artists WHERE path = ?', (track.path,))
+        self._connection.execute(
+            '''INSERT OR REPLACE INTO tracks (path, size, mtime_ns, inode, title, album, genre, rating, duration,
+            bitrate, sample_rate, channels, bit_depth, codec, is_vbr, metadata_json, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            (track.path, *track.signature,
+             app_metadata.get(AppMetadataKey.TITLE),
+             app_metadata.get(AppMetadataKey.ALBUM_NAME),
+             app_metadata.get(AppMetadataKey.GENRE_NAME),
+             int(rating) if rating is not None else None,  # type: ignore[arg-type]
+             technical_info.duration_in_sec if technical_info else None,
+             technical_info.bitrate if technical_info else None,
+             technical_info.sample_rate if technical_info else None,
+             technical_info.channels if technical_info else None,
+             technical_info.bit_depth if technical_info else None,
+             technical_info.codec if technical_info else None,
+             int(technical_info.is_vbr) if technical_info else None,
+             json.dumps({key.value: value for key, value in app_metadata.items()}),
+             track.error))
+        artists = app_metadata.get(AppMetadataKey.ARTISTS_NAMES) or []
+        self._connection.executemany(
+            'INSERT INTO track_artists (path, artist) VALUES (?, ?)',
+            [(track.path, artist) for artist in dict.fromkeys(artists)])  # type: ignore[union-attr]
+
+    def sync(self, workers: int = 1) -> LibrarySyncReport:
+        """
+        Brings the index up to date with the files under root.
+
+        Only the files that are new or whose (size, mtime_ns, inode) signature changed are read, read-only; indexed
+        files that no longer exist are removed. The signature stored is taken after reading each file.
+
+        Args:
+            workers: Number of files read in parallel
+        """
+        report = LibrarySyncReport()
+        indexed_signatures = self.get_signatures()
+
+        changed_files: list[tuple[str, FileSignature]] = []
+        for path, stat_result in self._iter_library_files():
+            signature = get_file_signature(stat_result)
+            indexed_signature = indexed_signatures.pop(path, None)
+            if indexed_signature == signature:
+                report.unchanged += 1
+                continue
+            if indexed_signature is None:
+                report.added += 1
+            else:
+                report.updated += 1
+            changed_files.append((path, signature))
+
+        readings = map_parallel(lambda changed_file: self._read_track(*changed_file), changed_files, max(1, workers))
+        for index, (_, track) in enumerate(readings):
+            if index % SYNC_COMMIT_BATCH_SIZE == 0:
+                self._connection.commit()
+            if track.error:
+                report.failed.append((track.path, track.error))
+            self._store_track(track)
+        self._connection.commit()
+
+        # Files left in indexed_signatures were not found under root anymore
+        with self._connection:
+            self._connection.executemany('DELETE FROM tracks WHERE path = ?', [(path,) for path in indexed_signatures])
+        report.removed = len(indexed_signatures)
+        return report
+
+    def get_signatures(self) -> dict[str, FileSignature]:
+        """Returns the (size, mtime_ns, inode) signature of every indexed file by path, as of when it was read."""
+        return {path: (size, mtime_ns, inode)
+                for path, size, mtime_ns, inode in self._connection.execute(
+                    'SELECT path, size, mtime_ns, inode FROM tracks')}
+
+    def update_file(self, path: str) -> AppMetadata | None:
+        """
+        Re-reads a single file and stores it, e.g. when a change notification is received.
+        Returns its new metadata, or None if the file does not exist anymore, in which case it is removed.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            self.remove_file(path)
+            return None
+        track = self._read_track(path, get_file_signature(stat_result))
+        with self._connection:
+            self._store_track(track)
+        return track.app_metadata
+
+    def remove_file(self, path: str) -> None:
+        """Removes the file from the index, if indexed."""
+        with self._connection:
+            self._connection.execute('DELETE FROM tracks WHERE path = ?', (os.path.abspath(path),))
+
+    def remove_directory(self, path: str) -> dict[str, AppMetadata]:
+        """Removes every indexed file under the directory and returns their last indexed metadata by path."""
+        directory_prefix = os.path.join(os.path.abspath(path), '')
+        removed_tracks = {
+            track_path: {AppMetadataKey(key): value for key, value in json.loads(metadata_json).items()}
+            for track_path, metadata_json in self._connection.execute(
+                'SELECT path, metadata_json FROM tracks WHERE substr(path, 1, ?) = ?',
+                (len(directory_prefix), directory_prefix))}
+        with self._connection:
+            self._connection.executemany('DELETE FROM tracks WHERE path = ?', [(path,) for path in removed_tracks])
+        return removed_tracks
+
+    def get_app_metadata(self, path: str) -> AppMetadata | None:
+        """Returns the indexed merged metadata of the file, None if the file is not indexed."""
+        row = self._connection.execute(
+            'SELECT metadata_json FROM tracks WHERE path = ?', (os.path.abspath(path),)).fetchone()
+        if row is None:
+            return None
+        return {AppMetadataKey(key): value for key, value in json.loads(row[0]).items()}
+
+    def get_read_error(self, path: str) -> str | None:
+        """Returns the error raised when the file was last read, None if it was read successfully or not indexed."""
+        row = self._connection.execute('SELECT error FROM tracks WHERE path = ?', (os.path.abspath(path),)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_technical_info(self, path: str) -> AudioTechnicalInfo | None:
+        """Returns the indexed technical info of the file, None if not indexed or if it could not be read."""
+        row = self._connection.execute(
+            '''SELECT duration, bitrate, sample_rate, channels, bit_depth, codec, is_vbr FROM tracks
+            WHERE path = ? AND duration IS NOT NULL''', (os.path.abspath(path),)).fetchone()
+        if row is None:
+            return None
+        duration, bitrate, sample_rate, channels, bit_depth, codec, is_vbr = row
+        return AudioTechnicalInfo(duration_in_sec=duration, bitrate=bitrate, sample_rate=sample_rate,
+                                  channels=channels, bit_depth=bit_depth, codec=codec, is_vbr=bool(is_vbr))
+
+    def find(self, artist: str | None = None, album: str | None = None, genre: str | None = None,
+             min_rating: int | None = None, max_rating: int | None = None,
+             min_duration_in_sec: float | None = None, max_duration_in_sec: float | None = None) -> list[str]:
+        """
+        Returns the paths of the indexed files matching all the given criteria.
+        Text criteria are case-insensitive exact matches, range bounds are inclusive.
+        """
+        conditions = []
+        parameters: list = []
+        if artist is not None:
+            conditions.append('path IN (SELECT path FROM track_artists WHERE artist = ?)')
+            parameters.append(artist)
+        for column, value in (('album', album), ('genre', genre)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                parameters.append(value)
+        for column, operator, value in (('rating', '>=', min_rating), ('rating', '<=', max_rating),
+                                        ('duration', '>=', min_duration_in_sec),
+                                        ('duration', '<=', max_duration_in_sec)):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                parameters.append(value)
+
+        query = 'SELECT path FROM tracks'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return [row[0] for row in self._connection.execute(query + ' ORDER BY path', parameters)]
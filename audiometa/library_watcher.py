@@ -0,0 +1,370 @@
+"""Change watcher keeping the metadata of a music library warm, based on Linux inotify.
+
+Every directory under the root is watched. Only files that were closed after being written (IN_CLOSE_WRITE), moved
+in (IN_MOVED_TO), deleted or moved out are considered, and a file is read again only once it has been quiet for the
+debounce delay, so that a tagger rewriting a file in several steps triggers a single read.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from threading import Event
+from typing import Iterator
+
+from .audio_file import AudioFile
+from .library_index import FileSignature, LibraryIndex, get_file_signature
+from .utils.LibraryChangeType import LibraryChangeType
+from .utils.TagFormat import MetadataFormat
+from .utils.types import AppMetadata
+
+
+DEFAULT_DEBOUNCE_SEC = 0.5
+
+# Longest time watch_library waits before checking its stop event
+STOP_EVENT_POLL_INTERVAL_SEC = 0.5
+
+# inotify constants, see <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCHED_EVENTS_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+
+# wd, mask, cookie, len, followed by the null-padded name
+INOTIFY_EVENT_STRUCT = struct.Struct('iIII')
+INOTIFY_READ_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class LibraryChangeEvent:
+    """
+    Change of a file of the watched library.
+
+    - path: Absolute path of the file
+    - change_type: Whether the file was modified or removed
+    - old_metadata: Metadata known before the change (from the index if any, else from the previous event of the
+      file), None if unknown
+    - new_metadata: Merged metadata read after the change, None if the file was removed or could not be read
+    - error: Error raised when reading the file, None otherwise
+    """
+    path: str
+    change_type: LibraryChangeType
+    old_metadata: AppMetadata | None
+    new_metadata: AppMetadata | None
+    error: str | None = None
+
+
+def _load_libc() -> ctypes.CDLL:
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.ENOSYS, f"Watching a library requires Linux inotify, not available on {sys.platform}")
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    if not hasattr(libc, 'inotify_init1'):
+        raise OSError(errno.ENOSYS, "Watching a library requires inotify, not provided by the C library")
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+class LibraryWatcher:
+    """
+    inotify watcher of the supported audio files under root.
+
+    If index is given, it is kept up to date with every change and provides the old metadata of the events.
+    Otherwise the metadata read for each event is kept in memory and provides the old metadata of the next event of
+    the same file.
+
+    If the inotify queue overflows, notifications are lost: the tree is scanned again and every file whose
+    (size, mtime_ns, inode) signature differs from the indexed one, or from the one seen by the watcher without index,
+    is read again, or reported as removed if it is gone.
+
+    Example:
+        with LibraryWatcher('/music') as watcher:
+            for event in watcher.read_events(timeout=10):
+                print(event.path, event.old_metadata, event.new_metadata)
+
+    Files are read read-only, so that reading them never causes a change notification.
+
+    Raises:
+        OSError: If inotify is not available, e.g. on other platforms than Linux
+    """
+
+    root: str
+    debounce_sec: float
+    index: LibraryIndex | None
+    normalized_rating_max_value: int | None
+
+    def __init__(self, root: str, debounce_sec: float = DEFAULT_DEBOUNCE_SEC, index: LibraryIndex | None = None,
+                 normalized_rating_max_value: int | None = None):
+        self._libc = _load_libc()
+        self.root = os.path.abspath(root)
+        self.debounce_sec = debounce_sec
+        self.index = index
+        self.normalized_rating_max_value = (
+            index.normalized_rating_max_value if index is not None else normalized_rating_max_value)
+        self._supported_extensions = tuple(MetadataFormat.get_priorities().keys())
+        self._metadata_cache: dict[str, AppMetadata] = {}
+        self._pending_changes: dict[str, float] = {}
+        self._watched_directories: dict[int, str] = {}
+        # Signatures of the files under root, to find the changes lost on overflow, if there is no index to keep them
+        self._signatures: dict[str, FileSignature] = {}
+
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+        try:
+            found_files = self._watch_tree(self.root)
+            if index is None:
+                for path in found_files:
+                    self._update_signature(path)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def get_app_metadata(self, path: str) -> AppMetadata | None:
+        """Returns the metadata read for the last change of the file, None if it did not change since watching."""
+        return self._metadata_cache.get(os.path.abspath(path))
+
+    def _is_supported_file(self, name: str) -> bool:
+        return name.lower().endswith(self._supported_extensions)
+
+    def _add_watch(self, directory: str) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCHED_EVENTS_MASK)
+        if wd < 0:
+            error_number = ctypes.get_errno()
+            # The directory may already be gone when its creation event is handled
+            if error_number in (errno.ENOENT, errno.ENOTDIR):
+                return False
+            raise OSError(error_number, os.strerror(error_number), directory)
+        self._watched_directories[wd] = directory
+        return True
+
+    def _watch_tree(self, root: str) -> list[str]:
+        """Watches root and its subdirectories, and returns the supported files found in them."""
+        found_files = []
+        directories = [root]
+        while directories:
+            directory = directories.pop()
+            if not self._add_watch(directory):
+                continue
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file() and self._is_supported_file(entry.name):
+                        found_files.append(entry.path)
+                except OSError:
+                    continue
+        return found_files
+
+    def _unwatch_tree(self, root: str) -> None:
+        directory_prefix = os.path.join(root, '')
+        for wd, directory in list(self._watched_directories.items()):
+            if directory == root or directory.startswith(directory_prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watched_directories[wd]
+
+    def _update_signature(self, path: str) -> None:
+        try:
+            self._signatures[path] = get_file_signature(os.stat(path))
+        except OSError:
+            self._signatures.pop(path, None)
+
+    def _schedule(self, path: str, now: float) -> None:
+        # Every new notification postpones the read, so that only the final state of the file is read
+        self._pending_changes.pop(path, None)
+        self._pending_changes[path] = now + self.debounce_sec
+
+    def _handle_inotify_event(self, wd: int, mask: int, name: str, now: float) -> list[LibraryChangeEvent]:
+        if mask & IN_Q_OVERFLOW:
+            self._handle_overflow(now)
+            return []
+        if mask & IN_IGNORED:
+            self._watched_directories.pop(wd, None)
+            return []
+        directory = self._watched_directories.get(wd)
+        if directory is None or not name:
+            return []
+        path = os.path.join(directory, name)
+
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                # Files may have been written before the directory was watched
+                for file_path in self._watch_tree(path):
+                    self._schedule(file_path, now)
+            elif mask & IN_MOVED_FROM:
+                self._unwatch_tree(path)
+                return self._remove_tree(path)
+            return []
+
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE) and self._is_supported_file(name):
+            self._schedule(path, now)
+        return []
+
+    def _handle_overflow(self, now: float) -> None:
+        # Notifications were lost: the files whose signature changed are read again, as if they had been notified.
+        # Watching the tree again also watches the directories created meanwhile
+        known_signatures = self.index.get_signatures() if self.index is not None else dict(self._signatures)
+        for path in self._watch_tree(self.root):
+            try:
+                signature = get_file_signature(os.stat(path))
+            except OSError:
+                continue
+            if known_signatures.pop(path, None) != signature:
+                self._schedule(path, now)
+        # The files left were not found anymore, and are reported as removed once read
+        for path in known_signatures:
+            self._schedule(path, now)
+
+    def _remove_tree(self, root: str) -> list[LibraryChangeEvent]:
+        directory_prefix = os.path.join(root, '')
+        old_metadata_by_path: dict[str, AppMetadata | None] = {
+            path: None for path in self._pending_changes if path.startswith(directory_prefix)}
+        old_metadata_by_path.update(
+            (path, metadata) for path, metadata in self._metadata_cache.items() if path.startswith(directory_prefix))
+        if self.index is not None:
+            old_metadata_by_path.update(self.index.remove_directory(root))
+        for path in [path for path in self._signatures if path.startswith(directory_prefix)]:
+            del self._signatures[path]
+
+        events = []
+        for path, old_metadata in old_metadata_by_path.items():
+            self._pending_changes.pop(path, None)
+            self._metadata_cache.pop(path, None)
+            events.append(LibraryChangeEvent(path, LibraryChangeType.REMOVED, old_metadata, None))
+        return events
+
+    def _read_inotify_events(self, now: float) -> list[LibraryChangeEvent]:
+        events = []
+        while True:
+            try:
+                data = os.read(self._fd, INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset + INOTIFY_EVENT_STRUCT.size <= len(data):
+                wd, mask, _, name_length = INOTIFY_EVENT_STRUCT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT_STRUCT.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+                offset += name_length
+                events.extend(self._handle_inotify_event(wd, mask, name, now))
+
+    def _process_change(self, path: str) -> LibraryChangeEvent:
+        if self.index is not None:
+            old_metadata = self.index.get_app_metadata(path)
+            new_metadata = self.index.update_file(path)
+            error = self.index.get_read_error(path) if new_metadata is not None else None
+        else:
+            old_metadata = self._metadata_cache.get(path)
+            new_metadata, error = self._read_app_metadata(path)
+            # Taken after reading, as the index does
+            self._update_signature(path)
+
+        if new_metadata is None and error is None:
+            self._metadata_cache.pop(path, None)
+            return LibraryChangeEvent(path, LibraryChangeType.REMOVED, old_metadata, None)
+        if error is not None:
+            self._metadata_cache.pop(path, None)
+            return LibraryChangeEvent(path, LibraryChangeType.MODIFIED, old_metadata, new_metadata or None, error)
+        self._metadata_cache[path] = new_metadata  # type: ignore[assignment]
+        return LibraryChangeEvent(path, LibraryChangeType.MODIFIED, old_metadata, new_metadata)
+
+    def _read_app_metadata(self, path: str) -> tuple[AppMetadata | None, str | None]:
+        # Imported here as the package entry point imports this module
+        from . import get_merged_app_metadata
+
+        if not os.path.exists(path):
+            return None, None
+        try:
+            # Read-only, so that reading never writes the file (e.g. an empty tag), which would notify a change again
+            with AudioFile(path, read_only=True) as audio_file:
+                return get_merged_app_metadata(
+                    audio_file, normalized_rating_max_value=self.normalized_rating_max_value), None
+        except FileNotFoundError:
+            return None, None
+        except Exception as exc:
+            return None, f'{type(exc).__name__}: {exc}'
+
+    def _process_due_changes(self, now: float) -> list[LibraryChangeEvent]:
+        due_paths = [path for path, due_time in self._pending_changes.items() if due_time <= now]
+        events = []
+        for path in due_paths:
+            del self._pending_changes[path]
+            events.append(self._process_change(path))
+        return events
+
+    def read_events(self, timeout: float | None = None) -> list[LibraryChangeEvent]:
+        """
+        Waits for changes and returns them once debounced.
+
+        Returns as soon as at least one change is available, or an empty list once timeout seconds elapsed (never
+        if timeout is None).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            events = self._process_due_changes(now)
+            if events:
+                return events
+
+            wait_sec = min(self._pending_changes.values()) - now if self._pending_changes else None
+            if deadline is not None:
+                remaining_sec = deadline - now
+                if remaining_sec <= 0:
+                    return []
+                wait_sec = remaining_sec if wait_sec is None else min(wait_sec, remaining_sec)
+            ready, _, _ = select.select([self._fd], [], [], max(0.0, wait_sec) if wait_sec is not None else None)
+            if ready:
+                events = self._read_inotify_events(time.monotonic())
+                if events:
+                    return events
+
+
+def watch_library(root: str, debounce_sec: float = DEFAULT_DEBOUNCE_SEC, index: LibraryIndex | None = None,
+                  normalized_rating_max_value: int | None = None,
+                  stop_event: Event | None = None) -> Iterator[LibraryChangeEvent]:
+    """
+    Yields the changes of the supported audio files under root as they happen. Linux only.
+
+    Args:
+        root: Directory to watch recursively
+        debounce_sec: Quiet time after the last notification of a file before it is read
+        index: Index kept up to date with the changes, also providing the old metadata of the events
+        normalized_rating_max_value: Rating normalization of the metadata read, ignored if index is given
+        stop_event: Makes the generator return once set, otherwise it runs until closed
+    """
+    with LibraryWatcher(root, debounce_sec=debounce_sec, index=index,
+                        normalized_rating_max_value=normalized_rating_max_value) as watcher:
+        while stop_event is None or not stop_event.is_set():
+            yield from watcher.read_events(timeout=STOP_EVENT_POLL_INTERVAL_SEC if stop_event is not None else None)
@@ -1,22 +1,29 @@
 
 from abc import abstractmethod
-from typing import TypeVar, cast
+from typing import Callable, TypeVar, cast
 
 from mutagen._file import FileType as MutagenMetadata
 
 from ..audio_file import AudioFile
 from ..utils.id3v1_genre_code_map import ID3V1_GENRE_CODE_MAP
+from ..utils.instrumentation import call_timed
 
 from ..exceptions import MetadataNotSupportedError
 from ..utils.AppMetadataKey import AppMetadataKey
-from ..utils.types import AppMetadata, AppMetadataValue, RawMetadataDict, RawMetadataKey
+from ..utils.MetadataDeletionReport import MetadataDeletionReport
+from ..utils.MetadataUpdateResult import MetadataUpdateResult
+from ..utils.types import AppMetadata, AppMetadataValue, RawMetadataDict, RawMetadataKey, RawMetadataValue
 
 
 # Separators in order of priority
 METADATA_ARTISTS_SEPARATORS = ("//", "\\\\", ";", "\\", "/", ",")
 
+# Stage names of the normalization of each key, built once rather than on every read
+NORMALIZE_STAGES = {app_metadata_key: f'normalize.{app_metadata_key.value}' for app_metadata_key in AppMetadataKey}
+
 
 T = TypeVar('T', str, int)
+R = TypeVar('R')
 
 
 class MetadataManager:
@@ -65,13 +72,23 @@ class MetadataManager:
 
     @abstractmethod
     def _update_not_using_mutagen_metadata(self, app_metadata: AppMetadata):
+        """Writes app_metadata, leaving in raw_mutagen_metadata the metadata written, from which it is read back."""
         raise NotImplementedError()
 
+    def _call_timed(self, stage: str, function: Callable[..., R], *args, **kwargs) -> R:
+        """Calls function, timed under (file extension, manager class, stage) if instrumentation is enabled."""
+        return call_timed(self.audio_file.file_extension, type(self).__name__, stage, function, *args, **kwargs)
+
     def _get_cleaned_raw_metadata_from_file(self) -> RawMetadataDict:
-        self.raw_mutagen_metadata = self._extract_mutagen_metadata()
-        raw_metadata_with_potential_duplicate_keys = \
-            self._convert_raw_mutagen_metadata_to_dict_with_potential_duplicate_keys(self.raw_mutagen_metadata)
-        return self._extract_and_regroup_raw_metadata_unique_entries(raw_metadata_with_potential_duplicate_keys)
+        self.raw_mutagen_metadata = self._call_timed('extract_mutagen_metadata', self._extract_mutagen_metadata)
+        return self._get_cleaned_raw_metadata(self.raw_mutagen_metadata)
+
+    def _get_cleaned_raw_metadata(self, raw_mutagen_metadata: MutagenMetadata) -> RawMetadataDict:
+        raw_metadata_with_potential_duplicate_keys = self._call_timed(
+            'convert_raw_mutagen_metadata', self._convert_raw_mutagen_metadata_to_dict_with_potential_duplicate_keys,
+            raw_mutagen_metadata)
+        return self._call_timed('regroup_raw_metadata', self._extract_and_regroup_raw_metadata_unique_entries,
+                                raw_metadata_with_potential_duplicate_keys)
 
     def _extract_and_regroup_raw_metadata_unique_entries(
             self, raw_metadata_with_potential_duplicate_keys: RawMetadataDict):
@@ -120,13 +137,21 @@ class MetadataManager:
         if app_metadata_key not in self.metadata_keys_direct_map_read:
             raise MetadataNotSupportedError(f'{app_metadata_key} metadata not supported by this format')
 
+        return self._call_timed(NORMALIZE_STAGES[app_metadata_key], self._get_normalized_app_specific_metadata,
+                                self.raw_clean_metadata, app_metadata_key)
+
+    def _get_normalized_app_specific_metadata(
+            self, raw_clean_metadata: RawMetadataDict, app_metadata_key: AppMetadataKey) -> AppMetadataValue:
         raw_metadata_key = self.metadata_keys_direct_map_read[app_metadata_key]
         if not raw_metadata_key:
             return self._get_undirectly_mapped_metadata_value_from_raw_clean_metadata(
-                raw_clean_metadata=self.raw_clean_metadata, app_metadata_key=app_metadata_key)
+                raw_clean_metadata=raw_clean_metadata, app_metadata_key=app_metadata_key)
 
-        value = self.raw_clean_metadata.get(raw_metadata_key)
+        return self._normalize_raw_metadata_value(raw_clean_metadata.get(raw_metadata_key), app_metadata_key)
 
+    def _normalize_raw_metadata_value(self, value: RawMetadataValue,
+                                      app_metadata_key: AppMetadataKey) -> AppMetadataValue:
+        """Converts the raw values of a key to the type of app_metadata_key, splitting separated values."""
         if not value or not len(value) or not value[0]:
             return None
 
@@ -158,38 +183,137 @@ class MetadataManager:
             return values_list_str
         raise ValueError(f'Unsupported metadata type: {app_metadata_key_optional_type}')
 
-    def update_file_metadata(self, app_metadata: AppMetadata):
+    def update_file_metadata(self, app_metadata: AppMetadata) -> MetadataUpdateResult:
+        """
+        Writes the values of app_metadata that differ from the current normalized ones, so that only the frames or
+        fields of these keys are touched. If every value is already set, the file is only read: nothing is saved.
+
+        The normalized metadata returned with the result is rebuilt from the in-memory metadata that was written, so
+        the file is not parsed again, and later reads through this manager see the new values.
+        """
         if not self.metadata_keys_direct_map_write:
             raise MetadataNotSupportedError('This format does not support metadata modification')
 
+        modified_app_metadata = self._get_modified_app_metadata(app_metadata)
+        if not modified_app_metadata:
+            return MetadataUpdateResult(app_metadata=self.get_app_metadata())
+
+        app_metadata_to_write = self._get_app_metadata_to_write(modified_app_metadata)
         if not self.update_using_mutagen_metadata:
-            self._update_not_using_mutagen_metadata(app_metadata)
+            self._call_timed('update_not_using_mutagen_metadata', self._update_not_using_mutagen_metadata,
+                             app_metadata_to_write)
         else:
             if self.raw_mutagen_metadata is None:
-                self.raw_mutagen_metadata = self._extract_mutagen_metadata()
+                self.raw_mutagen_metadata = self._call_timed('extract_mutagen_metadata',
+                                                             self._extract_mutagen_metadata)
+
+            self._update_raw_mutagen_metadata(self.raw_mutagen_metadata, app_metadata_to_write)
+            with self.audio_file.get_file_object(writable=True) as f:
+                self._call_timed('save', self.raw_mutagen_metadata.save, f)
+        # raw_mutagen_metadata holds what was written, updated in place or set by _update_not_using_mutagen_metadata
+        self.raw_clean_metadata = None if self.raw_mutagen_metadata is None else \
+            self._get_cleaned_raw_metadata(self.raw_mutagen_metadata)
+        return MetadataUpdateResult(modified_keys=list(modified_app_metadata), app_metadata=self.get_app_metadata())
+
+    def _get_modified_app_metadata(self, app_metadata: AppMetadata) -> AppMetadata:
+        """
+        Returns the entries of app_metadata whose value differs from the current one, both being compared in their
+        normalized form (see _get_comparable_app_metadata_value). Keys that cannot be read are kept.
 
-            for app_metadata_key in list(app_metadata.keys()):
-                app_metadata_value = app_metadata[app_metadata_key]
-                if app_metadata_key not in self.metadata_keys_direct_map_write:
-                    raise MetadataNotSupportedError(f'{app_metadata_key} metadata not supported by this format')
+        Raises:
+            MetadataNotSupportedError: If a key cannot be written, whether its value differs or not
+        """
+        modified_app_metadata: AppMetadata = {}
+        for app_metadata_key, app_metadata_value in app_metadata.items():
+            if not self.metadata_keys_direct_map_write or app_metadata_key not in self.metadata_keys_direct_map_write:
+                raise MetadataNotSupportedError(f'{app_metadata_key} metadata not supported by this format')
+            comparable_value = self._get_comparable_app_metadata_value(app_metadata_key, app_metadata_value)
+            try:
+                current_value = self.get_app_specific_metadata(app_metadata_key)
+            except MetadataNotSupportedError:
+                pass
+            else:
+                if comparable_value == self._get_comparable_app_metadata_value(app_metadata_key, current_value):
+                    continue
+            modified_app_metadata[app_metadata_key] = app_metadata_value
+        return modified_app_metadata
+
+    def _get_comparable_app_metadata_value(self, app_metadata_key: AppMetadataKey,
+                                           app_metadata_value: AppMetadataValue) -> AppMetadataValue:
+        """
+        Returns app_metadata_value as it would be read back: empty values as None, single values of list keys as
+        lists, and numeric values as numbers.
+        """
+        if app_metadata_value is None or app_metadata_value == '' or app_metadata_value == []:
+            return None
+
+        app_metadata_key_optional_type = app_metadata_key.get_optional_type()
+        if app_metadata_key_optional_type == list[str] and not isinstance(app_metadata_value, list):
+            return [str(app_metadata_value)]
+        try:
+            if app_metadata_key_optional_type == int:
+                return int(float(app_metadata_value))  # type: ignore
+            if app_metadata_key_optional_type == float:
+                return float(app_metadata_value)  # type: ignore
+        except (TypeError, ValueError):
+            pass
+        return app_metadata_value
+
+    def _get_app_metadata_to_write(self, app_metadata: AppMetadata) -> AppMetadata:
+        """Converts the modified entries to the values to write, e.g. normalized ratings to file ratings."""
+        return app_metadata
+
+    def _update_raw_mutagen_metadata(self, raw_mutagen_metadata: MutagenMetadata, app_metadata: AppMetadata):
+        """Sets the values of app_metadata in raw_mutagen_metadata, or anything with the same mapping interface."""
+        if not self.metadata_keys_direct_map_write:
+            raise MetadataNotSupportedError('This format does not support metadata modification')
+
+        for app_metadata_key in list(app_metadata.keys()):
+            app_metadata_value = app_metadata[app_metadata_key]
+            if app_metadata_key not in self.metadata_keys_direct_map_write:
+                raise MetadataNotSupportedError(f'{app_metadata_key} metadata not supported by this format')
+            else:
+                raw_metadata_key = self.metadata_keys_direct_map_write[app_metadata_key]
+                if raw_metadata_key:
+                    self._update_formatted_value_in_raw_mutagen_metadata(
+                        raw_mutagen_metadata=raw_mutagen_metadata, raw_metadata_key=raw_metadata_key,
+                        app_metadata_value=app_metadata_value)
                 else:
-                    raw_metadata_key = self.metadata_keys_direct_map_write[app_metadata_key]
-                    if raw_metadata_key:
-                        self._update_formatted_value_in_raw_mutagen_metadata(
-                            raw_mutagen_metadata=self.raw_mutagen_metadata, raw_metadata_key=raw_metadata_key,
-                            app_metadata_value=app_metadata_value)
-                    else:
-                        self._update_undirectly_mapped_metadata(
-                            raw_mutagen_metadata=self.raw_mutagen_metadata, app_metadata_value=app_metadata_value,
-                            app_metadata_key=app_metadata_key)
-            self.raw_mutagen_metadata.save(self.audio_file.get_file_path_or_object())
+                    self._update_undirectly_mapped_metadata(
+                        raw_mutagen_metadata=raw_mutagen_metadata, app_metadata_value=app_metadata_value,
+                        app_metadata_key=app_metadata_key)
 
     def delete_metadata(self) -> bool:
+        return self.delete_metadata_with_report().success
+
+    def delete_metadata_with_report(self, in_place: bool = False, dry_run: bool = False) -> MetadataDeletionReport:
+        """
+        Deletes the metadata of this format from the file, reporting the bytes reclaimed.
+
+        Args:
+            in_place: Blank the metadata where it is instead of removing it, for formats supporting it, so that no
+                byte of the file is moved. Formats that do not support it ignore it.
+            dry_run: Report what the deletion would do without modifying the file, reading only the headers and tag
+                regions: the deletion is run on a copy of the tag regions (see AudioFile.get_tag_regions_copy)
+
+        Raises:
+            MetadataNotSupportedError: If dry_run is set for a format whose tags may be interleaved with the audio
+        """
+        if dry_run:
+            tag_regions_copy = self.audio_file.get_tag_regions_copy()
+            if tag_regions_copy is None:
+                raise MetadataNotSupportedError(
+                    f"The deletion of metadata from {self.audio_file.file_extension} files cannot be probed")
+            return type(self)(tag_regions_copy).delete_metadata_with_report(in_place=in_place)
+
         if self.raw_mutagen_metadata is None:
             self.raw_mutagen_metadata = self._extract_mutagen_metadata()
 
+        file_size = self.audio_file.get_file_size()
         try:
-            self.raw_mutagen_metadata.delete()
-            return True
+            with self.audio_file.get_file_object(writable=True) as f:
+                self.raw_mutagen_metadata.delete(f)
         except Exception:
-            return False
+            return MetadataDeletionReport(success=False)
+        bytes_reclaimed = file_size - self.audio_file.get_file_size()
+        return MetadataDeletionReport(success=True, bytes_reclaimed=bytes_reclaimed, in_place=bytes_reclaimed == 0)
@@ -5,6 +5,8 @@ from mutagen._file import FileType as MutagenMetadata
 from ....AudioFile import AudioFile
 from ...exceptions import FileCorruptedError, MetadataNotSupportedError
 from ...utils.AppMetadataKey import AppMetadataKey
+from ...utils.MetadataDeletionReport import MetadataDeletionReport
+from ...utils.tag_regions import get_id3v1_tag_size
 from ...utils.types import AppMetadataValue, RawMetadataDict
 from ..MetadataManager import MetadataManager
 from .Id3v1RawMetadata import Id3v1RawMetadata
@@ -28,9 +30,9 @@ class Id3v1Manager(MetadataManager):
         - Multiple genres
         - Multiple artists
         ...
-    - Read-only (modification not safe). ID3v1 tags have a fixed size of 128 bytes. Each field within the tag has a 
-    specific length (e.g., 30 bytes for title, artist, and album). This fixed size can make it challenging to modify the 
-    tags without potentially corrupting the file or losing data.
+    - Read-only, except for deletion (modification not safe). ID3v1 tags have a fixed size of 128 bytes. Each field
+    within the tag has a specific length (e.g., 30 bytes for title, artist, and album). This fixed size can make it
+    challenging to modify the tags without potentially corrupting the file or losing data.
 
     Format Structure:
     - Bytes 0-2: "TAG" identifier
@@ -61,10 +63,27 @@ class Id3v1Manager(MetadataManager):
 
     def _extract_mutagen_metadata(self) -> Id3v1RawMetadata:
         try:
-            return Id3v1RawMetadata(fileobj=self.audio_file.file)
+            with self.audio_file.get_file_object() as f:
+                return Id3v1RawMetadata(fileobj=f)
         except Exception as exc:
             raise FileCorruptedError(f"Failed to extract ID3v1 metadata: {exc}")
 
+    def delete_metadata_with_report(self, in_place: bool = False, dry_run: bool = False) -> MetadataDeletionReport:
+        """
+        Deletes the ID3v1 tag by truncating the file before it, no other byte being moved. Unlike modifications, this
+        cannot corrupt the file. in_place is ignored, as the deletion is already done in place. With dry_run, only the
+        tag identifier is read.
+        """
+        try:
+            file_size = self.audio_file.get_file_size()
+            with self.audio_file.get_file_object() as f:
+                id3v1_tag_size = get_id3v1_tag_size(f, file_size)
+            if id3v1_tag_size and not dry_run:
+                self.audio_file.remove_range(file_size - id3v1_tag_size, id3v1_tag_size)
+        except Exception:
+            return MetadataDeletionReport(success=False)
+        return MetadataDeletionReport(success=True, bytes_reclaimed=id3v1_tag_size, in_place=True)
+
     def _convert_raw_mutagen_metadata_to_dict_with_potential_duplicate_keys(
             self, raw_mutagen_metadata: MutagenMetadata) -> RawMetadataDict:
         raw_metadata_id3v1: Id3v1RawMetadata = cast(Id3v1RawMetadata, raw_mutagen_metadata)
@@ -7,6 +7,7 @@ from typing import Any
 from mutagen._file import FileType
 
 from ...exceptions import MetadataNotSupportedError
+from ...utils.tag_regions import ID3V1_TAG_SIZE
 from .Id3v1RawMetadataKey import Id3v1RawMetadataKey
 
 
@@ -37,11 +38,11 @@ class Id3v1RawMetadata(FileType):
         # Handle both file objects and file paths
         if isinstance(self.fileobj, str):
             with open(self.fileobj, 'rb') as f:
-                f.seek(-128, 2)  # Seek from end
-                data = f.read(128)
+                f.seek(-ID3V1_TAG_SIZE, 2)  # Seek from end
+                data = f.read(ID3V1_TAG_SIZE)
         else:
-            self.fileobj.seek(-128, 2)  # Seek from end
-            data = self.fileobj.read(128)
+            self.fileobj.seek(-ID3V1_TAG_SIZE, 2)  # Seek from end
+            data = self.fileobj.read(ID3V1_TAG_SIZE)
 
         if not data.startswith(b'TAG'):
             self.tags = None
@@ -9,7 +9,10 @@ from mutagen.id3._util import ID3NoHeaderError
 
 from ...audio_file import AudioFile
 from ...utils.AppMetadataKey import AppMetadataKey
+from ...utils.MetadataDeletionReport import MetadataDeletionReport
 from ...utils.rating_profiles import RatingWriteProfile
+from ...utils.tag_regions import (ID3V1_TAG_SIZE, ID3V2_HEADER_SIZE, encode_synchsafe_int, get_id3v1_tag_size,
+                                  get_leading_id3v2_tags_size)
 from ...utils.types import AppMetadataValue, RawMetadataDict, RawMetadataKey
 from .RatingSupportingMetadataManager import RatingSupportingMetadataManager
 
@@ -217,17 +220,22 @@ class Id3v2Manager(RatingSupportingMetadataManager):
                          normalized_rating_max_value=normalized_rating_max_value)
 
     def _extract_mutagen_metadata(self) -> MutagenMetadata:
-        try:
-            return ID3(self.audio_file.get_file_path_or_object(), load_v1=False)  # type: ignore[return-value]
-        except ID3NoHeaderError:
+        with self.audio_file.get_file_object() as f:
             try:
-                id3 = ID3(self.audio_file.get_file_path_or_object(), load_v1=True)
-                id3.clear()  # Exclude ID3v1 tags
-                return id3  # type: ignore[return-value]
+                return ID3(f, load_v1=False)  # type: ignore[return-value]
             except ID3NoHeaderError:
-                id3 = ID3()
-                id3.save(self.audio_file.get_file_path_or_object(), v2_version=3)
-                return id3  # type: ignore[return-value]
+                try:
+                    f.seek(0)
+                    id3 = ID3(f, load_v1=True)
+                    id3.clear()  # Exclude ID3v1 tags
+                    return id3  # type: ignore[return-value]
+                except ID3NoHeaderError:
+                    pass
+        id3 = ID3()
+        if not self.audio_file.is_read_only():
+            with self.audio_file.get_file_object(writable=True) as f:
+                id3.save(f, v2_version=3)
+        return id3  # type: ignore[return-value]
 
     def _convert_raw_mutagen_metadata_to_dict_with_potential_duplicate_keys(
             self, raw_mutagen_metadata: MutagenMetadata) -> RawMetadataDict:
@@ -281,23 +289,43 @@ class Id3v2Manager(RatingSupportingMetadataManager):
         else:
             raw_mutagen_metadata_id3.add(text_frame_class(encoding=3, text=app_metadata_value))
 
-    def delete_metadata(self) -> bool:
+    def delete_metadata_with_report(self, in_place: bool = False, dry_run: bool = False) -> MetadataDeletionReport:
         """Delete all ID3v2 metadata from the audio file.
 
-        This removes all ID3v2 frames from the file while preserving the audio data.
-        Uses ID3.delete() which is more reliable than deleting individual frames,
-        especially for non-MP3 files like FLAC that might have ID3v2 tags.
+        This removes the ID3v2 tags at the start of the file while preserving the audio data, shifting the audio
+        backward, as well as a trailing ID3v1 tag, by truncating the file. The tags are located from their headers,
+        without parsing their frames, so this also works for non-MP3 files like FLAC that might have ID3v2 tags.
+
+        Args:
+            in_place: Replace the ID3v2 tags with an empty tag of the same size (padding only) instead of removing
+                them, so that the audio is not moved
+            dry_run: Report what the deletion would do without modifying the file, only reading the tag headers
 
         Returns:
-            bool: True if metadata was successfully deleted, False otherwise
+            MetadataDeletionReport: Successful if the tags were deleted or there were none
         """
         try:
-            # Create a new ID3 instance and use delete() to remove all ID3v2 tags
-            id3 = ID3(self.audio_file.file_path)
-            id3.delete()
-            return True
-        except ID3NoHeaderError:
-            # No ID3 tags present, consider this a success
-            return True
+            with self.audio_file.get_file_object() as f:
+                id3v2_tags_size = get_leading_id3v2_tags_size(f)
+                file_size = self.audio_file.get_file_size()
+                id3v1_tag_size = 0
+                if file_size - ID3V1_TAG_SIZE >= id3v2_tags_size:
+                    id3v1_tag_size = get_id3v1_tag_size(f, file_size)
+
+            if dry_run:
+                return MetadataDeletionReport(
+                    success=True, bytes_reclaimed=id3v1_tag_size + (0 if in_place else id3v2_tags_size),
+                    in_place=in_place or not id3v2_tags_size)
+            if id3v1_tag_size:
+                self.audio_file.remove_range(file_size - id3v1_tag_size, id3v1_tag_size)
+            if id3v2_tags_size and in_place:
+                with self.audio_file.get_file_object(writable=True) as f:
+                    f.write(b'ID3\x03\x00\x00' + encode_synchsafe_int(id3v2_tags_size - ID3V2_HEADER_SIZE))
+                    f.write(bytes(id3v2_tags_size - ID3V2_HEADER_SIZE))
+                return MetadataDeletionReport(success=True, bytes_reclaimed=id3v1_tag_size, in_place=True)
+            if id3v2_tags_size:
+                self.audio_file.remove_range(0, id3v2_tags_size)
+            return MetadataDeletionReport(success=True, bytes_reclaimed=id3v2_tags_size + id3v1_tag_size,
+                                          in_place=not id3v2_tags_size)
         except Exception:
-            return False
+            return MetadataDeletionReport(success=False)
@@ -0,0 +1,363 @@
+import io
+from typing import cast
+
+from django.core.exceptions import ImproperlyConfigured
+from mutagen._file import FileType as MutagenMetadata
+
+from ...audio_file import AudioFile
+from ...exceptions import FileCorruptedError, MetadataNotSupportedError
+from ...utils.id3v1_genre_code_map import ID3V1_GENRE_CODE_MAP
+from ...utils.MetadataDeletionReport import MetadataDeletionReport
+from ...utils.Mp4Atom import Mp4Atom
+from ...utils.mp4_atoms import (MP4_ATOM_HEADER_SIZE, MP4_FREE_ATOM_TYPES, MP4_FULL_BOX_HEADER_SIZE, MP4_ILST_PATH,
+                                find_mp4_atom_path, iter_mp4_atoms, render_mp4_atom, render_mp4_free_atom,
+                                set_mp4_atom_size, shift_mp4_chunk_offsets)
+from ...utils.rating_profiles import RatingWriteProfile
+from ...utils.types import AppMetadata, AppMetadataValue, RawMetadataDict, RawMetadataKey
+from ..MetadataManager import AppMetadataKey
+from .RatingSupportingMetadataManager import RatingSupportingMetadataManager
+
+
+# Items of the ilst atom by key, each item being a whole atom. Keys are the atom types, decoded as Latin-1 (e.g.
+# '©nam'), or '----:<mean>:<name>' for freeform atoms
+Mp4Items = dict[str, list[bytes]]
+
+# Type indicators of the data atoms of the items
+MP4_DATA_TYPE_IMPLICIT = 0
+MP4_DATA_TYPE_UTF8 = 1
+MP4_DATA_TYPE_UTF16 = 2
+MP4_DATA_TYPE_SIGNED_INT = 21
+MP4_DATA_TYPE_UNSIGNED_INT = 22
+
+# Free atom added after the ilst atom when it grows, so that the next updates fit in place
+MP4_FREE_PADDING_SIZE = 1024
+
+# Handler of the meta atom created for files without metadata, as written by iTunes
+MP4_METADATA_HANDLER_ATOM = render_mp4_atom(b'hdlr', bytes(8) + b'mdirappl' + bytes(9))
+
+
+class Mp4Manager(RatingSupportingMetadataManager):
+    """
+    Manages the iTunes-style metadata of MP4 audio files (M4A, AAC or ALAC in MP4).
+
+    MP4 Format:
+    The metadata items are the children of the moov/udta/meta/ilst atom. Each item is an atom named after its field
+    (e.g. '©nam' for the title) holding one or more 'data' atoms, made of a type indicator (UTF-8 text, big-endian
+    integer, binary), a locale and the value. Fields without a standard atom are stored in freeform '----' atoms,
+    identified by a mean (a reverse DNS domain, 'com.apple.iTunes') and a name, as done for the rating and language.
+
+    Genre Support:
+    - '©gen': Custom genre name as free text, which is written
+    - 'gnre': ID3v1 genre code plus one, found in files written by older software, only read
+
+    Implementation Note:
+    The atoms are located from their headers only (see utils/mp4_atoms), seeking over the audio (mdat atoms), so only
+    the ilst atom is read, whether moov is at the start or at the end of the file. Items are kept as the atoms they
+    were read as, so the fields that are not updated (e.g. cover art) are written back unchanged.
+
+    The new ilst atom is written in place when it fits in the space of the old one and of the free atoms following it
+    (a free atom filling the rest). Otherwise the moov atom is rebuilt, with a free atom of MP4_FREE_PADDING_SIZE
+    after the ilst atom for the next updates: it is rewritten in place when it is at the end of the file or when the
+    free atoms following it can absorb its growth, so that the audio does not move and the chunk offsets stay valid.
+    Only otherwise is the file rewritten, the chunk offsets of the stco/co64 atoms being shifted accordingly.
+    """
+
+    class Mp4Key(RawMetadataKey):
+        TITLE = '©nam'
+        ARTIST_NAME = '©ART'
+        ALBUM_NAME = '©alb'
+        ALBUM_ARTISTS_NAMES = 'aART'
+        GENRE_NAME = '©gen'
+        GENRE_CODE = 'gnre'  # ID3v1 genre code plus one
+        DATE = '©day'
+        TRACK_NUMBER = 'trkn'
+        DISC_NUMBER = 'disk'
+        BPM = 'tmpo'
+        COMMENT = '©cmt'
+        COMPOSER = '©wrt'
+        COPYRIGHT = 'cprt'
+        LYRICS = '©lyr'
+        ENCODED_BY = '©too'
+        COVER_ART = 'covr'
+        RATING = '----:com.apple.iTunes:RATING'
+        LANGUAGE = '----:com.apple.iTunes:LANGUAGE'
+
+    def __init__(self, audio_file: AudioFile, normalized_rating_max_value: int | None = None):
+        metadata_keys_direct_map_read: dict[AppMetadataKey, RawMetadataKey | None] = {
+            AppMetadataKey.TITLE: self.Mp4Key.TITLE,
+            AppMetadataKey.ARTISTS_NAMES: self.Mp4Key.ARTIST_NAME,
+            AppMetadataKey.ALBUM_NAME: self.Mp4Key.ALBUM_NAME,
+            AppMetadataKey.ALBUM_ARTISTS_NAMES: self.Mp4Key.ALBUM_ARTISTS_NAMES,
+            AppMetadataKey.GENRE_NAME: None,
+            AppMetadataKey.RATING: None,
+            AppMetadataKey.LANGUAGE: self.Mp4Key.LANGUAGE,
+        }
+        metadata_keys_direct_map_write: dict[AppMetadataKey, RawMetadataKey | None] = {
+            AppMetadataKey.TITLE: self.Mp4Key.TITLE,
+            AppMetadataKey.ARTISTS_NAMES: self.Mp4Key.ARTIST_NAME,
+            AppMetadataKey.ALBUM_NAME: self.Mp4Key.ALBUM_NAME,
+            AppMetadataKey.ALBUM_ARTISTS_NAMES: self.Mp4Key.ALBUM_ARTISTS_NAMES,
+            AppMetadataKey.GENRE_NAME: None,
+            AppMetadataKey.RATING: None,
+            AppMetadataKey.LANGUAGE: self.Mp4Key.LANGUAGE,
+        }
+        super().__init__(audio_file=audio_file,
+                         metadata_keys_direct_map_read=metadata_keys_direct_map_read,
+                         metadata_keys_direct_map_write=metadata_keys_direct_map_write,
+                         rating_write_profile=RatingWriteProfile.BASE_100_PROPORTIONAL,
+                         normalized_rating_max_value=normalized_rating_max_value,
+                         update_using_mutagen_metadata=False)
+
+    def _find_ilst_path(self) -> list[Mp4Atom]:
+        """Returns the moov, udta, meta and ilst atoms, as far as they exist."""
+        with self.audio_file.get_file_object() as f:
+            try:
+                atoms = find_mp4_atom_path(f, self.audio_file.get_file_size(), MP4_ILST_PATH)
+            except ValueError as error:
+                raise FileCorruptedError(f"Invalid MP4 file: {error}")
+        if not atoms:
+            raise FileCorruptedError("No moov atom found in the MP4 file")
+        return atoms
+
+    def _extract_mutagen_metadata(self) -> MutagenMetadata:
+        atoms = self._find_ilst_path()
+        if len(atoms) < len(MP4_ILST_PATH):
+            return cast(MutagenMetadata, {})
+
+        ilst = atoms[-1]
+        ilst_data = self.audio_file.read_at(ilst.offset, ilst.size)
+        items: Mp4Items = {}
+        try:
+            for item in iter_mp4_atoms(io.BytesIO(ilst_data), ilst.header_size, len(ilst_data)):
+                item_data = ilst_data[item.offset:item.end]
+                items.setdefault(self._get_item_key(item_data, item), []).append(item_data)
+        except ValueError as error:
+            raise FileCorruptedError(f"Invalid ilst atom: {error}")
+        return cast(MutagenMetadata, items)
+
+    def _get_item_key(self, item_data: bytes, item: Mp4Atom) -> str:
+        if item.type != b'----':
+            return item.type.decode('latin-1')
+        names = {child.type: item_data[child.data_offset + MP4_FULL_BOX_HEADER_SIZE:child.end].decode('utf-8')
+                 for child in iter_mp4_atoms(io.BytesIO(item_data), item.header_size, item.size)
+                 if child.type in (b'mean', b'name')}
+        return f"----:{names.get(b'mean', '')}:{names.get(b'name', '')}"
+
+    def _convert_raw_mutagen_metadata_to_dict_with_potential_duplicate_keys(
+            self, raw_mutagen_metadata: MutagenMetadata) -> RawMetadataDict:
+        items = cast(Mp4Items, raw_mutagen_metadata)
+        raw_metadata_dict: dict = {}
+        for key, key_items in items.items():
+            values = [value for item_data in key_items for value in self._get_item_values(key, item_data)]
+            if values:
+                raw_metadata_dict[key] = values
+        return raw_metadata_dict
+
+    def _get_item_values(self, key: str, item_data: bytes) -> list[str | int]:
+        """Returns the text and integer values of the data atoms of the item, binary values being skipped."""
+        values: list[str | int] = []
+        for child in iter_mp4_atoms(io.BytesIO(item_data), MP4_ATOM_HEADER_SIZE, len(item_data)):
+            if child.type != b'data':
+                continue
+            data_type = int.from_bytes(item_data[child.data_offset + 1:child.data_offset + 4], 'big')
+            # The type indicator is followed by a 4-byte locale
+            value = item_data[child.data_offset + 8:child.end]
+            if data_type == MP4_DATA_TYPE_UTF8:
+                values.append(value.decode('utf-8', 'replace'))
+            elif data_type == MP4_DATA_TYPE_UTF16:
+                values.append(value.decode('utf-16-be', 'replace'))
+            elif data_type in (MP4_DATA_TYPE_SIGNED_INT, MP4_DATA_TYPE_UNSIGNED_INT) and value:
+                values.append(int.from_bytes(value, 'big', signed=data_type == MP4_DATA_TYPE_SIGNED_INT))
+            elif data_type == MP4_DATA_TYPE_IMPLICIT and key in (self.Mp4Key.TRACK_NUMBER, self.Mp4Key.DISC_NUMBER):
+                if len(value) >= 4:
+                    values.append(int.from_bytes(value[2:4], 'big'))
+            elif data_type == MP4_DATA_TYPE_IMPLICIT and key == self.Mp4Key.GENRE_CODE and len(value) >= 2:
+                values.append(int.from_bytes(value[:2], 'big') - 1)
+        return values
+
+    def _create_item(self, key: str, value: AppMetadataValue) -> bytes:
+        """Returns the item atom holding the value, or values for lists, as UTF-8 text."""
+        values = value if isinstance(value, list) else [value]
+        data = b''.join(render_mp4_atom(b'data', MP4_DATA_TYPE_UTF8.to_bytes(4, 'big') + bytes(4)
+                                        + str(item_value).encode('utf-8'))
+                        for item_value in values)
+        if not key.startswith('----:'):
+            return render_mp4_atom(key.encode('latin-1'), data)
+        _, mean, name = key.split(':', 2)
+        return render_mp4_atom(b'----', render_mp4_atom(b'mean', bytes(4) + mean.encode('utf-8'))
+                               + render_mp4_atom(b'name', bytes(4) + name.encode('utf-8')) + data)
+
+    def _get_raw_rating_by_traktor_or_not(self, raw_clean_metadata: RawMetadataDict) -> tuple[int | None, bool]:
+        rating_list = raw_clean_metadata.get(self.Mp4Key.RATING)
+        if rating_list and rating_list[0] is not None:
+            try:
+                return int(float(rating_list[0])), False
+            except ValueError:
+                return None, False
+        return None, False
+
+    def _get_undirectly_mapped_metadata_value_other_than_rating_from_raw_clean_metadata(
+            self, raw_clean_metadata: RawMetadataDict, app_metadata_key: AppMetadataKey) -> AppMetadataValue:
+        if app_metadata_key == AppMetadataKey.GENRE_NAME:
+            genre_names = raw_clean_metadata.get(self.Mp4Key.GENRE_NAME)
+            if genre_names and genre_names[0]:
+                return str(genre_names[0])
+            genre_codes = raw_clean_metadata.get(self.Mp4Key.GENRE_CODE)
+            if genre_codes:
+                return ID3V1_GENRE_CODE_MAP.get(cast(int, genre_codes[0]))
+            return None
+        raise MetadataNotSupportedError(f'Metadata key not handled: {app_metadata_key}')
+
+    def _update_formatted_value_in_raw_mutagen_metadata(self, raw_mutagen_metadata: MutagenMetadata,
+                                                        raw_metadata_key: RawMetadataKey,
+                                                        app_metadata_value: AppMetadataValue):
+        items = cast(Mp4Items, raw_mutagen_metadata)
+        if app_metadata_value or app_metadata_value == 0:
+            items[raw_metadata_key.value] = [self._create_item(raw_metadata_key.value, app_metadata_value)]
+        else:
+            items.pop(raw_metadata_key.value, None)
+
+    def _update_undirectly_mapped_metadata(self, raw_mutagen_metadata: MutagenMetadata,
+                                           app_metadata_value: AppMetadataValue,
+                                           app_metadata_key: AppMetadataKey):
+        if app_metadata_key == AppMetadataKey.RATING:
+            self._update_formatted_value_in_raw_mutagen_metadata(
+                raw_mutagen_metadata=raw_mutagen_metadata, raw_metadata_key=self.Mp4Key.RATING,
+                app_metadata_value=app_metadata_value)
+        elif app_metadata_key == AppMetadataKey.GENRE_NAME:
+            # The genre is written as text, replacing any genre code
+            cast(Mp4Items, raw_mutagen_metadata).pop(self.Mp4Key.GENRE_CODE.value, None)
+            self._update_formatted_value_in_raw_mutagen_metadata(
+                raw_mutagen_metadata=raw_mutagen_metadata, raw_metadata_key=self.Mp4Key.GENRE_NAME,
+                app_metadata_value=app_metadata_value)
+        else:
+            raise ImproperlyConfigured('Metadata key not handled')
+
+    def _update_not_using_mutagen_metadata(self, app_metadata: AppMetadata):
+        if self.raw_mutagen_metadata is None:
+            self.raw_mutagen_metadata = self._call_timed('extract_mutagen_metadata', self._extract_mutagen_metadata)
+        items = cast(Mp4Items, self.raw_mutagen_metadata)
+        self._update_raw_mutagen_metadata(self.raw_mutagen_metadata, app_metadata)
+        self._write_ilst(b''.join(item_data for key_items in items.values() for item_data in key_items))
+
+    def delete_metadata_with_report(self, in_place: bool = False, dry_run: bool = False) -> MetadataDeletionReport:
+        """
+        Deletes the ilst atom, or empties it, a free atom taking its space, if in_place. Only the atom headers and the
+        moov atom are read, so a dry run does not read the audio.
+        """
+        try:
+            bytes_reclaimed = self._write_ilst(b'' if in_place else None, padded=in_place, dry_run=dry_run)
+        except (FileCorruptedError, MetadataNotSupportedError):
+            return MetadataDeletionReport(success=False)
+        if not dry_run:
+            self.raw_mutagen_metadata = cast(MutagenMetadata, {})
+        return MetadataDeletionReport(success=True, bytes_reclaimed=bytes_reclaimed, in_place=bytes_reclaimed == 0)
+
+    def _write_ilst(self, items_data: bytes | None, padded: bool = True, dry_run: bool = False) -> int:
+        """
+        Writes the ilst atom holding items_data, or removes it if items_data is None, returning the number of bytes
+        the file shrank by. If padded, free atoms are used and added so that the file size changes as little as
+        possible (see the class documentation).
+
+        Raises:
+            FileCorruptedError: If the atoms are invalid
+            MetadataNotSupportedError: If the moov atom cannot be rebuilt
+        """
+        atoms = self._find_ilst_path()
+        new_ilst = b'' if items_data is None else render_mp4_atom(b'ilst', items_data)
+        padding = render_mp4_free_atom(MP4_FREE_PADDING_SIZE) if padded else b''
+
+        if len(atoms) == len(MP4_ILST_PATH):
+            meta, ilst = atoms[2], atoms[3]
+            # The free atoms directly following the ilst atom are free space for it
+            region_end = ilst.end
+            with self.audio_file.get_file_object() as f:
+                try:
+                    for atom in iter_mp4_atoms(f, ilst.end, meta.end):
+                        if atom.type not in MP4_FREE_ATOM_TYPES:
+                            break
+                        region_end = atom.end
+                except ValueError as error:
+                    raise FileCorruptedError(f"Invalid meta atom: {error}")
+            region_start = ilst.offset
+            free_size = region_end - region_start - len(new_ilst)
+            if padded and (free_size == 0 or free_size >= MP4_ATOM_HEADER_SIZE):
+                if not dry_run:
+                    with self.audio_file.get_file_object(writable=True) as f:
+                        f.seek(region_start)
+                        f.write(new_ilst + (render_mp4_free_atom(free_size) if free_size else b''))
+                return 0
+            new_data = new_ilst + padding
+        else:
+            if items_data is None:
+                return 0
+            # The missing udta, meta and ilst atoms are created at the end of the deepest existing one
+            region_start = region_end = atoms[-1].end
+            new_data = new_ilst + padding
+            for atom_type in reversed(MP4_ILST_PATH[len(atoms):-1]):
+                if atom_type == b'meta':
+                    new_data = render_mp4_atom(b'meta', bytes(MP4_FULL_BOX_HEADER_SIZE) + MP4_METADATA_HANDLER_ATOM
+                                               + new_data)
+                else:
+                    new_data = render_mp4_atom(atom_type, new_data)
+
+        containers = [atom for atom in atoms if atom.type != b'ilst']
+        return self._write_moov(containers, region_start, region_end, new_data, padded, dry_run)
+
+    def _write_moov(self, containers: list[Mp4Atom], region_start: int, region_end: int, new_data: bytes,
+                    uses_free_space: bool, dry_run: bool) -> int:
+        """
+        Rebuilds the moov atom with new_data replacing its bytes from region_start to region_end, updating the sizes of
+        containers, the atoms holding the region. Returns the number of bytes the file shrank by.
+        """
+        moov = containers[0]
+        file_size = self.audio_file.get_file_size()
+        shift = len(new_data) - (region_end - region_start)
+
+        # The free atoms directly following the moov atom can absorb its growth, the audio then not moving
+        free_end = moov.end
+        if uses_free_space:
+            with self.audio_file.get_file_object() as f:
+                try:
+                    for atom in iter_mp4_atoms(f, moov.end, file_size):
+                        if atom.type not in MP4_FREE_ATOM_TYPES:
+                            break
+                        free_end = atom.end
+                except ValueError:
+                    pass
+        free_size = free_end - moov.end - shift
+        in_place = moov.end == file_size or (free_end > moov.end and (free_size == 0
+                                                                      or free_size >= MP4_ATOM_HEADER_SIZE))
+        if dry_run:
+            return 0 if in_place and moov.end < file_size else -shift
+
+        new_moov = bytearray(self.audio_file.read_at(moov.offset, moov.size))
+        new_moov[region_start - moov.offset:region_end - moov.offset] = new_data
+        try:
+            for container in containers:
+                set_mp4_atom_size(new_moov, container, moov.offset, container.size + shift)
+            if not in_place:
+                # The chunks after the moov atom move with the end of the file
+                shift_mp4_chunk_offsets(new_moov, shift, moov.end)
+        except ValueError as error:
+            raise MetadataNotSupportedError(f"The moov atom cannot be rebuilt: {error}")
+
+        if moov.end == file_size:
+            with self.audio_file.get_file_object(writable=True) as f:
+                f.seek(moov.offset)
+                f.write(new_moov)
+                f.truncate()
+            return -shift
+        if in_place:
+            with self.audio_file.get_file_object(writable=True) as f:
+                f.seek(moov.offset)
+                f.write(new_moov + (render_mp4_free_atom(free_size) if free_size else b''))
+            return 0
+
+        def write_file_with_moov(new_file):
+            self.audio_file.copy_range_to(new_file, 0, moov.offset)
+            new_file.write(new_moov)
+            self.audio_file.copy_range_to(new_file, moov.end, file_size - moov.end)
+
+        self.audio_file.replace_content(write_file_with_moov)
+        return -shift
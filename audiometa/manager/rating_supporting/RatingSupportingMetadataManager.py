@@ -73,21 +73,35 @@ class RatingSupportingMetadataManager(MetadataManager):
         star_rating_base_10 = (int)((normalized_rating * 10)/self.normalized_rating_max_value)
         return self.rating_write_profile[star_rating_base_10]
 
-    def update_file_metadata(self, app_metadata: AppMetadata):
-        if AppMetadataKey.RATING in list(app_metadata.keys()):
-            value: int | None = app_metadata[AppMetadataKey.RATING]  # type: ignore
-            if value is None:
-                del app_metadata[AppMetadataKey.RATING]
-            else:
-                if self.normalized_rating_max_value is None:
-                    raise ImproperlyConfigured(
-                        "If updating the rating, the max value of the normalized rating must be set.")
-
-                try:
-                    normalized_rating = int(float(value))
-                    file_rating = self._convert_normalized_rating_to_file_rating(normalized_rating=normalized_rating)
-                    app_metadata[AppMetadataKey.RATING] = file_rating
-                except (TypeError, ValueError):
-                    raise ValueError(f"Invalid rating value: {value}. Expected a numeric value.")
-
-        super().update_file_metadata(app_metadata)
+    def _get_modified_app_metadata(self, app_metadata: AppMetadata) -> AppMetadata:
+        # A None rating leaves the rating of the file as it is
+        if app_metadata.get(AppMetadataKey.RATING, 0) is None:
+            app_metadata = {key: value for key, value in app_metadata.items() if key != AppMetadataKey.RATING}
+        return super()._get_modified_app_metadata(app_metadata)
+
+    def _get_comparable_app_metadata_value(self, app_metadata_key: AppMetadataKey,
+                                           app_metadata_value: AppMetadataValue) -> AppMetadataValue:
+        """
+        Requested ratings are compared as they would be read back, i.e. rounded down to the star rating they are
+        written as.
+        """
+        if app_metadata_key != AppMetadataKey.RATING or app_metadata_value is None:
+            return super()._get_comparable_app_metadata_value(app_metadata_key, app_metadata_value)
+        normalized_rating = self._parse_normalized_rating(app_metadata_value)
+        return int(int(normalized_rating * 10 / self.normalized_rating_max_value) *  # type: ignore
+                   self.normalized_rating_max_value / 10)  # type: ignore
+
+    def _parse_normalized_rating(self, value: AppMetadataValue) -> int:
+        if self.normalized_rating_max_value is None:
+            raise ImproperlyConfigured("If updating the rating, the max value of the normalized rating must be set.")
+        try:
+            return int(float(value))  # type: ignore
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid rating value: {value}. Expected a numeric value.")
+
+    def _get_app_metadata_to_write(self, app_metadata: AppMetadata) -> AppMetadata:
+        if AppMetadataKey.RATING not in app_metadata:
+            return app_metadata
+        normalized_rating = self._parse_normalized_rating(app_metadata[AppMetadataKey.RATING])
+        file_rating = self._convert_normalized_rating_to_file_rating(normalized_rating=normalized_rating)
+        return {**app_metadata, AppMetadataKey.RATING: file_rating}
@@ -1,6 +1,6 @@
 import contextlib
 import os
-from typing import cast
+from typing import BinaryIO, Callable, cast
 
 from mutagen._file import FileType as MutagenMetadata
 from mutagen.wave import WAVE
@@ -9,8 +9,16 @@ from django.core.exceptions import ImproperlyConfigured
 
 from ....AudioFile import AudioFile
 from ...exceptions import MetadataNotSupportedError
+from ...utils.broadcast_wave_chunks import parse_bext_chunk, parse_cart_chunk, parse_id3_chunk, parse_ixml_chunk
 from ...utils.id3v1_genre_code_map import ID3V1_GENRE_CODE_MAP
+from ...utils.LayoutRegion import LayoutRegion
+from ...utils.LayoutRegionType import LayoutRegionType
+from ...utils.MetadataDeletionReport import MetadataDeletionReport
 from ...utils.rating_profiles import RatingWriteProfile
+from ...utils.riff_chunks import (RIFF_FORM_CHUNK_HEADER_SIZES, RIFF_FORM_HEADER_SIZES, RIFF_FORM_SIZE_FIELDS_ENDS,
+                                  get_riff_chunks_start, get_riff_size, read_riff_form, render_riff_chunk,
+                                  render_riff_junk_chunk, set_riff_size)
+from ...utils.tag_regions import get_leading_id3v2_tags_size
 from ...utils.types import AppMetadata, AppMetadataValue, RawMetadataDict, RawMetadataKey
 from ..MetadataManager import AppMetadataKey
 from ..rating_supporting.RatingSupportingMetadataManager import RatingSupportingMetadataManager
@@ -49,6 +57,18 @@ class RiffManager(RatingSupportingMetadataManager):
        - May not work with all software
        - Use genre codes for better compatibility
 
+    Broadcast Chunks:
+    Broadcast WAV files also hold bext (BWF), cart (AES46), iXML and 'id3 ' chunks, whose fields are read with the
+    raw keys of RiffChunkFieldKey ('<chunk ID>:<field>'). The chunks are indexed by ID from one walk of the chunk
+    headers (see AudioFile.get_layout), and each one is read and parsed only when a key mapped to one of its fields is
+    read, never the data chunk. Their fields map keys without INFO field (e.g. ENCODER_SETTINGS to the bext coding
+    history), and are fallbacks of INFO fields (see chunk_fallback_keys_read). Only the INFO chunk is written.
+
+    64-bit Forms:
+    WAV files above 4 GB are RF64 (or BW64) files, whose large sizes are in a ds64 chunk, or Sony Wave64 files, with
+    GUIDs and 64-bit sizes in their chunk headers (see utils/riff_chunks). Their INFO chunks are read and updated the
+    same way, the size of the RIFF content being updated where each form holds it.
+
     Note: This manager is the preferred way to handle WAV metadata, as it uses the format's native metadata system
     rather than non-standard alternatives like ID3v2 tags. The custom implementation ensures proper handling of RIFF
     chunk structures, maintaining word alignment and size fields according to the specification.
@@ -73,6 +93,47 @@ class RiffManager(RatingSupportingMetadataManager):
         COPYRIGHT = 'ICOP'
         TECHNICIAN = 'ITCH'  # Technician who worked on the track
 
+    class RiffChunkFieldKey(RawMetadataKey):
+        # Broadcast Wave Format extension
+        BEXT_DESCRIPTION = 'bext:Description'
+        BEXT_ORIGINATOR = 'bext:Originator'
+        BEXT_ORIGINATION_DATE = 'bext:OriginationDate'
+        BEXT_CODING_HISTORY = 'bext:CodingHistory'
+
+        # Radio traffic cart
+        CART_TITLE = 'cart:Title'
+        CART_ARTIST = 'cart:Artist'
+        CART_URL = 'cart:URL'
+
+        # Production sound recorders
+        IXML_PROJECT = 'iXML:PROJECT'
+        IXML_NOTE = 'iXML:NOTE'
+
+        # Frames of the embedded ID3v2 tag
+        ID3_TITLE = 'id3 :TIT2'
+        ID3_ARTISTS_NAMES = 'id3 :TPE1'
+        ID3_ALBUM_NAME = 'id3 :TALB'
+
+    # Parsers of the data of the chunks holding the fields of RiffChunkFieldKey, by chunk ID
+    CHUNK_FIELD_PARSERS: dict[str, Callable[[bytes], dict[str, str] | dict[str, list[str]]]] = {
+        'bext': parse_bext_chunk,
+        'cart': parse_cart_chunk,
+        'iXML': parse_ixml_chunk,
+        'id3 ': parse_id3_chunk,
+    }
+
+    # Chunk fields read in order when the mapped INFO field is missing
+    chunk_fallback_keys_read: dict[AppMetadataKey, tuple[RawMetadataKey, ...]] = {
+        AppMetadataKey.TITLE: (RiffChunkFieldKey.CART_TITLE, RiffChunkFieldKey.ID3_TITLE),
+        AppMetadataKey.ARTISTS_NAMES: (RiffChunkFieldKey.CART_ARTIST, RiffChunkFieldKey.ID3_ARTISTS_NAMES),
+        AppMetadataKey.ALBUM_NAME: (RiffChunkFieldKey.ID3_ALBUM_NAME, RiffChunkFieldKey.IXML_PROJECT),
+        AppMetadataKey.COMMENT: (RiffChunkFieldKey.BEXT_DESCRIPTION, RiffChunkFieldKey.IXML_NOTE),
+    }
+
+    _chunk_index: dict[str, LayoutRegion] | None = None
+    _chunk_header_size: int = 0
+    _parsed_chunk_ids: set[str]
+
     def __init__(self, audio_file: AudioFile, normalized_rating_max_value: None | int = None):
         metadata_keys_direct_map_read = {
             AppMetadataKey.TITLE: self.RiffTagKey.TITLE,
@@ -82,6 +143,10 @@ class RiffManager(RatingSupportingMetadataManager):
             AppMetadataKey.GENRE_NAME: None,
             AppMetadataKey.RATING: None,
             AppMetadataKey.LANGUAGE: self.RiffTagKey.LANGUAGE,
+            AppMetadataKey.COMMENT: self.RiffTagKey.COMMENTS,
+            AppMetadataKey.RECORDING_DATE: self.RiffChunkFieldKey.BEXT_ORIGINATION_DATE,
+            AppMetadataKey.ENCODER_SETTINGS: self.RiffChunkFieldKey.BEXT_CODING_HISTORY,
+            AppMetadataKey.URL: self.RiffChunkFieldKey.CART_URL,
             # AppMetadataKey.TRACK_NUMBER: None,
         }
         metadata_keys_direct_map_write: dict[AppMetadataKey, RawMetadataKey | None] = {
@@ -94,6 +159,7 @@ class RiffManager(RatingSupportingMetadataManager):
             AppMetadataKey.LANGUAGE: self.RiffTagKey.LANGUAGE,
             # AppMetadataKey.TRACK_NUMBER: self.RiffTagKey.TRACK_NUMBER,
         }
+        self._parsed_chunk_ids = set()
         super().__init__(audio_file=audio_file,
                          metadata_keys_direct_map_read=metadata_keys_direct_map_read,
                          metadata_keys_direct_map_write=metadata_keys_direct_map_write,
@@ -101,80 +167,41 @@ class RiffManager(RatingSupportingMetadataManager):
                          normalized_rating_max_value=normalized_rating_max_value,
                          update_using_mutagen_metadata=False)
 
-    def _skip_id3v2_tags(self, data: bytes) -> bytes:
-        """
-        Skip ID3v2 tags if present at the start of the file.
-        Returns the data starting from after any ID3v2 tags.
-        """
-        if data.startswith(b'ID3'):
-            # ID3v2 header is 10 bytes:
-            # 3 bytes: ID3
-            # 2 bytes: version
-            # 1 byte: flags
-            # 4 bytes: size (synchsafe integer)
-            if len(data) < 10:
-                return data
-
-            # Get size from synchsafe integer (7 bits per byte)
-            size_bytes = data[6:10]
-            size = ((size_bytes[0] & 0x7F) << 21) | \
-                   ((size_bytes[1] & 0x7F) << 14) | \
-                   ((size_bytes[2] & 0x7F) << 7) | \
-                   (size_bytes[3] & 0x7F)
-
-            # Skip the header (10 bytes) plus the size of the tag
-            return data[10 + size:]
-        return data
-
-    def _extract_riff_metadata_directly(self, file_data: bytes) -> dict[str, str]:
+    def _read_riff_form(self) -> tuple[int, str | None]:
+        """Returns the offset of the RIFF content, after any ID3v2 tags, and its form (None if it is not WAVE)."""
+        with self.audio_file.get_file_object() as f:
+            riff_start = get_leading_id3v2_tags_size(f)
+            return riff_start, read_riff_form(f, riff_start)
+
+    def _extract_riff_metadata_directly(self, info_data: bytes) -> dict[str, str]:
         """
-        Manually extract metadata from RIFF chunks without relying on external libraries.
-        This method directly parses the RIFF structure to extract metadata from the INFO chunk.
+        Manually extract metadata from the fields of an INFO chunk without relying on external libraries, info_data
+        being the data of the chunk following its 'INFO' list type.
         """
         info_tags: dict[str, str] = {}
-
-        # Skip ID3v2 if present
-        file_data = self._skip_id3v2_tags(file_data)
-
-        # Validate RIFF header
-        if len(file_data) < 12 or file_data[:4] != b'RIFF' or file_data[8:12] != b'WAVE':
-            return info_tags
-
-        pos = 12  # Start after RIFF header
-        while pos < len(file_data) - 8:
-            chunk_id = file_data[pos:pos + 4]
-            chunk_size = int.from_bytes(file_data[pos + 4:pos + 8], 'little')
-
-            if chunk_id == b'LIST' and pos + 12 <= len(file_data):
-                if file_data[pos + 8:pos + 12] == b'INFO':
-                    # Process INFO chunk
-                    info_pos = pos + 12
-                    info_end = pos + 8 + chunk_size
-
-                    while info_pos < info_end - 8:
-                        # Extract each metadata field
-                        field_id = file_data[info_pos:info_pos + 4].decode('ascii', errors='ignore')
-                        field_size = int.from_bytes(file_data[info_pos + 4:info_pos + 8], 'little')
-
-                        if field_size > 0 and info_pos + 8 + field_size <= info_end:
-                            # -1 to exclude null terminator
-                            field_data = file_data[info_pos + 8:info_pos + 8 + field_size - 1]
-                            try:
-                                # Decode and handle null-terminated strings
-                                field_value = field_data.decode('utf-8', errors='ignore')
-                                # Split on null byte and take first part if exists
-                                field_value = field_value.split('\x00')[0].strip()
-                                if field_id in self.RiffTagKey and field_value:
-                                    info_tags[field_id] = field_value
-                            except UnicodeDecodeError:
-                                pass
-
-                        # Move to next field, maintaining alignment
-                        info_pos += 8 + ((field_size + 1) & ~1)
-                    break
-
-            # Move to next chunk, maintaining alignment
-            pos += 8 + ((chunk_size + 1) & ~1)
+        info_pos = 0
+        info_end = len(info_data)
+
+        while info_pos < info_end - 8:
+            # Extract each metadata field
+            field_id = info_data[info_pos:info_pos + 4].decode('ascii', errors='ignore')
+            field_size = int.from_bytes(info_data[info_pos + 4:info_pos + 8], 'little')
+
+            if field_size > 0 and info_pos + 8 + field_size <= info_end:
+                # -1 to exclude null terminator
+                field_data = info_data[info_pos + 8:info_pos + 8 + field_size - 1]
+                try:
+                    # Decode and handle null-terminated strings
+                    field_value = field_data.decode('utf-8', errors='ignore')
+                    # Split on null byte and take first part if exists
+                    field_value = field_value.split('\x00')[0].strip()
+                    if field_id in list(self.RiffTagKey) and field_value:
+                        info_tags[field_id] = field_value
+                except UnicodeDecodeError:
+                    pass
+
+            # Move to next field, maintaining alignment
+            info_pos += 8 + ((field_size + 1) & ~1)
 
         return info_tags
 
@@ -190,16 +217,125 @@ class RiffManager(RatingSupportingMetadataManager):
         Extract RIFF metadata from WAV files using direct RIFF chunk parsing.
         This method reads the WAV file's INFO chunk directly, providing the most
         reliable way to access RIFF metadata.
-        """
-        self.audio_file.seek(0)
-        file_data = self.audio_file.read()
 
+        The chunk index is built from the chunk headers (see AudioFile.get_layout) and the INFO chunk is the only chunk
+        read, so memory stays bounded at any file size. The other chunks are read when their fields are (see
+        _get_normalized_app_specific_metadata).
+        """
+        info_tags: dict[str, str] = {}
+        self._build_chunk_index()
+        info_data = self._read_chunk_data('LIST/INFO')
+        if info_data is not None:
+            # The fields follow the 'INFO' list type
+            info_tags = self._extract_riff_metadata_directly(info_data[4:])
+        return self._create_wave_with_info_tags(info_tags)
+
+    def _create_wave_with_info_tags(self, info_tags: dict[str, str]) -> MutagenMetadata:
         # Create empty WAVE object and populate with directly parsed metadata
         wave = WAVE()
-        info_tags = self._extract_riff_metadata_directly(file_data)
         setattr(wave, 'info', info_tags)
         return wave
 
+    def _get_cleaned_raw_metadata(self, raw_mutagen_metadata: MutagenMetadata) -> RawMetadataDict:
+        # The fields of the other chunks are added again to the new dict when read
+        self._parsed_chunk_ids.clear()
+        return super()._get_cleaned_raw_metadata(raw_mutagen_metadata)
+
+    def _build_chunk_index(self) -> None:
+        """Indexes the chunks by ID (with the list type for LIST chunks), the first one being kept for each ID."""
+        self._chunk_index = {}
+        self._parsed_chunk_ids.clear()
+        _, form = self._read_riff_form()
+        if form is None:
+            return
+        self._chunk_header_size = RIFF_FORM_CHUNK_HEADER_SIZES[form]
+        for region in self.audio_file.get_layout():
+            if region.type == LayoutRegionType.RIFF_CHUNK and region.name:
+                self._chunk_index.setdefault(region.name, region)
+
+    def _read_chunk_data(self, chunk_id: str) -> bytes | None:
+        """Returns the data of the indexed chunk with its padding, or None if there is no such chunk."""
+        if self._chunk_index is None:
+            self._build_chunk_index()
+        region = cast(dict[str, LayoutRegion], self._chunk_index).get(chunk_id)
+        if region is None:
+            return None
+        return self.audio_file.read_at(region.offset + self._chunk_header_size, region.size - self._chunk_header_size)
+
+    def _parse_chunk_fields(self, raw_clean_metadata: RawMetadataDict, raw_metadata_key: RawMetadataKey) -> None:
+        """
+        Adds the fields of the chunk holding raw_metadata_key to raw_clean_metadata the first time one of its keys is
+        read, INFO fields having been added with the INFO chunk.
+        """
+        chunk_id, separator, _ = str(raw_metadata_key).partition(':')
+        if not separator or chunk_id in self._parsed_chunk_ids:
+            return
+        self._parsed_chunk_ids.add(chunk_id)
+        chunk_data = self._read_chunk_data(chunk_id)
+        if chunk_data is None:
+            return
+        for field, value in self.CHUNK_FIELD_PARSERS[chunk_id](chunk_data).items():
+            raw_clean_metadata[cast(RawMetadataKey, f'{chunk_id}:{field}')] = \
+                value if isinstance(value, list) else [value]
+
+    def _get_normalized_app_specific_metadata(
+            self, raw_clean_metadata: RawMetadataDict, app_metadata_key: AppMetadataKey) -> AppMetadataValue:
+        raw_metadata_key = self.metadata_keys_direct_map_read[app_metadata_key]
+        if raw_metadata_key:
+            self._parse_chunk_fields(raw_clean_metadata, raw_metadata_key)
+        app_metadata_value = super()._get_normalized_app_specific_metadata(raw_clean_metadata, app_metadata_key)
+
+        for fallback_raw_metadata_key in self.chunk_fallback_keys_read.get(app_metadata_key, ()):
+            if app_metadata_value is not None:
+                break
+            self._parse_chunk_fields(raw_clean_metadata, fallback_raw_metadata_key)
+            app_metadata_value = self._normalize_raw_metadata_value(
+                raw_clean_metadata.get(fallback_raw_metadata_key), app_metadata_key)
+        return app_metadata_value
+
+    def delete_metadata_with_report(self, in_place: bool = False, dry_run: bool = False) -> MetadataDeletionReport:
+        """
+        Deletes the LIST INFO chunk, with the JUNK chunks following it. The WAVE object built by
+        _extract_mutagen_metadata is not bound to the file, so the chunk is located with positional reads of the chunk
+        headers, like for updates.
+
+        The chunk is removed by shifting the following chunks backward and truncating the file, the RIFF size being
+        updated. With in_place, it is instead turned into a JUNK chunk of the same size, so that no byte is moved.
+        With dry_run, only the chunk headers are read.
+        """
+        riff_start, form = self._read_riff_form()
+        if form is None:
+            return MetadataDeletionReport(success=False)
+        # The chunks move, so the index is rebuilt from the new layout when a chunk is next read
+        self._chunk_index = None
+
+        info_chunk_region = self._find_info_chunk_region()
+        if info_chunk_region is None:
+            return MetadataDeletionReport(success=True, in_place=True)
+        info_chunk_start, info_chunk_end = info_chunk_region
+        info_chunk_size = info_chunk_end - info_chunk_start
+        if dry_run:
+            return MetadataDeletionReport(success=True, bytes_reclaimed=0 if in_place else info_chunk_size,
+                                          in_place=in_place)
+
+        try:
+            if in_place:
+                with self.audio_file.get_file_object(writable=True) as f:
+                    f.seek(info_chunk_start)
+                    f.write(render_riff_junk_chunk(form, info_chunk_size))
+                return MetadataDeletionReport(success=True, in_place=True)
+
+            size_fields = bytearray(self.audio_file.read_at(riff_start, RIFF_FORM_SIZE_FIELDS_ENDS[form]))
+            riff_size = get_riff_size(size_fields, form)
+            self.audio_file.remove_range(info_chunk_start, info_chunk_size)
+            set_riff_size(size_fields, form, max(riff_size - info_chunk_size, RIFF_FORM_HEADER_SIZES[form]))
+            with self.audio_file.get_file_object(writable=True) as f:
+                f.seek(riff_start)
+                f.write(size_fields)
+        except Exception:
+            return MetadataDeletionReport(success=False)
+        return MetadataDeletionReport(success=True, bytes_reclaimed=info_chunk_size)
+
     def _convert_raw_mutagen_metadata_to_dict_with_potential_duplicate_keys(
             self, raw_mutagen_metadata: MutagenMetadata) -> RawMetadataDict:
         """
@@ -214,7 +350,7 @@ class RiffManager(RatingSupportingMetadataManager):
         if hasattr(raw_mutagen_metadata_wav, 'info'):
             info_tags = getattr(raw_mutagen_metadata_wav, 'info')
             for key, value in info_tags.items():
-                if key in self.RiffTagKey:
+                if key in list(self.RiffTagKey):
                     raw_metadata_dict[key] = value
 
         return raw_metadata_dict
@@ -250,85 +386,145 @@ class RiffManager(RatingSupportingMetadataManager):
         This implementation maintains RIFF specification compliance while providing better
         performance and reliability for metadata updates.
 
+        The chunks are located from their headers only (see AudioFile.get_layout), so only the INFO chunk is held in
+        memory. The new INFO chunk is written in place when it fits in the space of the old one (a JUNK chunk filling
+        the rest); otherwise the file is rewritten to a temporary file, the other chunks being copied by the kernel,
+        then atomically renamed. Leading ID3v2 tags are dropped by the rewrite. The fields of the INFO chunk that
+        app_metadata does not set are kept, and if no field changes, nothing is written.
+
         Note: While TinyTag is excellent for reading metadata, it doesn't support writing.
         Therefore, we implement our own RIFF chunk writer following the specification.
         """
         if not self.metadata_keys_direct_map_write:
             raise ImproperlyConfigured('metadata_keys_direct_map_write must be set')
 
-        # Read the entire file into a mutable bytearray
-        self.audio_file.seek(0)
-        file_data = bytearray(self.audio_file.read())
-
-        # Skip any ID3v2 tags that might be present
-        skipped_data = self._skip_id3v2_tags(bytes(file_data))
-        file_data = bytearray(skipped_data)
-
-        # Find RIFF header and validate
-        if len(file_data) < 12 or bytes(file_data[:4]) != b'RIFF' or bytes(file_data[8:12]) != b'WAVE':
+        # Skip any ID3v2 tags that might be present, and validate the RIFF header
+        riff_start, form = self._read_riff_form()
+        if form is None:
             raise MetadataNotSupportedError("Invalid WAV file format")
 
-        # Find or create LIST INFO chunk
-        info_chunk_start = self._find_info_chunk_in_file_data(file_data)
-        if info_chunk_start == -1:
-            info_chunk_start = self._create_info_chunk_after_wave_header(file_data)
-
-        # Process metadata updates
-        info_chunk_size = int.from_bytes(bytes(file_data[info_chunk_start+4:info_chunk_start+8]), 'little')
+        # Fields of other keys are kept, and nothing is written if no field changes
+        info_fields = self._read_info_fields()
+        new_info_fields = self._get_updated_info_fields(info_fields, app_metadata)
+        if new_info_fields == info_fields:
+            return
+        self._chunk_index = None
+
+        new_info_chunk = self._create_info_chunk(new_info_fields, form)
+        self._write_info_chunk(riff_start, form, new_info_chunk)
+        # The fields written are read back from memory, the other chunks being indexed again when read
+        self.raw_mutagen_metadata = self._create_wave_with_info_tags(self._decode_info_fields(new_info_fields))
+
+    def _write_info_chunk(self, riff_start: int, form: str, new_info_chunk: bytes) -> None:
+        """Writes new_info_chunk in the space of the old INFO chunk if it fits, or else rewrites the file."""
+        info_chunk_region = self._find_info_chunk_region()
+
+        if riff_start == 0 and info_chunk_region is not None:
+            info_chunk_start, info_chunk_end = info_chunk_region
+            free_size = info_chunk_end - info_chunk_start - len(new_info_chunk)
+            if free_size == 0 or free_size >= RIFF_FORM_CHUNK_HEADER_SIZES[form]:
+                with self.audio_file.get_file_object(writable=True) as f:
+                    f.seek(info_chunk_start)
+                    f.write(new_info_chunk)
+                    if free_size:
+                        f.write(render_riff_junk_chunk(form, free_size))
+                return
+
+        self.audio_file.replace_content(
+            lambda new_file: self._write_file_with_info_chunk(new_file, riff_start, form, info_chunk_region,
+                                                              new_info_chunk))
+
+    def _read_info_fields(self) -> dict[str, bytes]:
+        """Returns the values of the fields of the INFO chunk by field ID, without null terminator, in file order."""
+        info_data = self._read_chunk_data('LIST/INFO')
+        info_fields: dict[str, bytes] = {}
+        if info_data is None:
+            return info_fields
+
+        # The fields follow the 'INFO' list type
+        info_pos = 4
+        while info_pos + 8 <= len(info_data):
+            field_id = info_data[info_pos:info_pos + 4].decode('ascii', errors='ignore')
+            field_size = int.from_bytes(info_data[info_pos + 4:info_pos + 8], 'little')
+            field_value = info_data[info_pos + 8:info_pos + 8 + field_size].split(b'\x00')[0]
+            if len(field_id) == 4 and field_value:
+                info_fields.setdefault(field_id, field_value)
+            info_pos += 8 + ((field_size + 1) & ~1)
+        return info_fields
+
+    def _decode_info_fields(self, info_fields: dict[str, bytes]) -> dict[str, str]:
+        """Returns the values of the fields of RiffTagKey, decoded like by _extract_riff_metadata_directly."""
+        info_tags: dict[str, str] = {}
+        for field_id, field_value in info_fields.items():
+            field_value_str = field_value.decode('utf-8', errors='ignore').strip()
+            if field_id in list(self.RiffTagKey) and field_value_str:
+                info_tags[field_id] = field_value_str
+        return info_tags
 
-        # Build new tags data
-        new_tags_data = bytearray()
+    def _get_updated_info_fields(self, info_fields: dict[str, bytes], app_metadata: AppMetadata) -> dict[str, bytes]:
+        """Returns info_fields with the fields of app_metadata set, or removed for empty values."""
+        new_info_fields = dict(info_fields)
         for app_key, value in app_metadata.items():
-            if value is None or value == "":
-                continue
-
             # Get corresponding RIFF tag
             riff_key = self._get_riff_key_for_metadata(app_key, value)
             if not riff_key:
                 continue
 
             # Prepare tag value
-            value_bytes = self._prepare_tag_value(value, app_key)
-            if not value_bytes:
-                continue
-
-            # Create tag data with proper alignment
+            value_bytes = None if value is None or value == "" else self._prepare_tag_value(value, app_key)
+            if value_bytes:
+                new_info_fields[str(riff_key)] = value_bytes
+            else:
+                new_info_fields.pop(str(riff_key), None)
+        return new_info_fields
+
+    def _create_info_chunk(self, info_fields: dict[str, bytes], form: str) -> bytes:
+        # Build new tags data, with proper alignment
+        new_tags_data = bytearray()
+        for riff_key, value_bytes in info_fields.items():
             new_tags_data.extend(self._create_aligned_metadata_with_proper_padding(riff_key, value_bytes))
 
-        # Create new INFO chunk
-        new_info_chunk = bytearray()
-        new_info_chunk.extend(b'LIST')
-        new_info_chunk.extend((len(new_tags_data) + 4).to_bytes(4, 'little'))  # +4 for 'INFO'
-        new_info_chunk.extend(b'INFO')
-        new_info_chunk.extend(new_tags_data)
-
-        # Replace old INFO chunk
-        file_data[info_chunk_start:info_chunk_start + info_chunk_size + 8] = new_info_chunk
-
-        # Update RIFF chunk size
-        total_size = len(file_data) - 8  # Exclude RIFF and size fields
-        file_data[4:8] = total_size.to_bytes(4, 'little')
-
-        # Write updated file
-        self.audio_file.seek(0)
-        self.audio_file.write(file_data)
-
-    def _find_info_chunk_in_file_data(self, file_data: bytearray) -> int:
-        pos = 12  # Start after RIFF header
-        while pos < len(file_data) - 8:
-            if (bytes(file_data[pos:pos+4]) == b'LIST' and
-                pos + 8 < len(file_data) and
-                    bytes(file_data[pos+8:pos+12]) == b'INFO'):
-                return pos
-            chunk_size = int.from_bytes(bytes(file_data[pos+4:pos+8]), 'little')
-            pos += 8 + ((chunk_size + 1) & ~1)  # Move to next chunk, maintaining alignment
-        return -1
-
-    def _create_info_chunk_after_wave_header(self, file_data: bytearray) -> int:
-        info_chunk = bytearray(b'LIST\x04\x00\x00\x00INFO')  # Minimal INFO chunk
-        insert_pos = 12  # After RIFF+size+WAVE
-        file_data[insert_pos:insert_pos] = info_chunk
-        return insert_pos
+        # Create new INFO chunk, with the chunk header of the form
+        return render_riff_chunk(form, b'LIST', b'INFO' + bytes(new_tags_data))
+
+    def _write_file_with_info_chunk(self, new_file: BinaryIO, riff_start: int, form: str,
+                                    info_chunk_region: tuple[int, int] | None, new_info_chunk: bytes) -> None:
+        """
+        Writes the RIFF content starting at riff_start to new_file, with new_info_chunk replacing the old INFO chunk,
+        or inserted after the WAVE header (and the ds64 chunk of RF64 files) if there is none.
+        """
+        file_size = self.audio_file.get_file_size()
+        try:
+            with self.audio_file.get_file_object() as f:
+                chunks_start = get_riff_chunks_start(f, riff_start, form)
+            info_chunk_start, info_chunk_end = info_chunk_region or (chunks_start, chunks_start)
+
+            # Update the size of the RIFF content, in the header or the ds64 chunk
+            total_size = file_size - riff_start - (info_chunk_end - info_chunk_start) + len(new_info_chunk)
+            header = bytearray(self.audio_file.read_at(riff_start, chunks_start - riff_start))
+            set_riff_size(header, form, total_size)
+        except ValueError as error:
+            raise MetadataNotSupportedError(str(error))
+        new_file.write(header)
+        self.audio_file.copy_range_to(new_file, chunks_start, info_chunk_start - chunks_start)
+        new_file.write(new_info_chunk)
+        self.audio_file.copy_range_to(new_file, info_chunk_end, file_size - info_chunk_end)
+
+    def _find_info_chunk_region(self) -> tuple[int, int] | None:
+        """
+        Returns the (start, end) offsets of the LIST INFO chunk, its end including the JUNK chunks directly following
+        it, which are free space left by previous in-place updates, or None if there is no INFO chunk.
+        """
+        layout = self.audio_file.get_layout()
+        for index, region in enumerate(layout):
+            if region.type == LayoutRegionType.RIFF_CHUNK and region.name == 'LIST/INFO':
+                info_chunk_end = region.end
+                for next_region in layout[index + 1:]:
+                    if next_region.type != LayoutRegionType.RIFF_CHUNK or next_region.name != 'JUNK':
+                        break
+                    info_chunk_end = next_region.end
+                return region.offset, info_chunk_end
+        return None
 
     def _get_riff_key_for_metadata(self, app_key: AppMetadataKey, value: AppMetadataValue) -> str | None:
         """Get the appropriate RIFF tag key for the metadata."""
@@ -1,21 +1,31 @@
 
-from typing import TypeVar, cast
+import io
+from typing import BinaryIO, TypeVar, cast
 
 from django.core.exceptions import ImproperlyConfigured
+from mutagen import MutagenError
 from mutagen._file import FileType as MutagenMetadata
-from mutagen.flac import FLAC, VCFLACDict
+from mutagen._vorbis import VCommentDict
+from mutagen.flac import FLAC
 
 
 from ....AudioFile import AudioFile
-from ...exceptions import FileCorruptedError, InvalidChunkDecodeError
+from ...exceptions import FileCorruptedError, InvalidChunkDecodeError, MetadataNotSupportedError
+from ...utils.MetadataDeletionReport import MetadataDeletionReport
+from ...utils.OggPage import OggPage
+from ...utils.ogg_pages import (OGG_CODEC_OPUS, OGG_CODEC_VORBIS, OGG_COMMENT_PACKET_PREFIXES, OGG_FILE_EXTENSIONS,
+                                create_ogg_pages, read_ogg_header_packets, read_ogg_page, renumber_ogg_page)
 from ...utils.rating_profiles import RatingWriteProfile
-from ...utils.types import AppMetadataValue, RawMetadataDict, RawMetadataKey
+from ...utils.types import AppMetadata, AppMetadataValue, RawMetadataDict, RawMetadataKey
 from ..MetadataManager import AppMetadataKey
 from .RatingSupportingMetadataManager import RatingSupportingMetadataManager
 
 
 T = TypeVar('T', str, int)
 
+# Padding added to the comment header of Ogg files when it grows, so that the next updates fit in its pages
+OGG_COMMENT_PADDING_SIZE = 1024
+
 
 class VorbisManager(RatingSupportingMetadataManager):
     """
@@ -41,6 +51,9 @@ class VorbisManager(RatingSupportingMetadataManager):
     - FLAC: Fully supports Vorbis comments.
     - Opus: Fully supports Vorbis comments.
 
+    The Vorbis comments of Ogg files are read from the pages of the comment header only, and written by rewriting
+    these pages (see _write_ogg_comment), the audio pages being left as they are.
+
     Note: This class assumes that the audio files being managed are primarily in formats that support Vorbis comments.
     """
 
@@ -91,11 +104,15 @@ class VorbisManager(RatingSupportingMetadataManager):
                          metadata_keys_direct_map_read=metadata_keys_direct_map_read,
                          metadata_keys_direct_map_write=metadata_keys_direct_map_write,
                          rating_write_profile=RatingWriteProfile.BASE_100_PROPORTIONAL,
-                         normalized_rating_max_value=normalized_rating_max_value)
+                         normalized_rating_max_value=normalized_rating_max_value,
+                         update_using_mutagen_metadata=audio_file.file_extension not in OGG_FILE_EXTENSIONS)
 
     def _extract_mutagen_metadata(self) -> MutagenMetadata:
+        if self.audio_file.file_extension in OGG_FILE_EXTENSIONS:
+            return cast(MutagenMetadata, self._read_ogg_comment())
         try:
-            return FLAC(self.audio_file.get_file_path_or_object())
+            with self.audio_file.get_file_object() as f:
+                return FLAC(f)
         except Exception as error:
             error_str = str(error)
             if "InvalidChunk" in error_str and "UnicodeDecodeError" in error_str:
@@ -106,11 +123,14 @@ class VorbisManager(RatingSupportingMetadataManager):
 
     def _convert_raw_mutagen_metadata_to_dict_with_potential_duplicate_keys(
             self, raw_mutagen_metadata: MutagenMetadata) -> RawMetadataDict:
-        raw_mutagen_metadata_flac: FLAC = cast(FLAC, raw_mutagen_metadata)
-        metadata = raw_mutagen_metadata_flac.tags
+        if isinstance(raw_mutagen_metadata, VCommentDict):
+            # Comments read from an Ogg file
+            metadata = raw_mutagen_metadata
+        else:
+            metadata = cast(FLAC, raw_mutagen_metadata).tags
         if isinstance(metadata, dict):
             return metadata
-        elif isinstance(metadata, VCFLACDict):
+        elif isinstance(metadata, VCommentDict):
             return dict(metadata)
         elif not metadata:
             return {}
@@ -150,3 +170,135 @@ class VorbisManager(RatingSupportingMetadataManager):
                                                                  app_metadata_value=app_metadata_value)
         else:
             raise ImproperlyConfigured('Metadata key not handled')
+
+    def _read_ogg_comment(self) -> VCommentDict:
+        """Returns the Vorbis comments of the Ogg file, reading only the pages up to its comment header."""
+        with self.audio_file.get_file_object() as f:
+            try:
+                codec, packets, _ = read_ogg_header_packets(f, packet_count=2)
+            except ValueError as error:
+                raise FileCorruptedError(f"Invalid Ogg file: {error}")
+        return self._parse_ogg_comment_packet(codec, packets[1])
+
+    def _parse_ogg_comment_packet(self, codec: str, comment_packet: bytes,
+                                  comment_data: BinaryIO | None = None) -> VCommentDict:
+        prefix = OGG_COMMENT_PACKET_PREFIXES[codec]
+        if not comment_packet.startswith(prefix):
+            raise FileCorruptedError("Invalid Ogg comment header")
+        try:
+            return VCommentDict(comment_data or io.BytesIO(comment_packet[len(prefix):]),
+                                framing=codec == OGG_CODEC_VORBIS)
+        except MutagenError as error:
+            raise FileCorruptedError(f"Invalid Ogg comment header: {error}")
+
+    def _update_not_using_mutagen_metadata(self, app_metadata: AppMetadata):
+        """Updates the Vorbis comments of Ogg files, the comments of FLAC files being updated by mutagen."""
+        if self.raw_mutagen_metadata is None:
+            self.raw_mutagen_metadata = self._call_timed('extract_mutagen_metadata', self._extract_mutagen_metadata)
+        vorbis_comment = cast(VCommentDict, self.raw_mutagen_metadata)
+        self._update_raw_mutagen_metadata(vorbis_comment, app_metadata)
+        self._write_ogg_comment(vorbis_comment)
+
+    def delete_metadata_with_report(self, in_place: bool = False, dry_run: bool = False) -> MetadataDeletionReport:
+        """
+        Deletes the Vorbis comments, keeping the vendor string of Ogg files. The comment header of Ogg files is
+        rewritten natively, so a dry run reads only its pages.
+        """
+        if self.audio_file.file_extension not in OGG_FILE_EXTENSIONS:
+            return super().delete_metadata_with_report(in_place=in_place, dry_run=dry_run)
+
+        try:
+            vorbis_comment = self._read_ogg_comment()
+            vorbis_comment.clear()
+            bytes_reclaimed = self._write_ogg_comment(vorbis_comment, padded=in_place, dry_run=dry_run)
+        except (FileCorruptedError, MetadataNotSupportedError):
+            return MetadataDeletionReport(success=False)
+        if not dry_run:
+            self.raw_mutagen_metadata = cast(MutagenMetadata, vorbis_comment)
+        return MetadataDeletionReport(success=True, bytes_reclaimed=bytes_reclaimed, in_place=bytes_reclaimed == 0)
+
+    def _write_ogg_comment(self, vorbis_comment: VCommentDict, padded: bool = True, dry_run: bool = False) -> int:
+        """
+        Writes vorbis_comment as the comment header of the Ogg file, returning the number of bytes the file shrank by.
+
+        Only the pages holding the comment header (and the Vorbis setup header, which shares them) are rewritten. If
+        padded, the comment header keeps its size when it shrinks, and gets OGG_COMMENT_PADDING_SIZE bytes of padding
+        when it grows, so that most updates rewrite these pages in place. The headers are spread over as many pages
+        as before whenever they fit, so the audio pages keep their sequence numbers and are copied as they are when
+        the file is rewritten: they are only renumbered when the headers need more pages.
+
+        Raises:
+            FileCorruptedError: If the header pages are invalid
+            MetadataNotSupportedError: If the header pages also hold other data
+        """
+        with self.audio_file.get_file_object() as f:
+            try:
+                codec, packets, pages = read_ogg_header_packets(f)
+            except ValueError as error:
+                raise FileCorruptedError(f"Invalid Ogg file: {error}")
+        header_pages = pages[1:]
+        if (not header_pages or sum(pages[0].segment_sizes) != len(packets[0])
+                or sum(sum(page.segment_sizes) for page in header_pages) != sum(map(len, packets[1:]))
+                or any(page.end != next_page.offset for page, next_page in zip(pages, pages[1:]))):
+            raise MetadataNotSupportedError("The Ogg header pages are shared with other packets or streams")
+
+        prefix = OGG_COMMENT_PACKET_PREFIXES[codec]
+        comment_packet = prefix + vorbis_comment.write(framing=codec == OGG_CODEC_VORBIS)
+        extra_data = b''
+        if codec == OGG_CODEC_OPUS:
+            # Binary data may follow the Opus comments, to be preserved if its first bit is set
+            old_comment_data = io.BytesIO(packets[1][len(prefix):])
+            self._parse_ogg_comment_packet(codec, packets[1], old_comment_data)
+            extra_data = old_comment_data.read()
+        if extra_data[:1] and extra_data[0] & 1:
+            comment_packet += extra_data
+        elif padded:
+            padding_size = len(packets[1]) - len(comment_packet)
+            comment_packet += bytes(padding_size if padding_size >= 0 else OGG_COMMENT_PADDING_SIZE)
+
+        new_pages = create_ogg_pages([comment_packet] + packets[2:], header_pages[0].serial_number,
+                                     header_pages[0].sequence_number, len(header_pages))
+        header_pages_start, header_pages_end = header_pages[0].offset, header_pages[-1].end
+        bytes_reclaimed = header_pages_end - header_pages_start - sum(map(len, new_pages))
+        if dry_run:
+            return bytes_reclaimed
+
+        if not bytes_reclaimed:
+            # Same number of pages of the same sizes
+            with self.audio_file.get_file_object(writable=True) as f:
+                f.seek(header_pages_start)
+                f.write(b''.join(new_pages))
+        else:
+            self.audio_file.replace_content(
+                lambda new_file: self._write_file_with_ogg_header_pages(new_file, header_pages, new_pages))
+        return bytes_reclaimed
+
+    def _write_file_with_ogg_header_pages(self, new_file: BinaryIO, header_pages: list[OggPage],
+                                          new_pages: list[bytes]) -> None:
+        """Writes the Ogg file to new_file, new_pages replacing header_pages, the next pages renumbered if needed."""
+        file_size = self.audio_file.get_file_size()
+        header_pages_start, header_pages_end = header_pages[0].offset, header_pages[-1].end
+        self.audio_file.copy_range_to(new_file, 0, header_pages_start)
+        new_file.write(b''.join(new_pages))
+
+        sequence_number_shift = len(new_pages) - len(header_pages)
+        if not sequence_number_shift:
+            self.audio_file.copy_range_to(new_file, header_pages_end, file_size - header_pages_end)
+            return
+
+        serial_number = header_pages[0].serial_number
+        offset = header_pages_end
+        with self.audio_file.get_file_object() as f:
+            while offset < file_size:
+                try:
+                    page = read_ogg_page(f, offset)
+                except ValueError:
+                    # Trailing data that is not an Ogg page is kept as it is
+                    break
+                page_data = self.audio_file.read_at(offset, page.size)
+                if page.serial_number == serial_number and len(page_data) == page.size:
+                    page_data = renumber_ogg_page(page_data, page.sequence_number + sequence_number_shift)
+                new_file.write(page_data)
+                offset = page.end
+        if offset < file_size:
+            self.audio_file.copy_range_to(new_file, offset, file_size - offset)
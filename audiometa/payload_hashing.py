@@ -0,0 +1,70 @@
+"""Batch hashing of the audio payload of files, e.g. to find the copies of a master tagged differently.
+
+Files are hashed by a bounded pool of threads (see AudioFile.get_payload_hash), and results are streamed back as soon
+as each file is done.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from .audio_file import AudioFile
+from .utils.parallel_map import map_parallel
+from .utils.payload_hash import DEFAULT_PAYLOAD_HASH_ALGORITHM
+
+
+@dataclass(frozen=True)
+class PayloadHashResult:
+    """
+    Payload hash of one file.
+
+    - path: Path of the file
+    - payload_hash: Hexadecimal hash of the audio bytes of the file, None if it could not be computed
+    - error: Error message if the hashing failed, None otherwise
+    - elapsed_sec: Wall-clock time spent on this file
+    - completed_count: Number of files done so far, this one included, for progress reporting
+    """
+    path: str
+    payload_hash: str | None
+    error: str | None
+    elapsed_sec: float
+    completed_count: int
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def _hash_one(path: str, algorithm: str) -> tuple[str | None, str | None, float]:
+    start_time = time.perf_counter()
+    try:
+        with AudioFile(path) as audio_file:
+            return audio_file.get_payload_hash(algorithm), None, time.perf_counter() - start_time
+    except Exception as exc:
+        return None, f'{type(exc).__name__}: {exc}', time.perf_counter() - start_time
+
+
+def get_payload_hash_many(paths: Iterable[str], algorithm: str = DEFAULT_PAYLOAD_HASH_ALGORITHM,
+                          workers: int | None = None) -> Iterator[PayloadHashResult]:
+    """
+    Computes the payload hashes of files (see AudioFile.get_payload_hash), served from the cache for files that did
+    not change since they were last hashed.
+
+    Files are hashed in parallel and their results yielded as they are done (see map_parallel). A file that cannot
+    be read gets a result with its error and no hash.
+
+    Args:
+        paths: Files to hash
+        algorithm: Name of a hashlib algorithm
+        workers: Maximum number of files hashed in parallel, defaults to the number of CPUs
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    hashings = map_parallel(lambda path: _hash_one(path, algorithm), map(str, paths), workers)
+    for completed_count, (path, hashing) in enumerate(hashings, start=1):
+        payload_hash, error, elapsed_sec = hashing
+        yield PayloadHashResult(path=path, payload_hash=payload_hash, error=error, elapsed_sec=elapsed_sec,
+                                completed_count=completed_count)
@@ -0,0 +1,123 @@
+"""Batch stripping of metadata, e.g. for privacy scrubbing before delivery.
+
+Files are stripped by a bounded pool of workers with the native deletions of the managers (see
+MetadataManager.delete_metadata_with_report), and results are streamed back as soon as each file is done. A dry run
+only reads the tag headers and regions, to know beforehand how many bytes would be removed and which files would
+have their audio moved.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from .audio_file import AudioFile
+from .manager.MetadataManager import MetadataManager
+from .manager.rating_supporting.Id3v2Manager import Id3v2Manager
+from .utils.parallel_map import map_parallel
+from .utils.TagFormat import MetadataFormat
+
+
+@dataclass(frozen=True)
+class TagStripResult:
+    """
+    Outcome of the stripping of one file, or of its probing in a dry run.
+
+    - path: Path of the file
+    - bytes_removed: Decrease of the file size, the bytes that would be removed in a dry run
+    - in_place: Whether the stripping moves no audio byte (tags truncated from the end of the file or blanked), as
+      opposed to shifting the audio backward over the removed tags
+    - error: Error message if the stripping failed, None otherwise
+    - elapsed_sec: Wall-clock time spent on this file
+    - completed_count: Number of files done so far, this one included, for progress reporting
+    - total_bytes_removed: Bytes removed from the files done so far, this one included
+    - total_elapsed_sec: Wall-clock time since the start of the batch
+    """
+    path: str
+    bytes_removed: int
+    in_place: bool
+    error: str | None
+    elapsed_sec: float
+    completed_count: int
+    total_bytes_removed: int
+    total_elapsed_sec: float
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def files_per_sec(self) -> float:
+        """Throughput of the batch so far, in files per second."""
+        return self.completed_count / self.total_elapsed_sec if self.total_elapsed_sec else 0.0
+
+
+def _get_managers_to_strip(audio_file: AudioFile, formats: Iterable[MetadataFormat]) -> list[MetadataManager]:
+    from . import _get_metadata_manager
+    file_formats = MetadataFormat.get_priorities().get(audio_file.file_extension, [])
+    managers = []
+    for tag_format in formats:
+        if tag_format in file_formats:
+            managers.append(_get_metadata_manager(audio_file, tag_format=tag_format))
+        elif tag_format == MetadataFormat.ID3V2:
+            # Same as delete_potential_id3_metadata_with_header: ID3v2 tags in front of any format
+            managers.append(Id3v2Manager(audio_file))
+    return managers
+
+
+def _strip_one(path: str, formats: list[MetadataFormat] | None, dry_run: bool) -> tuple[int, bool, str | None, float]:
+    start_time = time.perf_counter()
+    bytes_removed = 0
+    in_place = True
+    try:
+        with AudioFile(path) as audio_file:
+            if formats is None:
+                formats = MetadataFormat.get_priorities().get(audio_file.file_extension, [MetadataFormat.ID3V2])
+            if dry_run and MetadataFormat.ID3V2 in formats:
+                # The ID3v2 deletion also truncates the ID3v1 tag, which the probing would otherwise count twice
+                formats = [tag_format for tag_format in formats if tag_format != MetadataFormat.ID3V1]
+
+            for manager in _get_managers_to_strip(audio_file, formats):
+                report = manager.delete_metadata_with_report(dry_run=dry_run)
+                if not report.success:
+                    raise RuntimeError(f'{type(manager).__name__} could not delete the metadata')
+                bytes_removed += report.bytes_reclaimed
+                in_place = in_place and report.in_place
+        return bytes_removed, in_place, None, time.perf_counter() - start_time
+    except Exception as exc:
+        return bytes_removed, in_place, f'{type(exc).__name__}: {exc}', time.perf_counter() - start_time
+
+
+def strip_many(paths: Iterable[str], formats: Iterable[MetadataFormat] | None = None, workers: int | None = None,
+               dry_run: bool = False) -> Iterator[TagStripResult]:
+    """
+    Deletes the metadata of files in place, with the same deletions as delete_metadata and
+    delete_potential_id3_metadata_with_header.
+
+    Files are stripped in parallel and their results yielded as they are done (see map_parallel), with the running
+    totals of the batch. A file whose stripping fails keeps whatever deletions succeeded, its result carrying the
+    error, and the other files are still stripped.
+
+    Args:
+        paths: Files to strip
+        formats: Metadata formats to delete, those supported by the format of each file by default. Formats not
+            supported by a file are skipped, except ID3v2 whose tags are removed from the start of any file
+        workers: Maximum number of files processed in parallel, defaults to the number of CPUs
+        dry_run: Report the bytes that would be removed without modifying the files, reading only the tag headers
+            (and the tag regions of MP3 and FLAC files, the deletion being tried on an in-memory copy of them)
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    formats_list = None if formats is None else list(formats)
+
+    total_bytes_removed = 0
+    start_time = time.perf_counter()
+    strippings = map_parallel(lambda path: _strip_one(path, formats_list, dry_run), map(str, paths), workers)
+    for completed_count, (path, stripping) in enumerate(strippings, start=1):
+        bytes_removed, in_place, error, elapsed_sec = stripping
+        total_bytes_removed += bytes_removed
+        yield TagStripResult(
+            path=path, bytes_removed=bytes_removed, in_place=in_place, error=error, elapsed_sec=elapsed_sec,
+            completed_count=completed_count, total_bytes_removed=total_bytes_removed,
+            total_elapsed_sec=time.perf_counter() - start_time)
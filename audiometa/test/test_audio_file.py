@@ -1,10 +1,12 @@
 """Tests for AudioFile class."""
 
+import shutil
+
 import pytest
 from pathlib import Path
 
-from audiometa import AudioFile
-from audiometa.exceptions import FileTypeNotSupportedError, FileNotFoundError
+from audiometa import AudioFile, Mp3DurationMode, get_merged_app_metadata
+from audiometa.exceptions import FileTypeNotSupportedError
 
 
 class TestAudioFile:
@@ -51,6 +53,7 @@ class TestAudioFile:
         assert isinstance(duration, float)
         assert duration > 0
 
+    @pytest.mark.skipif(shutil.which("ffprobe") is None, reason="ffprobe binary not installed")
     def test_get_duration_in_sec_wav(self, sample_wav_file: Path):
         """Test getting duration for WAV file."""
         audio_file = AudioFile(sample_wav_file)
@@ -72,6 +75,7 @@ class TestAudioFile:
         assert isinstance(bitrate, int)
         assert bitrate > 0
 
+    @pytest.mark.skipif(shutil.which("ffprobe") is None, reason="ffprobe binary not installed")
     def test_get_bitrate_wav(self, sample_wav_file: Path):
         """Test getting bitrate for WAV file."""
         audio_file = AudioFile(sample_wav_file)
@@ -79,6 +83,49 @@ class TestAudioFile:
         assert isinstance(bitrate, int)
         assert bitrate > 0
 
+    def test_get_technical_info_mp3(self, sample_mp3_file: Path):
+        """Test getting technical info for MP3 file."""
+        audio_file = AudioFile(str(sample_mp3_file))
+        technical_info = audio_file.get_technical_info()
+        assert technical_info.codec == "mp3"
+        assert technical_info.duration_in_sec > 0
+        assert technical_info.sample_rate == 44100
+        assert technical_info.channels == 2
+        assert technical_info.bit_depth is None
+        assert technical_info.is_vbr is False
+
+    def test_get_technical_info_flac(self, sample_flac_file: Path):
+        """Test getting technical info for FLAC file."""
+        audio_file = AudioFile(str(sample_flac_file))
+        technical_info = audio_file.get_technical_info()
+        assert technical_info.codec == "flac"
+        assert technical_info.sample_rate == 44100
+        assert technical_info.bit_depth is not None
+
+    def test_get_technical_info_is_memoized(self, sample_mp3_file: Path):
+        """Test that technical info is parsed once and reused by the duration and bitrate views."""
+        audio_file = AudioFile(str(sample_mp3_file))
+        technical_info = audio_file.get_technical_info()
+        assert audio_file.get_technical_info() is technical_info
+        assert audio_file.get_duration_in_sec() == technical_info.duration_in_sec
+        assert audio_file.get_bitrate() == technical_info.bitrate
+
+    def test_get_technical_info_mp3_duration_modes(self, sample_mp3_file: Path):
+        """Test that every MP3 duration mode agrees on the duration and reports itself."""
+        audio_file = AudioFile(str(sample_mp3_file))
+        reference_duration = audio_file.get_duration_in_sec()
+        for mode in Mp3DurationMode:
+            technical_info = audio_file.get_technical_info(mode)
+            assert technical_info.duration_mode == mode
+            assert technical_info.duration_in_sec == pytest.approx(reference_duration, abs=0.05)
+
+    def test_get_bitrate_mp3_exact_mode_excludes_tags(self, sample_mp3_file: Path):
+        """Test that the exact mode bitrate is not inflated by the ID3v2 tag bytes."""
+        audio_file = AudioFile(str(sample_mp3_file))
+        exact_bitrate = audio_file.get_bitrate(Mp3DurationMode.EXACT)
+        assert exact_bitrate <= audio_file.get_bitrate(Mp3DurationMode.MUTAGEN)
+        assert exact_bitrate == pytest.approx(128, abs=2)
+
     def test_file_operations(self, temp_audio_file: Path):
         """Test file read/write operations."""
         audio_file = AudioFile(temp_audio_file)
@@ -92,6 +139,46 @@ class TestAudioFile:
         read_data = audio_file.read()
         assert read_data == test_data
 
+    def test_seek_and_positional_reads(self, sample_mp3_file: Path):
+        """Test that reads follow the position set by seek and that read_at does not move it."""
+        file_data = sample_mp3_file.read_bytes()
+        audio_file = AudioFile(str(sample_mp3_file))
+
+        assert audio_file.seek(10) == 10
+        assert audio_file.read(4) == file_data[10:14]
+        assert audio_file.read(2) == file_data[14:16]
+        assert audio_file.read_at(100, 8) == file_data[100:108]
+        assert audio_file.read(2) == file_data[16:18]
+        assert audio_file.seek(-128, 2) == len(file_data) - 128
+        assert audio_file.read() == file_data[-128:]
+        assert audio_file.get_file_size() == len(file_data)
+
+    def test_single_open_per_operation(self, sample_mp3_file: Path):
+        """Test that reading all the metadata and technical info opens the file once and reuses cached blocks."""
+        audio_file = AudioFile(str(sample_mp3_file))
+        get_merged_app_metadata(audio_file)
+        audio_file.get_technical_info()
+        assert audio_file.io_stats.opens == 1
+        # The sample fits in the head block, which is read once
+        assert audio_file.io_stats.bytes_read == sample_mp3_file.stat().st_size
+
+        audio_file.close()
+        audio_file.read_at(0, 4)
+        assert audio_file.io_stats.opens == 2
+
+    def test_file_object_write_invalidates_cache(self, sample_mp3_file: Path, tmp_path: Path):
+        """Test that writes through a writable file object are visible to later reads."""
+        mp3_file = tmp_path / "sample.mp3"
+        mp3_file.write_bytes(sample_mp3_file.read_bytes())
+        audio_file = AudioFile(str(mp3_file))
+        original_head = audio_file.read_at(0, 16)
+
+        with audio_file.get_file_object(writable=True) as f:
+            f.seek(3)
+            f.write(b"\x00\x00")
+        assert audio_file.read_at(0, 16) == original_head[:3] + b"\x00\x00" + original_head[5:]
+        assert mp3_file.read_bytes()[:16] == audio_file.read_at(0, 16)
+
     def test_file_name_methods(self, sample_mp3_file: Path):
         """Test file name methods."""
         audio_file = AudioFile(sample_mp3_file)
@@ -0,0 +1,101 @@
+"""Tests for the bext, cart, iXML and id3 chunks of broadcast WAV files."""
+
+import io
+from pathlib import Path
+
+from mutagen.id3 import ID3, TALB, TPE1
+
+from audiometa import AudioFile, get_single_format_app_metadata, update_file_metadata
+from audiometa.manager.rating_supporting.RiffManager import RiffManager
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.TagFormat import MetadataFormat
+
+
+# 16-bit stereo PCM at 44.1 kHz
+FMT_DATA = (b"\x01\x00\x02\x00" + (44100).to_bytes(4, "little") + (176400).to_bytes(4, "little") + b"\x04\x00\x10\x00")
+DATA_SIZE = 1024 * 1024
+TEXT_SIZE = 100 * 1000
+
+
+def render_chunk(chunk_id: bytes, data: bytes) -> bytes:
+    return chunk_id + len(data).to_bytes(4, "little") + data + bytes(len(data) % 2)
+
+
+def render_text(text: str, size: int) -> bytes:
+    return text.encode().ljust(size, b"\x00")
+
+
+def render_bext_chunk(description: str, origination_date: str, coding_history: str) -> bytes:
+    return render_chunk(b"bext", render_text(description, 256) + bytes(32 + 32) + render_text(origination_date, 10)
+                        + bytes(8 + 264) + coding_history.encode())
+
+
+def render_cart_chunk(title: str, url: str, tag_text: str) -> bytes:
+    return render_chunk(b"cart", b"0101" + render_text(title, 64) + bytes(64 * 6 + 36 + 64 * 3 + 344)
+                        + render_text(url, 1024) + tag_text.encode())
+
+
+def render_id3_chunk() -> bytes:
+    tags = ID3()
+    tags.add(TPE1(encoding=3, text=["Id3 artist"]))
+    tags.add(TALB(encoding=3, text=["Id3 album"]))
+    data = io.BytesIO()
+    tags.save(data, padding=lambda info: 0)
+    return render_chunk(b"id3 ", data.getvalue())
+
+
+def create_broadcast_wav(path: Path, info_title: str | None) -> None:
+    """Write a WAV file whose broadcast chunks follow the data chunk, the bext and cart chunks having long texts."""
+    chunks = render_chunk(b"fmt ", FMT_DATA)
+    if info_title is not None:
+        chunks += render_chunk(b"LIST", b"INFO" + render_chunk(b"INAM", info_title.encode() + b"\x00"))
+    chunks += (render_chunk(b"data", bytes(DATA_SIZE))
+               + render_bext_chunk("Bext description", "2024-05-01", "A=PCM,F=44100,W=16\r\n" * (TEXT_SIZE // 20))
+               + render_cart_chunk("Cart title", "https://example.com/cut/42", "T" * TEXT_SIZE)
+               + render_chunk(b"iXML", b"<?xml version=\"1.0\"?><BWFXML><PROJECT>Ixml project</PROJECT>"
+                                       b"<NOTE>Ixml note</NOTE><SPEED><NOTE>Nested</NOTE></SPEED></BWFXML>")
+               + render_id3_chunk())
+    path.write_bytes(b"RIFF" + (4 + len(chunks)).to_bytes(4, "little") + b"WAVE" + chunks)
+
+
+class TestBroadcastWaveChunks:
+    """Test cases for the chunks read with the INFO chunk of WAV files."""
+
+    def test_chunks_are_read_when_their_fields_are(self, tmp_path: Path):
+        """Test that each chunk is read the first time one of its fields is, the data chunk never being read."""
+        wav_path = tmp_path / "spot.wav"
+        create_broadcast_wav(wav_path, info_title="Info title")
+        audio_file = AudioFile(str(wav_path))
+        manager = RiffManager(audio_file)
+
+        assert manager.get_app_specific_metadata(AppMetadataKey.TITLE) == "Info title"
+        bytes_read = audio_file.io_stats.bytes_read
+        # Only the cached head and tail of the file and the chunk headers are read
+        assert bytes_read < 3 * 64 * 1024
+
+        assert manager.get_app_specific_metadata(AppMetadataKey.RECORDING_DATE) == "2024-05-01"
+        assert audio_file.io_stats.bytes_read > bytes_read + TEXT_SIZE
+        bytes_read = audio_file.io_stats.bytes_read
+        assert manager.get_app_specific_metadata(AppMetadataKey.ENCODER_SETTINGS).startswith("A=PCM,F=44100,W=16")
+        assert audio_file.io_stats.bytes_read == bytes_read
+
+        assert manager.get_app_specific_metadata(AppMetadataKey.URL) == "https://example.com/cut/42"
+        # The bext and cart chunks are read besides the cached head and tail, not the data chunk
+        assert audio_file.io_stats.bytes_read < 2 * 64 * 1024 + 2 * TEXT_SIZE + 4096 < DATA_SIZE
+
+    def test_chunk_fields_are_fallbacks_of_info_fields(self, tmp_path: Path):
+        """Test that the fields of the other chunks are read for the keys missing from the INFO chunk."""
+        wav_path = tmp_path / "spot.wav"
+        create_broadcast_wav(wav_path, info_title=None)
+
+        metadata = get_single_format_app_metadata(str(wav_path), MetadataFormat.RIFF)
+        assert metadata[AppMetadataKey.TITLE] == "Cart title"
+        assert metadata[AppMetadataKey.ARTISTS_NAMES] == ["Id3 artist"]
+        assert metadata[AppMetadataKey.ALBUM_NAME] == "Id3 album"
+        assert metadata[AppMetadataKey.COMMENT] == "Bext description"
+
+        update_file_metadata(str(wav_path), {AppMetadataKey.TITLE: "Info title"})
+        metadata = get_single_format_app_metadata(str(wav_path), MetadataFormat.RIFF)
+        assert metadata[AppMetadataKey.TITLE] == "Info title"
+        assert metadata[AppMetadataKey.URL] == "https://example.com/cut/42"
+        assert metadata[AppMetadataKey.COMMENT] == "Bext description"
@@ -0,0 +1,81 @@
+"""Tests for the command-line interface."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from audiometa import get_merged_app_metadata, update_file_metadata
+from audiometa.cli import main
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.tag_regions import get_id3v2_tag_size
+
+
+def read_jsonl(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def copy_flac(sample_flac_file: Path, path: Path, title: str | None = None) -> str:
+    path.write_bytes(sample_flac_file.read_bytes())
+    if title is not None:
+        update_file_metadata(str(path), {AppMetadataKey.TITLE: title})
+    return str(path)
+
+
+class TestCli:
+    """Test cases for the audiometa command."""
+
+    def test_read_and_scan(self, sample_flac_file: Path, tmp_path: Path, capsys: pytest.CaptureFixture):
+        """Test that read and scan write a JSON line per file, with the error of the files that failed."""
+        (tmp_path / "album").mkdir()
+        first_path = copy_flac(sample_flac_file, tmp_path / "album" / "first.flac", title="First")
+        second_path = copy_flac(sample_flac_file, tmp_path / "second.flac", title="Second")
+        (tmp_path / "cover.jpg").write_bytes(b"\xff\xd8")
+
+        assert main(["scan", str(tmp_path), "--workers", "2", "--technical"]) == 0
+        results = {result["path"]: result for result in read_jsonl(capsys.readouterr().out)}
+        assert sorted(results) == sorted([first_path, second_path])
+        assert results[first_path]["metadata"] == {"title": "First"}
+        assert results[second_path]["technical_info"]["codec"] == "flac"
+
+        missing_path = str(tmp_path / "missing.flac")
+        output_path = tmp_path / "read.jsonl"
+        assert main(["read", second_path, missing_path, "--output", str(output_path)]) == 1
+        results = read_jsonl(output_path.read_text())
+        assert {result["path"]: "error" in result for result in results} == {second_path: False, missing_path: True}
+
+    def test_read_commands_do_not_modify_files(self, sample_mp3_file: Path, tmp_path: Path,
+                                                capsys: pytest.CaptureFixture):
+        """Test that read, scan and bench do not write an empty ID3v2 tag into an MP3 file without one."""
+        mp3_data = sample_mp3_file.read_bytes()
+        mp3_path = tmp_path / "untagged.mp3"
+        mp3_path.write_bytes(mp3_data[get_id3v2_tag_size(mp3_data):])
+        untagged_data = mp3_path.read_bytes()
+
+        assert main(["read", str(mp3_path)]) == 0
+        assert main(["scan", str(tmp_path), "--technical"]) == 0
+        assert main(["bench", str(mp3_path)]) == 0
+        capsys.readouterr()
+        assert mp3_path.read_bytes() == untagged_data
+
+    def test_write_from_manifest_with_resume(self, sample_flac_file: Path, tmp_path: Path,
+                                             capsys: pytest.CaptureFixture):
+        """Test that a manifest run resumed with --resume skips the files already written."""
+        paths = [copy_flac(sample_flac_file, tmp_path / f"track{index}.flac") for index in range(3)]
+        manifest_path = tmp_path / "manifest.jsonl"
+        manifest_path.write_text("".join(
+            json.dumps({"path": path, "metadata": {"title": f"Title {index}", "artists_names": ["A", "B"]}}) + "\n"
+            for index, path in enumerate(paths)))
+        # As if a previous run had been interrupted after the first file
+        (tmp_path / "manifest.jsonl.done").write_text(paths[0] + "\n")
+
+        assert main(["write", "--manifest", str(manifest_path), "--resume", "--workers", "2"]) == 0
+        assert sorted(result["path"] for result in read_jsonl(capsys.readouterr().out)) == paths[1:]
+        assert AppMetadataKey.TITLE not in get_merged_app_metadata(paths[0])
+        metadata = get_merged_app_metadata(paths[2])
+        assert metadata[AppMetadataKey.TITLE] == "Title 2" and metadata[AppMetadataKey.ARTISTS_NAMES] == ["A", "B"]
+        assert sorted((tmp_path / "manifest.jsonl.done").read_text().split()) == sorted(paths)
+
+        assert main(["write", paths[0], "--set", "title=Set title"]) == 0
+        assert get_merged_app_metadata(paths[0])[AppMetadataKey.TITLE] == "Set title"
+        assert main(["write", paths[0], "--set", "not_a_key=1"]) == 2
@@ -0,0 +1,102 @@
+"""Tests for the columnar batch export of metadata and technical info."""
+
+import csv
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from audiometa import (export_columns, export_columns_to_csv, export_columns_to_jsonl, iter_exported_column_chunks,
+                       update_file_metadata)
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.tag_regions import get_id3v2_tag_size
+
+
+EXPORT_KEYS = [AppMetadataKey.TITLE, AppMetadataKey.ARTISTS_NAMES, AppMetadataKey.RATING, "duration_in_sec"]
+
+
+def create_library(sample_flac_file: Path, directory: Path, count: int) -> list[str]:
+    """Write count tagged copies of the sample FLAC file, with two artists alternating."""
+    paths = []
+    for index in range(count):
+        path = directory / f"track{index}.flac"
+        path.write_bytes(sample_flac_file.read_bytes())
+        update_file_metadata(str(path), {AppMetadataKey.TITLE: f"Title {index}",
+                                         AppMetadataKey.ARTISTS_NAMES: [f"Artist {index % 2}", "Guest"],
+                                         AppMetadataKey.RATING: 20 * (index % 5)},
+                             normalized_rating_max_value=100)
+        paths.append(str(path))
+    return paths
+
+
+class TestColumnarExport:
+    """Test cases for export_columns and the CSV and JSONL exports."""
+
+    def test_export_columns(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that numeric keys are exported as floats and string keys with each distinct value stored once."""
+        paths = create_library(sample_flac_file, tmp_path, count=6)
+        missing_path = str(tmp_path / "missing.flac")
+
+        columns = export_columns(paths + [missing_path], keys=EXPORT_KEYS, workers=3, normalized_rating_max_value=100)
+        assert sorted(columns.paths) == sorted(paths + [missing_path])
+        assert columns.keys == ["title", "artists_names", "rating", "duration_in_sec"]
+        assert [path for path, _ in columns.errors] == [missing_path]
+
+        artists_column = columns.string_columns["artists_names"]
+        assert sorted(artists_column.values) == ["Artist 0; Guest", "Artist 1; Guest"]
+        for index, path in enumerate(columns.paths):
+            if path == missing_path:
+                assert math.isnan(columns.numeric_columns["rating"][index]) and artists_column.codes[index] == -1
+                continue
+            track_index = paths.index(path)
+            assert columns.get_value("title", index) == f"Title {track_index}"
+            assert columns.get_value("rating", index) == 20 * (track_index % 5)
+            assert columns.get_value("duration_in_sec", index) > 0
+
+        with pytest.raises(ValueError):
+            export_columns(paths, keys=["not_a_key"])
+
+    def test_chunked_writers(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that the CSV and JSONL exports write a row per file, chunk by chunk, in the order of the paths."""
+        paths = create_library(sample_flac_file, tmp_path, count=5)
+        assert [len(chunk) for chunk in iter_exported_column_chunks(paths, keys=EXPORT_KEYS, chunk_size=2)] == [2, 2, 1]
+
+        csv_path = tmp_path / "library.csv"
+        assert export_columns_to_csv(paths, str(csv_path), keys=EXPORT_KEYS, workers=1, chunk_size=2,
+                                     normalized_rating_max_value=100) == []
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["path"] for row in rows] == paths
+        assert rows[1]["title"] == "Title 1" and rows[1]["artists_names"] == "Artist 1; Guest"
+        assert rows[2]["rating"] == "40.0"
+
+        jsonl_path = tmp_path / "library.jsonl"
+        export_columns_to_jsonl(paths, str(jsonl_path), keys=EXPORT_KEYS, workers=1, chunk_size=2,
+                                normalized_rating_max_value=100)
+        rows = [json.loads(line) for line in jsonl_path.read_text(encoding="utf-8").splitlines()]
+        assert [row["path"] for row in rows] == paths
+        assert rows[3]["rating"] == 60.0
+
+    def test_numpy_columns(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that the columns are viewed as NumPy arrays."""
+        numpy = pytest.importorskip("numpy")
+        paths = create_library(sample_flac_file, tmp_path, count=3)
+
+        columns = export_columns(paths, keys=EXPORT_KEYS, workers=1, normalized_rating_max_value=100)
+        ratings = columns.to_numpy("rating")
+        assert ratings.dtype == numpy.float64 and list(ratings) == [0.0, 20.0, 40.0]
+        artist_codes = columns.to_numpy("artists_names")
+        assert artist_codes.dtype == numpy.int32 and list(artist_codes) == [0, 1, 0]
+
+    def test_export_does_not_modify_files(self, sample_mp3_file: Path, tmp_path: Path):
+        """Test that exporting an MP3 file without ID3v2 tag does not write an empty tag into it."""
+        mp3_data = sample_mp3_file.read_bytes()
+        mp3_path = tmp_path / "untagged.mp3"
+        mp3_path.write_bytes(mp3_data[get_id3v2_tag_size(mp3_data):])
+        untagged_data = mp3_path.read_bytes()
+
+        columns = export_columns([str(mp3_path)], keys=EXPORT_KEYS, workers=1)
+        assert columns.errors == []
+        assert columns.get_value("duration_in_sec", 0) > 0
+        assert mp3_path.read_bytes() == untagged_data
@@ -0,0 +1,68 @@
+"""Tests for the updates writing only the metadata values that differ from the current ones."""
+
+from pathlib import Path
+
+import pytest
+
+from audiometa import AudioFile, get_merged_app_metadata, update_file_metadata
+from audiometa.exceptions import MetadataNotSupportedError
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+class TestDiffAwareUpdate:
+    """Test cases for update_file_metadata skipping unchanged values."""
+
+    def test_unchanged_values_are_not_written(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that only the modified keys are reported, and that the file is not written if no value changes."""
+        flac_path = tmp_path / "copy.flac"
+        flac_path.write_bytes(sample_flac_file.read_bytes())
+        app_metadata = {AppMetadataKey.TITLE: "Title", AppMetadataKey.ARTISTS_NAMES: ["A", "B"],
+                        AppMetadataKey.RATING: 65}
+        result = update_file_metadata(str(flac_path), app_metadata, normalized_rating_max_value=100)
+        assert result.modified and result.modified_keys == list(app_metadata)
+
+        file_data = flac_path.read_bytes()
+        audio_file = AudioFile(str(flac_path))
+        # The rating is compared as read back, rounded down to 60
+        result = update_file_metadata(audio_file, {**app_metadata, AppMetadataKey.ALBUM_NAME: None},
+                                      normalized_rating_max_value=100)
+        assert not result.modified
+        assert audio_file.io_stats.bytes_written == 0
+        assert flac_path.read_bytes() == file_data
+
+        result = update_file_metadata(str(flac_path), {**app_metadata, AppMetadataKey.TITLE: "Other"},
+                                      normalized_rating_max_value=100)
+        assert result.modified_keys == [AppMetadataKey.TITLE]
+        metadata = get_merged_app_metadata(str(flac_path), normalized_rating_max_value=100)
+        assert metadata[AppMetadataKey.TITLE] == "Other" and metadata[AppMetadataKey.RATING] == 60
+
+    def test_riff_info_fields_of_other_keys_are_kept(self, sample_wav_file: Path, tmp_path: Path):
+        """Test that a WAV update keeps the INFO fields it does not set, and skips the write if none changes."""
+        wav_data = sample_wav_file.read_bytes()
+        wav_path = tmp_path / "copy.wav"
+        wav_path.write_bytes(wav_data[wav_data.index(b"RIFF"):])
+        update_file_metadata(str(wav_path), {AppMetadataKey.TITLE: "Title", AppMetadataKey.LANGUAGE: "en"})
+        result = update_file_metadata(str(wav_path), {AppMetadataKey.ALBUM_NAME: "Album"})
+        assert result.modified_keys == [AppMetadataKey.ALBUM_NAME]
+        metadata = get_merged_app_metadata(str(wav_path))
+        assert metadata[AppMetadataKey.TITLE] == "Title" and metadata[AppMetadataKey.ALBUM_NAME] == "Album"
+
+        file_data = wav_path.read_bytes()
+        audio_file = AudioFile(str(wav_path))
+        assert not update_file_metadata(audio_file, {AppMetadataKey.TITLE: "Title",
+                                                     AppMetadataKey.LANGUAGE: "en"}).modified
+        assert audio_file.io_stats.bytes_written == 0
+        assert wav_path.read_bytes() == file_data
+
+    def test_keys_that_cannot_be_written_raise_even_if_unchanged(self, sample_wav_file: Path, tmp_path: Path):
+        """Test that a key read from WAV files but not written raises, whether its value is the current one or not."""
+        wav_data = sample_wav_file.read_bytes()
+        wav_path = tmp_path / "copy.wav"
+        wav_path.write_bytes(wav_data[wav_data.index(b"RIFF"):])
+        assert get_merged_app_metadata(str(wav_path)).get(AppMetadataKey.COMMENT) is None
+
+        file_data = wav_path.read_bytes()
+        for comment in (None, "Comment"):
+            with pytest.raises(MetadataNotSupportedError):
+                update_file_metadata(str(wav_path), {AppMetadataKey.TITLE: "Title", AppMetadataKey.COMMENT: comment})
+        assert wav_path.read_bytes() == file_data
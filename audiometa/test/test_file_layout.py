@@ -0,0 +1,110 @@
+"""Tests for the byte-range layout of audio files."""
+
+from pathlib import Path
+
+import pytest
+
+from audiometa import AudioFile, LayoutRegion, LayoutRegionType
+from audiometa.exceptions import FileCorruptedError, FileTypeNotSupportedError
+
+
+ID3V2_TAG = b"ID3\x03\x00\x00\x00\x00\x00\x20" + b"TIT2\x00\x00\x00\x06\x00\x00\x03Title" + bytes(16)
+ID3V1_TAG = b"TAG" + b"Title".ljust(30, b"\x00") + bytes(95)
+
+
+def create_wav(path: Path, chunks: list[tuple[bytes, bytes]]) -> None:
+    """Write a RIFF WAVE file with the given (ID, data) chunks."""
+    body = b"".join(chunk_id + len(data).to_bytes(4, "little") + data + bytes(len(data) & 1)
+                    for chunk_id, data in chunks)
+    path.write_bytes(b"RIFF" + (len(body) + 4).to_bytes(4, "little") + b"WAVE" + body)
+
+
+def assert_covers_file(layout: list[LayoutRegion], file_size: int) -> None:
+    """Assert that the regions are contiguous and cover the whole file."""
+    assert layout[0].offset == 0
+    for region, next_region in zip(layout, layout[1:]):
+        assert region.end == next_region.offset
+    assert layout[-1].end == file_size
+
+
+class TestFileLayout:
+    """Test cases for AudioFile.get_layout."""
+
+    def test_mp3_layout(self, tmp_path: Path):
+        """Test that an MP3 file is split into its ID3v2 tag and padding, audio payload and ID3v1 tag."""
+        mp3_path = tmp_path / "track.mp3"
+        mp3_path.write_bytes(ID3V2_TAG + b"\xff\xfb\x90\x00" + bytes(1000) + ID3V1_TAG)
+
+        layout = AudioFile(str(mp3_path)).get_layout()
+        assert [(region.type, region.offset, region.size) for region in layout] == [
+            (LayoutRegionType.ID3V2_TAG, 0, 26),
+            (LayoutRegionType.ID3V2_PADDING, 26, 16),
+            (LayoutRegionType.AUDIO_PAYLOAD, 42, 1004),
+            (LayoutRegionType.ID3V1_TAG, 1046, 128),
+        ]
+
+    def test_mp3_layout_with_id3v2_footer(self, tmp_path: Path):
+        """Test that the footer of an ID3v2.4 tag is part of the tag and not of its padding."""
+        mp3_path = tmp_path / "track.mp3"
+        frames = b"TIT2\x00\x00\x00\x06\x00\x00\x03Title" + bytes(4)
+        mp3_path.write_bytes(b"ID3\x04\x00\x10\x00\x00\x00\x14" + frames + b"3DI\x04\x00\x10\x00\x00\x00\x14"
+                             + b"\xff\xfb\x90\x00" + bytes(1000))
+
+        layout = AudioFile(str(mp3_path)).get_layout()
+        assert [(region.type, region.offset, region.size, region.name) for region in layout] == [
+            (LayoutRegionType.ID3V2_TAG, 0, 26, None),
+            (LayoutRegionType.ID3V2_PADDING, 26, 4, None),
+            (LayoutRegionType.ID3V2_TAG, 30, 10, "FOOTER"),
+            (LayoutRegionType.AUDIO_PAYLOAD, 40, 1004, None),
+        ]
+
+    def test_flac_layout(self, sample_flac_file: Path):
+        """Test that each FLAC metadata block is a region, followed by the audio payload."""
+        audio_file = AudioFile(str(sample_flac_file))
+        layout = audio_file.get_layout()
+        assert_covers_file(layout, audio_file.get_file_size())
+
+        marker_index = [region.type for region in layout].index(LayoutRegionType.FLAC_MARKER)
+        blocks = layout[marker_index + 1:-1]
+        assert blocks and all(region.type == LayoutRegionType.FLAC_METADATA_BLOCK for region in blocks)
+        assert blocks[0].name == "STREAMINFO"
+        assert layout[-1].type == LayoutRegionType.AUDIO_PAYLOAD
+        assert audio_file.read_at(layout[marker_index].offset, 4) == b"fLaC"
+
+    def test_wav_layout(self, tmp_path: Path):
+        """Test that each RIFF chunk is a region, the data of the 'data' chunk being the audio payload."""
+        wav_path = tmp_path / "track.wav"
+        create_wav(wav_path, [(b"fmt ", bytes(16)), (b"LIST", b"INFOINAM\x06\x00\x00\x00Title\x00"),
+                              (b"data", bytes(1001))])
+
+        layout = AudioFile(str(wav_path)).get_layout()
+        assert_covers_file(layout, wav_path.stat().st_size)
+        assert [(region.type, region.name) for region in layout] == [
+            (LayoutRegionType.RIFF_HEADER, None),
+            (LayoutRegionType.RIFF_CHUNK, "fmt "),
+            (LayoutRegionType.RIFF_CHUNK, "LIST/INFO"),
+            (LayoutRegionType.RIFF_CHUNK, "data"),
+            (LayoutRegionType.AUDIO_PAYLOAD, None),
+            (LayoutRegionType.UNKNOWN, None),
+        ]
+        assert layout[4].size == 1001 and layout[5].size == 1
+
+    def test_layout_is_cached_until_written(self, tmp_path: Path):
+        """Test that the layout is read once, and read again after a write through the instance."""
+        mp3_path = tmp_path / "track.mp3"
+        mp3_path.write_bytes(ID3V2_TAG + b"\xff\xfb\x90\x00" + bytes(1000))
+        audio_file = AudioFile(str(mp3_path))
+        layout = audio_file.get_layout()
+        assert audio_file.get_layout() is layout
+
+        audio_file.remove_range(0, len(ID3V2_TAG))
+        assert [region.type for region in audio_file.get_layout()] == [LayoutRegionType.AUDIO_PAYLOAD]
+
+    def test_unsupported_and_corrupted_files(self, sample_ogg_file: Path, tmp_path: Path):
+        """Test that formats without a layout are rejected, and invalid structures reported as corrupted."""
+        with pytest.raises(FileTypeNotSupportedError):
+            AudioFile(str(sample_ogg_file)).get_layout()
+        flac_path = tmp_path / "truncated.flac"
+        flac_path.write_bytes(b"fLaC\x00\x00\x00\x22")
+        with pytest.raises(FileCorruptedError):
+            AudioFile(str(flac_path)).get_layout()
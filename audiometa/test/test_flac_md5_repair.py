@@ -0,0 +1,55 @@
+"""Tests for batch FLAC MD5 repair."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from audiometa import FLAC_FAST_COMPRESSION_LEVEL, repair_flac_md5_many
+
+
+class TestFlacMd5Repair:
+    """Test cases for the batch FLAC MD5 repair pipeline."""
+
+    @pytest.mark.skipif(shutil.which("flac") is None, reason="flac binary not installed")
+    def test_repair_writes_to_destination_dir(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that corrected files are written to the destination directory under their own name."""
+        destination_dir = tmp_path / "repaired"
+        results = list(repair_flac_md5_many(
+            [str(sample_flac_file)], str(destination_dir), compression_level=FLAC_FAST_COMPRESSION_LEVEL, workers=1))
+
+        assert len(results) == 1
+        result = results[0]
+        assert result.success
+        assert result.destination_path == str(destination_dir / sample_flac_file.name)
+        assert Path(result.destination_path).stat().st_size > 0
+        assert result.elapsed_sec >= 0
+        assert result.completed_count == 1
+        # No partial file is left behind
+        assert [path.name for path in destination_dir.iterdir()] == [sample_flac_file.name]
+
+    def test_repair_streams_progress(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that every file yields one result and that progress counts up to the total."""
+        sources = []
+        for index in range(4):
+            source = tmp_path / f"track_{index}.flac"
+            shutil.copy2(sample_flac_file, source)
+            sources.append(str(source))
+
+        results = list(repair_flac_md5_many(iter(sources), str(tmp_path / "out"), workers=2))
+        assert sorted(result.source_path for result in results) == sources
+        assert [result.completed_count for result in results] == [1, 2, 3, 4]
+
+    def test_repair_reports_failures(self, sample_mp3_file: Path, tmp_path: Path):
+        """Test that a failing file is reported without stopping the batch."""
+        results = list(repair_flac_md5_many([str(sample_mp3_file)], str(tmp_path), workers=1))
+        assert len(results) == 1
+        assert not results[0].success
+        assert "FileTypeNotSupportedError" in results[0].error
+        assert results[0].destination_path is None
+
+    def test_repair_rejects_duplicate_names(self, sample_mp3_file: Path, tmp_path: Path):
+        """Test that two sources with the same file name do not overwrite each other."""
+        results = list(repair_flac_md5_many([str(sample_mp3_file), str(sample_mp3_file)], str(tmp_path), workers=1))
+        assert len(results) == 2
+        assert any("already written" in (result.error or "") for result in results)
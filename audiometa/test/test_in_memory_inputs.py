@@ -0,0 +1,78 @@
+"""Tests for bytes-like and stream inputs of AudioFile."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from audiometa import AudioFile, get_merged_app_metadata, update_file_metadata
+from audiometa.exceptions import FileTypeNotSupportedError
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+class TestInMemoryInputs:
+    """Test cases for AudioFile over bytes, memoryview and BytesIO content."""
+
+    @pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, io.BytesIO])
+    def test_technical_info_matches_file(self, sample_flac_file: Path, wrap):
+        """Test that in-memory content has the same technical info as the file it comes from."""
+        audio_file = AudioFile(wrap(sample_flac_file.read_bytes()))
+        assert audio_file.file_path is None
+        assert audio_file.file_extension == ".flac"
+        assert audio_file.get_technical_info() == AudioFile(str(sample_flac_file)).get_technical_info()
+
+    def test_extension_is_guessed_from_content(self, sample_mp3_file: Path, sample_flac_file: Path,
+                                               sample_wav_file: Path, sample_ogg_file: Path):
+        """Test that the format of in-memory content is detected from its first bytes, or can be given."""
+        assert AudioFile(sample_mp3_file.read_bytes()).file_extension == ".mp3"
+        assert AudioFile(sample_flac_file.read_bytes()).file_extension == ".flac"
+        assert AudioFile(sample_wav_file.read_bytes()).file_extension == ".wav"
+        assert AudioFile(sample_ogg_file.read_bytes()).file_extension == ".ogg"
+        assert AudioFile(b"\x00" * 16).file_extension == ""
+        assert AudioFile(b"\x00" * 16, file_extension="MP3").file_extension == ".mp3"
+
+    def test_id3v2_tag_in_front_of_flac_content(self, sample_flac_file: Path):
+        """Test that an ID3v2 tag in front of FLAC content does not make it detected as MP3."""
+        id3_tag = b"ID3\x03\x00\x00\x00\x00\x00\x04" + b"\x00" * 4
+        assert AudioFile(id3_tag + sample_flac_file.read_bytes()).file_extension == ".flac"
+
+    def test_bytes_are_read_in_place(self, sample_mp3_file: Path):
+        """Test that bytes-like content is exposed without copy and only the parsed slices are read."""
+        data = bytearray(sample_mp3_file.read_bytes())
+        audio_file = AudioFile(data)
+        assert audio_file.get_buffer().obj is data
+        audio_file.get_duration_in_sec()
+        assert audio_file.io_stats.opens == 0
+        assert 0 < audio_file.io_stats.bytes_read < len(data)
+
+    def test_bytes_are_read_only(self, sample_mp3_file: Path):
+        """Test that writing to bytes-like content fails without modifying it."""
+        data = sample_mp3_file.read_bytes()
+        audio_file = AudioFile(data)
+        assert audio_file.is_read_only()
+        with pytest.raises(io.UnsupportedOperation):
+            audio_file.write(b"data")
+
+    def test_stream_metadata_round_trip(self, sample_flac_file: Path):
+        """Test that metadata written to a BytesIO is written in place and read back from its content."""
+        stream = io.BytesIO(sample_flac_file.read_bytes())
+        update_file_metadata(AudioFile(stream), {AppMetadataKey.TITLE: "In Memory"})
+        assert get_merged_app_metadata(AudioFile(stream.getvalue()))[AppMetadataKey.TITLE] == "In Memory"
+
+    def test_mp3_seek_table_from_bytes(self, sample_mp3_file: Path):
+        """Test that the seek table of in-memory content matches the one of the file."""
+        in_memory_seek_table = AudioFile(sample_mp3_file.read_bytes()).get_mp3_seek_table()
+        assert in_memory_seek_table == AudioFile(str(sample_mp3_file)).get_mp3_seek_table()
+
+    def test_in_memory_content_has_no_file_name(self, sample_mp3_file: Path):
+        """Test that file operations needing a path are rejected for in-memory content."""
+        audio_file = AudioFile(io.BytesIO(sample_mp3_file.read_bytes()))
+        with pytest.raises(FileTypeNotSupportedError):
+            audio_file.get_file_name_system()
+        with pytest.raises(io.UnsupportedOperation):
+            audio_file.open_file()
+
+    def test_unsupported_object(self):
+        """Test that objects that are neither paths, bytes-like nor streams are rejected."""
+        with pytest.raises(FileTypeNotSupportedError):
+            AudioFile(42)
@@ -0,0 +1,98 @@
+"""Tests for the stage timing instrumentation."""
+
+from pathlib import Path
+
+import pytest
+
+from audiometa import (AudioFile, HistogramInstrumentation, StageTimingHistogram, get_merged_app_metadata,
+                       get_single_format_app_metadata, set_instrumentation, update_file_metadata)
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.TagFormat import MetadataFormat
+from audiometa.utils.instrumentation import Instrumentation, get_instrumentation
+
+
+class RecordingInstrumentation(Instrumentation):
+    """Instrumentation keeping every recorded stage key."""
+
+    def __init__(self):
+        self.stage_keys = []
+
+    def record(self, stage_key, elapsed_sec):
+        self.stage_keys.append(stage_key)
+
+
+@pytest.fixture
+def histogram_instrumentation():
+    """Install a histogram instrumentation for the duration of a test."""
+    instrumentation = HistogramInstrumentation()
+    previous_instrumentation = set_instrumentation(instrumentation)
+    yield instrumentation
+    set_instrumentation(previous_instrumentation)
+
+
+class TestInstrumentation:
+    """Test cases for the stage timing instrumentation."""
+
+    def test_disabled_by_default(self, sample_mp3_file: Path):
+        """Test that nothing is recorded when no instrumentation is installed."""
+        assert get_instrumentation() is None
+        get_merged_app_metadata(str(sample_mp3_file))
+
+    def test_read_stages_are_timed_per_format_and_manager(
+            self, sample_mp3_file: Path, histogram_instrumentation: HistogramInstrumentation):
+        """Test that every read stage is aggregated under the file format and manager class."""
+        get_single_format_app_metadata(str(sample_mp3_file), MetadataFormat.ID3V2)
+        get_single_format_app_metadata(str(sample_mp3_file), MetadataFormat.ID3V2)
+
+        histograms = histogram_instrumentation.get_histograms()
+        for stage in ('extract_mutagen_metadata', 'convert_raw_mutagen_metadata', 'regroup_raw_metadata',
+                      'normalize.title'):
+            histogram = histograms[('.mp3', 'Id3v2Manager', stage)]
+            assert histogram.count == 2
+            assert 0 <= histogram.min_sec <= histogram.max_sec
+            assert sum(histogram.bucket_counts) == 2
+
+    def test_write_stages_are_timed(self, temp_audio_file: Path, sample_mp3_file: Path, sample_wav_file: Path,
+                                    tmp_path: Path, histogram_instrumentation: HistogramInstrumentation):
+        """Test that mutagen saves and direct file writes are timed."""
+        temp_audio_file.write_bytes(sample_mp3_file.read_bytes())
+        update_file_metadata(str(temp_audio_file), {AppMetadataKey.TITLE: "Timed Title"})
+        assert ('.mp3', 'Id3v2Manager', 'save') in histogram_instrumentation.get_histograms()
+
+        wav_file = tmp_path / "sample.wav"
+        wav_file.write_bytes(sample_wav_file.read_bytes())
+        update_file_metadata(str(wav_file), {AppMetadataKey.TITLE: "Timed Title"})
+        histograms = histogram_instrumentation.get_histograms()
+        assert ('.wav', 'RiffManager', 'update_not_using_mutagen_metadata') in histograms
+        assert ('.wav', 'AudioFile', 'write') in histograms
+
+    def test_subprocess_calls_are_timed(self, sample_flac_file: Path):
+        """Test that external tools are timed under their name, even when they fail."""
+        instrumentation = RecordingInstrumentation()
+        previous_instrumentation = set_instrumentation(instrumentation)
+        try:
+            try:
+                AudioFile(str(sample_flac_file)).is_flac_file_md5_valid()
+            except Exception:
+                pass
+        finally:
+            set_instrumentation(previous_instrumentation)
+        assert ('.flac', 'AudioFile', 'subprocess.flac') in instrumentation.stage_keys
+
+    def test_histogram_percentiles(self):
+        """Test the histogram statistics."""
+        histogram = StageTimingHistogram()
+        assert histogram.get_percentile(0.5) == 0.0
+        for elapsed_sec in (0.001, 0.001, 0.001, 0.5):
+            histogram.add(elapsed_sec)
+        assert histogram.count == 4
+        assert histogram.get_mean_sec() == pytest.approx(0.12575)
+        assert histogram.get_percentile(0.5) <= 0.002
+        assert histogram.get_percentile(1.0) == 0.5
+
+    def test_reset(self, sample_mp3_file: Path, histogram_instrumentation: HistogramInstrumentation):
+        """Test that reset clears the histograms."""
+        get_merged_app_metadata(str(sample_mp3_file))
+        assert histogram_instrumentation.get_histograms()
+        histogram_instrumentation.reset()
+        assert histogram_instrumentation.get_histograms() == {}
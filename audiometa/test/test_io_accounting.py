@@ -0,0 +1,76 @@
+"""Tests for I/O accounting and byte budgets."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from audiometa import (AudioFile, ByteBudgetPolicy, get_merged_app_metadata, get_single_format_app_metadata,
+                       update_file_metadata)
+from audiometa.exceptions import ByteBudgetExceededError, ByteBudgetExceededWarning
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.TagFormat import MetadataFormat
+
+
+class TestIoAccounting:
+    """Test cases for AudioFile.io_stats and max_bytes_read."""
+
+    def test_metadata_read_is_counted(self, sample_mp3_file: Path):
+        """Test that mutagen reads through the manager are counted on the AudioFile."""
+        audio_file = AudioFile(str(sample_mp3_file))
+        assert audio_file.io_stats.opens == 0
+
+        get_single_format_app_metadata(audio_file, MetadataFormat.ID3V2)
+        io_stats = audio_file.io_stats
+        assert io_stats.opens >= 1
+        assert io_stats.reads >= 1
+        assert 0 < io_stats.bytes_read <= sample_mp3_file.stat().st_size
+        assert io_stats.writes == io_stats.bytes_written == 0
+
+    def test_write_is_counted(self, sample_mp3_file: Path, tmp_path: Path):
+        """Test that mutagen saves are counted as writes."""
+        mp3_file = tmp_path / "sample.mp3"
+        shutil.copy2(sample_mp3_file, mp3_file)
+        audio_file = AudioFile(str(mp3_file))
+        update_file_metadata(audio_file, {AppMetadataKey.TITLE: "Counted Title"})
+        assert audio_file.io_stats.bytes_written > 0
+
+        audio_file.reset_io_stats()
+        assert audio_file.io_stats.opens == audio_file.io_stats.bytes_written == 0
+
+    def test_budget_raises_on_whole_file_read(self, sample_wav_file: Path):
+        """Test that a read exceeding the budget raises, e.g. the RIFF manager loading the whole file."""
+        audio_file = AudioFile(str(sample_wav_file), max_bytes_read=1024)
+        with pytest.raises(ByteBudgetExceededError):
+            get_merged_app_metadata(audio_file)
+
+    def test_budget_warns_once(self, sample_wav_file: Path):
+        """Test that the warning policy lets the operation complete and warns once."""
+        audio_file = AudioFile(str(sample_wav_file), max_bytes_read=1024,
+                               byte_budget_policy=ByteBudgetPolicy.WARN)
+        with pytest.warns(ByteBudgetExceededWarning) as warning_records:
+            for _ in range(2):
+                with audio_file.open_file() as f:
+                    f.read()
+        assert len(warning_records) == 1
+        assert audio_file.io_stats.bytes_read == 2 * sample_wav_file.stat().st_size
+
+    def test_budget_is_checked_before_external_tools(self, sample_flac_file: Path):
+        """Test that an external tool reading the whole file is not run when it would exceed the budget."""
+        audio_file = AudioFile(str(sample_flac_file), max_bytes_read=1024)
+        with pytest.raises(ByteBudgetExceededError):
+            audio_file.is_flac_file_md5_valid()
+        assert audio_file.io_stats.opens == 0
+
+    def test_budget_large_enough_for_header_reads(self, sample_flac_file: Path):
+        """Test that reading FLAC metadata and technical info stays within the file size."""
+        file_size = sample_flac_file.stat().st_size
+        audio_file = AudioFile(str(sample_flac_file), max_bytes_read=2 * file_size)
+        get_single_format_app_metadata(audio_file, MetadataFormat.VORBIS)
+        audio_file.get_technical_info()
+        assert audio_file.io_stats.bytes_read <= 2 * file_size
+
+    def test_invalid_budget(self, sample_mp3_file: Path):
+        """Test that a negative budget is rejected."""
+        with pytest.raises(ValueError):
+            AudioFile(str(sample_mp3_file), max_bytes_read=-1)
@@ -0,0 +1,92 @@
+"""Tests for the persistent SQLite library index."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from audiometa import LibraryIndex, update_file_metadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+@pytest.fixture
+def library_dir(tmp_path: Path, sample_mp3_file: Path, sample_flac_file: Path) -> Path:
+    """Create a small library with nested directories."""
+    library = tmp_path / "library"
+    (library / "album_a").mkdir(parents=True)
+    (library / "album_b").mkdir(parents=True)
+    shutil.copy2(sample_mp3_file, library / "album_a" / "track1.mp3")
+    shutil.copy2(sample_mp3_file, library / "album_a" / "track2.mp3")
+    shutil.copy2(sample_flac_file, library / "album_b" / "track3.flac")
+    (library / "album_b" / "cover.jpg").write_bytes(b"not audio")
+    return library
+
+
+class TestLibraryIndex:
+    """Test cases for LibraryIndex."""
+
+    def test_initial_sync_indexes_supported_files(self, library_dir: Path, tmp_path: Path):
+        """Test that the first sync reads every supported file and skips the others."""
+        with LibraryIndex(str(library_dir), str(tmp_path / "index.db")) as index:
+            report = index.sync()
+            assert report.added == 3
+            assert report.updated == report.removed == report.unchanged == 0
+            assert len(index) == 3
+            assert index.get_app_metadata(str(library_dir / "album_b" / "cover.jpg")) is None
+
+    def test_incremental_sync(self, library_dir: Path, tmp_path: Path):
+        """Test that only changed files are re-read and that deletions are detected."""
+        db_path = str(tmp_path / "index.db")
+        with LibraryIndex(str(library_dir), db_path) as index:
+            index.sync()
+
+        changed_file = library_dir / "album_a" / "track1.mp3"
+        stat_result = changed_file.stat()
+        os.utime(changed_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+        (library_dir / "album_b" / "track3.flac").unlink()
+
+        with LibraryIndex(str(library_dir), db_path) as index:
+            report = index.sync()
+            assert report.updated == 1
+            assert report.removed == 1
+            assert report.unchanged == 1
+            assert report.added == 0
+            assert len(index) == 2
+
+            second_report = index.sync()
+            assert second_report.unchanged == 2
+            assert second_report.updated == second_report.added == second_report.removed == 0
+
+    def test_sync_does_not_modify_files(self, library_dir: Path, tmp_path: Path, sample_wav_file: Path):
+        """Test that syncing leaves the files as they are, so that the next sync finds them unchanged."""
+        shutil.copy2(sample_wav_file, library_dir / "album_b" / "track4.wav")
+        file_contents = {path: path.read_bytes() for path in library_dir.rglob("*") if path.is_file()}
+        with LibraryIndex(str(library_dir), str(tmp_path / "index.db")) as index:
+            assert index.sync(workers=2).added == 4
+            assert {path: path.read_bytes() for path in file_contents} == file_contents
+            assert index.sync().unchanged == 4
+
+    def test_find_by_indexed_columns(self, library_dir: Path, tmp_path: Path):
+        """Test queries by artist, album and duration."""
+        tagged_file = library_dir / "album_a" / "track2.mp3"
+        update_file_metadata(str(tagged_file), {
+            AppMetadataKey.ARTISTS_NAMES: ["Index Artist"],
+            AppMetadataKey.ALBUM_NAME: "Index Album",
+        })
+
+        with LibraryIndex(str(library_dir), str(tmp_path / "index.db")) as index:
+            index.sync()
+            assert index.find(artist="index artist") == [str(tagged_file)]
+            assert index.find(album="Index Album", artist="Index Artist") == [str(tagged_file)]
+            assert index.find(artist="Unknown Artist") == []
+            assert len(index.find(min_duration_in_sec=0.5, max_duration_in_sec=2)) >= 2
+            assert index.get_app_metadata(str(tagged_file))[AppMetadataKey.ALBUM_NAME] == "Index Album"
+
+    def test_rating_normalization_change_forces_reread(self, library_dir: Path, tmp_path: Path):
+        """Test that changing the rating scale invalidates the indexed files."""
+        db_path = str(tmp_path / "index.db")
+        with LibraryIndex(str(library_dir), db_path, normalized_rating_max_value=5) as index:
+            index.sync()
+        with LibraryIndex(str(library_dir), db_path, normalized_rating_max_value=10) as index:
+            assert index.sync().updated == 3
@@ -0,0 +1,181 @@
+"""Tests for the inotify library watcher."""
+
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from audiometa import LibraryChangeType, LibraryIndex, LibraryWatcher, update_file_metadata, watch_library
+from audiometa.library_watcher import IN_Q_OVERFLOW
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only available on Linux")
+
+DEBOUNCE_SEC = 0.2
+EVENT_TIMEOUT_SEC = 5
+
+
+@pytest.fixture
+def library_dir(tmp_path: Path, sample_mp3_file: Path) -> Path:
+    """Create a small library with one album."""
+    library = tmp_path / "library"
+    (library / "album").mkdir(parents=True)
+    shutil.copy2(sample_mp3_file, library / "album" / "track1.mp3")
+    return library
+
+
+class TestLibraryWatcher:
+    """Test cases for LibraryWatcher and watch_library."""
+
+    def test_written_file_emits_old_and_new_metadata(self, library_dir: Path):
+        """Test that rewriting a file emits a single debounced event with the metadata before and after."""
+        track = library_dir / "album" / "track1.mp3"
+        with LibraryWatcher(str(library_dir), debounce_sec=DEBOUNCE_SEC) as watcher:
+            update_file_metadata(str(track), {AppMetadataKey.TITLE: "First Title"})
+            update_file_metadata(str(track), {AppMetadataKey.TITLE: "First Title"})
+            events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+            assert len(events) == 1
+            assert events[0].path == str(track)
+            assert events[0].change_type == LibraryChangeType.MODIFIED
+            assert events[0].old_metadata is None
+            assert events[0].new_metadata[AppMetadataKey.TITLE] == "First Title"
+
+            update_file_metadata(str(track), {AppMetadataKey.TITLE: "Second Title"})
+            events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+            assert len(events) == 1
+            assert events[0].old_metadata[AppMetadataKey.TITLE] == "First Title"
+            assert events[0].new_metadata[AppMetadataKey.TITLE] == "Second Title"
+            assert watcher.get_app_metadata(str(track))[AppMetadataKey.TITLE] == "Second Title"
+
+    def test_unsupported_and_unchanged_files_are_ignored(self, library_dir: Path):
+        """Test that files with unsupported extensions and reads do not emit events."""
+        with LibraryWatcher(str(library_dir), debounce_sec=DEBOUNCE_SEC) as watcher:
+            (library_dir / "album" / "cover.jpg").write_bytes(b"not audio")
+            with open(library_dir / "album" / "track1.mp3", "rb") as f:
+                f.read()
+            assert watcher.read_events(timeout=2 * DEBOUNCE_SEC + 0.2) == []
+
+    def test_reading_a_file_does_not_notify_it_again(self, library_dir: Path, tmp_path: Path,
+                                                     sample_flac_file: Path):
+        """Test that reading a changed file leaves it unmodified, so that it emits no second event."""
+        shutil.copy2(sample_flac_file, tmp_path / "track2.flac")
+        file_data = sample_flac_file.read_bytes()
+        with LibraryWatcher(str(library_dir), debounce_sec=DEBOUNCE_SEC) as watcher:
+            os.rename(tmp_path / "track2.flac", library_dir / "album" / "track2.flac")
+            assert len(watcher.read_events(timeout=EVENT_TIMEOUT_SEC)) == 1
+            assert watcher.read_events(timeout=2 * DEBOUNCE_SEC + 0.2) == []
+            assert (library_dir / "album" / "track2.flac").read_bytes() == file_data
+
+    def test_moved_in_and_removed_files(self, library_dir: Path, tmp_path: Path, sample_flac_file: Path):
+        """Test that files moved into a new directory are read and that deletions are reported."""
+        outside_dir = tmp_path / "outside_album"
+        outside_dir.mkdir()
+        shutil.copy2(sample_flac_file, outside_dir / "track2.flac")
+
+        with LibraryWatcher(str(library_dir), debounce_sec=DEBOUNCE_SEC) as watcher:
+            os.rename(outside_dir, library_dir / "new_album")
+            events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+            assert [(event.path, event.change_type) for event in events] == [
+                (str(library_dir / "new_album" / "track2.flac"), LibraryChangeType.MODIFIED)]
+            assert events[0].new_metadata is not None
+
+            (library_dir / "new_album" / "track2.flac").unlink()
+            events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+            assert len(events) == 1
+            assert events[0].change_type == LibraryChangeType.REMOVED
+            assert events[0].old_metadata is not None
+            assert events[0].new_metadata is None
+
+    def test_index_is_kept_up_to_date(self, library_dir: Path, tmp_path: Path):
+        """Test that the index provides the old metadata and receives the new one."""
+        track = library_dir / "album" / "track1.mp3"
+        update_file_metadata(str(track), {AppMetadataKey.TITLE: "Indexed Title"})
+        with LibraryIndex(str(library_dir), str(tmp_path / "index.db")) as index:
+            index.sync()
+            with LibraryWatcher(str(library_dir), debounce_sec=DEBOUNCE_SEC, index=index) as watcher:
+                update_file_metadata(str(track), {AppMetadataKey.TITLE: "Watched Title"})
+                events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+                assert events[0].old_metadata[AppMetadataKey.TITLE] == "Indexed Title"
+                assert events[0].new_metadata[AppMetadataKey.TITLE] == "Watched Title"
+                assert index.get_app_metadata(str(track))[AppMetadataKey.TITLE] == "Watched Title"
+
+                shutil.move(str(library_dir / "album"), str(tmp_path / "moved_out"))
+                events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+                assert [(event.path, event.change_type) for event in events] == [
+                    (str(track), LibraryChangeType.REMOVED)]
+                assert events[0].old_metadata[AppMetadataKey.TITLE] == "Watched Title"
+                assert len(index) == 0
+
+    @pytest.mark.parametrize("with_index", [False, True])
+    def test_changes_lost_on_overflow_are_emitted(self, library_dir: Path, tmp_path: Path, sample_flac_file: Path,
+                                                  with_index: bool):
+        """Test that after an inotify queue overflow, the changed and removed files emit their events."""
+        shutil.copy2(sample_flac_file, library_dir / "album" / "track2.flac")
+        shutil.copy2(sample_flac_file, library_dir / "album" / "track3.flac")
+        index = LibraryIndex(str(library_dir), str(tmp_path / "index.db")) if with_index else None
+        if index is not None:
+            index.sync()
+        try:
+            with LibraryWatcher(str(library_dir), debounce_sec=DEBOUNCE_SEC, index=index) as watcher:
+                update_file_metadata(str(library_dir / "album" / "track1.mp3"), {AppMetadataKey.TITLE: "Lost Title"})
+                (library_dir / "album" / "track2.flac").unlink()
+                (library_dir / "new_album").mkdir()
+                shutil.copy2(sample_flac_file, library_dir / "new_album" / "track4.flac")
+                # The notifications are dropped, as the kernel does when the queue overflows
+                while True:
+                    try:
+                        os.read(watcher.fileno(), 64 * 1024)
+                    except BlockingIOError:
+                        break
+                watcher._handle_inotify_event(-1, IN_Q_OVERFLOW, "", time.monotonic())
+
+                events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+                assert sorted((event.path, event.change_type) for event in events) == [
+                    (str(library_dir / "album" / "track1.mp3"), LibraryChangeType.MODIFIED),
+                    (str(library_dir / "album" / "track2.flac"), LibraryChangeType.REMOVED),
+                    (str(library_dir / "new_album" / "track4.flac"), LibraryChangeType.MODIFIED),
+                ]
+                assert watcher.get_app_metadata(str(library_dir / "album" / "track1.mp3"))[
+                    AppMetadataKey.TITLE] == "Lost Title"
+
+                # The new directory is watched again
+                (library_dir / "new_album" / "track4.flac").unlink()
+                events = watcher.read_events(timeout=EVENT_TIMEOUT_SEC)
+                assert [(event.path, event.change_type) for event in events] == [
+                    (str(library_dir / "new_album" / "track4.flac"), LibraryChangeType.REMOVED)]
+        finally:
+            if index is not None:
+                index.close()
+
+    def test_watch_library_stops_on_event(self, library_dir: Path):
+        """Test that watch_library yields changes and returns once its stop event is set."""
+        stop_event = threading.Event()
+        received_events = []
+
+        def consume():
+            for event in watch_library(str(library_dir), debounce_sec=DEBOUNCE_SEC, stop_event=stop_event):
+                received_events.append(event)
+                stop_event.set()
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        try:
+            # Give the watcher time to set up its watches before writing
+            stop_event.wait(0.5)
+            update_file_metadata(str(library_dir / "album" / "track1.mp3"), {AppMetadataKey.TITLE: "Title"})
+        finally:
+            consumer.join(timeout=EVENT_TIMEOUT_SEC)
+            stop_event.set()
+        assert not consumer.is_alive()
+        assert len(received_events) == 1
+
+    def test_unsupported_platform_raises_os_error(self, library_dir: Path, monkeypatch: pytest.MonkeyPatch):
+        """Test that creating a watcher without inotify raises OSError."""
+        monkeypatch.setattr(sys, "platform", "darwin")
+        with pytest.raises(OSError, match="inotify"):
+            LibraryWatcher(str(library_dir))
@@ -0,0 +1,133 @@
+"""Tests for the native deletion of RIFF INFO chunks and ID3 tags."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from audiometa import (AudioFile, MetadataDeletionReport, delete_metadata, delete_metadata_with_report,
+                       delete_potential_id3_metadata_with_header, update_file_metadata)
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.TagFormat import MetadataFormat
+from audiometa.utils.tag_regions import encode_synchsafe_int
+
+
+ID3V2_TAG = b"ID3\x03\x00\x00\x00\x00\x00\x14" + b"TIT2\x00\x00\x00\x06\x00\x00\x03Title" + bytes(4)
+ID3V1_TAG = b"TAG" + b"Title".ljust(30, b"\x00") + bytes(95)
+
+
+def get_chunk_ids(data: bytes) -> list[bytes]:
+    """Returns the IDs of the chunks of RIFF content, LIST chunks being identified by their list type."""
+    chunk_ids = []
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_size = int.from_bytes(data[pos + 4:pos + 8], "little")
+        chunk_ids.append(data[pos + 8:pos + 12] if data[pos:pos + 4] == b"LIST" else data[pos:pos + 4])
+        pos += 8 + ((chunk_size + 1) & ~1)
+    return chunk_ids
+
+
+@pytest.fixture
+def tagged_wav(tmp_path: Path, sample_wav_file: Path) -> Path:
+    """Create a copy of the sample WAV file starting with its RIFF header, with an INFO chunk."""
+    wav_data = sample_wav_file.read_bytes()
+    wav_path = tmp_path / "tagged.wav"
+    wav_path.write_bytes(wav_data[wav_data.index(b"RIFF"):])
+    update_file_metadata(str(wav_path), {AppMetadataKey.TITLE: "Title to Delete"})
+    return wav_path
+
+
+@pytest.fixture
+def tagged_mp3(tmp_path: Path) -> Path:
+    """Create an MP3-like file with a leading ID3v2 tag and a trailing ID3v1 tag around 2 MiB of audio."""
+    mp3_path = tmp_path / "tagged.mp3"
+    mp3_path.write_bytes(ID3V2_TAG + b"\xff\xfb\x90\x00" + os.urandom(2 * 1024 * 1024) + ID3V1_TAG)
+    return mp3_path
+
+
+class TestMetadataDeletion:
+    """Test cases for delete_metadata_with_report and the native deletions of the managers."""
+
+    def test_riff_info_chunk_is_removed(self, tagged_wav: Path):
+        """Test that the INFO chunk is removed, the other chunks being kept with a valid RIFF size."""
+        data = tagged_wav.read_bytes()
+        report = delete_metadata_with_report(str(tagged_wav))
+
+        new_data = tagged_wav.read_bytes()
+        assert report == MetadataDeletionReport(success=True, bytes_reclaimed=len(data) - len(new_data))
+        assert report.bytes_reclaimed > 0
+        assert b"INFO" not in get_chunk_ids(new_data)
+        assert get_chunk_ids(new_data) == [chunk_id for chunk_id in get_chunk_ids(data) if chunk_id != b"INFO"]
+        assert int.from_bytes(new_data[4:8], "little") == len(new_data) - 8
+        assert new_data.endswith(data[data.index(b"data"):])
+
+    def test_riff_info_chunk_is_blanked_in_place(self, tagged_wav: Path):
+        """Test that in place, the INFO chunk is turned into a JUNK chunk without moving the other chunks."""
+        data = tagged_wav.read_bytes()
+        report = delete_metadata_with_report(str(tagged_wav), in_place=True)
+
+        new_data = tagged_wav.read_bytes()
+        assert report == MetadataDeletionReport(success=True, bytes_reclaimed=0, in_place=True)
+        assert len(new_data) == len(data)
+        assert b"INFO" not in get_chunk_ids(new_data) and b"JUNK" in get_chunk_ids(new_data)
+        assert new_data.index(b"data") == data.index(b"data")
+        assert b"Title to Delete" not in new_data
+
+    def test_riff_without_info_chunk(self, tagged_wav: Path):
+        """Test that deleting from a WAV file without an INFO chunk succeeds without changing it."""
+        assert delete_metadata(str(tagged_wav)) is True
+        data = tagged_wav.read_bytes()
+        assert delete_metadata_with_report(str(tagged_wav)) == MetadataDeletionReport(success=True, in_place=True)
+        assert tagged_wav.read_bytes() == data
+
+    def test_id3_tags_are_removed(self, tagged_mp3: Path):
+        """Test that the leading ID3v2 tag is removed by shifting the audio, and the ID3v1 tag truncated."""
+        data = tagged_mp3.read_bytes()
+        audio_file = AudioFile(str(tagged_mp3))
+        report = delete_metadata_with_report(audio_file, MetadataFormat.ID3V2)
+
+        assert report == MetadataDeletionReport(success=True, bytes_reclaimed=len(ID3V2_TAG) + len(ID3V1_TAG))
+        assert tagged_mp3.read_bytes() == data[len(ID3V2_TAG):-len(ID3V1_TAG)]
+        assert audio_file.io_stats.bytes_written == len(data) - len(ID3V2_TAG) - len(ID3V1_TAG)
+
+    def test_id3v2_tag_is_blanked_in_place(self, tagged_mp3: Path):
+        """Test that in place, the ID3v2 tag is replaced by padding of the same size."""
+        data = tagged_mp3.read_bytes()
+        report = delete_metadata_with_report(str(tagged_mp3), MetadataFormat.ID3V2, in_place=True)
+
+        new_data = tagged_mp3.read_bytes()
+        assert report == MetadataDeletionReport(success=True, bytes_reclaimed=len(ID3V1_TAG), in_place=True)
+        assert new_data == b"ID3\x03\x00\x00\x00\x00\x00\x14" + bytes(20) + data[len(ID3V2_TAG):-len(ID3V1_TAG)]
+
+    def test_id3v1_tag_is_truncated(self, tagged_mp3: Path):
+        """Test that deleting ID3v1 metadata only truncates the file."""
+        data = tagged_mp3.read_bytes()
+        report = delete_metadata_with_report(str(tagged_mp3), MetadataFormat.ID3V1)
+        assert report == MetadataDeletionReport(success=True, bytes_reclaimed=len(ID3V1_TAG), in_place=True)
+        assert tagged_mp3.read_bytes() == data[:-len(ID3V1_TAG)]
+
+    def test_id3_tags_in_front_of_flac(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that ID3v2 tags in front of FLAC content are removed."""
+        flac_data = sample_flac_file.read_bytes()
+        flac_data = flac_data[flac_data.index(b"fLaC"):]
+        flac_path = tmp_path / "tagged.flac"
+        flac_path.write_bytes(ID3V2_TAG + flac_data)
+
+        report = delete_potential_id3_metadata_with_header(AudioFile(str(flac_path)))
+        assert report.success and report.bytes_reclaimed == len(ID3V2_TAG)
+        assert flac_path.read_bytes() == flac_data
+
+    def test_read_only_content_is_not_deleted(self, tagged_mp3: Path):
+        """Test that deleting from read-only bytes-like content fails."""
+        assert not delete_metadata_with_report(tagged_mp3.read_bytes(), MetadataFormat.ID3V2).success
+
+    def test_large_id3v2_tag_is_removed_by_kernel_copies(self, tagged_mp3: Path):
+        """Test that audio shifted by more than a copy chunk is moved intact."""
+        audio_data = tagged_mp3.read_bytes()[len(ID3V2_TAG):]
+        padding_size = 1536 * 1024
+        id3v2_header = b"ID3\x04\x00\x00" + encode_synchsafe_int(padding_size)
+        tagged_mp3.write_bytes(id3v2_header + bytes(padding_size) + audio_data)
+
+        report = delete_metadata_with_report(str(tagged_mp3), MetadataFormat.ID3V2)
+        assert report.bytes_reclaimed == 10 + padding_size + len(ID3V1_TAG)
+        assert tagged_mp3.read_bytes() == audio_data[:-len(ID3V1_TAG)]
@@ -0,0 +1,56 @@
+"""Tests for MP3 seek tables."""
+
+import pytest
+from pathlib import Path
+
+from audiometa import AudioFile, Mp3DurationMode, Mp3SeekTable, get_mp3_seek_table
+from audiometa.exceptions import FileTypeNotSupportedError
+
+
+class TestMp3SeekTable:
+    """Test cases for MP3 seek table building and caching."""
+
+    def test_seek_table_covers_stream(self, sample_mp3_file: Path):
+        """Test that the seek table starts at the first audio frame and spans the whole stream."""
+        seek_table = get_mp3_seek_table(str(sample_mp3_file), interval_ms=100)
+
+        assert seek_table.sample_positions[0] == 0
+        assert seek_table.byte_offsets[0] == seek_table.audio_start
+        assert len(seek_table.byte_offsets) == len(seek_table.sample_positions)
+        assert list(seek_table.byte_offsets) == sorted(seek_table.byte_offsets)
+        exact_duration = AudioFile(str(sample_mp3_file)).get_duration_in_sec(Mp3DurationMode.EXACT)
+        assert seek_table.get_duration_in_sec() == pytest.approx(exact_duration)
+
+    def test_seek_table_interval(self, sample_mp3_file: Path):
+        """Test that consecutive entries are about interval_ms apart."""
+        seek_table = get_mp3_seek_table(str(sample_mp3_file), interval_ms=200)
+        interval_samples = 200 * seek_table.sample_rate / 1000
+        for previous, current in zip(seek_table.sample_positions, seek_table.sample_positions[1:]):
+            assert interval_samples <= current - previous + 1152
+
+    def test_find_position_for_ms(self, sample_mp3_file: Path):
+        """Test that lookups return the indexed frame at or before the requested position."""
+        seek_table = get_mp3_seek_table(str(sample_mp3_file), interval_ms=100)
+        byte_offset, sample_position = seek_table.find_position_for_ms(550)
+        assert sample_position <= 550 * seek_table.sample_rate / 1000
+        assert byte_offset in seek_table.byte_offsets
+
+        start, end = seek_table.get_byte_range_for_ms(0)
+        assert (start, end) == (seek_table.audio_start, seek_table.audio_end)
+
+    def test_serialization_round_trip(self, sample_mp3_file: Path):
+        """Test that a seek table survives serialization."""
+        seek_table = get_mp3_seek_table(str(sample_mp3_file), interval_ms=100)
+        assert Mp3SeekTable.from_bytes(seek_table.to_bytes()) == seek_table
+
+    def test_persistent_cache(self, sample_mp3_file: Path, tmp_path: Path):
+        """Test that seek tables are persisted in the cache directory."""
+        seek_table = get_mp3_seek_table(str(sample_mp3_file), interval_ms=250, cache_dir=str(tmp_path))
+        cache_files = list(tmp_path.glob("*.seektable"))
+        assert len(cache_files) == 1
+        assert Mp3SeekTable.from_bytes(cache_files[0].read_bytes()) == seek_table
+
+    def test_seek_table_non_mp3(self, sample_flac_file: Path):
+        """Test that seek tables are only built for MP3 files."""
+        with pytest.raises(FileTypeNotSupportedError):
+            get_mp3_seek_table(str(sample_flac_file))
@@ -0,0 +1,140 @@
+"""Tests for the iTunes-style metadata of MP4 audio files."""
+
+import os
+from pathlib import Path
+
+from mutagen.mp4 import MP4, Atoms, MP4Cover
+
+from audiometa import AudioFile, delete_metadata_with_report, get_merged_app_metadata, update_file_metadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+CHUNK_SIZE = 1000
+
+
+def render_atom(atom_type: bytes, data: bytes) -> bytes:
+    return (8 + len(data)).to_bytes(4, "big") + atom_type + data
+
+
+def render_moov(chunk_offsets: list[int]) -> bytes:
+    """Return a moov atom with an audio track of 2 seconds whose chunks are at chunk_offsets."""
+    mdhd = render_atom(b"mdhd", bytes(12) + (1000).to_bytes(4, "big") + (2000).to_bytes(4, "big") + bytes(4))
+    hdlr = render_atom(b"hdlr", bytes(8) + b"soun" + bytes(13))
+    stco = render_atom(b"stco", bytes(4) + len(chunk_offsets).to_bytes(4, "big")
+                       + b"".join(offset.to_bytes(4, "big") for offset in chunk_offsets))
+    minf = render_atom(b"minf", render_atom(b"stbl", stco))
+    return render_atom(b"moov", render_atom(b"trak", render_atom(b"mdia", mdhd + hdlr + minf)))
+
+
+def create_mp4(path: Path, chunk_count: int, moov_at_end: bool = False) -> None:
+    """Write an M4A file without metadata, with chunk_count chunks of random audio, moov before or after mdat."""
+    ftyp = render_atom(b"ftyp", b"M4A " + bytes(4) + b"M4A isom")
+    mdat = render_atom(b"mdat", os.urandom(chunk_count * CHUNK_SIZE))
+    moov_size = len(render_moov([0] * chunk_count))
+    audio_start = len(ftyp) + 8 + (0 if moov_at_end else moov_size)
+    moov = render_moov([audio_start + index * CHUNK_SIZE for index in range(chunk_count)])
+    path.write_bytes(ftyp + mdat + moov if moov_at_end else ftyp + moov + mdat)
+
+
+def read_chunks(path: Path) -> list[bytes]:
+    """Return the audio chunks of the file, found from the chunk offsets of its stco atom by mutagen."""
+    with open(path, "rb") as f:
+        stco = Atoms(f)[b"moov", b"trak", b"mdia", b"minf", b"stbl", b"stco"]
+        _, data = stco.read(f)
+        offsets = [int.from_bytes(data[8 + index:12 + index], "big") for index in range(0, len(data) - 8, 4)]
+        chunks = []
+        for offset in offsets:
+            f.seek(offset)
+            chunks.append(f.read(CHUNK_SIZE))
+    return chunks
+
+
+class TestMp4Metadata:
+    """Test cases for the ilst atom of MP4 files."""
+
+    def test_read_and_write(self, tmp_path: Path):
+        """Test that metadata written to an M4A file without any is read back, by mutagen too."""
+        mp4_path = tmp_path / "track.m4a"
+        create_mp4(mp4_path, chunk_count=20)
+        update_file_metadata(str(mp4_path), {AppMetadataKey.TITLE: "Title", AppMetadataKey.ARTISTS_NAMES: ["A", "B"],
+                                             AppMetadataKey.GENRE_NAME: "Rock", AppMetadataKey.RATING: 60},
+                             normalized_rating_max_value=100)
+
+        metadata = get_merged_app_metadata(str(mp4_path), normalized_rating_max_value=100)
+        assert metadata[AppMetadataKey.TITLE] == "Title"
+        assert metadata[AppMetadataKey.ARTISTS_NAMES] == ["A", "B"]
+        assert metadata[AppMetadataKey.GENRE_NAME] == "Rock"
+        assert metadata[AppMetadataKey.RATING] == 60
+        tags = MP4(mp4_path).tags
+        assert tags["©nam"] == ["Title"] and tags["©ART"] == ["A", "B"]
+        assert AudioFile(str(mp4_path)).get_duration_in_sec() == 2.0
+        assert AudioFile(mp4_path.read_bytes()).file_extension == ".m4a"
+
+    def test_update_keeps_other_items(self, tmp_path: Path):
+        """Test that items written by mutagen, not mapped to metadata keys, are kept by updates."""
+        mp4_path = tmp_path / "track.m4a"
+        create_mp4(mp4_path, chunk_count=20)
+        mp4 = MP4(mp4_path)
+        mp4.add_tags()
+        mp4.tags["©nam"] = ["Title"]
+        mp4.tags["covr"] = [MP4Cover(b"\x89PNG" + bytes(100), imageformat=MP4Cover.FORMAT_PNG)]
+        mp4.save()
+
+        update_file_metadata(str(mp4_path), {AppMetadataKey.TITLE: "New title"})
+        tags = MP4(mp4_path).tags
+        assert tags["©nam"] == ["New title"]
+        assert tags["covr"] == [b"\x89PNG" + bytes(100)]
+
+    def test_update_in_free_space(self, tmp_path: Path):
+        """Test that an update fitting in the free atom following the ilst atom rewrites only the ilst atom."""
+        mp4_path = tmp_path / "track.m4a"
+        create_mp4(mp4_path, chunk_count=20)
+        update_file_metadata(str(mp4_path), {AppMetadataKey.TITLE: "Title"})
+        data = mp4_path.read_bytes()
+
+        audio_file = AudioFile(str(mp4_path))
+        update_file_metadata(audio_file, {AppMetadataKey.TITLE: "A longer title", AppMetadataKey.ALBUM_NAME: "Album"})
+        new_data = mp4_path.read_bytes()
+        assert len(new_data) == len(data) and new_data[-20 * CHUNK_SIZE:] == data[-20 * CHUNK_SIZE:]
+        assert audio_file.io_stats.bytes_written < 2000
+        assert MP4(mp4_path).tags["©nam"] == ["A longer title"]
+
+    def test_growing_moov_before_audio_shifts_chunk_offsets(self, tmp_path: Path):
+        """Test that the chunk offsets are shifted when the moov atom, in front of the audio, outgrows its space."""
+        mp4_path = tmp_path / "track.m4a"
+        create_mp4(mp4_path, chunk_count=20)
+        chunks = read_chunks(mp4_path)
+
+        update_file_metadata(str(mp4_path), {AppMetadataKey.TITLE: "Title" * 1000})
+        assert read_chunks(mp4_path) == chunks
+        assert MP4(mp4_path).tags["©nam"] == ["Title" * 1000]
+
+    def test_moov_after_audio(self, tmp_path: Path):
+        """Test that the moov atom at the end of the file is rewritten without moving or reading the audio."""
+        mp4_path = tmp_path / "track.m4a"
+        create_mp4(mp4_path, chunk_count=500, moov_at_end=True)
+        chunks = read_chunks(mp4_path)
+
+        audio_file = AudioFile(str(mp4_path))
+        update_file_metadata(audio_file, {AppMetadataKey.TITLE: "Title" * 1000})
+        assert read_chunks(mp4_path) == chunks
+        # Only the cached head and tail of the file are read
+        assert audio_file.io_stats.bytes_read <= 2 * 64 * 1024 + 1024 < mp4_path.stat().st_size / 3
+        assert audio_file.io_stats.bytes_written < 10 * CHUNK_SIZE
+        assert get_merged_app_metadata(str(mp4_path))[AppMetadataKey.TITLE] == "Title" * 1000
+
+    def test_delete_metadata(self, tmp_path: Path):
+        """Test that deleting the metadata empties the ilst atom in place, or removes it reclaiming its space."""
+        mp4_path = tmp_path / "track.m4a"
+        create_mp4(mp4_path, chunk_count=20)
+        update_file_metadata(str(mp4_path), {AppMetadataKey.TITLE: "Title"})
+        chunks = read_chunks(mp4_path)
+        file_size = mp4_path.stat().st_size
+
+        in_place_report = delete_metadata_with_report(str(mp4_path), in_place=True)
+        assert in_place_report.in_place and mp4_path.stat().st_size == file_size
+        assert not MP4(mp4_path).tags
+
+        report = delete_metadata_with_report(str(mp4_path))
+        assert not report.in_place and report.bytes_reclaimed == file_size - mp4_path.stat().st_size > 0
+        assert read_chunks(mp4_path) == chunks
@@ -0,0 +1,140 @@
+"""Tests for the Vorbis comments of Ogg Vorbis and Opus files."""
+
+import os
+from pathlib import Path
+
+from mutagen.ogg import OggPage
+from mutagen.oggopus import OggOpus
+from mutagen.oggvorbis import OggVorbis
+
+from audiometa import AudioFile, delete_metadata_with_report, get_merged_app_metadata, update_file_metadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+OPUS_PRE_SKIP = 312
+
+
+def create_ogg_page(packets: list[bytes], serial: int, sequence: int, position: int, last: bool = False) -> bytes:
+    """Return an Ogg page holding the packets, written by mutagen."""
+    page = OggPage()
+    page.packets = packets
+    page.serial = serial
+    page.sequence = sequence
+    page.position = position
+    page.first = sequence == 0
+    page.last = last
+    return OggPage.write(page)
+
+
+def read_ogg_pages(path: Path) -> list[OggPage]:
+    """Return every page of the Ogg file, parsed by mutagen."""
+    pages = []
+    with open(path, "rb") as f:
+        while f.tell() < os.path.getsize(path):
+            pages.append(OggPage(f))
+    return pages
+
+
+def create_vorbis(path: Path, sample_ogg_file: Path, audio_page_count: int) -> None:
+    """Write the header pages of the sample Ogg Vorbis file followed by audio pages of 4000 random bytes each."""
+    header_pages = [page for page in read_ogg_pages(sample_ogg_file) if page.position == 0]
+    serial = header_pages[0].serial
+    audio_pages = [create_ogg_page([os.urandom(4000)], serial, len(header_pages) + index, (index + 1) * 1024,
+                                   last=index == audio_page_count - 1) for index in range(audio_page_count)]
+    path.write_bytes(b"".join(OggPage.write(page) for page in header_pages) + b"".join(audio_pages))
+
+
+def create_opus(path: Path, audio_page_count: int) -> None:
+    """Write an Ogg Opus file with an empty comment header and audio pages of 20 ms."""
+    identification_packet = (b"OpusHead" + bytes([1, 2]) + OPUS_PRE_SKIP.to_bytes(2, "little")
+                             + (44100).to_bytes(4, "little") + bytes(3))
+    comment_packet = b"OpusTags" + (4).to_bytes(4, "little") + b"test" + bytes(4)
+    pages = [create_ogg_page([identification_packet], 7, 0, 0), create_ogg_page([comment_packet], 7, 1, 0)]
+    pages += [create_ogg_page([os.urandom(200)], 7, 2 + index, OPUS_PRE_SKIP + (index + 1) * 960,
+                              last=index == audio_page_count - 1) for index in range(audio_page_count)]
+    path.write_bytes(b"".join(pages))
+
+
+class TestOggMetadata:
+    """Test cases for the Vorbis comments of Ogg files."""
+
+    def test_vorbis_read_and_write(self, sample_ogg_file: Path, tmp_path: Path):
+        """Test that Vorbis comments written to an Ogg Vorbis file are read back, by mutagen too."""
+        ogg_path = tmp_path / "track.ogg"
+        create_vorbis(ogg_path, sample_ogg_file, audio_page_count=10)
+        update_file_metadata(str(ogg_path), {AppMetadataKey.TITLE: "Title", AppMetadataKey.ARTISTS_NAMES: ["A", "B"]})
+
+        metadata = get_merged_app_metadata(str(ogg_path))
+        assert metadata[AppMetadataKey.TITLE] == "Title"
+        assert metadata[AppMetadataKey.ARTISTS_NAMES] == ["A", "B"]
+        assert OggVorbis(ogg_path)["artist"] == ["A", "B"]
+        assert AudioFile(str(ogg_path)).get_technical_info().codec == "vorbis"
+
+    def test_update_rewrites_header_pages_in_place(self, sample_ogg_file: Path, tmp_path: Path):
+        """Test that an update fitting in the padding of the comment header rewrites only the header pages."""
+        ogg_path = tmp_path / "track.ogg"
+        create_vorbis(ogg_path, sample_ogg_file, audio_page_count=10)
+        update_file_metadata(str(ogg_path), {AppMetadataKey.TITLE: "A long title, leaving padding once shortened"})
+        data = ogg_path.read_bytes()
+
+        audio_file = AudioFile(str(ogg_path))
+        update_file_metadata(audio_file, {AppMetadataKey.TITLE: "Short"})
+        new_data = ogg_path.read_bytes()
+        audio_start = read_ogg_pages(ogg_path)[-10].offset
+        assert len(new_data) == len(data) and new_data[audio_start:] == data[audio_start:]
+        assert audio_file.io_stats.bytes_written < audio_start
+        assert OggVorbis(ogg_path)["title"] == ["Short"]
+
+    def test_growing_comment_header_renumbers_audio_pages(self, sample_ogg_file: Path, tmp_path: Path):
+        """Test that the audio pages are renumbered, with valid CRCs, when the comment header needs more pages."""
+        ogg_path = tmp_path / "track.ogg"
+        create_vorbis(ogg_path, sample_ogg_file, audio_page_count=10)
+        page_count = len(read_ogg_pages(ogg_path))
+
+        update_file_metadata(str(ogg_path), {AppMetadataKey.TITLE: "Title" * 40000})
+        pages = read_ogg_pages(ogg_path)
+        data = ogg_path.read_bytes()
+        assert len(pages) == page_count + 3
+        assert [page.sequence for page in pages] == list(range(len(pages)))
+        assert all(OggPage.write(page) == data[page.offset:page.offset + page.size] for page in pages)
+        assert OggVorbis(ogg_path)["title"] == ["Title" * 40000]
+
+    def test_reads_only_header_and_last_pages(self, sample_ogg_file: Path, tmp_path: Path):
+        """Test that reading the comments and the duration of a large file reads neither its audio pages."""
+        ogg_path = tmp_path / "track.ogg"
+        create_vorbis(ogg_path, sample_ogg_file, audio_page_count=500)
+        update_file_metadata(str(ogg_path), {AppMetadataKey.TITLE: "Title"})
+
+        audio_file = AudioFile(str(ogg_path))
+        assert get_merged_app_metadata(audio_file)[AppMetadataKey.TITLE] == "Title"
+        assert audio_file.get_duration_in_sec() == 500 * 1024 / 44100
+        assert audio_file.io_stats.bytes_read <= 2 * 64 * 1024 < ogg_path.stat().st_size / 10
+
+    def test_opus(self, tmp_path: Path):
+        """Test that Opus files are recognized, with their duration and comments."""
+        opus_path = tmp_path / "track.opus"
+        create_opus(opus_path, audio_page_count=50)
+
+        assert AudioFile(opus_path.read_bytes()).file_extension == ".opus"
+        technical_info = AudioFile(str(opus_path)).get_technical_info()
+        assert (technical_info.codec, technical_info.sample_rate, technical_info.channels) == ("opus", 48000, 2)
+        assert technical_info.duration_in_sec == 1.0
+
+        update_file_metadata(str(opus_path), {AppMetadataKey.TITLE: "Title"})
+        assert get_merged_app_metadata(str(opus_path))[AppMetadataKey.TITLE] == "Title"
+        assert OggOpus(opus_path)["title"] == ["Title"]
+
+    def test_delete_metadata(self, sample_ogg_file: Path, tmp_path: Path):
+        """Test that deleting the comments keeps the vendor string, in place or reclaiming the padding."""
+        ogg_path = tmp_path / "track.ogg"
+        create_vorbis(ogg_path, sample_ogg_file, audio_page_count=10)
+        update_file_metadata(str(ogg_path), {AppMetadataKey.TITLE: "Title"})
+        vendor = OggVorbis(ogg_path).tags.vendor
+        file_size = ogg_path.stat().st_size
+
+        in_place_report = delete_metadata_with_report(str(ogg_path), in_place=True)
+        assert in_place_report.in_place and ogg_path.stat().st_size == file_size
+        assert not OggVorbis(ogg_path).tags and OggVorbis(ogg_path).tags.vendor == vendor
+
+        report = delete_metadata_with_report(str(ogg_path))
+        assert not report.in_place and report.bytes_reclaimed == file_size - ogg_path.stat().st_size > 0
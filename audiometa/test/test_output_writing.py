@@ -0,0 +1,67 @@
+"""Tests for writing updated files to a separate output."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from audiometa import AudioFile, get_merged_app_metadata, update_file_metadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.file_copy import copy_file_range
+
+
+class TestOutputWriting:
+    """Test cases for update_file_metadata(..., output=...) and AudioFile.write_to."""
+
+    @pytest.mark.parametrize("sample_fixture", ["sample_mp3_file", "sample_flac_file"])
+    def test_update_to_output_path_leaves_source_untouched(self, sample_fixture: str, tmp_path: Path,
+                                                           request: pytest.FixtureRequest):
+        """Test that the output has the new tags and the unchanged payload, and that the source is not modified."""
+        source: Path = request.getfixturevalue(sample_fixture)
+        source_data = source.read_bytes()
+        output = tmp_path / f"tagged{source.suffix}"
+
+        audio_file = AudioFile(str(source))
+        update_file_metadata(audio_file, {AppMetadataKey.TITLE: "Delivered"}, output=str(output))
+
+        assert source.read_bytes() == source_data
+        assert get_merged_app_metadata(str(output))[AppMetadataKey.TITLE] == "Delivered"
+        source_start, source_end = audio_file.get_audio_payload_region()
+        output_start, output_end = AudioFile(str(output)).get_audio_payload_region()
+        assert output.read_bytes()[output_start:output_end] == source_data[source_start:source_end]
+        assert not [path for path in tmp_path.iterdir() if path.name.endswith(".partial")]
+
+    def test_update_to_output_stream(self, sample_flac_file: Path):
+        """Test that the updated file is written to a stream from its current position."""
+        output = io.BytesIO()
+        output.write(b"prefix")
+        update_file_metadata(str(sample_flac_file), {AppMetadataKey.ARTISTS_NAMES: ["Streamed"]}, output=output)
+        assert output.getvalue().startswith(b"prefix")
+        tagged_data = output.getvalue()[len(b"prefix"):]
+        assert get_merged_app_metadata(tagged_data)[AppMetadataKey.ARTISTS_NAMES] == ["Streamed"]
+
+    def test_update_from_bytes_to_output(self, sample_mp3_file: Path, tmp_path: Path):
+        """Test that read-only bytes-like content can be tagged into an output."""
+        output = tmp_path / "tagged.mp3"
+        update_file_metadata(sample_mp3_file.read_bytes(), {AppMetadataKey.TITLE: "From Bytes"}, output=output)
+        assert get_merged_app_metadata(str(output))[AppMetadataKey.TITLE] == "From Bytes"
+
+    def test_write_to_without_tag_update_copies_file(self, sample_wav_file: Path, tmp_path: Path):
+        """Test that write_to copies formats without a payload region whole."""
+        output = tmp_path / "copy.wav"
+        audio_file = AudioFile(str(sample_wav_file))
+        assert audio_file.get_audio_payload_region() is None
+        audio_file.write_to(str(output))
+        assert output.read_bytes() == sample_wav_file.read_bytes()
+
+    def test_copy_file_range_with_offsets(self, tmp_path: Path):
+        """Test that byte ranges are copied between explicit offsets, and that short sources are reported."""
+        source = tmp_path / "source.bin"
+        source.write_bytes(bytes(range(256)) * 64)
+        destination = tmp_path / "destination.bin"
+        destination.write_bytes(b"head")
+        with open(source, "rb") as source_file, open(destination, "r+b") as destination_file:
+            copy_file_range(source_file.fileno(), 100, destination_file.fileno(), 4, 10_000)
+            with pytest.raises(OSError):
+                copy_file_range(source_file.fileno(), 16_000, destination_file.fileno(), 20_000, 1_000)
+        assert destination.read_bytes()[:10_004] == b"head" + source.read_bytes()[100:10_100]
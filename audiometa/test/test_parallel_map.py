@@ -0,0 +1,31 @@
+"""Tests for the bounded parallel map shared by the batch operations."""
+
+import itertools
+
+import pytest
+
+from audiometa.utils.parallel_map import PARALLEL_MAP_QUEUED_ITEMS_PER_WORKER, map_parallel
+
+
+class TestParallelMap:
+    """Test cases for map_parallel."""
+
+    def test_items_are_taken_lazily(self):
+        """Test that items are taken as results are consumed, falsy items included, up to the queue size."""
+        taken_items = []
+
+        def iter_items():
+            for item in itertools.count():
+                taken_items.append(item)
+                yield item
+
+        results = map_parallel(lambda item: item * 2, iter_items(), workers=2)
+        first_item, first_result = next(results)
+        assert first_result == first_item * 2
+        assert len(taken_items) <= PARALLEL_MAP_QUEUED_ITEMS_PER_WORKER * 2 + 1
+        results.close()
+
+        # Falsy items are mapped like any other
+        assert sorted(result for _, result in map_parallel(str, [None, 0, 1], workers=3)) == ["0", "1", "None"]
+        with pytest.raises(ValueError):
+            next(map_parallel(str, [1], workers=0))
@@ -0,0 +1,98 @@
+"""Tests for the audio payload hashes."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from audiometa import AudioFile, get_payload_hash, get_payload_hash_many, update_file_metadata
+from audiometa.exceptions import FileTypeNotSupportedError
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+ID3V2_TAG = b"ID3\x03\x00\x00\x00\x00\x00\x14" + b"TIT2\x00\x00\x00\x06\x00\x00\x03Title" + bytes(4)
+ID3V1_TAG = b"TAG" + b"Title".ljust(30, b"\x00") + bytes(95)
+
+
+def create_wav(path: Path, chunks: list[tuple[bytes, bytes]]) -> None:
+    """Write a RIFF WAVE file with the given (ID, data) chunks."""
+    body = b"".join(chunk_id + len(data).to_bytes(4, "little") + data + bytes(len(data) & 1)
+                    for chunk_id, data in chunks)
+    path.write_bytes(b"RIFF" + (len(body) + 4).to_bytes(4, "little") + b"WAVE" + body)
+
+
+class TestPayloadHash:
+    """Test cases for get_payload_hash and get_payload_hash_many."""
+
+    def test_mp3_tags_are_ignored(self, tmp_path: Path):
+        """Test that the ID3v2 and ID3v1 tags are not hashed."""
+        audio_data = b"\xff\xfb\x90\x00" + os.urandom(20_000)
+        tagged_path = tmp_path / "tagged.mp3"
+        tagged_path.write_bytes(ID3V2_TAG + audio_data + ID3V1_TAG)
+        untagged_path = tmp_path / "untagged.mp3"
+        untagged_path.write_bytes(audio_data)
+
+        assert get_payload_hash(str(tagged_path)) == hashlib.sha256(audio_data).hexdigest()
+        assert get_payload_hash(str(untagged_path)) == hashlib.sha256(audio_data).hexdigest()
+        assert get_payload_hash(str(tagged_path), algorithm="md5") == hashlib.md5(audio_data).hexdigest()
+
+    def test_flac_retagged_copy_has_same_hash(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that a FLAC file and its copy with other Vorbis comments have the same payload hash."""
+        copy_path = tmp_path / "copy.flac"
+        copy_path.write_bytes(sample_flac_file.read_bytes())
+        update_file_metadata(str(copy_path), {AppMetadataKey.TITLE: "A different title, longer than the padding" * 50})
+
+        assert copy_path.read_bytes() != sample_flac_file.read_bytes()
+        assert get_payload_hash(str(copy_path)) == get_payload_hash(str(sample_flac_file))
+
+    def test_wav_hashes_data_chunk_only(self, tmp_path: Path):
+        """Test that only the data chunk of WAV files is hashed, whatever the other chunks."""
+        audio_data = os.urandom(10_001)
+        wav_path = tmp_path / "track.wav"
+        create_wav(wav_path, [(b"fmt ", bytes(16)), (b"LIST", b"INFOINAM\x06\x00\x00\x00Title\x00"),
+                              (b"data", audio_data)])
+        other_wav_path = tmp_path / "other.wav"
+        create_wav(other_wav_path, [(b"fmt ", bytes(16)), (b"data", audio_data), (b"JUNK", bytes(100))])
+
+        assert get_payload_hash(str(wav_path)) == hashlib.sha256(audio_data).hexdigest()
+        assert get_payload_hash(str(other_wav_path)) == get_payload_hash(str(wav_path))
+
+    def test_hash_is_cached_by_file_identity(self, tmp_path: Path):
+        """Test that the hash of an unchanged file is served from the cache, and recomputed once it changes."""
+        mp3_path = tmp_path / "track.mp3"
+        mp3_path.write_bytes(b"\xff\xfb\x90\x00" + os.urandom(20_000))
+        payload_hash = get_payload_hash(str(mp3_path))
+
+        audio_file = AudioFile(str(mp3_path))
+        assert audio_file.get_payload_hash() == payload_hash
+        assert audio_file.io_stats.opens == 0
+
+        mp3_path.write_bytes(b"\xff\xfb\x90\x00" + os.urandom(30_000))
+        assert get_payload_hash(str(mp3_path)) != payload_hash
+
+    def test_in_memory_content(self, tmp_path: Path):
+        """Test that in-memory content is hashed like the file it comes from."""
+        mp3_path = tmp_path / "track.mp3"
+        mp3_path.write_bytes(ID3V2_TAG + b"\xff\xfb\x90\x00" + os.urandom(20_000))
+        assert get_payload_hash(mp3_path.read_bytes()) == get_payload_hash(str(mp3_path))
+
+    def test_unsupported_format(self, sample_ogg_file: Path):
+        """Test that formats whose payload cannot be located are rejected."""
+        with pytest.raises(FileTypeNotSupportedError):
+            get_payload_hash(str(sample_ogg_file))
+
+    def test_batch_hashing(self, tmp_path: Path):
+        """Test that every file yields one result, with failures carrying their error."""
+        paths = []
+        for index in range(4):
+            path = tmp_path / f"track_{index}.mp3"
+            path.write_bytes(ID3V2_TAG * index + b"\xff\xfb\x90\x00" + bytes(1000))
+            paths.append(str(path))
+        paths.append(str(tmp_path / "missing.mp3"))
+
+        results = {result.path: result for result in get_payload_hash_many(iter(paths), workers=2)}
+        assert sorted(results) == sorted(paths)
+        assert len({results[path].payload_hash for path in paths[:4]}) == 1
+        assert not results[paths[4]].success and results[paths[4]].payload_hash is None
+        assert sorted(result.completed_count for result in results.values()) == [1, 2, 3, 4, 5]
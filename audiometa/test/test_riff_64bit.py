@@ -0,0 +1,109 @@
+"""Tests for the RF64 and Wave64 forms of WAV files, used above 4 GB."""
+
+from pathlib import Path
+
+from audiometa import AudioFile, delete_metadata_with_report, get_single_format_app_metadata, update_file_metadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+from audiometa.utils.riff_chunks import W64_CHUNK_GUIDS, W64_RIFF_GUID, W64_WAVE_GUID
+from audiometa.utils.TagFormat import MetadataFormat
+
+
+# 16-bit stereo PCM at 44.1 kHz
+FMT_DATA = (b"\x01\x00\x02\x00" + (44100).to_bytes(4, "little") + (176400).to_bytes(4, "little") + b"\x04\x00\x10\x00")
+BYTE_RATE = 176400
+LARGE_DATA_SIZE = 5 * 1024 ** 3
+
+
+def render_info_chunk(title: bytes) -> bytes:
+    field = title + bytes(2 - len(title) % 2)
+    return (b"LIST" + (12 + len(field)).to_bytes(4, "little") + b"INFO"
+            + b"INAM" + len(field).to_bytes(4, "little") + field)
+
+
+def create_rf64(path: Path, data_size: int, chunks: bytes = b"") -> None:
+    """Write an RF64 file whose data chunk of data_size zero bytes is sparse, its size being in the ds64 chunk."""
+    fmt_chunk = b"fmt " + len(FMT_DATA).to_bytes(4, "little") + FMT_DATA
+    data_offset = 12 + 36 + len(fmt_chunk) + len(chunks) + 8
+    ds64 = (b"ds64" + (28).to_bytes(4, "little") + (data_offset + data_size - 8).to_bytes(8, "little")
+            + data_size.to_bytes(8, "little") + (data_size // 4).to_bytes(8, "little") + bytes(4))
+    with open(path, "wb") as f:
+        f.write(b"RF64\xff\xff\xff\xffWAVE" + ds64 + fmt_chunk + chunks + b"data\xff\xff\xff\xff")
+        f.truncate(data_offset + data_size)
+
+
+def create_w64(path: Path, data_size: int) -> None:
+    """Write a Wave64 file with a data chunk of data_size zero bytes."""
+    fmt_chunk = W64_CHUNK_GUIDS[b"fmt "] + (24 + len(FMT_DATA)).to_bytes(8, "little") + FMT_DATA
+    data_chunk = W64_CHUNK_GUIDS[b"data"] + (24 + data_size).to_bytes(8, "little") + bytes(data_size)
+    file_size = 40 + len(fmt_chunk) + len(data_chunk)
+    path.write_bytes(W64_RIFF_GUID + file_size.to_bytes(8, "little") + W64_WAVE_GUID + fmt_chunk + data_chunk)
+
+
+def get_riff_title(file: str | AudioFile) -> str:
+    """Return the title of the INFO chunk, only the RIFF format being read."""
+    return get_single_format_app_metadata(file, MetadataFormat.RIFF)[AppMetadataKey.TITLE]
+
+
+def get_chunk_names(path: Path) -> list[str]:
+    return [region.name for region in AudioFile(str(path)).get_layout() if region.name]
+
+
+class TestRiff64Bit:
+    """Test cases for RF64 and Wave64 files."""
+
+    def test_rf64_above_4gb_is_updated_in_place(self, tmp_path: Path):
+        """Test that the INFO chunk of a 5 GB RF64 file is read and updated in place, reading only chunk headers."""
+        wav_path = tmp_path / "long.wav"
+        junk_chunk = b"JUNK" + (200).to_bytes(4, "little") + bytes(200)
+        create_rf64(wav_path, LARGE_DATA_SIZE, render_info_chunk(b"Old title") + junk_chunk)
+
+        file_size = wav_path.stat().st_size
+        audio_file = AudioFile(str(wav_path))
+        assert get_riff_title(audio_file) == "Old title"
+        update_file_metadata(audio_file, {AppMetadataKey.TITLE: "A new and longer title"})
+        assert audio_file.io_stats.bytes_read < 256 * 1024 and audio_file.io_stats.bytes_written < 1024
+        assert wav_path.stat().st_size == file_size > LARGE_DATA_SIZE
+        assert get_riff_title(str(wav_path)) == "A new and longer title"
+
+        technical_info = AudioFile(str(wav_path)).get_technical_info()
+        assert technical_info.duration_in_sec == LARGE_DATA_SIZE / BYTE_RATE
+        assert (technical_info.codec, technical_info.channels, technical_info.bit_depth) == ("pcm_s16le", 2, 16)
+
+    def test_rf64_rewrite_updates_ds64_size(self, tmp_path: Path):
+        """Test that an INFO chunk inserted in an RF64 file follows the ds64 chunk, whose RIFF size is updated."""
+        wav_path = tmp_path / "track.wav"
+        create_rf64(wav_path, 4000)
+        update_file_metadata(str(wav_path), {AppMetadataKey.TITLE: "Title"})
+
+        data = wav_path.read_bytes()
+        assert data[:8] == b"RF64\xff\xff\xff\xff"
+        assert int.from_bytes(data[20:28], "little") == len(data) - 8
+        assert get_chunk_names(wav_path) == ["ds64", "LIST/INFO", "fmt ", "data"]
+        assert get_riff_title(str(wav_path)) == "Title"
+        assert AudioFile(data).file_extension == ".wav"
+
+        report = delete_metadata_with_report(str(wav_path))
+        data = wav_path.read_bytes()
+        assert report.bytes_reclaimed > 0 and int.from_bytes(data[20:28], "little") == len(data) - 8
+        assert get_chunk_names(wav_path) == ["ds64", "fmt ", "data"]
+
+    def test_w64(self, tmp_path: Path):
+        """Test that the INFO chunk of a Wave64 file is inserted, updated in place and deleted, its size kept valid."""
+        w64_path = tmp_path / "track.w64"
+        create_w64(w64_path, 176400)
+        assert AudioFile(w64_path.read_bytes()).file_extension == ".w64"
+        assert AudioFile(str(w64_path)).get_duration_in_sec() == 1.0
+
+        update_file_metadata(str(w64_path), {AppMetadataKey.TITLE: "A long title, leaving space once shortened"})
+        file_size = w64_path.stat().st_size
+        assert int.from_bytes(w64_path.read_bytes()[16:24], "little") == file_size
+        assert get_chunk_names(w64_path) == ["LIST/INFO", "fmt ", "data"]
+
+        update_file_metadata(str(w64_path), {AppMetadataKey.TITLE: "Short"})
+        assert w64_path.stat().st_size == file_size
+        assert get_chunk_names(w64_path) == ["LIST/INFO", "JUNK", "fmt ", "data"]
+        assert get_riff_title(str(w64_path)) == "Short"
+
+        delete_metadata_with_report(str(w64_path))
+        assert int.from_bytes(w64_path.read_bytes()[16:24], "little") == w64_path.stat().st_size
+        assert get_chunk_names(w64_path) == ["fmt ", "data"]
@@ -0,0 +1,95 @@
+"""Tests for the in-place and streaming updates of RIFF INFO chunks."""
+
+import io
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from audiometa import AudioFile, update_file_metadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+def get_chunks(data: bytes) -> list[tuple[bytes, int]]:
+    """Returns the (ID, size) of the chunks of RIFF content, LIST chunks being identified by their list type."""
+    chunks = []
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        chunk_size = int.from_bytes(data[pos + 4:pos + 8], "little")
+        chunks.append((data[pos + 8:pos + 12] if chunk_id == b"LIST" else chunk_id, chunk_size))
+        pos += 8 + ((chunk_size + 1) & ~1)
+    return chunks
+
+
+def get_info_fields(data: bytes) -> dict[bytes, bytes]:
+    """Returns the values of the fields of the INFO chunk of RIFF content."""
+    info_start = data.index(b"LIST") + 12
+    info_end = info_start - 4 + int.from_bytes(data[info_start - 8:info_start - 4], "little")
+    fields = {}
+    pos = info_start
+    while pos + 8 <= info_end:
+        field_size = int.from_bytes(data[pos + 4:pos + 8], "little")
+        fields[data[pos:pos + 4]] = data[pos + 8:pos + 8 + field_size].rstrip(b"\x00")
+        pos += 8 + ((field_size + 1) & ~1)
+    return fields
+
+
+@pytest.fixture
+def wav_copy(tmp_path: Path, sample_wav_file: Path) -> Path:
+    """Create a copy of the sample WAV file starting with its RIFF header."""
+    wav_data = sample_wav_file.read_bytes()
+    wav_path = tmp_path / "copy.wav"
+    wav_path.write_bytes(wav_data[wav_data.index(b"RIFF"):])
+    return wav_path
+
+
+class TestRiffInfoUpdate:
+    """Test cases for RiffManager INFO chunk updates."""
+
+    def test_growing_info_chunk_rewrites_file(self, wav_copy: Path):
+        """Test that a larger INFO chunk is written by a rewrite keeping the other chunks and a valid RIFF size."""
+        original_data = wav_copy.read_bytes()
+        os.chmod(wav_copy, 0o640)
+        update_file_metadata(str(wav_copy), {AppMetadataKey.TITLE: "A title much longer than the original one"})
+
+        data = wav_copy.read_bytes()
+        assert int.from_bytes(data[4:8], "little") == len(data) - 8
+        assert get_info_fields(data)[b"INAM"] == b"A title much longer than the original one"
+        assert [chunk for chunk in get_chunks(data) if chunk[0] != b"INFO"] == [
+            chunk for chunk in get_chunks(original_data) if chunk[0] != b"INFO"]
+        assert data.endswith(original_data[original_data.index(b"data"):])
+        assert stat.S_IMODE(wav_copy.stat().st_mode) == 0o640
+        assert not [path for path in wav_copy.parent.iterdir() if path.name.endswith(".partial")]
+
+    def test_shrinking_info_chunk_is_updated_in_place(self, wav_copy: Path):
+        """Test that a smaller INFO chunk is written in place, the rest filled by a JUNK chunk reused on growth."""
+        update_file_metadata(str(wav_copy), {AppMetadataKey.TITLE: "A title much longer than the original one"})
+        file_size = wav_copy.stat().st_size
+
+        update_file_metadata(str(wav_copy), {AppMetadataKey.TITLE: "Short"})
+        data = wav_copy.read_bytes()
+        assert len(data) == file_size
+        assert [chunk_id for chunk_id, _ in get_chunks(data)][-3:] == [b"INFO", b"JUNK", b"data"]
+        assert get_info_fields(data)[b"INAM"] == b"Short"
+
+        update_file_metadata(str(wav_copy), {AppMetadataKey.TITLE: "A somewhat longer title"})
+        assert wav_copy.stat().st_size == file_size
+        assert get_info_fields(wav_copy.read_bytes())[b"INAM"] == b"A somewhat longer title"
+
+    def test_leading_id3v2_tag_is_dropped_by_rewrite(self, wav_copy: Path):
+        """Test that the rewrite starts the file with its RIFF header."""
+        wav_copy.write_bytes(b"ID3\x03\x00\x00\x00\x00\x00\x04" + bytes(4) + wav_copy.read_bytes())
+        update_file_metadata(str(wav_copy), {AppMetadataKey.TITLE: "Title"})
+        data = wav_copy.read_bytes()
+        assert data.startswith(b"RIFF")
+        assert get_info_fields(data)[b"INAM"] == b"Title"
+
+    def test_stream_is_rewritten_in_place(self, wav_copy: Path):
+        """Test that a stream is overwritten with the rewritten content."""
+        stream = io.BytesIO(wav_copy.read_bytes())
+        update_file_metadata(AudioFile(stream), {AppMetadataKey.TITLE: "A title much longer than the original one"})
+        data = stream.getvalue()
+        assert int.from_bytes(data[4:8], "little") == len(data) - 8
+        assert get_info_fields(data)[b"INAM"] == b"A title much longer than the original one"
@@ -0,0 +1,74 @@
+"""Tests for batch tag stripping."""
+
+import shutil
+from pathlib import Path
+
+from audiometa import MetadataFormat, get_merged_app_metadata, strip_many, update_file_metadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+ID3V2_TAG = b"ID3\x03\x00\x00\x00\x00\x00\x14" + b"TIT2\x00\x00\x00\x06\x00\x00\x03Title" + bytes(4)
+ID3V1_TAG = b"TAG" + b"Title".ljust(30, b"\x00") + bytes(95)
+
+
+class TestTagStripping:
+    """Test cases for strip_many."""
+
+    def test_dry_run_reports_without_modifying(self, sample_wav_file: Path, tmp_path: Path):
+        """Test that a dry run reports the bytes a stripping removes, without modifying the files."""
+        wav_data = sample_wav_file.read_bytes()
+        wav_path = tmp_path / "track.wav"
+        wav_path.write_bytes(wav_data[wav_data.index(b"RIFF"):])
+        update_file_metadata(str(wav_path), {AppMetadataKey.TITLE: "Private"})
+        mp3_path = tmp_path / "track.mp3"
+        mp3_path.write_bytes(ID3V2_TAG + b"\xff\xfb\x90\x00" + bytes(4096) + ID3V1_TAG)
+        sizes = {str(path): path.stat().st_size for path in (wav_path, mp3_path)}
+
+        dry_run_results = {result.path: result for result in strip_many(sizes, workers=2, dry_run=True)}
+        assert {path: Path(path).stat().st_size for path in sizes} == sizes
+        assert dry_run_results[str(mp3_path)].bytes_removed == len(ID3V2_TAG) + len(ID3V1_TAG)
+        assert not dry_run_results[str(mp3_path)].in_place
+
+        results = {result.path: result for result in strip_many(sizes, workers=2)}
+        for path, size in sizes.items():
+            assert results[path].success
+            assert results[path].bytes_removed == dry_run_results[path].bytes_removed
+            assert Path(path).stat().st_size == size - results[path].bytes_removed
+        assert max(result.total_bytes_removed for result in results.values()) == sum(
+            result.bytes_removed for result in results.values())
+        assert AppMetadataKey.TITLE not in get_merged_app_metadata(str(wav_path))
+
+    def test_dry_run_probes_flac_tag_regions(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that the Vorbis comments of FLAC files are probed on a copy of the tag regions."""
+        flac_path = tmp_path / "track.flac"
+        shutil.copy2(sample_flac_file, flac_path)
+        update_file_metadata(str(flac_path), {AppMetadataKey.TITLE: "Private"})
+        flac_data = flac_path.read_bytes()
+
+        [dry_run_result] = strip_many([str(flac_path)], formats=[MetadataFormat.VORBIS], dry_run=True)
+        assert dry_run_result.success
+        assert flac_path.read_bytes() == flac_data
+
+        [result] = strip_many([str(flac_path)], formats=[MetadataFormat.VORBIS])
+        assert result.success
+        assert (result.bytes_removed, result.in_place) == (dry_run_result.bytes_removed, dry_run_result.in_place)
+        assert AppMetadataKey.TITLE not in get_merged_app_metadata(str(flac_path))
+
+    def test_leading_id3v2_tags_of_any_format(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that ID3v2 tags are stripped from formats whose metadata is in another format."""
+        flac_data = sample_flac_file.read_bytes()
+        flac_data = flac_data[flac_data.index(b"fLaC"):]
+        flac_path = tmp_path / "track.flac"
+        flac_path.write_bytes(ID3V2_TAG + flac_data)
+
+        [result] = strip_many([str(flac_path)], formats=[MetadataFormat.ID3V2])
+        assert result.success and result.bytes_removed == len(ID3V2_TAG)
+        assert flac_path.read_bytes() == flac_data
+
+    def test_failures_and_throughput_are_reported(self, tmp_path: Path):
+        """Test that a failing file carries its error and that the throughput is reported."""
+        results = list(strip_many([str(tmp_path / "missing.mp3")], workers=1))
+        assert len(results) == 1
+        assert not results[0].success and "FileNotFoundError" in results[0].error
+        assert results[0].completed_count == 1
+        assert results[0].files_per_sec > 0
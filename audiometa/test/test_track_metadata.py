@@ -0,0 +1,49 @@
+"""Tests for the compact TrackMetadata form of AppMetadata."""
+
+import pickle
+import sys
+
+import pytest
+
+from audiometa import TrackMetadata
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+APP_METADATA = {
+    AppMetadataKey.TITLE: "Title",
+    AppMetadataKey.RATING: 80,
+    AppMetadataKey.ARTISTS_NAMES: ["Artist 1", "Artist 2"],
+    AppMetadataKey.GENRE_NAME: "Rock",
+}
+
+
+class TestTrackMetadata:
+    """Test cases for TrackMetadata."""
+
+    def test_conversions(self):
+        """Test that a record converts back to the same dict, values being read like those of the dict."""
+        record = TrackMetadata.from_app_metadata(APP_METADATA)
+        assert record.to_app_metadata() == APP_METADATA
+        assert record[AppMetadataKey.ARTISTS_NAMES] == ("Artist 1", "Artist 2")
+        assert record.rating == 80 and record.album_name is None
+        assert record.get(AppMetadataKey.BPM, 0) == 0 and AppMetadataKey.BPM not in record
+        assert list(record) == [AppMetadataKey.TITLE, AppMetadataKey.ARTISTS_NAMES, AppMetadataKey.GENRE_NAME,
+                                AppMetadataKey.RATING]
+        with pytest.raises(KeyError):
+            record[AppMetadataKey.BPM]
+        with pytest.raises(AttributeError):
+            record.title = "Other title"
+
+        assert TrackMetadata({"title": "Title", "bpm": None}) == TrackMetadata({AppMetadataKey.TITLE: "Title"})
+        assert pickle.loads(pickle.dumps(record)) == record
+        assert TrackMetadata().to_app_metadata() == {}
+
+    def test_strings_are_shared(self):
+        """Test that equal strings of different records are stored once, the records being smaller than dicts."""
+        first_record = TrackMetadata({AppMetadataKey.ARTISTS_NAMES: ["".join(["Art", "ist"])]})
+        second_record = TrackMetadata({AppMetadataKey.ARTISTS_NAMES: ["".join(["Arti", "st"])]})
+        assert first_record.artists_names[0] is second_record.artists_names[0]
+
+        record = TrackMetadata(APP_METADATA)
+        record_size = sys.getsizeof(record) + sys.getsizeof(record.__getstate__()[1])
+        assert record_size < sys.getsizeof(APP_METADATA)
@@ -0,0 +1,46 @@
+"""Tests for the metadata read back from memory after an update."""
+
+from pathlib import Path
+
+from audiometa import AudioFile, get_merged_app_metadata
+from audiometa.manager.rating_supporting.RiffManager import RiffManager
+from audiometa.manager.rating_supporting.VorbisManager import VorbisManager
+from audiometa.utils.AppMetadataKey import AppMetadataKey
+
+
+class TestUpdateReadBack:
+    """Test cases for the normalized metadata rebuilt by the managers after writing."""
+
+    def test_flac_update_returns_written_metadata(self, sample_flac_file: Path, tmp_path: Path):
+        """Test that the result holds the new normalized metadata, which later reads get without reading the file."""
+        flac_path = tmp_path / "copy.flac"
+        flac_path.write_bytes(sample_flac_file.read_bytes())
+        audio_file = AudioFile(str(flac_path))
+        manager = VorbisManager(audio_file, normalized_rating_max_value=100)
+
+        result = manager.update_file_metadata({AppMetadataKey.TITLE: "Title", AppMetadataKey.ARTISTS_NAMES: ["A", "B"],
+                                               AppMetadataKey.RATING: 80})
+        assert result.app_metadata == get_merged_app_metadata(str(flac_path), normalized_rating_max_value=100)
+        assert result.app_metadata[AppMetadataKey.RATING] == 80
+
+        audio_file.reset_io_stats()
+        assert manager.get_app_specific_metadata(AppMetadataKey.TITLE) == "Title"
+        assert audio_file.io_stats.bytes_read == 0
+
+    def test_riff_update_returns_written_metadata(self, sample_wav_file: Path, tmp_path: Path):
+        """Test that the INFO fields written are read back from memory, the other chunks being indexed again."""
+        wav_data = sample_wav_file.read_bytes()
+        wav_path = tmp_path / "copy.wav"
+        wav_path.write_bytes(wav_data[wav_data.index(b"RIFF"):])
+        audio_file = AudioFile(str(wav_path))
+        manager = RiffManager(audio_file)
+
+        manager.update_file_metadata({AppMetadataKey.TITLE: "Title", AppMetadataKey.LANGUAGE: "en"})
+        # Growing the INFO chunk rewrites the file
+        result = manager.update_file_metadata({AppMetadataKey.TITLE: "A title much longer than the previous one"})
+        assert result.app_metadata == get_merged_app_metadata(str(wav_path))
+        assert result.app_metadata[AppMetadataKey.LANGUAGE] == "en"
+
+        audio_file.reset_io_stats()
+        assert manager.get_app_specific_metadata(AppMetadataKey.TITLE) == "A title much longer than the previous one"
+        assert audio_file.io_stats.bytes_read == 0
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+from .Mp3DurationMode import Mp3DurationMode
+
+
+@dataclass(frozen=True)
+class AudioTechnicalInfo:
+    """
+    Technical properties of an audio stream, read from a single parse of the file headers.
+
+    - duration_in_sec: Playback duration in seconds
+    - bitrate: Bitrate in kbps
+    - sample_rate: Sample rate in Hz, None if unknown
+    - channels: Number of channels, None if unknown
+    - bit_depth: Bits per sample, None for lossy codecs that do not have one
+    - codec: Codec name (e.g. 'mp3', 'flac', 'pcm_s16le'), None if unknown
+    - is_vbr: Whether the encoded bitrate varies over the stream
+    - duration_mode: Mode that produced the duration and bitrate of MP3 files, None for other formats
+    """
+    duration_in_sec: float
+    bitrate: int
+    sample_rate: int | None = None
+    channels: int | None = None
+    bit_depth: int | None = None
+    codec: str | None = None
+    is_vbr: bool = False
+    duration_mode: Mp3DurationMode | None = None
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class ByteBudgetPolicy(str, Enum):
+    """
+    Behavior when the bytes read from an audio file exceed its max_bytes_read budget.
+
+    - RAISE: Raise ByteBudgetExceededError from the read that exceeded the budget
+    - WARN: Emit a ByteBudgetExceededWarning, once per file, and let the operation go on
+    """
+    RAISE = 'raise'
+    WARN = 'warn'
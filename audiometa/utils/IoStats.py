@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class IoStats:
+    """
+    I/O performed on an audio file.
+
+    - opens: Number of times the file was opened
+    - reads/bytes_read: Number of read calls and bytes returned by them. Files handed to external tools (flac,
+      ffmpeg) are counted as fully read.
+    - seeks: Number of seek calls
+    - writes/bytes_written: Number of write calls and bytes written by them
+    """
+    opens: int = 0
+    reads: int = 0
+    bytes_read: int = 0
+    seeks: int = 0
+    writes: int = 0
+    bytes_written: int = 0
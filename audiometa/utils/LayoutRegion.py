@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+from .LayoutRegionType import LayoutRegionType
+
+
+@dataclass(frozen=True)
+class LayoutRegion:
+    """
+    Byte range of a file, as returned by AudioFile.get_layout.
+
+    - type: Kind of the region
+    - offset: Offset of the first byte of the region in the file
+    - size: Size of the region in bytes
+    - name: Chunk ID of RIFF chunks (with the list type for LIST chunks, e.g. 'LIST/INFO'), block type of FLAC
+      metadata blocks (e.g. 'VORBIS_COMMENT'), 'FOOTER' for the footer of ID3v2.4 tags, None for other regions
+    """
+    type: LayoutRegionType
+    offset: int
+    size: int
+    name: str | None = None
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
@@ -0,0 +1,28 @@
+from enum import Enum
+
+
+class LayoutRegionType(str, Enum):
+    """
+    Kind of a byte range of a file, as returned by AudioFile.get_layout.
+
+    - ID3V2_TAG: Header, extended header and frames of an ID3v2 tag, or its footer (named 'FOOTER')
+    - ID3V2_PADDING: Zero bytes following the frames of an ID3v2 tag, which can be overwritten by new frames
+    - RIFF_HEADER: 'RIFF' header of a WAV file, with its size and 'WAVE' form type
+    - RIFF_CHUNK: RIFF chunk with its header and pad byte, or only the header of the 'data' chunk
+    - FLAC_MARKER: 'fLaC' marker starting a FLAC stream
+    - FLAC_METADATA_BLOCK: FLAC metadata block with its header, PADDING blocks included
+    - AUDIO_PAYLOAD: Audio bytes: MPEG frames, FLAC frames or data of the 'data' chunk
+    - APE_TAG: APEv2 tag at the end of the file
+    - ID3V1_TAG: 128-byte ID3v1 tag at the end of the file
+    - UNKNOWN: Bytes that are not part of the structure, e.g. the pad byte of the 'data' chunk or trailing garbage
+    """
+    ID3V2_TAG = 'id3v2_tag'
+    ID3V2_PADDING = 'id3v2_padding'
+    RIFF_HEADER = 'riff_header'
+    RIFF_CHUNK = 'riff_chunk'
+    FLAC_MARKER = 'flac_marker'
+    FLAC_METADATA_BLOCK = 'flac_metadata_block'
+    AUDIO_PAYLOAD = 'audio_payload'
+    APE_TAG = 'ape_tag'
+    ID3V1_TAG = 'id3v1_tag'
+    UNKNOWN = 'unknown'
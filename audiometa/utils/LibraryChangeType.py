@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class LibraryChangeType(str, Enum):
+    """
+    Kind of change reported by the library watcher.
+
+    - MODIFIED: The file was written or moved into the library and has been read again
+    - REMOVED: The file was deleted or moved out of the library
+    """
+    MODIFIED = 'modified'
+    REMOVED = 'removed'
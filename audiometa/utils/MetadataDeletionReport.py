@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class MetadataDeletionReport:
+    """
+    Outcome of a metadata deletion.
+
+    - success: Whether the metadata is gone, which is also the case if the file had none
+    - bytes_reclaimed: Decrease of the file size
+    - in_place: Whether no other byte of the file was moved: the metadata was blanked where it was (e.g. a RIFF INFO
+      chunk turned into a JUNK chunk), truncated from the end of the file, or there was none
+    """
+    success: bool
+    bytes_reclaimed: int = 0
+    in_place: bool = False
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+
+from .AppMetadataKey import AppMetadataKey
+from .types import AppMetadata
+
+
+@dataclass(frozen=True)
+class MetadataUpdateResult:
+    """
+    Outcome of a metadata update.
+
+    - modified_keys: Keys whose value differed from the current one and was written, in the order they were given.
+      Empty if every value was already set, in which case nothing was written to the file
+    - app_metadata: Normalized metadata of the updated format after the update, rebuilt from what was written without
+      reading the file again
+    """
+    modified_keys: list[AppMetadataKey] = field(default_factory=list)
+    app_metadata: AppMetadata = field(default_factory=dict)
+
+    @property
+    def modified(self) -> bool:
+        return bool(self.modified_keys)
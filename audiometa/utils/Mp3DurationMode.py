@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class Mp3DurationMode(str, Enum):
+    """
+    Accuracy/latency trade-off used to compute the duration and bitrate of MP3 files.
+
+    - MUTAGEN: Duration from mutagen, bitrate from the whole file size (tags included) divided by the duration
+    - FAST: Duration from the Xing/Info/VBRI header, or estimated from the first frame for CBR files without one.
+      Reads the tag headers, then 64 KiB blocks from the end of the ID3v2 tags up to the first frame (a single block
+      unless junk precedes the stream).
+    - EXACT: Streaming scan of every frame header, without decoding audio. The bitrate excludes the ID3v2, ID3v1 and
+      APEv2 tag regions. Reads the whole file, but is accurate for VBR files with missing or wrong headers.
+    """
+    MUTAGEN = 'mutagen'
+    FAST = 'fast'
+    EXACT = 'exact'
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Mp4Atom:
+    """
+    Header of an MP4 atom (box), as read from the file.
+
+    - type: Four-character type of the atom (e.g. b'moov')
+    - offset: Offset of the atom in the file
+    - size: Size of the atom, header included
+    - header_size: Size of the header, 16 for atoms with a 64-bit size, 8 otherwise
+    """
+    type: bytes
+    offset: int
+    size: int
+    header_size: int
+
+    @property
+    def data_offset(self) -> int:
+        return self.offset + self.header_size
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class OggPage:
+    """
+    Header of an Ogg page, as read from the file.
+
+    - offset: Offset of the page in the file
+    - header_type: Flags of the page (continued packet, first and last page of the logical stream)
+    - granule_position: Codec-specific position of the last packet ending in the page, -1 if none does
+    - serial_number: Serial number of the logical stream of the page
+    - sequence_number: Number of the page in its logical stream
+    - segment_sizes: Lacing values of the page, a packet ending with the first value lower than 255
+    """
+    offset: int
+    header_type: int
+    granule_position: int
+    serial_number: int
+    sequence_number: int
+    segment_sizes: tuple[int, ...]
+
+    @property
+    def header_size(self) -> int:
+        return 27 + len(self.segment_sizes)
+
+    @property
+    def size(self) -> int:
+        return self.header_size + sum(self.segment_sizes)
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
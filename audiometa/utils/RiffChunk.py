@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RiffChunk:
+    """
+    Header of a chunk of a RIFF, RF64 or Wave64 file, as read from the file.
+
+    - id: Chunk ID (e.g. b'data'), the four-character code of the GUID for Wave64 chunks (see utils/riff_chunks)
+    - offset: Offset of the chunk header in the file
+    - header_size: Size of the chunk header, 24 for Wave64 chunks, 8 otherwise
+    - size: Size of the chunk data, without its padding
+    - pad_size: Size of the padding aligning the next chunk
+    """
+    id: bytes
+    offset: int
+    header_size: int
+    size: int
+    pad_size: int
+
+    @property
+    def data_offset(self) -> int:
+        return self.offset + self.header_size
+
+    @property
+    def data_end(self) -> int:
+        return self.data_offset + self.size
+
+    @property
+    def end(self) -> int:
+        return self.data_end + self.pad_size
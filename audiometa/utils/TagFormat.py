@@ -7,6 +7,7 @@ class MetadataFormat(str, Enum):
     ID3V1 = 'id3v1'
     VORBIS = 'vorbis'
     RIFF = 'riff'
+    MP4 = 'mp4'
 
     @classmethod
     def get_priorities(cls) -> dict[str, list['MetadataFormat']]:
@@ -20,4 +21,9 @@ class MetadataFormat(str, Enum):
             '.flac': [cls.VORBIS, cls.ID3V2, cls.ID3V1],
             '.mp3': [cls.ID3V2, cls.ID3V1],
             '.wav': [cls.RIFF, cls.ID3V2, cls.ID3V1],
+            '.w64': [cls.RIFF],
+            '.ogg': [cls.VORBIS],
+            '.opus': [cls.VORBIS],
+            '.m4a': [cls.MP4],
+            '.mp4': [cls.MP4],
         }
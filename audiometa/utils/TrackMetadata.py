@@ -0,0 +1,116 @@
+import sys
+from operator import itemgetter
+from typing import Iterator
+
+from .AppMetadataKey import AppMetadataKey
+from .types import AppMetadata, AppMetadataValue
+
+
+# Bit of each key in TrackMetadata masks, from the declaration order of AppMetadataKey
+TRACK_METADATA_KEY_BITS: dict[AppMetadataKey, int] = {key: 1 << position for position, key in enumerate(AppMetadataKey)}
+TRACK_METADATA_KEYS: tuple[AppMetadataKey, ...] = tuple(AppMetadataKey)
+
+
+class TrackMetadata:
+    """
+    Compact immutable form of AppMetadata, to hold the metadata of many tracks in memory (e.g. a whole library).
+
+    Instead of a dict keyed by AppMetadataKey, a record has two slots: a bit mask of its keys, each key having a fixed
+    bit from its position in AppMetadataKey, and a tuple of their values in key order, missing keys taking no space.
+    Strings are interned, so that the artists, albums and genres shared by tracks are stored once, and the values of
+    list keys (e.g. ARTISTS_NAMES) are tuples. to_app_metadata converts back to the dict form, with lists.
+
+    Values are read like those of a dict (record[AppMetadataKey.TITLE], record.get(...), key in record) or as
+    attributes named by the key values (record.title), None if missing.
+    """
+
+    __slots__ = ('_key_mask', '_values')
+
+    _key_mask: int
+    _values: tuple
+
+    def __init__(self, app_metadata: AppMetadata | None = None):
+        key_mask = 0
+        key_bits_and_values = []
+        for key, value in (app_metadata or {}).items():
+            if value is None:
+                continue
+            # Looked up as is first, converting keys given by value only if needed
+            key_bit = TRACK_METADATA_KEY_BITS.get(key) or TRACK_METADATA_KEY_BITS[AppMetadataKey(key)]
+            key_mask |= key_bit
+            if isinstance(value, str):
+                value = sys.intern(value)
+            elif isinstance(value, list):
+                value = tuple([sys.intern(item) if isinstance(item, str) else item for item in value])
+            key_bits_and_values.append((key_bit, value))
+        key_bits_and_values.sort(key=itemgetter(0))
+        object.__setattr__(self, '_key_mask', key_mask)
+        object.__setattr__(self, '_values', tuple([value for _, value in key_bits_and_values]))
+
+    @classmethod
+    def from_app_metadata(cls, app_metadata: AppMetadata) -> 'TrackMetadata':
+        return cls(app_metadata)
+
+    def to_app_metadata(self) -> AppMetadata:
+        """Returns the dict form, the values of list keys being lists."""
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in self.items()}
+
+    def _get_value_index(self, key: AppMetadataKey) -> int | None:
+        key_bit = TRACK_METADATA_KEY_BITS[key]
+        if not self._key_mask & key_bit:
+            return None
+        # The values of the keys of lower bits come first
+        return (self._key_mask & (key_bit - 1)).bit_count()
+
+    def get(self, key: AppMetadataKey, default: AppMetadataValue | tuple = None) -> AppMetadataValue | tuple:
+        value_index = self._get_value_index(key)
+        return default if value_index is None else self._values[value_index]
+
+    def __getitem__(self, key: AppMetadataKey) -> AppMetadataValue | tuple:
+        value_index = self._get_value_index(key)
+        if value_index is None:
+            raise KeyError(key)
+        return self._values[value_index]
+
+    def __getattr__(self, name: str) -> AppMetadataValue | tuple:
+        try:
+            key = AppMetadataKey(name)
+        except ValueError:
+            raise AttributeError(name) from None
+        return self.get(key)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __contains__(self, key: object) -> bool:
+        return key in TRACK_METADATA_KEY_BITS and bool(self._key_mask & TRACK_METADATA_KEY_BITS[key])  # type: ignore
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[AppMetadataKey]:
+        return (key for key in TRACK_METADATA_KEYS if self._key_mask & TRACK_METADATA_KEY_BITS[key])
+
+    def keys(self) -> list[AppMetadataKey]:
+        return list(self)
+
+    def items(self) -> Iterator[tuple[AppMetadataKey, AppMetadataValue | tuple]]:
+        return zip(self, self._values)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TrackMetadata):
+            return NotImplemented
+        return self._key_mask == other._key_mask and self._values == other._values
+
+    def __hash__(self) -> int:
+        return hash((self._key_mask, self._values))
+
+    def __repr__(self) -> str:
+        return f'TrackMetadata({dict((key.value, value) for key, value in self.items())})'
+
+    def __getstate__(self) -> tuple[int, tuple]:
+        return self._key_mask, self._values
+
+    def __setstate__(self, state: tuple[int, tuple]) -> None:
+        object.__setattr__(self, '_key_mask', state[0])
+        object.__setattr__(self, '_values', state[1])
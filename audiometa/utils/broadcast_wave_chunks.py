@@ -0,0 +1,81 @@
+"""
+Parsing of the broadcast chunks of WAV files: bext (Broadcast Wave Format, EBU Tech 3285), cart (AES46), iXML and the
+embedded ID3v2 tag of 'id3 ' chunks. Each parser takes the data of a chunk, read from the chunk index of RiffManager,
+and returns its text fields by name, fields left empty being omitted.
+"""
+
+import io
+import xml.etree.ElementTree as ElementTree
+
+from mutagen import MutagenError
+from mutagen.id3 import ID3, TextFrame
+
+# (name, size) of the fixed fields at the start of the chunk data, binary fields having no name
+BEXT_FIELDS: tuple[tuple[str | None, int], ...] = (
+    ('Description', 256), ('Originator', 32), ('OriginatorReference', 32), ('OriginationDate', 10),
+    ('OriginationTime', 8),
+    (None, 8 + 2 + 64 + 10 + 180),  # TimeReference, Version, UMID, loudness values, reserved
+)
+BEXT_CODING_HISTORY_OFFSET = 602
+
+CART_FIELDS: tuple[tuple[str | None, int], ...] = (
+    ('Version', 4), ('Title', 64), ('Artist', 64), ('CutID', 64), ('ClientID', 64), ('Category', 64),
+    ('Classification', 64), ('OutCue', 64), ('StartDate', 10), ('StartTime', 8), ('EndDate', 10), ('EndTime', 8),
+    ('ProducerAppID', 64), ('ProducerAppVersion', 64), ('UserDef', 64),
+    (None, 4 + 64 + 276),  # LevelReference, PostTimer, reserved
+    ('URL', 1024),
+)
+CART_TAG_TEXT_OFFSET = 2048
+
+
+def _decode_text(data: bytes) -> str:
+    # Fields are NUL-padded, and may be filled with spaces
+    return data.split(b'\x00')[0].decode('utf-8', errors='ignore').strip()
+
+
+def _parse_fixed_fields(data: bytes, fields: tuple[tuple[str | None, int], ...],
+                        text_name: str, text_offset: int) -> dict[str, str]:
+    values: dict[str, str] = {}
+    offset = 0
+    for name, size in fields:
+        if name is not None:
+            values[name] = _decode_text(data[offset:offset + size])
+        offset += size
+    values[text_name] = _decode_text(data[text_offset:])
+    return {name: value for name, value in values.items() if value}
+
+
+def parse_bext_chunk(data: bytes) -> dict[str, str]:
+    """Returns the text fields of a bext chunk, the coding history following the fixed fields."""
+    return _parse_fixed_fields(data, BEXT_FIELDS, 'CodingHistory', BEXT_CODING_HISTORY_OFFSET)
+
+
+def parse_cart_chunk(data: bytes) -> dict[str, str]:
+    """Returns the text fields of a cart chunk, the tag text following the fixed fields."""
+    return _parse_fixed_fields(data, CART_FIELDS, 'TagText', CART_TAG_TEXT_OFFSET)
+
+
+def parse_ixml_chunk(data: bytes) -> dict[str, str]:
+    """
+    Returns the text of the elements directly under the BWFXML root of an iXML chunk (e.g. PROJECT, SCENE, TAKE,
+    NOTE), nested elements being ignored. A malformed document has no fields.
+    """
+    try:
+        root = ElementTree.fromstring(data.rstrip(b'\x00').strip())
+    except ElementTree.ParseError:
+        return {}
+    return {element.tag: element.text.strip() for element in root
+            if len(element) == 0 and element.text and element.text.strip()}
+
+
+def parse_id3_chunk(data: bytes) -> dict[str, list[str]]:
+    """Returns the values of the text frames of the ID3v2 tag of an 'id3 ' chunk by frame ID (e.g. TIT2)."""
+    try:
+        tags = ID3(io.BytesIO(data))
+    except MutagenError:
+        return {}
+    values: dict[str, list[str]] = {}
+    for frame in tags.values():
+        if isinstance(frame, TextFrame):
+            values.setdefault(frame.FrameID, []).extend(str(text) for text in frame.text if str(text))
+    return {frame_id: texts for frame_id, texts in values.items() if texts}
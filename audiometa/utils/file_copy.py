@@ -0,0 +1,84 @@
+"""Copies of byte ranges between files, done by the kernel when possible.
+
+os.copy_file_range lets the filesystem share or copy the blocks without them going through user space (and reflinks
+them on filesystems supporting it), os.sendfile copies them within the kernel. Both are tried in turn, reads and
+writes in user space being the last resort.
+"""
+
+import errno
+import os
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Errors meaning that a copy method is not supported for these files, rather than an I/O failure
+_UNSUPPORTED_COPY_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+
+
+def _copy_with_copy_file_range(source_fd: int, source_offset: int, destination_fd: int, destination_offset: int,
+                               size: int) -> int:
+    copied_size = 0
+    while copied_size < size:
+        chunk_size = os.copy_file_range(source_fd, destination_fd, size - copied_size,
+                                        source_offset + copied_size, destination_offset + copied_size)
+        if chunk_size == 0:
+            break
+        copied_size += chunk_size
+    return copied_size
+
+
+def _copy_with_sendfile(source_fd: int, source_offset: int, destination_fd: int, destination_offset: int,
+                        size: int) -> int:
+    # sendfile writes at the position of the destination
+    os.lseek(destination_fd, destination_offset, os.SEEK_SET)
+    copied_size = 0
+    while copied_size < size:
+        chunk_size = os.sendfile(destination_fd, source_fd, source_offset + copied_size, size - copied_size)
+        if chunk_size == 0:
+            break
+        copied_size += chunk_size
+    return copied_size
+
+
+def _copy_with_read_write(source_fd: int, source_offset: int, destination_fd: int, destination_offset: int,
+                          size: int) -> int:
+    copied_size = 0
+    while copied_size < size:
+        chunk = os.pread(source_fd, min(COPY_CHUNK_SIZE, size - copied_size), source_offset + copied_size)
+        if not chunk:
+            break
+        os.pwrite(destination_fd, chunk, destination_offset + copied_size)
+        copied_size += len(chunk)
+    return copied_size
+
+
+def copy_file_range(source_fd: int, source_offset: int, destination_fd: int, destination_offset: int,
+                    size: int) -> None:
+    """
+    Copies size bytes of the regular file source_fd at source_offset to the regular file destination_fd at
+    destination_offset. The positions of both descriptors are left undefined.
+
+    Raises:
+        OSError: If the source has less than size bytes at source_offset, or on I/O errors
+    """
+    copy_methods = []
+    if hasattr(os, 'copy_file_range'):
+        copy_methods.append(_copy_with_copy_file_range)
+    if hasattr(os, 'sendfile'):
+        copy_methods.append(_copy_with_sendfile)
+
+    copied_size = 0
+    for copy_method in copy_methods:
+        try:
+            copied_size += copy_method(source_fd, source_offset + copied_size, destination_fd,
+                                       destination_offset + copied_size, size - copied_size)
+            break
+        except OSError as exc:
+            # Offsets being explicit, bytes copied before the method failed are simply copied again by the next one
+            if exc.errno not in _UNSUPPORTED_COPY_ERRNOS:
+                raise
+    else:
+        copied_size += _copy_with_read_write(source_fd, source_offset + copied_size, destination_fd,
+                                             destination_offset + copied_size, size - copied_size)
+
+    if copied_size < size:
+        raise OSError(errno.EIO, f"Unexpected end of file after copying {copied_size} of {size} bytes")
@@ -0,0 +1,15 @@
+"""
+Identity of a file on disk: (device, inode, size, modification time in ns).
+Any rewrite of the file changes at least one of these, so it can be used as a cache key for data derived from the
+file content without hashing it.
+"""
+
+import os
+
+
+FileIdentity = tuple[int, int, int, int]
+
+
+def get_file_identity(path: str) -> FileIdentity:
+    stat_result = os.stat(path)
+    return stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
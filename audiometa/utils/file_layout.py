@@ -0,0 +1,171 @@
+"""Byte-range layout of audio files, from their headers only.
+
+The layout is the ordered list of the regions of a file (ID3v2 tags and their padding, RIFF chunks, FLAC metadata
+blocks, audio payload, APEv2 and ID3v1 tails), which together cover the whole file. Only the headers of the tags,
+frames, chunks and blocks are read, never their content nor the audio payload.
+"""
+
+from typing import BinaryIO
+
+from .LayoutRegion import LayoutRegion
+from .LayoutRegionType import LayoutRegionType
+from .riff_chunks import RIFF_FILE_EXTENSIONS, RIFF_FORM_HEADER_SIZES, iter_riff_chunks, read_riff_form
+from .tag_regions import (ID3V1_TAG_SIZE, ID3V2_FOOTER_PRESENT_FLAG, ID3V2_FOOTER_SIZE, ID3V2_HEADER_SIZE,
+                          decode_synchsafe_int, get_ape_tag_size, get_id3v1_tag_size, get_id3v2_tag_size)
+
+
+LAYOUT_FILE_EXTENSIONS = ('.mp3', '.flac', *RIFF_FILE_EXTENSIONS)
+
+ID3V2_UNSYNCHRONISATION_FLAG = 0x80
+ID3V2_EXTENDED_HEADER_FLAG = 0x40
+
+FLAC_MARKER_SIZE = 4
+FLAC_METADATA_BLOCK_HEADER_SIZE = 4
+FLAC_METADATA_BLOCK_TYPE_NAMES = {
+    0: 'STREAMINFO',
+    1: 'PADDING',
+    2: 'APPLICATION',
+    3: 'SEEKTABLE',
+    4: 'VORBIS_COMMENT',
+    5: 'CUESHEET',
+    6: 'PICTURE',
+}
+
+
+def _get_id3v2_frames_end(fileobj: BinaryIO, tag_offset: int, header: bytes) -> int:
+    """Returns the offset of the padding of the ID3v2 tag at tag_offset, i.e. the end of its last frame."""
+    version, flags = header[3], header[5]
+    end = tag_offset + ID3V2_HEADER_SIZE + decode_synchsafe_int(header[6:10])
+    if flags & ID3V2_UNSYNCHRONISATION_FLAG and version < 4:
+        # Frame sizes of unsynchronised ID3v2.2/2.3 tags do not match their bytes: the padding cannot be located
+        return end
+
+    offset = tag_offset + ID3V2_HEADER_SIZE
+    if flags & ID3V2_EXTENDED_HEADER_FLAG:
+        fileobj.seek(offset)
+        extended_header_size = fileobj.read(4)
+        if len(extended_header_size) < 4:
+            return end
+        # ID3v2.4 counts the size field in the synchsafe size, ID3v2.3 does not
+        offset += (decode_synchsafe_int(extended_header_size) if version >= 4
+                   else 4 + int.from_bytes(extended_header_size, 'big'))
+
+    frame_header_size = 6 if version == 2 else 10
+    while offset + frame_header_size <= end:
+        fileobj.seek(offset)
+        frame_header = fileobj.read(frame_header_size)
+        if len(frame_header) < frame_header_size or frame_header[0] == 0:
+            break
+        if version == 2:
+            frame_size = int.from_bytes(frame_header[3:6], 'big')
+        elif version == 3:
+            frame_size = int.from_bytes(frame_header[4:8], 'big')
+        else:
+            frame_size = decode_synchsafe_int(frame_header[4:8])
+        offset += frame_header_size + frame_size
+    return min(offset, end)
+
+
+def _append_id3v2_regions(fileobj: BinaryIO, file_size: int, regions: list[LayoutRegion]) -> int:
+    """Appends the regions of the ID3v2 tags at the start of the file, returning the offset following them."""
+    offset = 0
+    while offset < file_size:
+        fileobj.seek(offset)
+        header = fileobj.read(ID3V2_HEADER_SIZE)
+        tag_size = min(get_id3v2_tag_size(header), file_size - offset)
+        if not tag_size:
+            break
+        tag_end = offset + tag_size
+        # The footer of ID3v2.4 tags follows the frame area, hence their padding
+        footer_size = min(ID3V2_FOOTER_SIZE, tag_size) if header[5] & ID3V2_FOOTER_PRESENT_FLAG else 0
+        frame_area_end = tag_end - footer_size
+        frames_end = min(_get_id3v2_frames_end(fileobj, offset, header), frame_area_end)
+        regions.append(LayoutRegion(LayoutRegionType.ID3V2_TAG, offset, frames_end - offset))
+        if frames_end < frame_area_end:
+            regions.append(LayoutRegion(LayoutRegionType.ID3V2_PADDING, frames_end, frame_area_end - frames_end))
+        if footer_size:
+            regions.append(LayoutRegion(LayoutRegionType.ID3V2_TAG, frame_area_end, footer_size, 'FOOTER'))
+        offset = tag_end
+    return offset
+
+
+def _append_flac_regions(fileobj: BinaryIO, offset: int, end: int, regions: list[LayoutRegion]) -> int:
+    """Appends the regions of the FLAC marker and metadata blocks at offset, returning the offset of the frames."""
+    fileobj.seek(offset)
+    if fileobj.read(FLAC_MARKER_SIZE) != b'fLaC':
+        raise ValueError("No FLAC stream marker")
+    regions.append(LayoutRegion(LayoutRegionType.FLAC_MARKER, offset, FLAC_MARKER_SIZE))
+    offset += FLAC_MARKER_SIZE
+    while True:
+        fileobj.seek(offset)
+        block_header = fileobj.read(FLAC_METADATA_BLOCK_HEADER_SIZE)
+        if len(block_header) < FLAC_METADATA_BLOCK_HEADER_SIZE:
+            raise ValueError("Truncated FLAC metadata block")
+        block_type = block_header[0] & 0x7F
+        block_size = FLAC_METADATA_BLOCK_HEADER_SIZE + int.from_bytes(block_header[1:4], 'big')
+        if offset + block_size > end:
+            raise ValueError("Truncated FLAC metadata block")
+        regions.append(LayoutRegion(LayoutRegionType.FLAC_METADATA_BLOCK, offset, block_size,
+                                    FLAC_METADATA_BLOCK_TYPE_NAMES.get(block_type, f'RESERVED_{block_type}')))
+        offset += block_size
+        # The first bit flags the last metadata block
+        if block_header[0] & 0x80:
+            return offset
+
+
+def _append_riff_regions(fileobj: BinaryIO, offset: int, file_size: int, regions: list[LayoutRegion]) -> None:
+    """Appends the regions of the RIFF, RF64 or Wave64 header and chunks at offset, up to the end of the file."""
+    form = read_riff_form(fileobj, offset)
+    if form is None:
+        raise ValueError("No RIFF header")
+    riff_chunks = list(iter_riff_chunks(fileobj, offset, file_size))
+    header_size = RIFF_FORM_HEADER_SIZES[form]
+    regions.append(LayoutRegion(LayoutRegionType.RIFF_HEADER, offset, header_size))
+    offset += header_size
+    for chunk in riff_chunks:
+        name = chunk.id.decode('latin-1')
+        if chunk.id == b'LIST':
+            fileobj.seek(chunk.data_offset)
+            name += '/' + fileobj.read(4).decode('latin-1')
+        data_end = min(chunk.data_end, file_size)
+        chunk_end = min(chunk.end, file_size)
+        if chunk.id == b'data':
+            regions.append(LayoutRegion(LayoutRegionType.RIFF_CHUNK, chunk.offset, chunk.header_size, name))
+            regions.append(LayoutRegion(LayoutRegionType.AUDIO_PAYLOAD, chunk.data_offset,
+                                        data_end - chunk.data_offset))
+            if chunk_end > data_end:
+                regions.append(LayoutRegion(LayoutRegionType.UNKNOWN, data_end, chunk_end - data_end))
+        else:
+            regions.append(LayoutRegion(LayoutRegionType.RIFF_CHUNK, chunk.offset, chunk_end - chunk.offset, name))
+        offset = chunk_end
+    if offset < file_size:
+        regions.append(LayoutRegion(LayoutRegionType.UNKNOWN, offset, file_size - offset))
+
+
+def read_file_layout(fileobj: BinaryIO, file_size: int, file_extension: str) -> list[LayoutRegion]:
+    """
+    Returns the regions of the MP3, FLAC or WAV (RIFF, RF64 or Wave64) file, in file order.
+
+    Raises:
+        ValueError: If the format is not supported or the FLAC or RIFF structure is invalid
+    """
+    if file_extension not in LAYOUT_FILE_EXTENSIONS:
+        raise ValueError(f"The layout of {file_extension} files is not supported")
+    regions: list[LayoutRegion] = []
+    offset = _append_id3v2_regions(fileobj, file_size, regions)
+    if file_extension in RIFF_FILE_EXTENSIONS:
+        _append_riff_regions(fileobj, offset, file_size, regions)
+        return regions
+
+    # Trailing tags are only looked for after the leading ones, which they cannot overlap
+    id3v1_tag_size = get_id3v1_tag_size(fileobj, file_size) if file_size - offset >= ID3V1_TAG_SIZE else 0
+    ape_tag_size = min(get_ape_tag_size(fileobj, file_size - id3v1_tag_size), file_size - id3v1_tag_size - offset)
+    end = file_size - id3v1_tag_size - ape_tag_size
+    if file_extension == '.flac':
+        offset = _append_flac_regions(fileobj, offset, end, regions)
+    regions.append(LayoutRegion(LayoutRegionType.AUDIO_PAYLOAD, offset, end - offset))
+    if ape_tag_size:
+        regions.append(LayoutRegion(LayoutRegionType.APE_TAG, end, ape_tag_size))
+    if id3v1_tag_size:
+        regions.append(LayoutRegion(LayoutRegionType.ID3V1_TAG, file_size - id3v1_tag_size, id3v1_tag_size))
+    return regions
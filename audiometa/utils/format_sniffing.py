@@ -0,0 +1,52 @@
+"""Detection of the format of an audio file from its first bytes, for inputs that have no file name."""
+
+from typing import Callable
+
+from .riff_chunks import RIFF_FORM_W64, W64_HEADER_SIZE, get_riff_form
+from .tag_regions import ID3V2_HEADER_SIZE, get_id3v2_tag_size
+
+
+# Enough bytes to recognize any of the supported signatures, the longest being the Wave64 header, before the codec of
+# the first Ogg packet
+SIGNATURE_SIZE = W64_HEADER_SIZE
+
+# Offset of the first packet in an Ogg file whose first page has a single segment
+OGG_FIRST_PACKET_OFFSET = 28
+
+
+def _is_mpeg_audio_frame_sync(data: bytes) -> bool:
+    # 11 set sync bits, then a valid MPEG version (not 01) and layer (not 00)
+    return (len(data) >= 2 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0 and (data[1] & 0x18) != 0x08
+            and (data[1] & 0x06) != 0)
+
+
+def guess_file_extension(read_at: Callable[[int, int], bytes]) -> str | None:
+    """
+    Returns the extension of the format of the content (.mp3, .flac, .wav, .w64, .ogg, .opus or .m4a), None if it is
+    not recognized.
+
+    read_at(offset, size) returns the bytes at offset. ID3v2 tags are skipped, as they are also found in front of
+    FLAC and WAV content, so only the few bytes of the tag headers and of the signature are read.
+    """
+    offset = 0
+    header = read_at(0, SIGNATURE_SIZE)
+    while header.startswith(b'ID3'):
+        tag_size = get_id3v2_tag_size(header[:ID3V2_HEADER_SIZE])
+        if not tag_size:
+            break
+        offset += tag_size
+        header = read_at(offset, SIGNATURE_SIZE)
+
+    if header.startswith(b'fLaC'):
+        return '.flac'
+    riff_form = get_riff_form(header)
+    if riff_form is not None:
+        return '.w64' if riff_form == RIFF_FORM_W64 else '.wav'
+    if header.startswith(b'OggS'):
+        return '.opus' if header[OGG_FIRST_PACKET_OFFSET:].startswith(b'OpusHead') else '.ogg'
+    if header[4:8] == b'ftyp':
+        return '.m4a'
+    if offset or _is_mpeg_audio_frame_sync(header):
+        # Anything else after an ID3v2 tag is assumed to be MPEG audio, possibly after some padding or garbage
+        return '.mp3'
+    return None
@@ -0,0 +1,133 @@
+"""Pluggable timing instrumentation of the read and write stages.
+
+Stages are identified by (format, component, stage), e.g. ('.mp3', 'Id3v2Manager', 'extract_mutagen_metadata') or
+('.wav', 'AudioFile', 'subprocess.ffprobe'), where format is the file extension. Instrumentation is disabled by
+default: timed calls then only cost a global lookup, and no clock is read.
+
+Example:
+    instrumentation = HistogramInstrumentation()
+    set_instrumentation(instrumentation)
+    get_merged_app_metadata('song.mp3')
+    for (file_format, component, stage), histogram in instrumentation.get_histograms().items():
+        print(file_format, component, stage, histogram.count, histogram.get_percentile(0.99))
+"""
+
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, TypeVar
+
+
+StageKey = tuple[str, str, str]
+
+# Upper bounds of the histogram buckets: 1 µs doubling up to about 2 min, plus a last unbounded bucket
+HISTOGRAM_BUCKET_UPPER_BOUNDS_SEC = tuple(1e-6 * 2 ** exponent for exponent in range(27))
+
+R = TypeVar('R')
+
+
+class Instrumentation:
+    """Receives the duration of every timed stage. Subclasses decide how to aggregate or export them."""
+
+    def record(self, stage_key: StageKey, elapsed_sec: float) -> None:
+        raise NotImplementedError()
+
+
+@dataclass
+class StageTimingHistogram:
+    """
+    Distribution of the durations of a stage.
+
+    - count: Number of timed calls
+    - total_sec/min_sec/max_sec: Sum, minimum and maximum of the durations
+    - bucket_counts: Number of durations within each bound of HISTOGRAM_BUCKET_UPPER_BOUNDS_SEC, the last item
+      counting the longer ones
+    """
+    count: int = 0
+    total_sec: float = 0.0
+    min_sec: float = float('inf')
+    max_sec: float = 0.0
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * (len(HISTOGRAM_BUCKET_UPPER_BOUNDS_SEC) + 1))
+
+    def add(self, elapsed_sec: float) -> None:
+        self.count += 1
+        self.total_sec += elapsed_sec
+        self.min_sec = min(self.min_sec, elapsed_sec)
+        self.max_sec = max(self.max_sec, elapsed_sec)
+        for bucket_index, upper_bound_sec in enumerate(HISTOGRAM_BUCKET_UPPER_BOUNDS_SEC):
+            if elapsed_sec <= upper_bound_sec:
+                self.bucket_counts[bucket_index] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+    def get_mean_sec(self) -> float:
+        return self.total_sec / self.count if self.count else 0.0
+
+    def get_percentile(self, fraction: float) -> float:
+        """
+        Returns an upper estimate of the given percentile (e.g. 0.99), i.e. the upper bound of the bucket containing
+        it, capped by the maximum duration.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative_count = 0
+        for bucket_index, bucket_count in enumerate(self.bucket_counts[:-1]):
+            cumulative_count += bucket_count
+            if cumulative_count >= rank:
+                return min(HISTOGRAM_BUCKET_UPPER_BOUNDS_SEC[bucket_index], self.max_sec)
+        return self.max_sec
+
+
+class HistogramInstrumentation(Instrumentation):
+    """Aggregates durations in memory into one histogram per stage. Thread-safe."""
+
+    def __init__(self):
+        self._histograms: dict[StageKey, StageTimingHistogram] = {}
+        self._lock = Lock()
+
+    def record(self, stage_key: StageKey, elapsed_sec: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(stage_key)
+            if histogram is None:
+                histogram = self._histograms[stage_key] = StageTimingHistogram()
+            histogram.add(elapsed_sec)
+
+    def get_histograms(self) -> dict[StageKey, StageTimingHistogram]:
+        """Returns a snapshot of the histograms by (format, component, stage)."""
+        with self._lock:
+            return {
+                stage_key: StageTimingHistogram(histogram.count, histogram.total_sec, histogram.min_sec,
+                                                histogram.max_sec, list(histogram.bucket_counts))
+                for stage_key, histogram in self._histograms.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+_instrumentation: Instrumentation | None = None
+
+
+def set_instrumentation(instrumentation: Instrumentation | None) -> Instrumentation | None:
+    """Installs the process-wide instrumentation, None disabling it, and returns the previous one."""
+    global _instrumentation
+    previous_instrumentation = _instrumentation
+    _instrumentation = instrumentation
+    return previous_instrumentation
+
+
+def get_instrumentation() -> Instrumentation | None:
+    return _instrumentation
+
+
+def call_timed(file_format: str, component: str, stage: str, function: Callable[..., R], *args, **kwargs) -> R:
+    """Calls function, recording its duration under (file_format, component, stage) if instrumentation is enabled."""
+    instrumentation = _instrumentation
+    if instrumentation is None:
+        return function(*args, **kwargs)
+    start_time = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        instrumentation.record((file_format, component, stage), time.perf_counter() - start_time)
@@ -0,0 +1,140 @@
+"""Accounting of the I/O performed on an audio file, with an optional budget on the bytes read.
+
+Every open of an AudioFile goes through an IoAccountant, which returns AccountingFile wrappers counting the calls
+made on them, whether by the library itself or by mutagen when the wrapper is passed as its file object.
+"""
+
+import warnings
+from typing import IO
+
+from ..exceptions import ByteBudgetExceededError, ByteBudgetExceededWarning
+from .ByteBudgetPolicy import ByteBudgetPolicy
+from .IoStats import IoStats
+
+
+class IoAccountant:
+    """
+    Counts the I/O of one file into an IoStats and enforces max_bytes_read, if set, according to the policy.
+    """
+
+    stats: IoStats
+    max_bytes_read: int | None
+    byte_budget_policy: ByteBudgetPolicy
+
+    def __init__(self, file_path: str, max_bytes_read: int | None = None,
+                 byte_budget_policy: ByteBudgetPolicy = ByteBudgetPolicy.RAISE):
+        if max_bytes_read is not None and max_bytes_read < 0:
+            raise ValueError("max_bytes_read must not be negative")
+        self.file_path = file_path
+        self.stats = IoStats()
+        self.max_bytes_read = max_bytes_read
+        self.byte_budget_policy = byte_budget_policy
+        self._has_warned = False
+
+    def reset(self) -> None:
+        self.stats = IoStats()
+        self._has_warned = False
+
+    def open(self, mode: str = 'rb') -> 'AccountingFile':
+        file = open(self.file_path, mode)
+        self.record_open()
+        return AccountingFile(file, self)
+
+    def record_open(self) -> None:
+        self.stats.opens += 1
+
+    def record_read(self, size: int) -> None:
+        self.stats.reads += 1
+        self.stats.bytes_read += size
+        self._check_read_budget()
+
+    def record_external_read(self, size: int) -> None:
+        """Charges size bytes read by an external tool, checking the budget before the tool is run."""
+        if self.max_bytes_read is not None and self.stats.bytes_read + size > self.max_bytes_read:
+            self._on_budget_exceeded(self.stats.bytes_read + size)
+        self.stats.bytes_read += size
+
+    def record_seek(self) -> None:
+        self.stats.seeks += 1
+
+    def record_write(self, size: int) -> None:
+        self.stats.writes += 1
+        self.stats.bytes_written += size
+
+    def _check_read_budget(self) -> None:
+        if self.max_bytes_read is not None and self.stats.bytes_read > self.max_bytes_read:
+            self._on_budget_exceeded(self.stats.bytes_read)
+
+    def _on_budget_exceeded(self, bytes_read: int) -> None:
+        message = (f"Reading {self.file_path} takes {bytes_read} bytes, "
+                   f"more than the budget of {self.max_bytes_read} bytes")
+        if self.byte_budget_policy == ByteBudgetPolicy.RAISE:
+            raise ByteBudgetExceededError(message)
+        if not self._has_warned:
+            self._has_warned = True
+            warnings.warn(message, ByteBudgetExceededWarning, stacklevel=4)
+
+
+class AccountingFile:
+    """Binary file wrapper reporting its reads, seeks and writes to an IoAccountant."""
+
+    def __init__(self, file: IO[bytes], accountant: IoAccountant):
+        self._file = file
+        self._accountant = accountant
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._accountant.record_read(len(data))
+        return data
+
+    def readinto(self, buffer) -> int:
+        size = self._file.readinto(buffer)  # type: ignore[attr-defined]
+        self._accountant.record_read(size or 0)
+        return size
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        self._accountant.record_seek()
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def write(self, data: bytes) -> int:
+        size = self._file.write(data)
+        self._accountant.record_write(size)
+        return size
+
+    def truncate(self, size: int | None = None) -> int:
+        return self._file.truncate(size)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @property
+    def name(self) -> str:
+        return self._file.name
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def readable(self) -> bool:
+        return self._file.readable()
+
+    def writable(self) -> bool:
+        return self._file.writable()
+
+    def seekable(self) -> bool:
+        return self._file.seekable()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
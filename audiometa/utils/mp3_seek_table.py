@@ -0,0 +1,214 @@
+"""Frame-accurate seek tables for MP3 files.
+
+VBR files without a Xing TOC cannot be seeked accurately by byte proportion. A seek table is built by scanning the
+frame headers once (see mpeg_audio.iter_mpeg_frames), keeping the byte offset and first sample position of the
+first frame starting at or after every interval_ms milliseconds. Entries are stored in two array('Q') columns, i.e.
+16 bytes per entry, and tables are cached by file identity in memory and optionally on disk.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import IO, Callable, cast
+
+from .file_identity import FileIdentity, get_file_identity
+from .mpeg_audio import find_first_frame, iter_mpeg_frames, read_vbr_header
+from .tag_regions import get_audio_region
+
+
+DEFAULT_SEEK_TABLE_INTERVAL_MS = 500
+
+# Number of seek tables kept in the in-memory cache
+SEEK_TABLE_MEMORY_CACHE_SIZE = 256
+
+SEEK_TABLE_MAGIC = b'AMST'
+SEEK_TABLE_FORMAT_VERSION = 1
+# version, interval_ms, sample_rate, total_samples, audio_start, audio_end, entries count
+SEEK_TABLE_HEADER_STRUCT = struct.Struct('<BIIQQQQ')
+
+
+@dataclass
+class Mp3SeekTable:
+    """
+    Seek table of an MP3 stream.
+
+    - interval_ms: Requested spacing between two entries
+    - sample_rate: Sample rate of the stream in Hz
+    - total_samples: Number of samples in the stream (the Xing/Info/VBRI header frame excluded)
+    - audio_start/audio_end: Offsets of the first audio frame and of the end of the last one
+    - byte_offsets: Offset of the frame of each entry in the file
+    - sample_positions: Position of the first sample of the frame of each entry
+    """
+    interval_ms: int
+    sample_rate: int
+    total_samples: int
+    audio_start: int
+    audio_end: int
+    byte_offsets: array = field(default_factory=lambda: array('Q'))
+    sample_positions: array = field(default_factory=lambda: array('Q'))
+
+    def get_duration_in_sec(self) -> float:
+        return self.total_samples / self.sample_rate
+
+    def find_position_for_sample(self, sample: int) -> tuple[int, int]:
+        """
+        Returns (byte_offset, sample_position) of the last indexed frame starting at or before the given sample.
+        Decoding from byte_offset and skipping sample - sample_position samples is sample-accurate.
+        """
+        if not self.byte_offsets:
+            return self.audio_start, 0
+        index = max(0, bisect_right(self.sample_positions, max(0, sample)) - 1)
+        return self.byte_offsets[index], self.sample_positions[index]
+
+    def find_position_for_ms(self, position_ms: float) -> tuple[int, int]:
+        return self.find_position_for_sample(int(position_ms * self.sample_rate / 1000))
+
+    def get_byte_range_for_ms(self, start_ms: float, end_ms: float | None = None) -> tuple[int, int]:
+        """
+        Returns the (start, end) byte range covering [start_ms, end_ms[, end excluded. The range starts at an indexed
+        frame, so it may begin up to interval_ms before start_ms.
+        """
+        start_offset, _ = self.find_position_for_ms(start_ms)
+        if end_ms is None:
+            return start_offset, self.audio_end
+        end_sample = int(end_ms * self.sample_rate / 1000)
+        index = bisect_right(self.sample_positions, end_sample)
+        end_offset = self.byte_offsets[index] if index < len(self.byte_offsets) else self.audio_end
+        return start_offset, max(start_offset, end_offset)
+
+    def to_bytes(self) -> bytes:
+        byte_offsets = array('Q', self.byte_offsets)
+        sample_positions = array('Q', self.sample_positions)
+        if sys.byteorder != 'little':
+            byte_offsets.byteswap()
+            sample_positions.byteswap()
+        header = SEEK_TABLE_HEADER_STRUCT.pack(
+            SEEK_TABLE_FORMAT_VERSION, self.interval_ms, self.sample_rate, self.total_samples, self.audio_start,
+            self.audio_end, len(byte_offsets))
+        return SEEK_TABLE_MAGIC + header + byte_offsets.tobytes() + sample_positions.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Mp3SeekTable':
+        if not data.startswith(SEEK_TABLE_MAGIC):
+            raise ValueError("Not a serialized seek table")
+        header_end = len(SEEK_TABLE_MAGIC) + SEEK_TABLE_HEADER_STRUCT.size
+        version, interval_ms, sample_rate, total_samples, audio_start, audio_end, entries_count = \
+            SEEK_TABLE_HEADER_STRUCT.unpack(data[len(SEEK_TABLE_MAGIC):header_end])
+        if version != SEEK_TABLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported seek table format version: {version}")
+
+        columns_size = entries_count * 8
+        if len(data) != header_end + 2 * columns_size:
+            raise ValueError("Truncated seek table")
+        byte_offsets = array('Q', data[header_end:header_end + columns_size])
+        sample_positions = array('Q', data[header_end + columns_size:])
+        if sys.byteorder != 'little':
+            byte_offsets.byteswap()
+            sample_positions.byteswap()
+        return cls(interval_ms=interval_ms, sample_rate=sample_rate, total_samples=total_samples,
+                   audio_start=audio_start, audio_end=audio_end, byte_offsets=byte_offsets,
+                   sample_positions=sample_positions)
+
+
+_memory_cache: 'OrderedDict[tuple[FileIdentity, int], Mp3SeekTable]' = OrderedDict()
+_memory_cache_lock = Lock()
+
+
+def scan_mp3_seek_table(path: str | None, interval_ms: int = DEFAULT_SEEK_TABLE_INTERVAL_MS,
+                        opener: Callable[[], IO[bytes]] | None = None) -> Mp3SeekTable:
+    """
+    Builds the seek table of the MP3 file with a single streaming scan of its frame headers.
+    The file is opened with opener if given (e.g. AudioFile.get_file_object, to account the reads, or to scan
+    in-memory content with no path), else with open.
+    """
+    if interval_ms <= 0:
+        raise ValueError("interval_ms must be positive")
+    if path is None and opener is None:
+        raise ValueError("Either path or opener must be given")
+
+    with (opener() if opener else open(cast(str, path), 'rb')) as f:
+        start, end = get_audio_region(f, f.seek(0, os.SEEK_END))
+        first_frame = find_first_frame(f, start, end)
+        if first_frame is None:
+            raise ValueError("No MPEG audio frame found")
+        first_frame_offset, first_header, first_frame_data = first_frame
+        if read_vbr_header(first_frame_data, first_header) is not None:
+            first_frame_offset += first_header.frame_length
+
+        seek_table = Mp3SeekTable(interval_ms=interval_ms, sample_rate=first_header.sample_rate, total_samples=0,
+                                  audio_start=first_frame_offset, audio_end=first_frame_offset)
+        next_entry_sample = 0
+        sample_position = 0
+        for frame_offset, header in iter_mpeg_frames(f, first_frame_offset, end, first_header):
+            if sample_position >= next_entry_sample:
+                seek_table.byte_offsets.append(frame_offset)
+                seek_table.sample_positions.append(sample_position)
+                next_entry_sample = (sample_position * 1000 // (interval_ms * seek_table.sample_rate) + 1) * \
+                    interval_ms * seek_table.sample_rate // 1000
+            sample_position += header.samples_per_frame
+            seek_table.audio_end = frame_offset + header.frame_length
+
+        seek_table.total_samples = sample_position
+        return seek_table
+
+
+def _get_disk_cache_path(cache_dir: str, cache_key: tuple[FileIdentity, int]) -> str:
+    key_digest = hashlib.sha1(repr(cache_key).encode('ascii')).hexdigest()
+    return os.path.join(cache_dir, f'{key_digest}.seektable')
+
+
+def _read_disk_cache(cache_path: str) -> Mp3SeekTable | None:
+    try:
+        with open(cache_path, 'rb') as f:
+            return Mp3SeekTable.from_bytes(f.read())
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def _write_disk_cache(cache_dir: str, cache_path: str, seek_table: Mp3SeekTable) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write then rename, so that concurrent readers never see a partially written table
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(seek_table.to_bytes())
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def get_mp3_seek_table(path: str, interval_ms: int = DEFAULT_SEEK_TABLE_INTERVAL_MS,
+                       cache_dir: str | None = None, opener: Callable[[], IO[bytes]] | None = None) -> Mp3SeekTable:
+    """
+    Returns the seek table of the MP3 file, from the in-memory cache, then from cache_dir if given, and scans the file
+    only if neither has a table for the current identity of the file.
+    """
+    cache_key = (get_file_identity(path), interval_ms)
+    with _memory_cache_lock:
+        seek_table = _memory_cache.get(cache_key)
+        if seek_table is not None:
+            _memory_cache.move_to_end(cache_key)
+            return seek_table
+
+    cache_path = _get_disk_cache_path(cache_dir, cache_key) if cache_dir else None
+    seek_table = _read_disk_cache(cache_path) if cache_path else None
+    if seek_table is None:
+        seek_table = scan_mp3_seek_table(path, interval_ms, opener)
+        if cache_dir and cache_path:
+            _write_disk_cache(cache_dir, cache_path, seek_table)
+
+    with _memory_cache_lock:
+        _memory_cache[cache_key] = seek_table
+        while len(_memory_cache) > SEEK_TABLE_MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+    return seek_table
@@ -0,0 +1,154 @@
+"""MP4 atom (box) parsing, for MP4/M4A audio files.
+
+An MP4 file is a tree of atoms, each starting with a 32-bit big-endian size (1 for a 64-bit size following the type,
+0 for an atom extending to the end of the file) and a four-character type. The metadata lives in the
+moov/udta/meta/ilst atom, and the audio in mdat atoms, before or after moov, that the sample tables of moov point
+into with absolute chunk offsets (stco and co64 atoms).
+
+Only the atom headers are read while walking the tree: atoms that are not on the path being looked for, mdat
+included, are seeked over, so the metadata is found without reading the audio.
+"""
+
+import io
+from typing import BinaryIO, Iterator
+
+from .Mp4Atom import Mp4Atom
+
+
+MP4_FILE_EXTENSIONS = ('.m4a', '.mp4')
+
+MP4_ATOM_HEADER_SIZE = 8
+MP4_EXTENDED_ATOM_HEADER_SIZE = 16
+
+# Atoms of free space, which players ignore
+MP4_FREE_ATOM_TYPES = (b'free', b'skip')
+
+MP4_ILST_PATH = (b'moov', b'udta', b'meta', b'ilst')
+# Path from moov to the sample tables holding the chunk offsets, for each track
+MP4_SAMPLE_TABLE_PATH = (b'trak', b'mdia', b'minf', b'stbl')
+
+# The meta atom is a full box: its children follow 4 bytes of version and flags
+MP4_FULL_BOX_HEADER_SIZE = 4
+
+
+def iter_mp4_atoms(fileobj: BinaryIO, start: int, end: int) -> Iterator[Mp4Atom]:
+    """
+    Yields the atoms between start and end, reading only their headers.
+
+    Raises:
+        ValueError: If an atom header is invalid or an atom extends past end
+    """
+    offset = start
+    while offset + MP4_ATOM_HEADER_SIZE <= end:
+        fileobj.seek(offset)
+        header = fileobj.read(MP4_ATOM_HEADER_SIZE)
+        if len(header) < MP4_ATOM_HEADER_SIZE:
+            raise ValueError(f"Truncated atom header at offset {offset}")
+        size = int.from_bytes(header[:4], 'big')
+        atom_type = header[4:8]
+        header_size = MP4_ATOM_HEADER_SIZE
+        if size == 1:
+            extended_size = fileobj.read(8)
+            if len(extended_size) < 8:
+                raise ValueError(f"Truncated atom header at offset {offset}")
+            size = int.from_bytes(extended_size, 'big')
+            header_size = MP4_EXTENDED_ATOM_HEADER_SIZE
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise ValueError(f"Invalid size of the {atom_type!r} atom at offset {offset}")
+        yield Mp4Atom(type=atom_type, offset=offset, size=size, header_size=header_size)
+        offset += size
+
+
+def get_mp4_children_offset(fileobj: BinaryIO, atom: Mp4Atom) -> int:
+    """Returns the offset of the first child of the container atom."""
+    if atom.type != b'meta':
+        return atom.data_offset
+    # Unlike ISO files, QuickTime files have no version and flags in the meta atom: its first child follows the header
+    fileobj.seek(atom.data_offset + 4)
+    if fileobj.read(4) == b'hdlr':
+        return atom.data_offset
+    return atom.data_offset + MP4_FULL_BOX_HEADER_SIZE
+
+
+def find_mp4_atom_path(fileobj: BinaryIO, file_size: int, path: tuple[bytes, ...]) -> list[Mp4Atom]:
+    """
+    Returns the atoms along path from the top level (e.g. moov, udta, meta, ilst), as far as they are found: the
+    last one returned is the deepest existing atom of the path.
+
+    Raises:
+        ValueError: If the atom headers are invalid
+    """
+    atoms: list[Mp4Atom] = []
+    start, end = 0, file_size
+    for atom_type in path:
+        atom = next((child for child in iter_mp4_atoms(fileobj, start, end) if child.type == atom_type), None)
+        if atom is None:
+            break
+        atoms.append(atom)
+        start, end = get_mp4_children_offset(fileobj, atom), atom.end
+    return atoms
+
+
+def render_mp4_atom(atom_type: bytes, data: bytes) -> bytes:
+    """Returns the atom of the given type holding data, with a 64-bit size only if needed."""
+    size = MP4_ATOM_HEADER_SIZE + len(data)
+    if size > 0xFFFFFFFF:
+        return (1).to_bytes(4, 'big') + atom_type + (size + 8).to_bytes(8, 'big') + data
+    return size.to_bytes(4, 'big') + atom_type + data
+
+
+def render_mp4_free_atom(size: int) -> bytes:
+    """Returns a free atom of size bytes, header included, which must be at least MP4_ATOM_HEADER_SIZE."""
+    return render_mp4_atom(b'free', bytes(size - MP4_ATOM_HEADER_SIZE))
+
+
+def set_mp4_atom_size(buffer: bytearray, atom: Mp4Atom, buffer_offset: int, size: int) -> None:
+    """
+    Sets the size in the header of the atom, held in buffer from buffer_offset of the file.
+
+    Raises:
+        ValueError: If the size does not fit in the 32-bit size field of the atom
+    """
+    offset = atom.offset - buffer_offset
+    if atom.header_size == MP4_EXTENDED_ATOM_HEADER_SIZE:
+        buffer[offset + 8:offset + 16] = size.to_bytes(8, 'big')
+    elif size > 0xFFFFFFFF:
+        raise ValueError(f"The {atom.type!r} atom is too large for its 32-bit size field")
+    else:
+        buffer[offset:offset + 4] = size.to_bytes(4, 'big')
+
+
+def shift_mp4_chunk_offsets(moov: bytearray, shift: int, from_offset: int) -> None:
+    """
+    Adds shift to the chunk offsets of the tracks of the moov atom held in moov that are at or after from_offset, i.e.
+    that point into media data moved by shift bytes.
+
+    Raises:
+        ValueError: If the atoms are invalid, or an offset does not fit in a 32-bit stco entry
+    """
+    moov_file = io.BytesIO(moov)
+    moov_atom = next(iter_mp4_atoms(moov_file, 0, len(moov)))
+    sample_tables = [moov_atom]
+    for atom_type in MP4_SAMPLE_TABLE_PATH:
+        sample_tables = [child for container in sample_tables
+                         for child in iter_mp4_atoms(moov_file, container.data_offset, container.end)
+                         if child.type == atom_type]
+
+    for sample_table in sample_tables:
+        for atom in iter_mp4_atoms(moov_file, sample_table.data_offset, sample_table.end):
+            if atom.type not in (b'stco', b'co64'):
+                continue
+            entry_size = 4 if atom.type == b'stco' else 8
+            entries_offset = atom.data_offset + MP4_FULL_BOX_HEADER_SIZE + 4
+            entry_count = int.from_bytes(moov[entries_offset - 4:entries_offset], 'big')
+            if entries_offset + entry_count * entry_size > atom.end:
+                raise ValueError(f"Invalid {atom.type!r} atom at offset {atom.offset}")
+            for entry_offset in range(entries_offset, entries_offset + entry_count * entry_size, entry_size):
+                chunk_offset = int.from_bytes(moov[entry_offset:entry_offset + entry_size], 'big')
+                if chunk_offset >= from_offset:
+                    chunk_offset += shift
+                    if chunk_offset >= 1 << (8 * entry_size):
+                        raise ValueError("A chunk offset does not fit in its stco atom")
+                    moov[entry_offset:entry_offset + entry_size] = chunk_offset.to_bytes(entry_size, 'big')
@@ -0,0 +1,302 @@
+"""MPEG audio (MP3) frame header parsing.
+
+Only the 4-byte frame headers and the optional Xing/Info/VBRI header of the first frame are ever interpreted, the
+audio data itself is never decoded.
+
+Frame header layout (32 bits):
+- 11 bits: frame sync (all ones)
+- 2 bits: MPEG version (00: 2.5, 01: reserved, 10: 2, 11: 1)
+- 2 bits: layer (00: reserved, 01: III, 10: II, 11: I)
+- 1 bit: protection
+- 4 bits: bitrate index
+- 2 bits: sample rate index
+- 1 bit: padding
+- 1 bit: private
+- 2 bits: channel mode (11: mono)
+- 6 bits: mode extension, copyright, original, emphasis
+"""
+
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+from .AudioTechnicalInfo import AudioTechnicalInfo
+from .Mp3DurationMode import Mp3DurationMode
+from .tag_regions import get_audio_region
+
+
+FRAME_HEADER_SIZE = 4
+
+# Bytes read at once when scanning frames or looking for the first frame
+SCAN_BLOCK_SIZE = 64 * 1024
+
+MPEG_VERSION_1 = 3
+MPEG_VERSION_2 = 2
+MPEG_VERSION_2_5 = 0
+
+LAYER_1 = 3
+LAYER_2 = 2
+LAYER_3 = 1
+
+CHANNEL_MODE_MONO = 3
+
+BITRATES_KBPS = {
+    (MPEG_VERSION_1, LAYER_1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (MPEG_VERSION_1, LAYER_2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (MPEG_VERSION_1, LAYER_3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (MPEG_VERSION_2, LAYER_1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (MPEG_VERSION_2, LAYER_2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (MPEG_VERSION_2, LAYER_3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+SAMPLE_RATES = {
+    MPEG_VERSION_1: (44100, 48000, 32000),
+    MPEG_VERSION_2: (22050, 24000, 16000),
+    MPEG_VERSION_2_5: (11025, 12000, 8000),
+}
+
+XING_FRAMES_FLAG = 0x1
+XING_BYTES_FLAG = 0x2
+
+# The VBRI header always starts 32 bytes after the frame header
+VBRI_HEADER_OFFSET = FRAME_HEADER_SIZE + 32
+
+
+@dataclass(frozen=True)
+class MpegFrameHeader:
+    version: int
+    layer: int
+    bitrate_kbps: int
+    sample_rate: int
+    channels: int
+    frame_length: int
+    samples_per_frame: int
+
+    def is_compatible_with(self, other: 'MpegFrameHeader') -> bool:
+        """Frames of a same stream share their version, layer and sample rate, unlike false syncs in garbage data."""
+        return (self.version, self.layer, self.sample_rate) == (other.version, other.layer, other.sample_rate)
+
+    def get_side_info_size(self) -> int:
+        if self.version == MPEG_VERSION_1:
+            return 17 if self.channels == 1 else 32
+        return 9 if self.channels == 1 else 17
+
+
+@dataclass(frozen=True)
+class VbrHeader:
+    """Xing, Info (the CBR flavour of Xing written by LAME) or VBRI header found in the first frame."""
+    tag_id: bytes
+    frames: int | None
+    bytes: int | None
+
+    def is_vbr(self) -> bool:
+        return self.tag_id != b'Info'
+
+
+def parse_mpeg_frame_header(data: bytes, pos: int = 0) -> MpegFrameHeader | None:
+    """Returns the frame header at data[pos:pos + 4], or None if these bytes are not a valid frame header."""
+    if len(data) < pos + FRAME_HEADER_SIZE or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+
+    version = (data[pos + 1] >> 3) & 0x3
+    layer = (data[pos + 1] >> 1) & 0x3
+    bitrate_index = data[pos + 2] >> 4
+    sample_rate_index = (data[pos + 2] >> 2) & 0x3
+    padding = (data[pos + 2] >> 1) & 0x1
+    channel_mode = data[pos + 3] >> 6
+
+    # Reserved values, and free format (bitrate index 0) which cannot be sized from the header alone
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate_kbps = BITRATES_KBPS[(MPEG_VERSION_1 if version == MPEG_VERSION_1 else MPEG_VERSION_2, layer)][
+        bitrate_index]
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+
+    if layer == LAYER_1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate_kbps * 1000 // sample_rate + padding) * 4
+    elif layer == LAYER_3 and version != MPEG_VERSION_1:
+        samples_per_frame = 576
+        frame_length = 72 * bitrate_kbps * 1000 // sample_rate + padding
+    else:
+        samples_per_frame = 1152
+        frame_length = 144 * bitrate_kbps * 1000 // sample_rate + padding
+
+    return MpegFrameHeader(
+        version=version,
+        layer=layer,
+        bitrate_kbps=bitrate_kbps,
+        sample_rate=sample_rate,
+        channels=1 if channel_mode == CHANNEL_MODE_MONO else 2,
+        frame_length=frame_length,
+        samples_per_frame=samples_per_frame)
+
+
+def find_first_frame(fileobj: BinaryIO, start: int, end: int) -> tuple[int, MpegFrameHeader, bytes] | None:
+    """
+    Returns the offset, header and bytes of the first frame between start and end.
+
+    A candidate is only accepted if another compatible frame header follows it, or if it is the last frame before
+    end, so that sync-like bytes in junk data preceding the stream are skipped.
+    """
+    pos = start
+    while pos < end:
+        fileobj.seek(pos)
+        data = fileobj.read(min(SCAN_BLOCK_SIZE, end - pos))
+        if len(data) < FRAME_HEADER_SIZE:
+            return None
+
+        index = data.find(b'\xff')
+        while index != -1:
+            header = parse_mpeg_frame_header(data, index)
+            if header is not None:
+                frame_offset = pos + index
+                next_frame_offset = frame_offset + header.frame_length
+                fileobj.seek(frame_offset)
+                frame_data = fileobj.read(header.frame_length + FRAME_HEADER_SIZE)
+                next_header = parse_mpeg_frame_header(frame_data, header.frame_length)
+                if next_frame_offset >= end or (next_header and next_header.is_compatible_with(header)):
+                    return frame_offset, header, frame_data[:header.frame_length]
+            index = data.find(b'\xff', index + 1)
+
+        # Keep the last bytes, a header may straddle two blocks
+        pos += max(1, len(data) - FRAME_HEADER_SIZE + 1)
+    return None
+
+
+def read_vbr_header(frame_data: bytes, header: MpegFrameHeader) -> VbrHeader | None:
+    """Returns the Xing/Info or VBRI header stored in the given (first) frame, if any."""
+    xing_offset = FRAME_HEADER_SIZE + header.get_side_info_size()
+    tag_id = frame_data[xing_offset:xing_offset + 4]
+    if tag_id in (b'Xing', b'Info'):
+        flags = int.from_bytes(frame_data[xing_offset + 4:xing_offset + 8], 'big')
+        field_offset = xing_offset + 8
+        frames = None
+        stream_bytes = None
+        if flags & XING_FRAMES_FLAG:
+            frames = int.from_bytes(frame_data[field_offset:field_offset + 4], 'big')
+            field_offset += 4
+        if flags & XING_BYTES_FLAG:
+            stream_bytes = int.from_bytes(frame_data[field_offset:field_offset + 4], 'big')
+        return VbrHeader(tag_id=tag_id, frames=frames, bytes=stream_bytes)
+
+    if frame_data[VBRI_HEADER_OFFSET:VBRI_HEADER_OFFSET + 4] == b'VBRI':
+        return VbrHeader(
+            tag_id=b'VBRI',
+            frames=int.from_bytes(frame_data[VBRI_HEADER_OFFSET + 14:VBRI_HEADER_OFFSET + 18], 'big'),
+            bytes=int.from_bytes(frame_data[VBRI_HEADER_OFFSET + 10:VBRI_HEADER_OFFSET + 14], 'big'))
+    return None
+
+
+def iter_mpeg_frames(fileobj: BinaryIO, start: int, end: int,
+                     reference_header: MpegFrameHeader) -> Iterator[tuple[int, MpegFrameHeader]]:
+    """
+    Yields the offset and header of each frame between start and end, reading the file in blocks of SCAN_BLOCK_SIZE
+    bytes so that memory stays bounded whatever the file size.
+
+    Headers that are not compatible with reference_header are treated as garbage and the scan resynchronizes on the
+    next frame sync.
+    """
+    buffer = b''
+    buffer_offset = start
+    pos = 0
+    while True:
+        if len(buffer) - pos < FRAME_HEADER_SIZE:
+            absolute_pos = buffer_offset + pos
+            buffer = buffer[pos:] if pos <= len(buffer) else b''
+            buffer_offset = absolute_pos
+            pos = 0
+            read_offset = buffer_offset + len(buffer)
+            if read_offset >= end:
+                return
+            fileobj.seek(read_offset)
+            block = fileobj.read(min(SCAN_BLOCK_SIZE, end - read_offset))
+            if not block:
+                return
+            buffer += block
+            continue
+
+        header = parse_mpeg_frame_header(buffer, pos)
+        if header is None or not header.is_compatible_with(reference_header):
+            next_sync = buffer.find(b'\xff', pos + 1)
+            pos = next_sync if next_sync != -1 else len(buffer)
+            continue
+
+        frame_offset = buffer_offset + pos
+        if frame_offset + header.frame_length > end:
+            return
+        yield frame_offset, header
+        pos += header.frame_length
+
+
+def read_mp3_technical_info(fileobj: BinaryIO, file_size: int, mode: Mp3DurationMode) -> AudioTechnicalInfo:
+    """
+    Returns the technical info of an MP3 stream using the given native mode:
+    - FAST: duration from the Xing/Info/VBRI header of the first frame, or estimated from the first frame bitrate for
+      CBR files without such a header
+    - EXACT: streaming scan of every frame header, the bitrate being computed over the audio frames only
+    In both modes, the leading ID3v2 and trailing ID3v1/APEv2 tags are excluded from the bitrate computation.
+    """
+    start, end = get_audio_region(fileobj, file_size)
+    first_frame = find_first_frame(fileobj, start, end)
+    if first_frame is None:
+        raise ValueError("No MPEG audio frame found")
+    first_frame_offset, first_header, first_frame_data = first_frame
+    vbr_header = read_vbr_header(first_frame_data, first_header)
+
+    if mode == Mp3DurationMode.FAST:
+        return _read_mp3_technical_info_fast(first_frame_offset, first_header, vbr_header, end)
+    if mode == Mp3DurationMode.EXACT:
+        return _read_mp3_technical_info_exact(fileobj, first_frame_offset, first_header, vbr_header, end)
+    raise ValueError(f"Unsupported native MP3 duration mode: {mode}")
+
+
+def _read_mp3_technical_info_fast(first_frame_offset: int, first_header: MpegFrameHeader,
+                                  vbr_header: VbrHeader | None, end: int) -> AudioTechnicalInfo:
+    audio_size = end - first_frame_offset
+    if vbr_header is not None and vbr_header.frames:
+        duration = vbr_header.frames * first_header.samples_per_frame / first_header.sample_rate
+        # The header frame itself does not carry audio
+        stream_size = vbr_header.bytes or audio_size - first_header.frame_length
+        bitrate = int(stream_size * 8 / duration / 1000) if duration > 0 else 0
+        is_vbr = vbr_header.is_vbr()
+    else:
+        if vbr_header is not None:
+            audio_size -= first_header.frame_length
+        bitrate = first_header.bitrate_kbps
+        duration = audio_size * 8 / (bitrate * 1000)
+        is_vbr = False
+
+    return AudioTechnicalInfo(
+        duration_in_sec=duration,
+        bitrate=bitrate,
+        sample_rate=first_header.sample_rate,
+        channels=first_header.channels,
+        codec='mp3',
+        is_vbr=is_vbr,
+        duration_mode=Mp3DurationMode.FAST)
+
+
+def _read_mp3_technical_info_exact(fileobj: BinaryIO, first_frame_offset: int, first_header: MpegFrameHeader,
+                                   vbr_header: VbrHeader | None, end: int) -> AudioTechnicalInfo:
+    scan_start = first_frame_offset
+    if vbr_header is not None:
+        scan_start += first_header.frame_length
+
+    total_samples = 0
+    total_bytes = 0
+    bitrates: set[int] = set()
+    for _, header in iter_mpeg_frames(fileobj, scan_start, end, first_header):
+        total_samples += header.samples_per_frame
+        total_bytes += header.frame_length
+        bitrates.add(header.bitrate_kbps)
+
+    duration = total_samples / first_header.sample_rate
+    return AudioTechnicalInfo(
+        duration_in_sec=duration,
+        bitrate=int(total_bytes * 8 / duration / 1000) if duration > 0 else 0,
+        sample_rate=first_header.sample_rate,
+        channels=first_header.channels,
+        codec='mp3',
+        is_vbr=len(bitrates) > 1,
+        duration_mode=Mp3DurationMode.EXACT)
@@ -0,0 +1,264 @@
+"""Ogg page parsing, for Ogg Vorbis and Opus files.
+
+An Ogg file is a sequence of pages, each made of a 27-byte header, a table of segment sizes (lacing values) and the
+segments. A packet spans consecutive segments of a logical stream, ending with the first one smaller than 255 bytes,
+possibly across pages. The first packets of a stream are its headers: identification (alone in the first page), then
+comment (the Vorbis comments), then setup for Vorbis; the audio packets start on the page after the last header.
+
+Only the pages holding the header packets are read from the start of the file, and the duration comes from the
+granule position of the last page, found by reading the end of the file: the audio pages are never walked.
+
+Page header layout (little-endian):
+- 4 bytes: capture pattern 'OggS'
+- 1 byte: version (0)
+- 1 byte: header type flags (continued packet, first page, last page)
+- 8 bytes: granule position, -1 if no packet ends in the page
+- 4 bytes: serial number of the logical stream
+- 4 bytes: page sequence number in the logical stream
+- 4 bytes: CRC of the whole page, computed with this field zeroed
+- 1 byte: number of segments, followed by the segment table
+"""
+
+import zlib
+from math import ceil
+from typing import BinaryIO
+
+from .AudioTechnicalInfo import AudioTechnicalInfo
+from .OggPage import OggPage
+
+
+OGG_FILE_EXTENSIONS = ('.ogg', '.opus')
+
+OGG_PAGE_HEADER_SIZE = 27
+OGG_MAX_SEGMENT_COUNT = 255
+OGG_MAX_SEGMENT_SIZE = 255
+OGG_MAX_PAGE_SIZE = OGG_PAGE_HEADER_SIZE + OGG_MAX_SEGMENT_COUNT * (1 + OGG_MAX_SEGMENT_SIZE)
+
+OGG_CONTINUED_PACKET_FLAG = 0x01
+
+OGG_NO_GRANULE_POSITION = -1
+
+OGG_CODEC_VORBIS = 'vorbis'
+OGG_CODEC_OPUS = 'opus'
+
+# Number of header packets of each codec, the comment header being the second one
+OGG_HEADER_PACKET_COUNTS = {OGG_CODEC_VORBIS: 3, OGG_CODEC_OPUS: 2}
+OGG_COMMENT_PACKET_PREFIXES = {OGG_CODEC_VORBIS: b'\x03vorbis', OGG_CODEC_OPUS: b'OpusTags'}
+
+# Opus granule positions always count samples at 48 kHz, whatever the sample rate of the input
+OPUS_GRANULE_SAMPLE_RATE = 48000
+
+# The Ogg CRC is the big-endian counterpart of zlib's CRC-32: zlib computes it over bit-reversed bytes
+_BIT_REVERSED_BYTES = bytes(int(f'{byte:08b}'[::-1], 2) for byte in range(256))
+
+
+def get_ogg_crc(page: bytes | bytearray) -> bytes:
+    """Returns the 4 bytes of the CRC field of the page, whose own CRC field must be zeroed."""
+    crc = ~zlib.crc32(bytes(page).translate(_BIT_REVERSED_BYTES), 0xFFFFFFFF) & 0xFFFFFFFF
+    return crc.to_bytes(4, 'big').translate(_BIT_REVERSED_BYTES)
+
+
+def read_ogg_page(fileobj: BinaryIO, offset: int) -> OggPage:
+    """
+    Returns the header of the page at offset, reading only its header and segment table.
+
+    Raises:
+        ValueError: If there is no valid page header at offset
+    """
+    fileobj.seek(offset)
+    header = fileobj.read(OGG_PAGE_HEADER_SIZE)
+    if len(header) < OGG_PAGE_HEADER_SIZE or header[:4] != b'OggS':
+        raise ValueError(f"No Ogg page at offset {offset}")
+    if header[4] != 0:
+        raise ValueError(f"Unsupported Ogg version {header[4]} at offset {offset}")
+    segment_sizes = fileobj.read(header[26])
+    if len(segment_sizes) < header[26]:
+        raise ValueError(f"Truncated Ogg page at offset {offset}")
+    return OggPage(offset=offset, header_type=header[5],
+                   granule_position=int.from_bytes(header[6:14], 'little', signed=True),
+                   serial_number=int.from_bytes(header[14:18], 'little'),
+                   sequence_number=int.from_bytes(header[18:22], 'little'), segment_sizes=tuple(segment_sizes))
+
+
+def get_ogg_codec(identification_packet: bytes) -> str:
+    """
+    Returns the codec of the logical stream starting with the identification packet.
+
+    Raises:
+        ValueError: If the codec is neither Vorbis nor Opus
+    """
+    if identification_packet.startswith(b'\x01vorbis'):
+        return OGG_CODEC_VORBIS
+    if identification_packet.startswith(b'OpusHead'):
+        return OGG_CODEC_OPUS
+    raise ValueError("The Ogg stream is neither Vorbis nor Opus")
+
+
+def read_ogg_header_packets(fileobj: BinaryIO,
+                            packet_count: int | None = None) -> tuple[str, list[bytes], list[OggPage]]:
+    """
+    Returns the codec, the first packet_count header packets (all of them by default) and the pages holding them, of
+    the first logical stream of the file. Pages are read from the start of the file until the last of these packets is
+    complete.
+
+    Raises:
+        ValueError: If the file is not a valid Ogg Vorbis or Opus file
+    """
+    packets: list[bytes] = []
+    pages: list[OggPage] = []
+    packet = bytearray()
+    codec = ''
+    offset = 0
+    while not codec or len(packets) < (packet_count or OGG_HEADER_PACKET_COUNTS[codec]):
+        page = read_ogg_page(fileobj, offset)
+        offset = page.end
+        if pages and page.serial_number != pages[0].serial_number:
+            # Page of another multiplexed logical stream
+            continue
+        pages.append(page)
+        data = fileobj.read(page.size - page.header_size)
+        if len(data) < page.size - page.header_size:
+            raise ValueError(f"Truncated Ogg page at offset {page.offset}")
+
+        position = 0
+        for segment_size in page.segment_sizes:
+            packet += data[position:position + segment_size]
+            position += segment_size
+            if segment_size < OGG_MAX_SEGMENT_SIZE:
+                packets.append(bytes(packet))
+                packet = bytearray()
+                if not codec:
+                    codec = get_ogg_codec(packets[0])
+                if len(packets) == (packet_count or OGG_HEADER_PACKET_COUNTS[codec]):
+                    break
+    return codec, packets, pages
+
+
+def find_last_ogg_granule_position(fileobj: BinaryIO, file_size: int, serial_number: int) -> int:
+    """
+    Returns the granule position of the last page of the logical stream, searching backward from the end of the file
+    so that only the last pages are read.
+
+    Raises:
+        ValueError: If no page of the logical stream has a granule position
+    """
+    end = file_size
+    while end > 0:
+        start = max(0, end - OGG_MAX_PAGE_SIZE)
+        fileobj.seek(start)
+        data = fileobj.read(end - start)
+        index = len(data)
+        while (index := data.rfind(b'OggS', 0, index)) != -1:
+            header = data[index:index + OGG_PAGE_HEADER_SIZE]
+            if (len(header) == OGG_PAGE_HEADER_SIZE and header[4] == 0
+                    and int.from_bytes(header[14:18], 'little') == serial_number):
+                granule_position = int.from_bytes(header[6:14], 'little', signed=True)
+                if granule_position != OGG_NO_GRANULE_POSITION:
+                    return granule_position
+        if start == 0:
+            break
+        # Overlap the windows, for the page headers across their boundary
+        end = start + OGG_PAGE_HEADER_SIZE - 1
+    raise ValueError("No Ogg page with a granule position")
+
+
+def read_ogg_technical_info(fileobj: BinaryIO, file_size: int) -> AudioTechnicalInfo:
+    """
+    Returns the technical properties of the Vorbis or Opus stream, from its identification header and the granule
+    position of its last page.
+
+    Raises:
+        ValueError: If the file is not a valid Ogg Vorbis or Opus file
+    """
+    first_page = read_ogg_page(fileobj, 0)
+    identification_packet_size = 0
+    for segment_size in first_page.segment_sizes:
+        identification_packet_size += segment_size
+        if segment_size < OGG_MAX_SEGMENT_SIZE:
+            break
+    identification_packet = fileobj.read(identification_packet_size)
+    codec = get_ogg_codec(identification_packet)
+    granule_position = find_last_ogg_granule_position(fileobj, file_size, first_page.serial_number)
+
+    if codec == OGG_CODEC_VORBIS:
+        if len(identification_packet) < 28:
+            raise ValueError("Truncated Vorbis identification header")
+        channels = identification_packet[11]
+        sample_rate = int.from_bytes(identification_packet[12:16], 'little')
+        maximum_bitrate, nominal_bitrate, minimum_bitrate = (
+            int.from_bytes(identification_packet[index:index + 4], 'little', signed=True) for index in (16, 20, 24))
+        if not sample_rate:
+            raise ValueError("Invalid Vorbis sample rate")
+        duration = max(0, granule_position) / sample_rate
+        is_vbr = not (nominal_bitrate > 0 and maximum_bitrate == minimum_bitrate == nominal_bitrate)
+    else:
+        if len(identification_packet) < 19:
+            raise ValueError("Truncated Opus identification header")
+        channels = identification_packet[9]
+        pre_skip = int.from_bytes(identification_packet[10:12], 'little')
+        sample_rate = OPUS_GRANULE_SAMPLE_RATE
+        nominal_bitrate = 0
+        duration = max(0, granule_position - pre_skip) / OPUS_GRANULE_SAMPLE_RATE
+        is_vbr = True
+
+    if nominal_bitrate > 0:
+        bitrate = nominal_bitrate // 1000
+    else:
+        bitrate = int(file_size * 8 / duration / 1000) if duration > 0 else 0
+    return AudioTechnicalInfo(duration_in_sec=duration, bitrate=bitrate, sample_rate=sample_rate, channels=channels,
+                              codec=codec, is_vbr=is_vbr)
+
+
+def create_ogg_pages(packets: list[bytes], serial_number: int, first_sequence_number: int,
+                     page_count: int) -> list[bytes]:
+    """
+    Returns the pages holding the header packets, numbered from first_sequence_number, the last packet ending the last
+    page. The packets are spread over page_count pages if they fit, so that the pages after them keep their sequence
+    numbers; over as few pages as they fit in otherwise.
+    """
+    segment_sizes: list[int] = []
+    packet_end_segment_indexes = set()
+    for packet in packets:
+        segment_sizes.extend([OGG_MAX_SEGMENT_SIZE] * (len(packet) // OGG_MAX_SEGMENT_SIZE))
+        segment_sizes.append(len(packet) % OGG_MAX_SEGMENT_SIZE)
+        packet_end_segment_indexes.add(len(segment_sizes) - 1)
+    page_count = min(max(page_count, ceil(len(segment_sizes) / OGG_MAX_SEGMENT_COUNT)), len(segment_sizes))
+
+    data = b''.join(packets)
+    pages = []
+    segment_index = data_offset = 0
+    continued = False
+    for page_index in range(page_count):
+        # Fill the pages in order, leaving at least one segment for each of the next ones
+        segment_count = min(OGG_MAX_SEGMENT_COUNT, len(segment_sizes) - segment_index - (page_count - page_index - 1))
+        page_segment_sizes = segment_sizes[segment_index:segment_index + segment_count]
+        ends_packet = any(index in packet_end_segment_indexes
+                          for index in range(segment_index, segment_index + segment_count))
+        # Header packets have a granule position of 0
+        granule_position = 0 if ends_packet else OGG_NO_GRANULE_POSITION
+        page_data_size = sum(page_segment_sizes)
+
+        page = bytearray(b'OggS')
+        page += bytes((0, OGG_CONTINUED_PACKET_FLAG if continued else 0))
+        page += granule_position.to_bytes(8, 'little', signed=True)
+        page += serial_number.to_bytes(4, 'little')
+        page += (first_sequence_number + page_index).to_bytes(4, 'little')
+        page += bytes(4)
+        page += bytes((segment_count, *page_segment_sizes))
+        page += data[data_offset:data_offset + page_data_size]
+        page[22:26] = get_ogg_crc(page)
+        pages.append(bytes(page))
+
+        continued = segment_index + segment_count - 1 not in packet_end_segment_indexes
+        segment_index += segment_count
+        data_offset += page_data_size
+    return pages
+
+
+def renumber_ogg_page(page: bytes, sequence_number: int) -> bytes:
+    """Returns the page with the given sequence number, and its CRC updated accordingly."""
+    renumbered_page = bytearray(page)
+    renumbered_page[18:22] = sequence_number.to_bytes(4, 'little')
+    renumbered_page[22:26] = bytes(4)
+    renumbered_page[22:26] = get_ogg_crc(renumbered_page)
+    return bytes(renumbered_page)
@@ -0,0 +1,44 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, TypeVar
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Number of items submitted to the pool per worker, keeping the workers busy while results are consumed
+PARALLEL_MAP_QUEUED_ITEMS_PER_WORKER = 2
+
+
+def map_parallel(function: Callable[[T], R], items: Iterable[T], workers: int) -> Iterator[tuple[T, R]]:
+    """
+    Yields the (item, result) of function over items, computed by a pool of workers threads, in completion order.
+
+    Items are taken from the iterable as results are consumed, at most PARALLEL_MAP_QUEUED_ITEMS_PER_WORKER * workers
+    being submitted at any time, so items may be a lazy iterable of any length. With a single worker, results are in
+    the order of items. Exceptions raised by function are raised when its result is reached.
+
+    Raises:
+        ValueError: If workers is below 1
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    pending: dict[Future, T] = {}
+    items_iterator = iter(items)
+    items_left = True
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while items_left and len(pending) < PARALLEL_MAP_QUEUED_ITEMS_PER_WORKER * workers:
+                for item in items_iterator:
+                    pending[executor.submit(function, item)] = item
+                    break
+                else:
+                    items_left = False
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # Futures done together are taken in submission order, so that a single worker keeps the order of items
+            for future in [future for future in pending if future in done]:
+                yield pending.pop(future), future.result()
@@ -0,0 +1,50 @@
+"""Hashing of the audio payload of files, ignoring their tags.
+
+The same recording tagged differently has the same payload hash, so it finds duplicates that whole-file hashes miss.
+The payload is hashed in large blocks from a memory map of the file (hashlib releases the GIL on large blocks, so
+files can be hashed in parallel threads), and hashes are cached in memory by file identity and algorithm.
+"""
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
+
+from .file_identity import FileIdentity, get_file_identity
+
+
+DEFAULT_PAYLOAD_HASH_ALGORITHM = 'sha256'
+
+# Size of the slices of the memory map given to the hash function
+PAYLOAD_HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Number of hashes kept in the in-memory cache
+PAYLOAD_HASH_MEMORY_CACHE_SIZE = 65536
+
+
+def update_hash(hash_object: 'hashlib._Hash', buffer: memoryview, start: int, end: int) -> None:
+    """Feeds buffer[start:end] to hash_object in blocks of PAYLOAD_HASH_BLOCK_SIZE, without copying it."""
+    for block_start in range(start, end, PAYLOAD_HASH_BLOCK_SIZE):
+        hash_object.update(buffer[block_start:min(block_start + PAYLOAD_HASH_BLOCK_SIZE, end)])
+
+
+_memory_cache: 'OrderedDict[tuple[FileIdentity, str], str]' = OrderedDict()
+_memory_cache_lock = Lock()
+
+
+def get_payload_hash(path: str, algorithm: str, compute: Callable[[], str]) -> str:
+    """Returns the payload hash of the file from the in-memory cache, calling compute only on a cache miss."""
+    cache_key = (get_file_identity(path), algorithm)
+    with _memory_cache_lock:
+        payload_hash = _memory_cache.get(cache_key)
+        if payload_hash is not None:
+            _memory_cache.move_to_end(cache_key)
+            return payload_hash
+
+    payload_hash = compute()
+
+    with _memory_cache_lock:
+        _memory_cache[cache_key] = payload_hash
+        while len(_memory_cache) > PAYLOAD_HASH_MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+    return payload_hash
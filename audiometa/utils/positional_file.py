@@ -0,0 +1,359 @@
+"""Positional access to the content of an audio file, shared by all its reads and writes.
+
+The content comes from a lazily opened file descriptor (PositionalFile), a bytes-like object (PositionalBuffer) or a
+seekable binary stream (PositionalStream). Reads are positional, so any number of file-like views with their own
+position can share the source without seeking it. Tags live at the start (ID3v2, FLAC metadata blocks, RIFF header)
+and at the end (ID3v1, APEv2) of audio files, so the first and last blocks of files and streams are cached: the
+successive small reads of the managers and parsers are then served from memory.
+"""
+
+import io
+import os
+from typing import BinaryIO, cast
+
+from .file_copy import COPY_CHUNK_SIZE, copy_file_range
+from .io_accounting import IoAccountant
+
+
+HEAD_CACHE_SIZE = 64 * 1024
+TAIL_CACHE_SIZE = 64 * 1024
+
+
+class PositionalSource:
+    """
+    Positional reads and writes over some content, with a head/tail block cache and I/O accounting.
+    Only the reads that reach the underlying content are counted in the accountant.
+
+    The cached size and blocks are only dropped by writes through this source, never checked against the content:
+    a source must not outlive writes made by other objects or processes, unless invalidate_cache is called after them.
+    """
+
+    name: str
+
+    def __init__(self, name: str, accountant: IoAccountant, caches_blocks: bool = True):
+        self.name = name
+        self._accountant = accountant
+        self._caches_blocks = caches_blocks
+        self._size: int | None = None
+        self._head: bytes | None = None
+        self._tail: bytes | None = None
+        self._tail_offset = 0
+        self._writable_views_count = 0
+
+    def _read_raw(self, offset: int, size: int) -> bytes:
+        raise NotImplementedError()
+
+    def _write_raw(self, offset: int, data: bytes) -> int:
+        raise io.UnsupportedOperation(f"{self.name} is read-only")
+
+    def _truncate_raw(self, size: int) -> None:
+        raise io.UnsupportedOperation(f"{self.name} is read-only")
+
+    def _get_raw_size(self) -> int:
+        raise NotImplementedError()
+
+    def _prepare_write(self) -> None:
+        pass
+
+    def _move_raw(self, source_offset: int, destination_offset: int, size: int) -> None:
+        # Forward, the destination being before the source: every chunk is read before being overwritten
+        moved_size = 0
+        while moved_size < size:
+            chunk = self._read_raw(source_offset + moved_size, min(COPY_CHUNK_SIZE, size - moved_size))
+            if not chunk:
+                break
+            self._write_raw(destination_offset + moved_size, chunk)
+            moved_size += len(chunk)
+
+    def fileno(self, writable: bool = False) -> int:
+        raise io.UnsupportedOperation(f"{self.name} has no file descriptor")
+
+    def get_buffer(self) -> memoryview | None:
+        """Returns the whole content without copying it if it is held in memory, None otherwise."""
+        return None
+
+    def close(self) -> None:
+        self.invalidate_cache()
+
+    def invalidate_cache(self) -> None:
+        """Drops the cached blocks and size, e.g. after the content was modified without using this object."""
+        self._size = None
+        self._head = None
+        self._tail = None
+
+    def get_size(self) -> int:
+        if self._size is None:
+            self._size = self._get_raw_size()
+        return self._size
+
+    def _read_uncached(self, offset: int, size: int) -> bytes:
+        data = self._read_raw(offset, size)
+        self._accountant.record_read(len(data))
+        return data
+
+    def read_at(self, offset: int, size: int = -1) -> bytes:
+        """Returns up to size bytes starting at offset, all the remaining bytes if size is negative."""
+        file_size = self.get_size()
+        if offset >= file_size or size == 0:
+            return b''
+        end = file_size if size < 0 else min(file_size, offset + size)
+
+        if not self._caches_blocks or self._writable_views_count:
+            # Content being rewritten through a writable view is not cached
+            return self._read_uncached(offset, end - offset)
+        if end <= HEAD_CACHE_SIZE:
+            if self._head is None:
+                self._head = self._read_uncached(0, min(HEAD_CACHE_SIZE, file_size))
+            return self._head[offset:end]
+        if end == file_size and offset >= file_size - TAIL_CACHE_SIZE:
+            if self._tail is None:
+                self._tail_offset = max(0, file_size - TAIL_CACHE_SIZE)
+                self._tail = self._read_uncached(self._tail_offset, file_size - self._tail_offset)
+            return self._tail[offset - self._tail_offset:]
+        if offset >= file_size - TAIL_CACHE_SIZE and self._tail is not None:
+            return self._tail[offset - self._tail_offset:end - self._tail_offset]
+        return self._read_uncached(offset, end - offset)
+
+    def record_seek(self) -> None:
+        self._accountant.record_seek()
+
+    def write_at(self, offset: int, data: bytes) -> int:
+        self._prepare_write()
+        self.invalidate_cache()
+        written_size = self._write_raw(offset, data)
+        self._accountant.record_write(written_size)
+        return written_size
+
+    def truncate(self, size: int) -> int:
+        self._prepare_write()
+        self._truncate_raw(size)
+        self.invalidate_cache()
+        return size
+
+    def remove_range(self, offset: int, size: int) -> None:
+        """Removes size bytes at offset, shifting the bytes after them backward, then truncating the content."""
+        file_size = self.get_size()
+        size = min(size, file_size - offset)
+        if size <= 0:
+            return
+        moved_size = file_size - offset - size
+        self._prepare_write()
+        self.invalidate_cache()
+        if moved_size:
+            self._accountant.record_external_read(moved_size)
+            self._move_raw(offset + size, offset, moved_size)
+            self._accountant.record_write(moved_size)
+        self.truncate(file_size - size)
+
+    def open_view(self, writable: bool = False) -> 'PositionalFileView':
+        """Returns a new file-like object with its own position, reading and writing through this source."""
+        if writable:
+            self._prepare_write()
+            self._writable_views_count += 1
+            self.invalidate_cache()
+        return PositionalFileView(self, writable)
+
+    def _on_view_closed(self, writable: bool) -> None:
+        if writable:
+            self._writable_views_count -= 1
+            self.invalidate_cache()
+
+
+class PositionalFile(PositionalSource):
+    """
+    Lazily opened file, read with os.pread.
+
+    The file is opened read-only on first use, and reopened read-write only when a write is needed, so that reads
+    never produce close-after-write notifications. With read_only, it is never reopened: writes raise
+    io.UnsupportedOperation.
+    """
+
+    file_path: str
+
+    def __init__(self, file_path: str, accountant: IoAccountant, read_only: bool = False):
+        super().__init__(file_path, accountant)
+        self.file_path = file_path
+        self._file: BinaryIO | None = None
+        self._is_writable = False
+        self._read_only = read_only
+
+    def _get_file(self, writable: bool = False) -> BinaryIO:
+        if writable and self._read_only:
+            raise io.UnsupportedOperation(f"{self.file_path} is opened read-only")
+        if self._file is None or (writable and not self._is_writable):
+            if self._file is not None:
+                self._file.close()
+            self._file = cast(BinaryIO, open(self.file_path, 'r+b' if writable else 'rb', buffering=0))
+            self._is_writable = writable
+            self._accountant.record_open()
+        return self._file
+
+    def _prepare_write(self) -> None:
+        self._get_file(writable=True)
+
+    def _read_raw(self, offset: int, size: int) -> bytes:
+        file = self._get_file(self._is_writable)
+        if hasattr(os, 'pread'):
+            return os.pread(file.fileno(), size, offset)
+        # Platforms without pread: the descriptor position is not shared with the views, so seeking it is safe
+        file.seek(offset)
+        return file.read(size)
+
+    def _write_raw(self, offset: int, data: bytes) -> int:
+        file = self._get_file(writable=True)
+        if hasattr(os, 'pwrite'):
+            return os.pwrite(file.fileno(), data, offset)
+        file.seek(offset)
+        return file.write(data)
+
+    def _truncate_raw(self, size: int) -> None:
+        os.ftruncate(self._get_file(writable=True).fileno(), size)
+
+    def _move_raw(self, source_offset: int, destination_offset: int, size: int) -> None:
+        shift = source_offset - destination_offset
+        if shift < COPY_CHUNK_SIZE:
+            # Kernel copies must not overlap, so small shifts would take too many of them
+            super()._move_raw(source_offset, destination_offset, size)
+            return
+        fileno = self._get_file(writable=True).fileno()
+        for chunk_offset in range(0, size, shift):
+            copy_file_range(fileno, source_offset + chunk_offset, fileno, destination_offset + chunk_offset,
+                            min(shift, size - chunk_offset))
+
+    def _get_raw_size(self) -> int:
+        return os.fstat(self._get_file(self._is_writable).fileno()).st_size
+
+    def fileno(self, writable: bool = False) -> int:
+        return self._get_file(writable).fileno()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+
+class PositionalBuffer(PositionalSource):
+    """Read-only bytes-like content. Reads copy only the requested slices, and the content is never copied whole."""
+
+    def __init__(self, buffer: bytes | bytearray | memoryview, accountant: IoAccountant, name: str = '<memory>'):
+        super().__init__(name, accountant, caches_blocks=False)
+        view = memoryview(buffer)
+        self._buffer = view if view.format == 'B' and view.ndim == 1 else view.cast('B')
+
+    def _read_raw(self, offset: int, size: int) -> bytes:
+        return bytes(self._buffer[offset:offset + size])
+
+    def _get_raw_size(self) -> int:
+        return len(self._buffer)
+
+    def get_buffer(self) -> memoryview | None:
+        return self._buffer
+
+
+class PositionalStream(PositionalSource):
+    """
+    Seekable binary stream, e.g. a BytesIO or a spooled temporary file. The stream is written in place if it is
+    writable; its position is left undefined.
+    """
+
+    def __init__(self, stream: BinaryIO, accountant: IoAccountant, name: str = '<stream>'):
+        super().__init__(name, accountant)
+        self._stream = stream
+
+    def _read_raw(self, offset: int, size: int) -> bytes:
+        self._stream.seek(offset)
+        return self._stream.read(size)
+
+    def _write_raw(self, offset: int, data: bytes) -> int:
+        self._stream.seek(offset)
+        return self._stream.write(data)
+
+    def _truncate_raw(self, size: int) -> None:
+        self._stream.truncate(size)
+
+    def _get_raw_size(self) -> int:
+        return self._stream.seek(0, os.SEEK_END)
+
+
+class PositionalFileView:
+    """
+    Binary file-like object over a PositionalSource, with its own position, that can be passed to mutagen. Closing it
+    does not close the source.
+    """
+
+    def __init__(self, positional_source: PositionalSource, writable: bool):
+        self._positional_source = positional_source
+        self._writable = writable
+        self._position = 0
+        self.closed = False
+
+    @property
+    def name(self) -> str:
+        return self._positional_source.name
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._positional_source.read_at(self._position, -1 if size is None else size)
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self._positional_source.get_size() + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise OSError(22, "Invalid argument")
+        self._positional_source.record_seek()
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, data: bytes) -> int:
+        if not self._writable:
+            raise io.UnsupportedOperation("File view not open for writing")
+        written_size = self._positional_source.write_at(self._position, bytes(data))
+        self._position += written_size
+        return written_size
+
+    def truncate(self, size: int | None = None) -> int:
+        if not self._writable:
+            raise io.UnsupportedOperation("File view not open for writing")
+        return self._positional_source.truncate(self._position if size is None else size)
+
+    def flush(self) -> None:
+        pass
+
+    def fileno(self) -> int:
+        return self._positional_source.fileno(self._writable)
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return self._writable
+
+    def seekable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._positional_source._on_view_closed(self._writable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,244 @@
+"""RIFF chunk parsing, for WAV files, including their 64-bit forms: RF64 (and BW64) and Sony Wave64.
+
+A RIFF file is a header ('RIFF', 32-bit little-endian size of the rest of the file, 'WAVE') followed by chunks, each
+made of a four-character ID, a 32-bit size and the data, padded to an even size. Files above 4 GB use one of two forms:
+- RF64 (EBU Tech 3306) and BW64 (ITU-R BS.2088): same layout with 'RF64' or 'BW64' in place of 'RIFF', the 32-bit sizes
+  of the header and of the large chunks being 0xFFFFFFFF, their actual 64-bit sizes being held in the 'ds64' chunk,
+  which comes first: sizes of the RIFF content and of the data chunk, sample count, then a table of other chunk sizes
+- Wave64: GUIDs in place of the IDs, 64-bit sizes counting the header in place of the 32-bit ones, and chunks aligned
+  on 8 bytes. The IDs of the chunks are the four-character codes their GUIDs start with (e.g. 'data'), LIST and JUNK
+  chunks being reported as such
+
+Only the headers of the chunks (and the small ds64 chunk) are read, so the chunks are located at any file size without
+reading the audio.
+"""
+
+from typing import BinaryIO, Iterator
+
+from .AudioTechnicalInfo import AudioTechnicalInfo
+from .RiffChunk import RiffChunk
+
+
+RIFF_FILE_EXTENSIONS = ('.wav', '.w64')
+
+RIFF_FORM_RIFF = 'RIFF'
+RIFF_FORM_RF64 = 'RF64'
+RIFF_FORM_W64 = 'W64'
+
+# ID, size, form type
+RIFF_HEADER_SIZE = 12
+# ID and size
+RIFF_CHUNK_HEADER_SIZE = 8
+# GUID, size, form type GUID
+W64_HEADER_SIZE = 40
+# GUID and size
+W64_CHUNK_HEADER_SIZE = 24
+
+RIFF_FORM_HEADER_SIZES = {RIFF_FORM_RIFF: RIFF_HEADER_SIZE, RIFF_FORM_RF64: RIFF_HEADER_SIZE,
+                          RIFF_FORM_W64: W64_HEADER_SIZE}
+RIFF_FORM_CHUNK_HEADER_SIZES = {RIFF_FORM_RIFF: RIFF_CHUNK_HEADER_SIZE, RIFF_FORM_RF64: RIFF_CHUNK_HEADER_SIZE,
+                                RIFF_FORM_W64: W64_CHUNK_HEADER_SIZE}
+RIFF_FORM_CHUNK_ALIGNMENTS = {RIFF_FORM_RIFF: 2, RIFF_FORM_RF64: 2, RIFF_FORM_W64: 8}
+
+RF64_FORM_IDS = (b'RF64', b'BW64')
+# Value of the 32-bit sizes whose actual value is in the ds64 chunk
+RF64_SIZE_PLACEHOLDER = 0xFFFFFFFF
+# RIFF content size, data chunk size, sample count and table length
+RF64_DS64_FIXED_SIZE = 28
+RF64_DS64_TABLE_ENTRY_SIZE = 12
+
+W64_RIFF_GUID = b'riff\x2e\x91\xcf\x11\xa5\xd6\x28\xdb\x04\xc1\x00\x00'
+W64_WAVE_GUID = b'wave\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a'
+W64_CHUNK_GUIDS = {
+    b'LIST': b'list\x2f\x91\xcf\x11\xa5\xd6\x28\xdb\x04\xc1\x00\x00',
+    b'JUNK': b'junk\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a',
+    b'fmt ': b'fmt \xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a',
+    b'fact': b'fact\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a',
+    b'data': b'data\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a',
+    b'levl': b'levl\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a',
+    b'bext': b'bext\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a',
+}
+W64_CHUNK_IDS = {guid: chunk_id for chunk_id, guid in W64_CHUNK_GUIDS.items()}
+
+# Number of bytes from the start of the RIFF content holding its size: the header, plus the start of the ds64 chunk
+RIFF_FORM_SIZE_FIELDS_ENDS = {RIFF_FORM_RIFF: 8, RIFF_FORM_RF64: RIFF_HEADER_SIZE + RIFF_CHUNK_HEADER_SIZE + 8,
+                              RIFF_FORM_W64: 24}
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def get_riff_form(header: bytes) -> str | None:
+    """Returns the form (RIFF_FORM_*) of the WAVE content starting with header, None if it is not WAVE content."""
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return RIFF_FORM_RIFF
+    if header[:4] in RF64_FORM_IDS and header[8:12] == b'WAVE':
+        return RIFF_FORM_RF64
+    if header[:16] == W64_RIFF_GUID and header[24:40] == W64_WAVE_GUID:
+        return RIFF_FORM_W64
+    return None
+
+
+def read_riff_form(fileobj: BinaryIO, riff_start: int) -> str | None:
+    """Returns the form of the WAVE content starting at riff_start, None if there is none."""
+    fileobj.seek(riff_start)
+    return get_riff_form(fileobj.read(W64_HEADER_SIZE))
+
+
+def _read_rf64_sizes(fileobj: BinaryIO, chunk: RiffChunk) -> dict[bytes, int]:
+    """Returns the 64-bit sizes of the ds64 chunk, by chunk ID, the size of the RIFF content being under b'RF64'."""
+    fileobj.seek(chunk.data_offset)
+    data = fileobj.read(chunk.size)
+    if len(data) < RF64_DS64_FIXED_SIZE:
+        raise ValueError("Truncated ds64 chunk")
+    sizes = {b'RF64': int.from_bytes(data[0:8], 'little'), b'data': int.from_bytes(data[8:16], 'little')}
+    table_length = int.from_bytes(data[24:28], 'little')
+    for index in range(table_length):
+        entry = data[RF64_DS64_FIXED_SIZE + index * RF64_DS64_TABLE_ENTRY_SIZE:
+                     RF64_DS64_FIXED_SIZE + (index + 1) * RF64_DS64_TABLE_ENTRY_SIZE]
+        if len(entry) < RF64_DS64_TABLE_ENTRY_SIZE:
+            raise ValueError("Truncated ds64 chunk table")
+        sizes[entry[:4]] = int.from_bytes(entry[4:12], 'little')
+    return sizes
+
+
+def iter_riff_chunks(fileobj: BinaryIO, riff_start: int, file_size: int) -> Iterator[RiffChunk]:
+    """
+    Yields the chunks of the RIFF, RF64 or Wave64 content starting at riff_start, reading only their headers. The
+    sizes of the large RF64 chunks are taken from the ds64 chunk.
+
+    Raises:
+        ValueError: If there is no WAVE header at riff_start, or an RF64 chunk size is missing from the ds64 chunk
+    """
+    form = read_riff_form(fileobj, riff_start)
+    if form is None:
+        raise ValueError("No RIFF header")
+    header_size = RIFF_FORM_CHUNK_HEADER_SIZES[form]
+    alignment = RIFF_FORM_CHUNK_ALIGNMENTS[form]
+    rf64_sizes: dict[bytes, int] = {}
+    offset = riff_start + RIFF_FORM_HEADER_SIZES[form]
+    while offset + header_size <= file_size:
+        fileobj.seek(offset)
+        chunk_header = fileobj.read(header_size)
+        if form == RIFF_FORM_W64:
+            chunk_id = W64_CHUNK_IDS.get(chunk_header[:16], chunk_header[:4])
+            chunk_size = max(0, int.from_bytes(chunk_header[16:24], 'little') - W64_CHUNK_HEADER_SIZE)
+        else:
+            chunk_id = chunk_header[:4]
+            chunk_size = int.from_bytes(chunk_header[4:8], 'little')
+            if form == RIFF_FORM_RF64 and chunk_size == RF64_SIZE_PLACEHOLDER:
+                if chunk_id not in rf64_sizes:
+                    raise ValueError(f"No size for the {chunk_id!r} chunk in the ds64 chunk")
+                chunk_size = rf64_sizes[chunk_id]
+        chunk = RiffChunk(id=chunk_id, offset=offset, header_size=header_size, size=chunk_size,
+                          pad_size=-chunk_size % alignment)
+        if form == RIFF_FORM_RF64 and chunk_id == b'ds64':
+            rf64_sizes = _read_rf64_sizes(fileobj, chunk)
+        yield chunk
+        offset = chunk.end
+
+
+def get_riff_chunks_start(fileobj: BinaryIO, riff_start: int, form: str) -> int:
+    """
+    Returns the offset where chunks can be inserted in the content starting at riff_start: after the header, or after
+    the ds64 chunk, which must come first, for RF64 content.
+
+    Raises:
+        ValueError: If RF64 content does not start with a ds64 chunk
+    """
+    chunks_start = riff_start + RIFF_FORM_HEADER_SIZES[form]
+    if form != RIFF_FORM_RF64:
+        return chunks_start
+    fileobj.seek(chunks_start)
+    chunk_header = fileobj.read(RIFF_CHUNK_HEADER_SIZE)
+    if chunk_header[:4] != b'ds64':
+        raise ValueError("No ds64 chunk in the RF64 file")
+    chunk_size = int.from_bytes(chunk_header[4:8], 'little')
+    return chunks_start + RIFF_CHUNK_HEADER_SIZE + chunk_size + (chunk_size & 1)
+
+
+def get_riff_size(size_fields: bytes, form: str) -> int:
+    """Returns the size of the RIFF content, header included, from its first bytes (see RIFF_FORM_SIZE_FIELDS_ENDS)."""
+    if form == RIFF_FORM_RIFF:
+        return 8 + int.from_bytes(size_fields[4:8], 'little')
+    if form == RIFF_FORM_RF64:
+        return 8 + int.from_bytes(size_fields[20:28], 'little')
+    return int.from_bytes(size_fields[16:24], 'little')
+
+
+def set_riff_size(size_fields: bytearray, form: str, riff_size: int) -> None:
+    """
+    Sets the size of the RIFF content, header included, in its first bytes (see RIFF_FORM_SIZE_FIELDS_ENDS).
+
+    Raises:
+        ValueError: If the size does not fit in the 32-bit size of a RIFF file, or RF64 content has no ds64 chunk
+    """
+    if form == RIFF_FORM_RIFF:
+        if riff_size - 8 > 0xFFFFFFFF:
+            raise ValueError("The WAV file is too large for a RIFF size field")
+        size_fields[4:8] = (riff_size - 8).to_bytes(4, 'little')
+    elif form == RIFF_FORM_RF64:
+        if size_fields[12:16] != b'ds64':
+            raise ValueError("No ds64 chunk in the RF64 file")
+        size_fields[4:8] = RF64_SIZE_PLACEHOLDER.to_bytes(4, 'little')
+        size_fields[20:28] = (riff_size - 8).to_bytes(8, 'little')
+    else:
+        size_fields[16:24] = riff_size.to_bytes(8, 'little')
+
+
+def render_riff_chunk(form: str, chunk_id: bytes, data: bytes) -> bytes:
+    """Returns the chunk holding data, with the header and padding of the form."""
+    if form == RIFF_FORM_W64:
+        header = W64_CHUNK_GUIDS[chunk_id] + (W64_CHUNK_HEADER_SIZE + len(data)).to_bytes(8, 'little')
+    else:
+        header = chunk_id + len(data).to_bytes(4, 'little')
+    return header + data + bytes(-len(data) % RIFF_FORM_CHUNK_ALIGNMENTS[form])
+
+
+def render_riff_junk_chunk(form: str, size: int) -> bytes:
+    """Returns a JUNK chunk of size bytes, header included, which must be aligned and hold the header."""
+    return render_riff_chunk(form, b'JUNK', bytes(size - RIFF_FORM_CHUNK_HEADER_SIZES[form]))
+
+
+def read_riff_technical_info(fileobj: BinaryIO, riff_start: int, file_size: int) -> AudioTechnicalInfo:
+    """
+    Returns the technical properties of the WAVE content starting at riff_start, from its fmt chunk and the size of its
+    data chunk.
+
+    Raises:
+        ValueError: If the content has no valid fmt or data chunk
+    """
+    fmt_data = None
+    data_size = None
+    for chunk in iter_riff_chunks(fileobj, riff_start, file_size):
+        if chunk.id == b'fmt ' and fmt_data is None:
+            fileobj.seek(chunk.data_offset)
+            fmt_data = fileobj.read(min(chunk.size, 40))
+        elif chunk.id == b'data' and data_size is None:
+            data_size = min(chunk.size, file_size - chunk.data_offset)
+    if fmt_data is None or len(fmt_data) < 16:
+        raise ValueError("No valid fmt chunk")
+    if data_size is None:
+        raise ValueError("No data chunk")
+
+    format_tag = int.from_bytes(fmt_data[0:2], 'little')
+    channels = int.from_bytes(fmt_data[2:4], 'little')
+    sample_rate = int.from_bytes(fmt_data[4:8], 'little')
+    byte_rate = int.from_bytes(fmt_data[8:12], 'little')
+    bits_per_sample = int.from_bytes(fmt_data[14:16], 'little')
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt_data) >= 26:
+        # The format is in the first bytes of the sub-format GUID
+        format_tag = int.from_bytes(fmt_data[24:26], 'little')
+    if not byte_rate:
+        raise ValueError("Invalid byte rate in the fmt chunk")
+
+    if format_tag == WAVE_FORMAT_PCM:
+        codec = 'pcm_u8' if bits_per_sample == 8 else f'pcm_s{bits_per_sample}le'
+    elif format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        codec = f'pcm_f{bits_per_sample}le'
+    else:
+        codec = f'0x{format_tag:04x}'
+    return AudioTechnicalInfo(duration_in_sec=data_size / byte_rate, bitrate=byte_rate * 8 // 1000,
+                              sample_rate=sample_rate or None, channels=channels or None,
+                              bit_depth=bits_per_sample or None, codec=codec)
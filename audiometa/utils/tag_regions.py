@@ -0,0 +1,95 @@
+"""Location of the tag regions that surround the audio payload of a file.
+
+ID3v2 tags are found at the start of a file, ID3v1 and APEv2 tags at its end. In RIFF files, the tags are chunks
+next to the 'data' chunk holding the audio (see utils/riff_chunks). These helpers only read the few header/footer
+bytes needed to size each region, so the audio payload is never touched.
+"""
+
+from typing import BinaryIO
+
+
+ID3V2_HEADER_SIZE = 10
+ID3V2_FOOTER_SIZE = 10
+ID3V2_FOOTER_PRESENT_FLAG = 0x10
+
+ID3V1_TAG_SIZE = 128
+
+APE_TAG_FOOTER_SIZE = 32
+APE_TAG_HEADER_PRESENT_FLAG = 1 << 31
+
+
+def decode_synchsafe_int(data: bytes) -> int:
+    """Decode a 4-byte synchsafe integer (7 bits per byte), as used by ID3v2 sizes."""
+    return ((data[0] & 0x7F) << 21) | ((data[1] & 0x7F) << 14) | ((data[2] & 0x7F) << 7) | (data[3] & 0x7F)
+
+
+def encode_synchsafe_int(value: int) -> bytes:
+    """Encode a 4-byte synchsafe integer (7 bits per byte), as used by ID3v2 sizes."""
+    if not 0 <= value < 1 << 28:
+        raise ValueError(f"{value} does not fit in a synchsafe integer")
+    return bytes(((value >> 21) & 0x7F, (value >> 14) & 0x7F, (value >> 7) & 0x7F, value & 0x7F))
+
+
+def get_id3v2_tag_size(header: bytes) -> int:
+    """
+    Returns the total size in bytes of the ID3v2 tag starting at the beginning of header, including its 10-byte header
+    and optional footer, or 0 if header does not start with an ID3v2 tag.
+    """
+    if len(header) < ID3V2_HEADER_SIZE or not header.startswith(b'ID3'):
+        return 0
+    size = ID3V2_HEADER_SIZE + decode_synchsafe_int(header[6:10])
+    if header[5] & ID3V2_FOOTER_PRESENT_FLAG:
+        size += ID3V2_FOOTER_SIZE
+    return size
+
+
+def get_leading_id3v2_tags_size(fileobj: BinaryIO) -> int:
+    """
+    Returns the size of the ID3v2 tags at the start of the file. Some taggers prepend several tags; all of them are
+    counted.
+    """
+    total_size = 0
+    while True:
+        fileobj.seek(total_size)
+        tag_size = get_id3v2_tag_size(fileobj.read(ID3V2_HEADER_SIZE))
+        if not tag_size:
+            return total_size
+        total_size += tag_size
+
+
+def get_id3v1_tag_size(fileobj: BinaryIO, end: int) -> int:
+    """Returns ID3V1_TAG_SIZE if an ID3v1 tag ends at offset end, 0 otherwise."""
+    if end < ID3V1_TAG_SIZE:
+        return 0
+    fileobj.seek(end - ID3V1_TAG_SIZE)
+    return ID3V1_TAG_SIZE if fileobj.read(3) == b'TAG' else 0
+
+
+def get_ape_tag_size(fileobj: BinaryIO, end: int) -> int:
+    """Returns the size of the APEv2 tag (footer and optional header included) ending at offset end, 0 if none."""
+    if end < APE_TAG_FOOTER_SIZE:
+        return 0
+    fileobj.seek(end - APE_TAG_FOOTER_SIZE)
+    footer = fileobj.read(APE_TAG_FOOTER_SIZE)
+    if not footer.startswith(b'APETAGEX'):
+        return 0
+    # The size field counts the items and the footer, but not the optional header
+    size = int.from_bytes(footer[12:16], 'little')
+    flags = int.from_bytes(footer[20:24], 'little')
+    if flags & APE_TAG_HEADER_PRESENT_FLAG:
+        size += APE_TAG_FOOTER_SIZE
+    return min(size, end)
+
+
+def get_trailing_tags_size(fileobj: BinaryIO, file_size: int) -> int:
+    """Returns the size of the ID3v1 and APEv2 tags at the end of the file. APEv2 may sit before ID3v1."""
+    id3v1_size = get_id3v1_tag_size(fileobj, file_size)
+    ape_size = get_ape_tag_size(fileobj, file_size - id3v1_size)
+    return id3v1_size + ape_size
+
+
+def get_audio_region(fileobj: BinaryIO, file_size: int) -> tuple[int, int]:
+    """Returns the (start, end) offsets of the bytes between the leading and trailing tags of the file."""
+    start = get_leading_id3v2_tags_size(fileobj)
+    end = file_size - get_trailing_tags_size(fileobj, file_size)
+    return start, max(start, end)
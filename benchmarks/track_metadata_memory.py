@@ -0,0 +1,80 @@
+"""Memory benchmark of TrackMetadata records against AppMetadata dicts.
+
+Builds the metadata of synthetic tracks in both forms and reports the bytes retained per track: the sizes of the
+distinct objects reachable from the tracks, objects shared by tracks being counted once. Strings are created anew for
+each track, as when read from files, so that the sharing of the artists, albums and genres by interned strings is
+measured.
+
+Usage: python benchmarks/track_metadata_memory.py [track count, 1000000 by default]
+"""
+
+import gc
+import sys
+import time
+from typing import Callable
+
+from audiometa import AppMetadata, AppMetadataKey, TrackMetadata
+
+
+ARTIST_COUNT = 5000
+ALBUM_COUNT = 20000
+GENRES = ('Rock', 'Jazz', 'Electronic', 'Classical', 'Hip-Hop', 'Pop', 'Folk', 'Soul')
+
+
+def create_app_metadata(index: int) -> AppMetadata:
+    return {
+        AppMetadataKey.TITLE: f'Track title {index}',
+        AppMetadataKey.ARTISTS_NAMES: [f'Artist {index % ARTIST_COUNT}', f'Artist {(index * 7) % ARTIST_COUNT}'],
+        AppMetadataKey.ALBUM_NAME: f'Album {index % ALBUM_COUNT}',
+        AppMetadataKey.ALBUM_ARTISTS_NAMES: [f'Artist {index % ARTIST_COUNT}'],
+        AppMetadataKey.GENRE_NAME: ''.join(GENRES[index % len(GENRES)]),
+        AppMetadataKey.RATING: index % 11 * 10,
+        AppMetadataKey.TRACK_NUMBER: index % 15 + 1,
+        AppMetadataKey.BPM: 60 + index % 120,
+        AppMetadataKey.RELEASE_DATE: f'{1960 + index % 60}-01-01',
+    }
+
+
+def get_retained_size(root: object) -> int:
+    """Returns the total size of the distinct objects reachable from root through containers and TrackMetadata."""
+    seen_ids = set()
+    objects = [root]
+    size = 0
+    while objects:
+        obj = objects.pop()
+        if id(obj) in seen_ids:
+            continue
+        seen_ids.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            objects.extend(obj.keys())
+            objects.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            objects.extend(obj)
+        elif isinstance(obj, TrackMetadata):
+            objects.extend(obj.__getstate__())
+    return size
+
+
+def measure_bytes_per_track(create_track: Callable[[int], object], track_count: int) -> tuple[float, float]:
+    """Returns the bytes retained per track and the seconds taken to create each."""
+    gc.collect()
+    start_time = time.perf_counter()
+    tracks = [create_track(index) for index in range(track_count)]
+    elapsed_sec = time.perf_counter() - start_time
+    return (get_retained_size(tracks) - sys.getsizeof(tracks)) / track_count, elapsed_sec / track_count
+
+
+def main() -> None:
+    track_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dict_bytes, dict_sec = measure_bytes_per_track(create_app_metadata, track_count)
+    record_bytes, record_sec = measure_bytes_per_track(
+        lambda index: TrackMetadata(create_app_metadata(index)), track_count)
+    print(f'{track_count} tracks')
+    print(f'AppMetadata dict: {dict_bytes:.0f} bytes per track, built in {dict_sec * 1e6:.1f} us')
+    print(f'TrackMetadata:    {record_bytes:.0f} bytes per track ({record_bytes / dict_bytes:.0%}), '
+          f'built from the dict in {record_sec * 1e6:.1f} us')
+
+
+if __name__ == '__main__':
+    main()